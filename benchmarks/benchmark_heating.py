@@ -0,0 +1,313 @@
+"""
+Performance benchmarks for steady heating analyses, using engines built from the validation datasets (validation/data/*.json).
+
+Every combination of engine, number of grid points, coolant convection model, wall roughness and cooling jacket configuration is timed, and the results are written to a JSON file
+that can be compared with the output from another version of the package, to find performance regressions between releases.
+
+Usage:
+    python benchmarks/benchmark_heating.py --output benchmark.json
+    python benchmarks/benchmark_heating.py --quick --compare old_benchmark.json
+
+Notes:
+ - The engines use the geometry, channel dimensions and operating conditions from the validation notebooks. If CoolProp is installed, the hydrogen coolant properties come from CoolProp
+   (like in the notebooks), otherwise representative constant values are used. The exhaust gas always uses representative constant values, so Cantera is not needed.
+   Benchmarks should only be compared if they use the same "properties" (recorded in the output file).
+ - The datasets don't include channel roughness, so the rough wall cases all use ROUGHNESS.
+ - Each case is run 'repeat' times to measure the runtime, and then once more with tracemalloc and a cusfbamboo.profiling.Profiler to measure the peak memory and count the calls to each
+   solver callback and transport property (these slow the analysis down, so this run is not timed). The timed runs use the same engines as any other analysis, with nothing wrapped.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+# Use the copy of cusfbamboo in this repository (rather than an installed version), so the benchmarks can be run straight from a checkout of any release
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cusfbamboo as bam
+import cusfbamboo.config
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "validation", "data")
+ROUGHNESS = 10e-6                                                                           # Roughness used for the rough wall cases (m)
+
+# Representative properties for the hydrogen/oxygen exhaust gas, and for supercritical hydrogen (used if CoolProp is not installed)
+EXHAUST_PROPERTIES = {"Pr" : 0.6, "mu" : 1.0e-4, "k" : 0.6}
+HYDROGEN_PROPERTIES = {"Pr" : 0.9, "mu" : 1.2e-5, "k" : 0.12, "cp" : 13000.0, "rho" : 40.0}
+
+def _coolprop_hydrogen():
+    # CoolProp hydrogen properties, rounding temperatures up to 12 K like the validation notebooks do. Returns None if CoolProp is not installed.
+    try:
+        from CoolProp.CoolProp import PropsSI
+    except ImportError:
+        return None
+
+    outputs = {"Pr" : "PRANDTL", "mu" : "VISCOSITY", "k" : "CONDUCTIVITY", "cp" : "CPMASS", "rho" : "DMASS"}
+
+    def make(output):
+        return lambda T, p: PropsSI(output, "T", max(T, 12), "P", p, "HYDROGEN")
+
+    return {name : make(output) for name, output in outputs.items()}
+
+def _channels(configuration, xs, rs, channel_width, number_of_channels, blockage_ratio = None):
+    # Keyword arguments for a CoolingJacket with either configuration, with the same channel cross section. For vertical channels, the blockage ratio fills the space between the channels.
+    channel_width = np.asarray(channel_width, dtype = float)
+
+    if configuration == "vertical":
+        blockage = np.clip(1 - number_of_channels * channel_width / (2 * np.pi * np.asarray(rs)), 0.0, 0.99)
+
+        return {"number_of_channels" : number_of_channels,
+                "blockage_ratio" : cusfbamboo.config.TabulatedProfile(xs, blockage)}
+
+    else:
+        # CoolingJacket only uses 'number_of_channels' if a blockage ratio is given
+        return {"number_of_channels" : number_of_channels,
+                "channel_width" : cusfbamboo.config.TabulatedProfile(xs, channel_width),
+                "blockage_ratio" : 0.0 if blockage_ratio is None else cusfbamboo.config.TabulatedProfile(xs, blockage_ratio)}
+
+def pavli(configuration):
+    """Pavli 1966 (firing 9), hydrogen cooled spiral channels - see 'validation/Pavli 1966.ipynb'.
+    """
+    data = json.load(open(os.path.join(DATA_DIRECTORY, "pavli.json")))
+    xs = data["Chamber Contour"]["x (m)"]
+    rs = data["Chamber Contour"]["y (m)"]
+
+    channel_height = 2.54e-3
+    channel_width = np.interp(xs, data["Channel width"]["x (m)"], data["Channel width"]["w (m)"])
+    blockage_ratio = 2.045e-6 / (channel_width * channel_height)
+
+    return dict(perfect_gas = bam.PerfectGas(gamma = 1.2163, cp = 4063.1),
+                chamber_conditions = bam.ChamberConditions(p0 = 7.91e5, T0 = 2939),
+                geometry = bam.Geometry(xs = xs, rs = rs),
+                walls = bam.Wall(material = bam.materials.StainlessSteel304, thickness = 2.54e-3),
+                cooling_jacket = dict(T_coolant_in = data["Coolant temperature"]["T (K)"][0],
+                                      p_coolant_in = data["Coolant static pressure"]["p (Pa)"][0],
+                                      mdot_coolant = 0.0644,
+                                      channel_height = channel_height,
+                                      **_channels(configuration, xs, rs, channel_width, 8, blockage_ratio)),
+                counterflow = False)
+
+def vulcain(configuration):
+    """Vulcain combustion chamber (Kirner 1993), hydrogen cooled vertical channels - see 'validation/Vulcain Combustion Chamber.ipynb'.
+    """
+    data = json.load(open(os.path.join(DATA_DIRECTORY, "vulcain.json")))
+    xs = data["Kirner"]["Chamber Contour"]["x"]
+    rs = data["Kirner"]["Chamber Contour"]["y"]
+
+    x_key = [xs[0], xs[int(np.argmin(rs))], xs[-1]]
+    number_of_channels = 360
+
+    channel_height = cusfbamboo.config.TabulatedProfile(x_key, [9.5e-3, 11e-3, 12e-3])
+    fin_width = np.interp(xs, x_key, [2.0e-3, 1.3e-3, 2.6e-3])
+    channel_width = 2 * np.pi * np.asarray(rs) / number_of_channels - fin_width
+
+    return dict(perfect_gas = bam.PerfectGas(gamma = 1.2006, cp = 3866.5),
+                chamber_conditions = bam.ChamberConditions(p0 = 100e5, T0 = 3452.81),
+                geometry = bam.Geometry(xs = xs, rs = rs),
+                walls = bam.Wall(material = bam.Material(k = 295), thickness = 1e-3),
+                cooling_jacket = dict(T_coolant_in = 36.198,
+                                      p_coolant_in = 137.9e5,
+                                      mdot_coolant = 33.42,
+                                      channel_height = channel_height,
+                                      **_channels(configuration, xs, rs, channel_width, number_of_channels)),
+                counterflow = True)
+
+def ssme(configuration):
+    """SSME main combustion chamber (Pizzarelli), hydrogen cooled vertical channels, using the channel and wall dimensions from 'validation/data/ssme.json'.
+    """
+    data = json.load(open(os.path.join(DATA_DIRECTORY, "ssme.json")))
+    xs = data["Chamber contour"]["x (m)"]
+    rs = data["Chamber contour"]["y (m)"]
+
+    return dict(perfect_gas = bam.PerfectGas(gamma = 1.2, cp = 3700.0),
+                chamber_conditions = bam.ChamberConditions(p0 = 20.64e6, T0 = 3600),
+                geometry = bam.Geometry(xs = xs, rs = rs),
+                walls = bam.Wall(material = bam.Material(k = 316),
+                                 thickness = cusfbamboo.config.TabulatedProfile(data["Wall thickness"]["x (m)"], data["Wall thickness"]["t (m)"])),
+                cooling_jacket = dict(T_coolant_in = min(data["Coolant temperature"]["T (K)"]),
+                                      p_coolant_in = 26.5e6,
+                                      mdot_coolant = 13.15,
+                                      channel_height = cusfbamboo.config.TabulatedProfile(data["Channel height"]["x (m)"], data["Channel height"]["h (m)"]),
+                                      **_channels(configuration, xs, rs, np.interp(xs, data["Channel width"]["x (m)"], data["Channel width"]["w (m)"]), 390)),
+                counterflow = True)
+
+ENGINES = {"pavli" : pavli, "vulcain" : vulcain, "ssme" : ssme}
+
+def build_case(name, configuration, coolant_convection, roughness, coolant_properties):
+    """Build an Engine for a benchmark case.
+
+    Args:
+        name (str): Name of the engine, one of ENGINES.
+        configuration (str): Cooling jacket configuration, "vertical" or "spiral".
+        coolant_convection (str): Coolant convection model, e.g. "gnielinski".
+        roughness (float): Channel roughness (m), or None for smooth walls.
+        coolant_properties (dict): Coolant properties, in the form {name : float or callable}.
+
+    Returns:
+        tuple: (Engine, counterflow).
+    """
+    inputs = ENGINES[name](configuration)
+
+    cooling_jacket = bam.CoolingJacket(coolant_transport = bam.TransportProperties(**coolant_properties),
+                                       configuration = configuration,
+                                       roughness = roughness,
+                                       **inputs["cooling_jacket"])
+
+    engine = bam.Engine(perfect_gas = inputs["perfect_gas"],
+                        chamber_conditions = inputs["chamber_conditions"],
+                        geometry = inputs["geometry"],
+                        coolant_convection = coolant_convection,
+                        cooling_jacket = cooling_jacket,
+                        exhaust_transport = bam.TransportProperties(**EXHAUST_PROPERTIES),
+                        walls = inputs["walls"])
+
+    return engine, inputs["counterflow"]
+
+def run_case(name, num_grid, coolant_convection, roughness, configuration, coolant_properties, repeat = 3):
+    """Time a single benchmark case.
+
+    Args:
+        name (str): Name of the engine, one of ENGINES.
+        num_grid (int): Number of grid points.
+        coolant_convection (str): Coolant convection model.
+        roughness (float): Channel roughness (m), or None for smooth walls.
+        configuration (str): Cooling jacket configuration, "vertical" or "spiral".
+        coolant_properties (dict): Coolant properties, in the form {name : float or callable}.
+        repeat (int, optional): Number of timed runs. Defaults to 3.
+
+    Returns:
+        dict: Results for the case, including "runtime" (the fastest of the timed runs), "peak_memory" and "callback_counts" (calls to each solver callback, and to each transport property
+            as e.g. "coolant.mu").
+    """
+    runtimes = []
+
+    for i in range(repeat):
+        # Build a new engine each time, so cached values (e.g. Mach numbers) are only reused in the same way as in a single analysis
+        bam.engine._MACH_CACHES.clear()
+        engine, counterflow = build_case(name, configuration, coolant_convection, roughness, coolant_properties)
+
+        start = time.perf_counter()
+        results = engine.steady_heating_analysis(num_grid = num_grid, counterflow = counterflow, summary_only = True)
+        runtimes.append(time.perf_counter() - start)
+
+    bam.engine._MACH_CACHES.clear()
+    engine, counterflow = build_case(name, configuration, coolant_convection, roughness, coolant_properties)
+
+    tracemalloc.start()
+    profile = engine.steady_heating_analysis(num_grid = num_grid, counterflow = counterflow, summary_only = True, profile = True)["profile"]
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    callback_counts = {key : value["calls"] for key, value in profile["callbacks"].items()}
+
+    for label, counts in profile["properties"].items():
+        callback_counts.update({f"{label}.{key}" : calls for key, calls in counts.items()})
+
+    return {"engine" : name,
+            "num_grid" : num_grid,
+            "coolant_convection" : coolant_convection,
+            "roughness" : roughness,
+            "configuration" : configuration,
+            "runtime" : min(runtimes),
+            "runtimes" : runtimes,
+            "peak_memory" : peak_memory,
+            "callback_counts" : callback_counts,
+            "T_hw_max" : float(results["T_hw_max"]),
+            "T_coolant_out" : float(results["T_coolant_out"]),
+            "p_coolant_out" : float(results["p_coolant_out"])}
+
+def case_id(case):
+    return f'{case["engine"]}/{case["num_grid"]}/{case["coolant_convection"]}/{"rough" if case["roughness"] else "smooth"}/{case["configuration"]}'
+
+def compare(cases, previous, threshold):
+    """Print the change in runtime of each case compared to a previous benchmark file, and list the ones that got slower by more than 'threshold'.
+
+    Args:
+        cases (list): Cases from this run.
+        previous (dict): Contents of a previous benchmark file.
+        threshold (float): Fractional slowdown to report as a regression, e.g. 0.1 for 10%.
+
+    Returns:
+        list: IDs of the cases that regressed.
+    """
+    if previous.get("properties") != _properties_name():
+        print(f'Warning: the previous benchmark used "{previous.get("properties")}" properties, but this one uses "{_properties_name()}", so the runtimes are not comparable.')
+
+    old = {case_id(case) : case for case in previous["cases"]}
+    regressions = []
+
+    for case in cases:
+        if case_id(case) not in old:
+            continue
+
+        ratio = case["runtime"] / old[case_id(case)]["runtime"]
+        print(f"{case_id(case):55s} {old[case_id(case)]['runtime']:8.3f} s -> {case['runtime']:8.3f} s ({100 * (ratio - 1):+6.1f}%)")
+
+        if ratio > 1 + threshold:
+            regressions.append(case_id(case))
+
+    return regressions
+
+def _properties_name():
+    return "coolprop" if _coolprop_hydrogen() is not None else "constant"
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = "Benchmark steady heating analyses of the validation engines.")
+    parser.add_argument("--engines", nargs = "+", default = list(ENGINES.keys()), choices = list(ENGINES.keys()))
+    parser.add_argument("--num-grid", nargs = "+", type = int, default = [250, 1000, 4000])
+    parser.add_argument("--coolant-convection", nargs = "+", default = ["gnielinski", "dittus-boelter"], choices = ["gnielinski", "sieder-tate", "dittus-boelter"])
+    parser.add_argument("--configurations", nargs = "+", default = ["vertical", "spiral"], choices = ["vertical", "spiral"])
+    parser.add_argument("--repeat", type = int, default = 3, help = "Number of timed runs of each case")
+    parser.add_argument("--quick", action = "store_true", help = "Only use num_grid = 250, with one timed run of each case")
+    parser.add_argument("--output", default = None, help = "Path of the JSON file to write the results to")
+    parser.add_argument("--compare", default = None, help = "Path of a previous JSON output to compare the runtimes with")
+    parser.add_argument("--threshold", type = float, default = 0.1, help = "Fractional slowdown to report as a regression when using --compare")
+    args = parser.parse_args(arguments)
+
+    if args.quick:
+        args.num_grid = [250]
+        args.repeat = 1
+
+    coolant_properties = _coolprop_hydrogen()
+
+    if coolant_properties is None:
+        coolant_properties = HYDROGEN_PROPERTIES
+
+    cases = []
+
+    for name, num_grid, coolant_convection, roughness, configuration in itertools.product(args.engines, args.num_grid, args.coolant_convection, [None, ROUGHNESS], args.configurations):
+        case = run_case(name, num_grid, coolant_convection, roughness, configuration, coolant_properties, repeat = args.repeat)
+        cases.append(case)
+
+        print(f"{case_id(case):55s} {case['runtime']:8.3f} s {case['peak_memory'] / 1e6:8.2f} MB {sum(case['callback_counts'].values()):10d} calls")
+
+    output = {"version" : bam.__version__,
+              "python" : platform.python_version(),
+              "numpy" : np.__version__,
+              "platform" : platform.platform(),
+              "processor" : platform.processor(),
+              "properties" : _properties_name(),
+              "created" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "cases" : cases}
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent = 1)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(cases, json.load(f), args.threshold)
+
+        if regressions:
+            print(f"{len(regressions)} case(s) are more than {100 * args.threshold:.0f}% slower: {regressions}")
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
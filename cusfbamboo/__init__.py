@@ -1,11 +1,31 @@
+__version__ = "0.2.4"
+
 from cusfbamboo.engine import *
 from cusfbamboo.materials import Material, TransportProperties
 from cusfbamboo.plot import show
+from cusfbamboo.sweeps import sweep
+from cusfbamboo.convergence import grid_convergence
 
 import cusfbamboo.engine
 import cusfbamboo.isen
 import cusfbamboo.materials
 import cusfbamboo.circuit
 import cusfbamboo.hx
+import cusfbamboo.reducers
+import cusfbamboo.constraints
+import cusfbamboo.sweeps
+import cusfbamboo.convergence
+import cusfbamboo.config
+import cusfbamboo.cache
+import cusfbamboo.aio
+import cusfbamboo.property_service
+import cusfbamboo.profiling
+import cusfbamboo.transient
+import cusfbamboo.throttle
+import cusfbamboo.jackets
+import cusfbamboo.network
+import cusfbamboo.stress
+import cusfbamboo.conduction
+import cusfbamboo.fins
 import cusfbamboo.rao
 import cusfbamboo.plot
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+asyncio interface for running heating analyses without blocking the event loop.
+
+Each analysis runs on an executor (by default the event loop's default thread pool), while the event loop carries on with other work. Analyses can be cancelled or given a timeout,
+in which case the analysis is abandoned at the next grid point, and progress events can be streamed back to the event loop as the analysis marches along the cooling channel.
+
+Example:
+    async def main():
+        results = await engine.steady_heating_analysis_async(num_grid = 1000, timeout = 60)
+
+        queue = asyncio.Queue()
+        batch = asyncio.create_task(cusfbamboo.aio.run_batch([engine_1, engine_2], progress = queue, summary_only = True))
+
+    asyncio.run(main())
+
+Progress events are dictionaries with the keys:
+ - "event" - One of "started", "station", "finished", "failed", "cancelled" or "timeout".
+ - "case" - The index of the analysis in a batch (None for a single analysis).
+ - "x", "index" and "fraction" - For "station" events only. The axial position and index (in the direction of coolant flow) of the grid point, and the fraction of the grid points that
+   have been solved so far.
+ - "error" - For "failed" events only. The exception that was raised.
+
+Notes:
+ - With a ThreadPoolExecutor (or the default executor), analyses of the same Engine object can run at the same time, since analyses never modify the Engine (see RunContext).
+ - With a concurrent.futures.ProcessPoolExecutor, the analyses run in parallel, but the Engine must be picklable (see cusfbamboo.config). Only "started" and "finished" progress events
+   are sent, and cancellation stops waiting for the result, but cannot interrupt an analysis that a worker process has already started.
+ - With solver = "newton", every grid point is solved before any "station" events are sent, so cancellation only takes effect once the Newton iterations have finished.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+
+class _Stop(Exception):
+    # Raised inside the executor to abandon an analysis that has been cancelled
+    pass
+
+def _emit(progress, event):
+    # Send a progress event to either an asyncio.Queue or a function
+    if isinstance(progress, asyncio.Queue):
+        progress.put_nowait(event)
+    else:
+        progress(event)
+
+def _run(engine, analysis_kwargs, stop, report, progress_every):
+    # Run an analysis in a worker thread, checking at each grid point whether it has been cancelled. This uses the 'progress' hook rather than a 'callback', so the analysis
+    # can still skip the values it doesn't need.
+    def progress(index, num_points, x):
+        if stop.is_set():
+            raise _Stop
+
+        if report is not None and (index + 1) % progress_every == 0:
+            report({"event" : "station", "x" : x, "index" : index, "fraction" : (index + 1) / num_points})
+
+    return engine.steady_heating_analysis(**analysis_kwargs, progress = progress)
+
+async def steady_heating_analysis(engine, executor = None, timeout = None, progress = None, progress_every = 1, case = None, **analysis_kwargs):
+    """Run Engine.steady_heating_analysis() on an executor, without blocking the event loop.
+
+    Args:
+        engine (Engine): Engine to analyse.
+        executor (concurrent.futures.Executor, optional): Executor to run the analysis on. Defaults to None, in which case the event loop's default executor (a thread pool) is used.
+        timeout (float, optional): Maximum time to wait for the analysis (s). If it takes longer, the analysis is abandoned and asyncio.TimeoutError is raised. Defaults to None (no limit).
+        progress (asyncio.Queue or callable, optional): Where to send progress events - either a queue to put them in, or a function that is called with each event (on the event loop's thread). Defaults to None.
+        progress_every (int, optional): Number of grid points between "station" progress events. Defaults to 1.
+        case (int, optional): Value for the "case" key of progress events. Defaults to None.
+
+    Keyword Args:
+        Any keyword arguments for Engine.steady_heating_analysis(), e.g. num_grid = 1000.
+
+    Returns:
+        dict: Results of the analysis.
+    """
+    assert type(progress_every) is int and progress_every >= 1, "'progress_every' must be an integer that is at least 1"
+    assert "callback" not in analysis_kwargs, "'callback' cannot be used with asynchronous analyses - use 'progress' instead"
+
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+
+    def send(event):
+        if progress is not None:
+            _emit(progress, dict(event, case = case))
+
+    def report(event):
+        # Called from the worker thread, so the event needs to be passed back to the event loop's thread
+        loop.call_soon_threadsafe(send, event)
+
+    if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        function = functools.partial(engine.steady_heating_analysis, **analysis_kwargs)
+    else:
+        function = functools.partial(_run, engine, analysis_kwargs, stop, None if progress is None else report, progress_every)
+
+    send({"event" : "started"})
+
+    try:
+        results = await asyncio.wait_for(loop.run_in_executor(executor, function), timeout)
+
+    except asyncio.TimeoutError:
+        stop.set()
+        send({"event" : "timeout"})
+        raise
+
+    except asyncio.CancelledError:
+        stop.set()
+        send({"event" : "cancelled"})
+        raise
+
+    except Exception as error:
+        send({"event" : "failed", "error" : error})
+        raise
+
+    send({"event" : "finished"})
+
+    return results
+
+async def run_batch(engines, executor = None, max_concurrency = None, timeout = None, progress = None, progress_every = 1, return_exceptions = False, **analysis_kwargs):
+    """Run steady heating analyses of several engines concurrently, without blocking the event loop.
+
+    Args:
+        engines (list): List of Engine objects to analyse. Items can also be (Engine, dict) pairs, where the dictionary contains extra keyword arguments for Engine.steady_heating_analysis()
+            for that case only (e.g. (engine, {"coolant_inlet" : {"mdot_coolant" : 0.4}})).
+        executor (concurrent.futures.Executor, optional): Executor to run the analyses on. Defaults to None, in which case the event loop's default executor (a thread pool) is used.
+        max_concurrency (int, optional): Maximum number of analyses to run at once. Defaults to None (no limit, other than the size of the executor).
+        timeout (float, optional): Maximum time to wait for each analysis (s). Defaults to None (no limit).
+        progress (asyncio.Queue or callable, optional): Where to send progress events, which include the index of the case in 'engines' as event["case"]. Defaults to None.
+        progress_every (int, optional): Number of grid points between "station" progress events. Defaults to 1.
+        return_exceptions (bool, optional): If True, any exception raised by a case (including asyncio.TimeoutError) is returned in place of its results. Otherwise the first exception
+            cancels the remaining cases and is raised. Defaults to False.
+
+    Keyword Args:
+        Any keyword arguments for Engine.steady_heating_analysis(), which are used for every case, e.g. summary_only = True.
+
+    Returns:
+        list: Results for each case, in the same order as 'engines'.
+    """
+    semaphore = None if max_concurrency is None else asyncio.Semaphore(max_concurrency)
+
+    async def run_case(index, item):
+        if type(item) is tuple:
+            engine, case_kwargs = item
+        else:
+            engine, case_kwargs = item, {}
+
+        kwargs = dict(analysis_kwargs, **case_kwargs)
+
+        if semaphore is None:
+            return await steady_heating_analysis(engine, executor = executor, timeout = timeout, progress = progress, progress_every = progress_every, case = index, **kwargs)
+
+        async with semaphore:
+            return await steady_heating_analysis(engine, executor = executor, timeout = timeout, progress = progress, progress_every = progress_every, case = index, **kwargs)
+
+    tasks = [asyncio.ensure_future(run_case(index, item)) for index, item in enumerate(engines)]
+
+    try:
+        return await asyncio.gather(*tasks, return_exceptions = return_exceptions)
+
+    finally:
+        # Stop any cases that are still running (e.g. if one failed, or the batch was cancelled)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
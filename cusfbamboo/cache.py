@@ -0,0 +1,243 @@
+"""
+On-disk cache for heating analysis results, so that repeating an identical analysis (e.g. when re-running a notebook, or restarting a sweep) doesn't need to re-solve it.
+
+Results are stored in compressed numpy files, named after a hash of the engine definition (see cusfbamboo.config), the analysis options and the package version.
+Changing any input therefore gives a new entry, and old entries are never used with a different version of the package.
+
+Example:
+    cache = cusfbamboo.cache.ResultCache("results_cache")
+    results = engine.steady_heating_analysis(num_grid = 1000, cache = cache)     # Solves the problem and stores the results
+    results = engine.steady_heating_analysis(num_grid = 1000, cache = cache)     # Loads the stored results
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+import cusfbamboo
+import cusfbamboo.config
+
+def _canonical(value, name):
+    # Convert analysis options into something that can be written as JSON, with the same output for equivalent inputs
+    if value is None or type(value) is bool or type(value) is str:
+        return value
+
+    elif isinstance(value, (int, float, np.number)):
+        return _canonical_number(value)
+
+    elif type(value) is dict:
+        return {str(key) : _canonical(item, f"{name}[{key}]") for key, item in value.items()}
+
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(item, name) for item in value]
+
+    elif hasattr(value, "to_dict"):
+        return value.to_dict()
+
+    elif callable(value) and not hasattr(value, "__dict__"):
+        raise ValueError(f"'{name}' cannot be used with a ResultCache, because functions cannot be hashed reliably.")
+
+    elif hasattr(value, "__dict__"):
+        # Objects such as reducers and constraints - ignore their private running values
+        state = {key : item for key, item in vars(value).items() if not key.startswith("_")}
+
+        for key, item in state.items():
+            if callable(item) and not hasattr(item, "to_dict"):
+                raise ValueError(f"'{name}' cannot be used with a ResultCache, because it contains a function ('{key}'), which cannot be hashed reliably.")
+
+        return {"class" : f"{type(value).__module__}.{type(value).__name__}", "state" : _canonical(state, name)}
+
+    else:
+        raise ValueError(f"'{name}' cannot be used with a ResultCache, as it is a {type(value)}.")
+
+def _table_files(value, tables, seen):
+    # Find the property tables loaded from files, anywhere inside the engine. Their definitions only contain the file path, so the contents must be hashed separately.
+    if id(value) in seen:
+        return
+
+    seen.add(id(value))
+
+    if isinstance(value, cusfbamboo.config.PropertyTable):
+        if value.file is not None:
+            tables.append({"file" : value.file, "T" : value.T, "p" : value.p, "values" : value.values})
+
+    elif type(value) is dict:
+        for item in value.values():
+            _table_files(item, tables, seen)
+
+    elif type(value) in (list, tuple):
+        for item in value:
+            _table_files(item, tables, seen)
+
+    elif hasattr(value, "__dict__") and type(value).__module__.startswith("cusfbamboo"):
+        for item in vars(value).values():
+            _table_files(item, tables, seen)
+
+def _canonical_number(value):
+    # Integers and floats with the same value should give the same hash
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+class ResultCache:
+    def __init__(self, directory, max_bytes = 1e9):
+        """Cache of heating analysis results, stored in a directory. When the total size of the stored results is larger than 'max_bytes', the least recently used results are deleted.
+
+        The same directory can safely be used by several processes at once (e.g. the workers of cusfbamboo.sweep()).
+
+        Args:
+            directory (str): Directory to store the results in. Created if it doesn't exist.
+            max_bytes (float, optional): Maximum total size of the stored results (bytes). Defaults to 1e9 (i.e. 1 GB).
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.directory, exist_ok = True)
+
+    def key(self, engine, **options):
+        """Get the key used to store results, which is a hash of the engine definition, analysis options and package version. The contents of any property tables loaded from files are included, so editing a table file gives a new key.
+
+        Args:
+            engine (Engine): The Engine object. Must be convertible into an engine definition (see cusfbamboo.config.engine_to_dict()).
+
+        Keyword Args:
+            Any options that affect the results (e.g. num_grid = 1000).
+
+        Returns:
+            str: The key.
+        """
+        tables = []
+        _table_files(engine, tables, set())
+
+        definition = {"engine" : cusfbamboo.config.engine_to_dict(engine),
+                      "tables" : tables,
+                      "options" : _canonical(options, "options"),
+                      "version" : cusfbamboo.__version__}
+
+        text = json.dumps(_canonical(definition, "engine"), sort_keys = True, separators = (",", ":"))
+
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        """Load stored results.
+
+        Args:
+            key (str): Key of the results, from ResultCache.key().
+
+        Returns:
+            dict: The results, or None if they are not stored.
+        """
+        path = self._path(key)
+
+        try:
+            with np.load(path, allow_pickle = False) as data:
+                metadata = json.loads(str(data["__metadata__"]))
+                results = {name : data[name] if name in metadata["arrays"] else data[name].tolist() for name in data.files if name != "__metadata__"}
+
+            # Mark the results as recently used
+            os.utime(path)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, ValueError, KeyError):
+            # Unreadable file (e.g. from a process that was killed while writing) - treat it as missing
+            self._remove(path)
+            return None
+
+        results.update(metadata["other"])
+
+        return results
+
+    def put(self, key, results):
+        """Store results, and then delete the least recently used results if the cache is too large.
+
+        Args:
+            key (str): Key of the results, from ResultCache.key().
+            results (dict): Results from Engine.steady_heating_analysis().
+        """
+        columns = {}
+        metadata = {"arrays" : [], "other" : {}}
+
+        for name, value in results.items():
+            try:
+                array = None if (value is None or type(value) is dict) else np.asarray(value)
+            except ValueError:
+                array = None
+
+            if array is None or array.dtype.kind not in "biuf":
+                # Things like results["info"], which aren't numbers
+                metadata["other"][name] = value
+
+            else:
+                columns[name] = array
+
+                if type(value) is np.ndarray:
+                    metadata["arrays"].append(name)
+
+        columns["__metadata__"] = np.array(json.dumps(metadata, default = lambda item: np.asarray(item).tolist()))
+
+        # Write to a temporary file first, so other processes never see a partly written file
+        handle, temporary_path = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+
+        with os.fdopen(handle, "wb") as f:
+            np.savez_compressed(f, **columns)
+
+        os.replace(temporary_path, self._path(key))
+
+        self.evict()
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        # List of (last used time, size, path) for every stored result, oldest first
+        entries = []
+
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(entries)
+
+    @property
+    def size(self):
+        """Total size of the stored results (bytes).
+        """
+        return sum(entry[1] for entry in self._entries())
+
+    def evict(self):
+        """Delete the least recently used results until the total size is no more than 'max_bytes'.
+        """
+        entries = self._entries()
+        total = sum(entry[1] for entry in entries)
+
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Delete all stored results.
+        """
+        for mtime, size, path in self._entries():
+            self._remove(path)
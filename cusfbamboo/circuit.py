@@ -8,6 +8,7 @@ References:
     - [4] - https://en.wikipedia.org/wiki/Nucleate_boiling
     - [5] - https://en.wikipedia.org/wiki/Fin_(extended_surface)
     - [6] - Welty, Fundamentals of Momentum, Heat and Mass Transfer, Fifth Edition
+    - [7] - Ivey, H. J., Morris, D. J., On the Relevance of the Vapour-Liquid Exchange Mechanism for Sub-Cooled Boiling Heat Transfer at High Pressure, UKAEA AEEW-R 137 (1962)
 """
 
 import numpy as np
@@ -180,7 +181,7 @@ def Q_fin_adiabatic(P, Ac, k, h, L, T_b, T_inf):
 
 
 # Nucleate boiling
-def dQ_dA_nucleate(mu_l, h_fg, rho_l, rho_v, sigma, cp_l, T_w, T_sat, C_sf, Pr_l):
+def dQ_dA_nucleate(mu_l, h_fg, rho_l, rho_v, sigma, cp_l, T_w, T_sat, C_sf, Pr_l, n = 1.7):
     """Get the heat flux due to nucleate boiling. From Rohsenow's equation [4][6].
 
     Args:
@@ -194,11 +195,12 @@ def dQ_dA_nucleate(mu_l, h_fg, rho_l, rho_v, sigma, cp_l, T_w, T_sat, C_sf, Pr_l
         T_sat (float): Saturation temperature of the fluid (K)
         C_sf (float): Surface-fluid coefficient. Will be different for different material + fluid combinations. Some examples are available in [4] and [6].
         Pr_l (float): Prandtl number of the liquid phase
+        n (float, optional): Prandtl number exponent. Defaults to 1.7, but should be 1.0 for water [6].
 
     Returns:
         float: Heat flux (W/m2)
     """
-    return mu_l * h_fg * (GRAVITY * (rho_l - rho_v) / sigma)**0.5 * (cp_l * (T_w - T_sat) / (C_sf * h_fg * Pr_l**1.7))**3
+    return mu_l * h_fg * (GRAVITY * (rho_l - rho_v) / sigma)**0.5 * (cp_l * (T_w - T_sat) / (C_sf * h_fg * Pr_l**n))**3
 
 def dQ_dA_nucleate_critical(h_fg, rho_v, sigma, rho_l):
     """Get the critical heat flux due to nucleate boiling, i.e. the maximum heat transfer rate that is possible. From Rohsenow's equation [4][6].
@@ -214,6 +216,22 @@ def dQ_dA_nucleate_critical(h_fg, rho_v, sigma, rho_l):
     """
     return 0.18 * h_fg * rho_v * ( (sigma * GRAVITY * (rho_l - rho_v)) / (rho_v**2) )**0.25
 
+def dQ_dA_critical_subcooling(rho_l, rho_v, cp_l, h_fg, T_sat, T_bulk):
+    """Get the factor that the critical heat flux increases by when the bulk liquid is subcooled, i.e. below the saturation temperature. From Ivey and Morris [7].
+
+    Args:
+        rho_l (float): Density of the liquid phase (kg/m3)
+        rho_v (float): Density of the vapour phase (kg/m3)
+        cp_l (float): Isobaric specific heat capacity of the liquid (J/kg/K)
+        h_fg (float): Enthalpy between vapour and liquid phases. h_fg = h_g - h_f. (J/kg)
+        T_sat (float): Saturation temperature of the fluid (K)
+        T_bulk (float): Bulk temperature of the liquid (K)
+
+    Returns:
+        float: Ratio of the subcooled critical heat flux to the saturated critical heat flux (e.g. from dQ_dA_nucleate_critical())
+    """
+    return 1 + 0.1 * (rho_l / rho_v)**0.75 * cp_l * max(T_sat - T_bulk, 0.0) / h_fg
+
 def h_coolant_stable_film(k_vf, rho_vf, rho_v, rho_l, h_fg, cp_l, dT, mu_vf, T_w, T_sat, sigma):
     """Convective heat transfer coefficient for the stable-film phase of boiling heat transfer [6]. The film temperature is defined as the mean of the wall and freestream temperature, i.e. 0.5 * (T_w + T_bulk)
        
@@ -0,0 +1,258 @@
+"""
+Steady 2-D axisymmetric (x, r) conduction through the walls of an engine, including axial conduction. Used by Engine.steady_heating_analysis_2d().
+
+The walls are split into a number of radial nodes at every grid point of the coolant march, and the finite volume conduction equations for every node are solved at once, as a sparse
+linear system with convective (Robin) boundary conditions on the hot and cold sides. Axial conduction is included between neighbouring grid points, and the ends of the cooling jacket
+are adiabatic.
+
+The conduction matrix only depends on the geometry and materials, but the convective boundary conditions change with every coupling iteration. The sparse LU factorization is therefore
+done with a fixed set of reference boundary conductances, and is then used as the preconditioner for conjugate gradient iterations with the actual boundary conductances. Since the two
+matrices only differ on the diagonal of the boundary nodes, this converges in a few back substitutions. 
+
+Walls (AxisymmetricWall) are never modified once they have been made, so they are cached by geometry and materials and shared by every analysis of the same walls (e.g. in a sweep, 
+including from several threads at once). The factorization depends on the boundary conductances of a single analysis, so it is kept in an AxisymmetricSolver, which each analysis 
+makes for itself.
+
+Notation:
+ - 'c': Cold side (usually coolant)
+ - 'h': Hot side (usually exhaust gas)
+ - Nodes are numbered from the hot side (j = 0) to the cold side (j = -1), like the walls in an Engine. All values are per unit axial length.
+"""
+
+import hashlib
+import threading
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+WALL_CACHE_SIZE = 8         # Maximum number of walls to keep
+
+_WALLS = {}
+_WALLS_LOCK = threading.Lock()      # Held when adding to or removing from _WALLS, so threads can share the walls
+
+class RadialWall:
+    def __init__(self, r_faces, k):
+        """Radial nodes through a cylindrical wall, at a set of axial stations, with convective boundary conditions on the hot and cold sides. Shared by AxisymmetricWall and 
+        cusfbamboo.transient.TransientWallSolver. All values are per unit axial length.
+
+        Args:
+            r_faces (numpy.ndarray): Radii of the faces between nodes (m), with shape (stations, nodes + 1). r_faces[:, 0] is the hot side surface and r_faces[:, -1] is the cold side surface.
+            k (numpy.ndarray): Thermal conductivity of each node (W/m/K), with shape (stations, nodes).
+
+        Attributes:
+            r (numpy.ndarray): Radius of each node (m), with shape (stations, nodes).
+            G (numpy.ndarray): Radial conductance between neighbouring nodes per unit axial length (W/m/K), with shape (stations, nodes - 1).
+            R_h (numpy.ndarray): Conduction resistance from the first node to the hot side surface, per unit axial length (K m/W), with shape (stations,).
+            R_c (numpy.ndarray): Conduction resistance from the last node to the cold side surface, per unit axial length (K m/W), with shape (stations,).
+        """
+        r_faces = np.asarray(r_faces, dtype = float)
+        k = np.asarray(k, dtype = float)
+
+        assert r_faces.ndim == 2 and r_faces.shape[1] >= 2, "'r_faces' must have the shape (stations, nodes + 1)"
+        assert k.shape == (r_faces.shape[0], r_faces.shape[1] - 1), "'k' must have the shape (stations, nodes)"
+        assert np.all(np.diff(r_faces, axis = 1) > 0), "'r_faces' must increase from the hot side to the cold side"
+        assert np.all(k > 0), "'k' must be positive"
+
+        self.stations, self.nodes = k.shape
+
+        # Each node sits at the middle of its annulus. Each half of the annulus has a cylindrical conduction resistance ln(r2/r1) / (2 pi k).
+        self.r = (r_faces[:, :-1] + r_faces[:, 1:]) / 2
+        R_inner = np.log(self.r / r_faces[:, :-1]) / (2 * np.pi * k)
+        R_outer = np.log(r_faces[:, 1:] / self.r) / (2 * np.pi * k)
+
+        self.G = 1.0 / (R_outer[:, :-1] + R_inner[:, 1:])
+        self.R_h = R_inner[:, 0]
+        self.R_c = R_outer[:, -1]
+
+    def boundary_conductance(self, hA, R_wall):
+        """Conductance between a fluid and the nearest node, with convection to the surface in series with conduction to the node. Written so that hA = 0 (no heat transfer) is allowed.
+
+        Args:
+            hA (numpy.ndarray): Convective heat transfer coefficient multiplied by the surface area per unit axial length (W/m/K), at each station.
+            R_wall (numpy.ndarray): Conduction resistance from the surface to the node (K m/W), at each station (i.e. R_h or R_c).
+
+        Returns:
+            numpy.ndarray: Conductance per unit axial length (W/m/K), at each station.
+        """
+        hA = np.asarray(hA, dtype = float)
+        return hA / (1.0 + hA * R_wall)
+
+    def surface_temperatures(self, T, T_h, G_h, T_c, G_c):
+        """Get the hot and cold side surface temperatures, and the heat flows through them.
+
+        Args:
+            T (numpy.ndarray): Node temperatures (K), with shape (stations, nodes).
+            T_h (numpy.ndarray): Hot fluid temperature at each station (K).
+            G_h (numpy.ndarray): Conductance between the hot fluid and the first node at each station (W/m/K).
+            T_c (numpy.ndarray): Cold fluid temperature at each station (K).
+            G_c (numpy.ndarray): Conductance between the cold fluid and the last node at each station (W/m/K).
+
+        Returns:
+            tuple: (T_hw, T_cw, dQ_dx_h, dQ_dx_c) - the hot and cold side surface temperatures (K), the heat flow per unit axial length from the hot fluid into the wall (W/m), and the
+            heat flow per unit axial length from the wall into the cold fluid (W/m).
+        """
+        dQ_dx_h = G_h * (T_h - T[:, 0])
+        dQ_dx_c = G_c * (T[:, -1] - T_c)
+
+        return T[:, 0] + dQ_dx_h * self.R_h, T[:, -1] - dQ_dx_c * self.R_c, dQ_dx_h, dQ_dx_c
+
+class AxisymmetricWall(RadialWall):
+    def __init__(self, r_faces, k, dx):
+        """Steady 2-D axisymmetric conduction through a wall, at a set of equally spaced axial stations.
+
+        Args:
+            r_faces (numpy.ndarray): Radii of the faces between nodes (m), with shape (stations, nodes + 1). r_faces[:, 0] is the hot side surface and r_faces[:, -1] is the cold side surface.
+            k (numpy.ndarray): Thermal conductivity of each node (W/m/K), with shape (stations, nodes).
+            dx (float): Axial distance between the stations (m).
+
+        Attributes:
+            See RadialWall.
+        """
+        super().__init__(r_faces = r_faces, k = k)
+
+        r_faces = np.asarray(r_faces, dtype = float)
+        k = np.asarray(k, dtype = float)
+        dx = abs(float(dx))
+
+        assert dx > 0, "'dx' must be non-zero"
+
+        size = self.stations * self.nodes
+        index = np.arange(size).reshape(self.stations, self.nodes)
+
+        # Axial conduction between neighbouring stations, through the mean annulus area - divided by dx again to make it per unit axial length
+        annulus_area = np.pi * (r_faces[:, 1:]**2 - r_faces[:, :-1]**2)
+        G_axial = 2 / (1 / k[:-1] + 1 / k[1:]) * (annulus_area[:-1] + annulus_area[1:]) / 2 / dx**2
+
+        rows = np.concatenate([index[:, :-1].ravel(), index[:-1].ravel()])
+        columns = np.concatenate([index[:, 1:].ravel(), index[1:].ravel()])
+        conductances = np.concatenate([self.G.ravel(), G_axial.ravel()])
+
+        # Symmetric matrix, with the sum of the conductances to the neighbouring nodes on the diagonal
+        diagonal = np.bincount(rows, weights = conductances, minlength = size) + np.bincount(columns, weights = conductances, minlength = size)
+
+        self._K = scipy.sparse.coo_matrix((np.concatenate([-conductances, -conductances, diagonal]),
+                                           (np.concatenate([rows, columns, np.arange(size)]), np.concatenate([columns, rows, np.arange(size)]))),
+                                          shape = (size, size)).tocsc()
+
+        self._hot = index[:, 0]
+        self._cold = index[:, -1]
+
+    def matrix(self, G_h, G_c):
+        """Get the conduction matrix, including the boundary conductances.
+
+        Args:
+            G_h (numpy.ndarray): Conductance between the hot fluid and the first node at each station (W/m/K).
+            G_c (numpy.ndarray): Conductance between the cold fluid and the last node at each station (W/m/K).
+
+        Returns:
+            scipy.sparse.csc_matrix: The matrix, with the nodes numbered in the order [station 0 node 0, station 0 node 1, ..., station 1 node 0, ...].
+        """
+        boundary = np.zeros(self.stations * self.nodes)
+        boundary[self._hot] += G_h
+        boundary[self._cold] += G_c
+
+        return (self._K + scipy.sparse.diags(boundary)).tocsc()
+
+class AxisymmetricSolver:
+    def __init__(self, wall):
+        """Solver for the node temperatures of an AxisymmetricWall, which keeps the factorization of the conduction matrix for a single analysis. Every analysis should use its own
+        AxisymmetricSolver, even if it shares the AxisymmetricWall with other analyses.
+
+        Args:
+            wall (AxisymmetricWall): The wall.
+
+        Attributes:
+            factorizations (int): Number of times the conduction matrix has been factorized by this solver.
+        """
+        self.wall = wall
+        self._lu = None
+        self._G_h_ref = None
+        self._G_c_ref = None
+        self.factorizations = 0
+
+    def factorize(self, G_h, G_c):
+        """Factorize the conduction matrix, using a set of boundary conductances as the reference values.
+
+        Args:
+            G_h (numpy.ndarray): Reference conductance between the hot fluid and the first node at each station (W/m/K).
+            G_c (numpy.ndarray): Reference conductance between the cold fluid and the last node at each station (W/m/K).
+        """
+        G_h = np.array(G_h, dtype = float)
+        G_c = np.array(G_c, dtype = float)
+
+        assert np.all(G_h >= 0) and np.all(G_c >= 0) and (np.any(G_h > 0) or np.any(G_c > 0)), "The boundary conductances must not be negative or all zero"
+
+        self._lu = scipy.sparse.linalg.splu(self.wall.matrix(G_h, G_c))
+        self._G_h_ref = G_h
+        self._G_c_ref = G_c
+        self.factorizations += 1
+
+    def solve(self, T_h, G_h, T_c, G_c, T_guess = None, rtol = 1e-10, max_iter = 50):
+        """Solve for the node temperatures, with the given fluid temperatures and boundary conductances. The existing factorization is reused if possible.
+
+        Args:
+            T_h (numpy.ndarray): Hot fluid temperature at each station (K), e.g. the exhaust recovery temperature.
+            G_h (numpy.ndarray): Conductance between the hot fluid and the first node at each station (W/m/K), from AxisymmetricWall.boundary_conductance().
+            T_c (numpy.ndarray): Cold fluid temperature at each station (K).
+            G_c (numpy.ndarray): Conductance between the cold fluid and the last node at each station (W/m/K), from AxisymmetricWall.boundary_conductance().
+            T_guess (numpy.ndarray, optional): Guess of the node temperatures (K), with shape (stations, nodes), e.g. from the previous coupling iteration. Defaults to None.
+            rtol (float, optional): Relative tolerance for the conjugate gradient iterations. Defaults to 1e-10.
+            max_iter (int, optional): Maximum number of conjugate gradient iterations, before the matrix is refactorized with the actual boundary conductances. Defaults to 50.
+
+        Returns:
+            numpy.ndarray: Node temperatures (K), with shape (stations, nodes).
+        """
+        G_h = np.asarray(G_h, dtype = float)
+        G_c = np.asarray(G_c, dtype = float)
+
+        if self._lu is None:
+            self.factorize(G_h, G_c)
+
+        rhs = np.zeros(self.wall.stations * self.wall.nodes)
+        rhs[self.wall._hot] += G_h * T_h
+        rhs[self.wall._cold] += G_c * T_c
+
+        if np.array_equal(G_h, self._G_h_ref) and np.array_equal(G_c, self._G_c_ref):
+            return self._lu.solve(rhs).reshape(self.wall.stations, self.wall.nodes)
+
+        A = self.wall.matrix(G_h, G_c)
+        preconditioner = scipy.sparse.linalg.LinearOperator(A.shape, matvec = self._lu.solve)
+        T, info = scipy.sparse.linalg.cg(A, rhs, x0 = None if T_guess is None else np.ravel(T_guess), rtol = rtol, maxiter = max_iter, M = preconditioner)
+
+        if info != 0:
+            # Too far from the reference values to converge quickly, so use the actual values from now on
+            self.factorize(G_h, G_c)
+            T = self._lu.solve(rhs)
+
+        return T.reshape(self.wall.stations, self.wall.nodes)
+
+def axisymmetric_wall(r_faces, k, dx):
+    """Get the AxisymmetricWall for a geometry and set of materials, reusing a cached one (and its conduction matrix) if the same wall has been used before.
+
+    Args:
+        r_faces (numpy.ndarray): Radii of the faces between nodes (m), with shape (stations, nodes + 1).
+        k (numpy.ndarray): Thermal conductivity of each node (W/m/K), with shape (stations, nodes).
+        dx (float): Axial distance between the stations (m).
+
+    Returns:
+        AxisymmetricWall: The wall.
+    """
+    r_faces = np.ascontiguousarray(r_faces, dtype = float)
+    k = np.ascontiguousarray(k, dtype = float)
+
+    key = hashlib.sha256(str((r_faces.shape, abs(float(dx)))).encode() + r_faces.tobytes() + k.tobytes()).hexdigest()
+
+    wall = _WALLS.get(key)
+
+    if wall is None:
+        # Build the wall without holding the lock. If two threads build the same wall, the first one stored is kept.
+        wall = AxisymmetricWall(r_faces = r_faces, k = k, dx = dx)
+
+        with _WALLS_LOCK:
+            # Forget the oldest wall if we have too many
+            if key not in _WALLS and len(_WALLS) >= WALL_CACHE_SIZE:
+                _WALLS.pop(next(iter(_WALLS), None), None)
+
+            wall = _WALLS.setdefault(key, wall)
+
+    return wall
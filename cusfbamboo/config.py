@@ -0,0 +1,400 @@
+"""
+Declarative engine definitions, for saving engines to files and sending them to other processes or machines.
+
+An engine definition is a dictionary containing only numbers, strings, booleans, lists and dictionaries, so it can be written to JSON or YAML.
+Any input that could be a function of position (e.g. wall thickness, channel height) or of temperature and pressure (e.g. coolant viscosity) can be given as:
+ - A number, for a constant value.
+ - {"type" : "table", "x" : [...], "values" : [...]} for a linearly interpolated profile (see TabulatedProfile).
+ - {"type" : "piecewise", "breakpoints" : [...], "coefficients" : [[...], ...]} for a piecewise polynomial profile (see PiecewiseProfile).
+ - {"type" : "table", "T" : [...], "values" : [...]} or {"type" : "table", "T" : [...], "p" : [...], "values" : [[...], ...]} for a property table (see PropertyTable).
+ - {"type" : "table", "file" : "path/to/table.json"} for a property table stored in a separate JSON file.
+
+Materials, fluids and boiling properties can either be given as the name of one of the pre-defined ones in cusfbamboo.materials (e.g. "CopperC106", "Water", "WaterBoiling"), 
+or as a dictionary of their inputs.
+
+Example:
+    definition = {"perfect_gas" : {"gamma" : 1.31, "cp" : 830},
+                  "chamber_conditions" : {"p0" : 10e5, "T0" : 2800},
+                  "geometry" : {"xs" : [...], "rs" : [...]},
+                  "exhaust_transport" : "CO2",
+                  "walls" : [{"material" : "CopperC106", "thickness" : 2e-3}],
+                  "cooling_jacket" : {"T_coolant_in" : 298.15, "p_coolant_in" : 30e5, "mdot_coolant" : 0.5, "channel_height" : 2e-3, "coolant_transport" : "Water"}}
+
+    engine = cusfbamboo.config.engine_from_dict(definition)
+"""
+
+import json
+import os
+import numpy as np
+import scipy.interpolate
+
+import cusfbamboo.engine
+import cusfbamboo.materials
+
+class TabulatedProfile:
+    def __init__(self, x, values):
+        """A function of axial position, found by linearly interpolating a table. Unlike a lambda, it can be pickled and converted into an engine definition.
+
+        Args:
+            x (list): Axial positions (m). Must be increasing.
+            values (list): Values at each axial position.
+        """
+        self.x = [float(item) for item in x]
+        self.values = [float(item) for item in values]
+
+        assert len(self.x) == len(self.values), "'x' and 'values' must be the same length"
+
+    def __call__(self, x):
+        return np.interp(x, self.x, self.values)
+
+    def to_dict(self):
+        return {"type" : "table", "x" : self.x, "values" : self.values}
+
+class PiecewiseProfile:
+    def __init__(self, breakpoints, coefficients):
+        """A piecewise polynomial function of axial position. Unlike a lambda, it can be pickled and converted into an engine definition.
+
+        Args:
+            breakpoints (list): Axial positions where each piece starts and ends (m), in increasing order. Positions outside of these use the first or last piece.
+            coefficients (list): List of polynomial coefficients for each piece, in increasing powers of x, e.g. [[1e-3], [1e-3, 2e-3]] for a constant piece followed by a linear piece.
+                Must have one less item than 'breakpoints'.
+        """
+        self.breakpoints = [float(item) for item in breakpoints]
+        self.coefficients = [[float(item) for item in piece] for piece in coefficients]
+
+        assert len(self.coefficients) == len(self.breakpoints) - 1, "'coefficients' must have one less item than 'breakpoints'"
+
+    def __call__(self, x):
+        piece = np.clip(np.searchsorted(self.breakpoints, x, side = "right") - 1, 0, len(self.coefficients) - 1)
+
+        if np.ndim(x) == 0:
+            return np.polynomial.polynomial.polyval(x, self.coefficients[piece])
+        else:
+            return np.array([np.polynomial.polynomial.polyval(x[i], self.coefficients[piece[i]]) for i in range(len(x))])
+
+    def to_dict(self):
+        return {"type" : "piecewise", "breakpoints" : self.breakpoints, "coefficients" : self.coefficients}
+
+class PropertyTable:
+    def __init__(self, T, values, p = None, file = None):
+        """A transport property as a function of temperature (and optionally pressure), found by linearly interpolating a table. Can be used as any of the inputs to TransportProperties.
+
+        Args:
+            T (list): Temperatures (K), in increasing order.
+            values (list): Property values. If 'p' is given, this must be a 2D list, with values[i][j] at T[i] and p[j]. Otherwise it is a list of values at each T.
+            p (list, optional): Pressures (Pa), in increasing order. Defaults to None, in which case the property only depends on temperature.
+            file (str, optional): Path of the file the table was loaded from. If given, engine definitions will refer to this file instead of including the data. Defaults to None.
+        """
+        self.T = [float(item) for item in T]
+        self.p = None if p is None else [float(item) for item in p]
+        self.values = np.array(values, dtype = float).tolist()
+        self.file = file
+
+        if self.p is None:
+            self._interpolator = None
+        else:
+            self._interpolator = scipy.interpolate.RegularGridInterpolator((self.T, self.p), np.array(self.values), bounds_error = False, fill_value = None)
+
+    @staticmethod
+    def from_file(path):
+        """Load a property table from a JSON file, containing the keys "T", "values" and optionally "p".
+
+        Args:
+            path (str): Path to the JSON file.
+
+        Returns:
+            PropertyTable: The property table.
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        return PropertyTable(T = data["T"], values = data["values"], p = data.get("p"), file = path)
+
+    def __call__(self, T, p = None):
+        if self._interpolator is None:
+            return np.interp(T, self.T, self.values)
+        else:
+            return float(self._interpolator((T, p)))
+
+    def __getstate__(self):
+        # The interpolator is rebuilt when unpickling
+        state = self.__dict__.copy()
+        state["_interpolator"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(T = state["T"], values = state["values"], p = state["p"], file = state["file"])
+
+    def to_dict(self):
+        if self.file is not None:
+            return {"type" : "table", "file" : self.file}
+
+        data = {"type" : "table", "T" : self.T, "values" : self.values}
+
+        if self.p is not None:
+            data["p"] = self.p
+
+        return data
+
+# Conversion to and from definitions
+def _named(cls):
+    # Dictionary of the pre-defined objects of a given class in cusfbamboo.materials
+    return {name : value for name, value in vars(cusfbamboo.materials).items() if type(value) is cls}
+
+def _value_from_dict(value, base_path = None):
+    # Convert a number or profile/table definition into a number or callable
+    if type(value) is not dict:
+        return value
+
+    assert value.get("type") in ["table", "piecewise"], f"Unrecognised function type '{value.get('type')}'. Try 'table' or 'piecewise'"
+
+    if value["type"] == "piecewise":
+        return PiecewiseProfile(breakpoints = value["breakpoints"], coefficients = value["coefficients"])
+
+    elif "file" in value:
+        path = value["file"]
+
+        if base_path is not None and not os.path.isabs(path):
+            table = PropertyTable.from_file(os.path.join(base_path, path))
+            table.file = path
+            return table
+
+        return PropertyTable.from_file(path)
+
+    elif "T" in value:
+        return PropertyTable(T = value["T"], values = value["values"], p = value.get("p"))
+
+    else:
+        return TabulatedProfile(x = value["x"], values = value["values"])
+
+def _value_to_dict(value, name):
+    # Convert a number or picklable callable into its definition
+    if value is None or type(value) is bool or type(value) is str:
+        return value
+
+    elif isinstance(value, (int, float, np.number)):
+        return float(value) if not isinstance(value, (int, np.integer)) else int(value)
+
+    elif hasattr(value, "to_dict"):
+        return value.to_dict()
+
+    else:
+        raise ValueError(f"'{name}' cannot be converted into an engine definition. Functions must be given as a TabulatedProfile, PiecewiseProfile or PropertyTable, instead of a {type(value)}.")
+
+def material_from_dict(definition, base_path = None):
+    if type(definition) is str:
+        return _named(cusfbamboo.materials.Material)[definition]
+
+    return cusfbamboo.materials.Material(**{key : _value_from_dict(value, base_path) for key, value in definition.items()})
+
+def _material_properties(material):
+    definition = {"k" : _value_to_dict(material.k, "k")}
+
+    # NaN isn't valid JSON, so leave out any properties that weren't given
+    for key in ["E", "alpha", "poisson", "rho", "cp", "yield_strength", "ultimate_strength", "ductility"]:
+        if callable(getattr(material, key)) or not np.isnan(getattr(material, key)):
+            definition[key] = _value_to_dict(getattr(material, key), key)
+
+    return definition
+
+def material_to_dict(material):
+    definition = _material_properties(material)
+
+    # Use the name of pre-defined materials - these may be copies (e.g. after pickling), so compare the properties too
+    for name, value in _named(cusfbamboo.materials.Material).items():
+        if value is material or _material_properties(value) == definition:
+            return name
+
+    return definition
+
+def transport_from_dict(definition, base_path = None):
+    if type(definition) is str:
+        return _named(cusfbamboo.materials.TransportProperties)[definition]
+
+    return cusfbamboo.materials.TransportProperties(**{key : _value_from_dict(value, base_path) for key, value in definition.items()})
+
+def _transport_properties(transport):
+    definition = {}
+
+    for key in ["Pr", "mu", "k", "cp", "rho", "gamma_coolant"]:
+        value = getattr(transport, "_" + key)
+
+        if value is not None:
+            definition[key] = _value_to_dict(value, key)
+
+    return definition
+
+def transport_to_dict(transport):
+    definition = _transport_properties(transport)
+
+    for name, value in _named(cusfbamboo.materials.TransportProperties).items():
+        if value is transport or _transport_properties(value) == definition:
+            return name
+
+    return definition
+
+def boiling_from_dict(definition):
+    if type(definition) is str:
+        return _named(cusfbamboo.materials.NucleateBoiling)[definition]
+
+    return cusfbamboo.materials.NucleateBoiling(**definition)
+
+def _boiling_properties(boiling):
+    definition = {"p" : boiling.p}
+
+    for key in cusfbamboo.materials.SATURATION_PROPERTIES:
+        definition[key] = getattr(boiling, key)
+
+    definition.update({"C_sf" : float(boiling.C_sf), "n" : float(boiling.n), "p_critical" : boiling.p_critical})
+
+    return definition
+
+def boiling_to_dict(boiling):
+    definition = _boiling_properties(boiling)
+
+    for name, value in _named(cusfbamboo.materials.NucleateBoiling).items():
+        if value is boiling or _boiling_properties(value) == definition:
+            return name
+
+    return definition
+
+def wall_from_dict(definition, base_path = None):
+    return cusfbamboo.engine.Wall(material = material_from_dict(definition["material"], base_path), thickness = _value_from_dict(definition["thickness"], base_path))
+
+def wall_to_dict(wall):
+    return {"material" : material_to_dict(wall.material), "thickness" : _value_to_dict(wall._thickness, "thickness")}
+
+def cooling_jacket_from_dict(definition, base_path = None):
+    definition = dict(definition)
+    definition["coolant_transport"] = transport_from_dict(definition["coolant_transport"], base_path)
+
+    for key in ["channel_height", "roughness", "blockage_ratio", "channel_width"]:
+        if key in definition:
+            definition[key] = _value_from_dict(definition[key], base_path)
+
+    if "coolant_boiling" in definition:
+        definition["coolant_boiling"] = boiling_from_dict(definition["coolant_boiling"])
+
+    return cusfbamboo.engine.CoolingJacket(**definition)
+
+def cooling_jacket_to_dict(cooling_jacket):
+    definition = {"T_coolant_in" : _value_to_dict(cooling_jacket.T_coolant_in, "T_coolant_in"),
+                  "p_coolant_in" : _value_to_dict(cooling_jacket.p_coolant_in, "p_coolant_in"),
+                  "mdot_coolant" : _value_to_dict(cooling_jacket.mdot_coolant, "mdot_coolant"),
+                  "channel_height" : _value_to_dict(cooling_jacket._channel_height, "channel_height"),
+                  "coolant_transport" : transport_to_dict(cooling_jacket.coolant_transport),
+                  "roughness" : _value_to_dict(cooling_jacket._roughness, "roughness"),
+                  "configuration" : cooling_jacket.configuration,
+                  "restrain_fins" : cooling_jacket.restrain_fins}
+
+    # 'number_of_channels' is only an input if there's a blockage ratio, or the channels are spiralling
+    if cooling_jacket.configuration == "spiral" or cooling_jacket.number_of_channels != 0:
+        definition["blockage_ratio"] = _value_to_dict(cooling_jacket._blockage_ratio, "blockage_ratio")
+        definition["number_of_channels"] = cooling_jacket.number_of_channels
+
+    if cooling_jacket.configuration == "spiral":
+        definition["channel_width"] = _value_to_dict(cooling_jacket._channel_width, "channel_width")
+
+    if hasattr(cooling_jacket, "xs"):
+        definition["xs"] = [float(x) for x in cooling_jacket.xs]
+
+    if cooling_jacket.fin_model is not None:
+        definition["fin_model"] = cooling_jacket.fin_model
+
+    if cooling_jacket.coolant_boiling is not None:
+        definition["coolant_boiling"] = boiling_to_dict(cooling_jacket.coolant_boiling)
+
+    return definition
+
+def engine_from_dict(definition, base_path = None):
+    """Create an Engine object from an engine definition.
+
+    Args:
+        definition (dict): The engine definition.
+        base_path (str, optional): Directory that any relative property table file paths are relative to. Defaults to None (i.e. the current working directory).
+
+    Returns:
+        Engine: The Engine object.
+    """
+    allowed_keys = {"perfect_gas", "chamber_conditions", "geometry", "coolant_convection", "exhaust_convection", "walls", "cooling_jacket", "cooling_jackets", "exhaust_transport", 
+                    "h_exhaust_sf", "h_coolant_sf"}
+    left_over = set(definition.keys()) - allowed_keys
+    assert not left_over, f'Unrecognised keys in engine definition: {left_over}'
+
+    kwargs = {}
+
+    for key in ["coolant_convection", "exhaust_convection", "h_exhaust_sf", "h_coolant_sf"]:
+        if key in definition:
+            kwargs[key] = definition[key]
+
+    if "walls" in definition:
+        kwargs["walls"] = [wall_from_dict(wall, base_path) for wall in definition["walls"]]
+
+    if "cooling_jacket" in definition:
+        kwargs["cooling_jacket"] = cooling_jacket_from_dict(definition["cooling_jacket"], base_path)
+
+    if "cooling_jackets" in definition:
+        kwargs["cooling_jackets"] = [cooling_jacket_from_dict(cooling_jacket, base_path) for cooling_jacket in definition["cooling_jackets"]]
+
+    if "exhaust_transport" in definition:
+        kwargs["exhaust_transport"] = transport_from_dict(definition["exhaust_transport"], base_path)
+
+    return cusfbamboo.engine.Engine(perfect_gas = cusfbamboo.engine.PerfectGas(**definition["perfect_gas"]),
+                                    chamber_conditions = cusfbamboo.engine.ChamberConditions(**definition["chamber_conditions"]),
+                                    geometry = cusfbamboo.engine.Geometry(**definition["geometry"]),
+                                    **kwargs)
+
+def engine_to_dict(engine):
+    """Convert an Engine object into an engine definition. Any functions of position, temperature or pressure must be TabulatedProfile, PiecewiseProfile or PropertyTable objects (not lambdas or other functions).
+
+    Args:
+        engine (Engine): The Engine object.
+
+    Returns:
+        dict: The engine definition.
+    """
+    definition = {"perfect_gas" : {"gamma" : float(engine.perfect_gas.gamma), "cp" : float(engine.perfect_gas.cp)},
+                  "chamber_conditions" : {"p0" : float(engine.chamber_conditions.p0), "T0" : float(engine.chamber_conditions.T0)},
+                  "geometry" : {"xs" : [float(x) for x in engine.geometry.xs], "rs" : [float(r) for r in engine.geometry.rs]},
+                  "coolant_convection" : engine.coolant_convection,
+                  "exhaust_convection" : engine.exhaust_convection,
+                  "h_exhaust_sf" : _value_to_dict(engine.h_exhaust_sf, "h_exhaust_sf"),
+                  "h_coolant_sf" : _value_to_dict(engine.h_coolant_sf, "h_coolant_sf")}
+
+    if hasattr(engine, "walls"):
+        definition["walls"] = [wall_to_dict(wall) for wall in engine.walls]
+
+    if hasattr(engine, "cooling_jacket"):
+        definition["cooling_jacket"] = cooling_jacket_to_dict(engine.cooling_jacket)
+
+    if hasattr(engine, "cooling_jackets"):
+        definition["cooling_jackets"] = [cooling_jacket_to_dict(cooling_jacket) for cooling_jacket in engine.cooling_jackets]
+
+    if hasattr(engine, "exhaust_transport"):
+        definition["exhaust_transport"] = transport_to_dict(engine.exhaust_transport)
+
+    return definition
+
+def save(engine, path):
+    """Save an Engine object to a JSON file.
+
+    Args:
+        engine (Engine): The Engine object.
+        path (str): Path of the file to save to.
+    """
+    with open(path, "w") as f:
+        json.dump(engine_to_dict(engine), f, indent = 4)
+
+def load(path):
+    """Load an Engine object from a JSON file. Relative property table file paths are taken to be relative to the directory of the JSON file.
+
+    Args:
+        path (str): Path of the file to load.
+
+    Returns:
+        Engine: The Engine object.
+    """
+    with open(path) as f:
+        definition = json.load(f)
+
+    return engine_from_dict(definition, base_path = os.path.dirname(os.path.abspath(path)))
@@ -0,0 +1,73 @@
+"""
+Design constraints that can be checked during a heating analysis, so that infeasible designs can be abandoned as soon as a limit is broken.
+"""
+
+class Constraints:
+    """Limits to check at every grid point of a heating analysis. As soon as one is violated, the analysis is stopped and reported as infeasible.
+
+    Keyword Args:
+        T_hw_max (float or list): Maximum allowable temperature of each wall (K). The hottest part of each wall (the side closest to the exhaust) is checked. Can be a single float which applies to every wall, or a list with an entry for each wall, in the same order as Engine.walls (i.e. [hottest_wall, ... , coldest_wall]). Entries can be None to not check that wall.
+        p_coolant_min (float): Minimum allowable coolant static pressure (Pa).
+        T_coolant_max (float): Maximum allowable coolant static temperature (K).
+        sigma_t_max (float or list): Maximum allowable tangential stress in each wall (Pa), compared against 'sigma_t_max' from the heating analysis. Can be a single float which applies to every wall, or a list with an entry for each wall (in the same order as Engine.walls). Entries can be None to not check that wall.
+    """
+    def __init__(self, **kwargs):
+        # Check that the user has not mispelt or used additional kwargs
+        allowed_kwargs = {"T_hw_max", "p_coolant_min", "T_coolant_max", "sigma_t_max"}
+        left_over = set(kwargs.keys()) - allowed_kwargs
+        assert not left_over, f'Unrecognised keyword arguments for Constraints: {left_over}'
+
+        self.T_hw_max = kwargs.get("T_hw_max")
+        self.p_coolant_min = kwargs.get("p_coolant_min")
+        self.T_coolant_max = kwargs.get("T_coolant_max")
+        self.sigma_t_max = kwargs.get("sigma_t_max")
+
+    @property
+    def fields(self):
+        """Keys of the values that are checked at each grid point.
+
+        Returns:
+            set: The keys.
+        """
+        return {"x", "T", "p_coolant", "T_coolant"} | ({"sigma_t_max"} if self.sigma_t_max is not None else set())
+
+    @staticmethod
+    def _per_wall(limit, number_of_walls):
+        # Turn a limit into a list with an entry for each wall
+        if limit is None:
+            return [None] * number_of_walls
+
+        elif type(limit) is list or type(limit) is tuple:
+            assert len(limit) == number_of_walls, f"Per-wall constraints must have one entry for each wall. Got {len(limit)} entries for {number_of_walls} walls."
+            return list(limit)
+
+        else:
+            return [limit] * number_of_walls
+
+    def check(self, row):
+        """Check the results at a single grid point against the constraints.
+
+        Args:
+            row (dict): Results at a single grid point, as yielded by Engine.iter_heating_analysis().
+
+        Returns:
+            dict: None if all constraints are satisfied. Otherwise a dictionary describing the first violation found, with the keys "constraint", "x", "value", "limit" and "wall" (the wall index, or None if not relevant).
+        """
+        number_of_walls = len(row["T"]) - 3         # Wall boundaries, plus the coolant and exhaust gas
+
+        if self.p_coolant_min is not None and row["p_coolant"] <= self.p_coolant_min:
+            return {"constraint" : "p_coolant_min", "x" : row["x"], "value" : row["p_coolant"], "limit" : self.p_coolant_min, "wall" : None}
+
+        if self.T_coolant_max is not None and row["T_coolant"] > self.T_coolant_max:
+            return {"constraint" : "T_coolant_max", "x" : row["x"], "value" : row["T_coolant"], "limit" : self.T_coolant_max, "wall" : None}
+
+        # Temperatures go in the order [coolant, coldest wall boundary, ..., hottest wall boundary, exhaust], so the hot side of wall j is at T[-2-j]
+        for j, limit in enumerate(self._per_wall(self.T_hw_max, number_of_walls)):
+            if limit is not None and row["T"][-2-j] > limit:
+                return {"constraint" : "T_hw_max", "x" : row["x"], "value" : row["T"][-2-j], "limit" : limit, "wall" : j}
+
+        for j, limit in enumerate(self._per_wall(self.sigma_t_max, number_of_walls)):
+            if limit is not None and row["sigma_t_max"][j] > limit:
+                return {"constraint" : "sigma_t_max", "x" : row["x"], "value" : row["sigma_t_max"][j], "limit" : limit, "wall" : j}
+
+        return None
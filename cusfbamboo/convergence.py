@@ -0,0 +1,173 @@
+"""
+Grid convergence studies, for choosing the number of grid points to use in a heating analysis.
+
+A study runs Engine.steady_heating_analysis() on a sequence of grids, each 'ratio' times finer than the last. The last three levels are used to estimate the observed order of accuracy
+and the Richardson extrapolated (i.e. zero grid spacing) value of each quantity, which gives an estimate of the discretisation error on any grid. The recommended number of grid points
+is then the smallest that keeps the estimated error of every quantity within its tolerance.
+
+Example:
+    study = cusfbamboo.grid_convergence(engine, tolerances = {"T_hw_max" : 1.0, "T_coolant_out" : 0.1, "dp_coolant" : 100})
+    results = engine.steady_heating_analysis(num_grid = study["recommended_num_grid"])
+
+Notes:
+ - The grids are nested (the grid spacing is L / num_grid, and num_grid is multiplied by 'ratio'), so the exhaust gas Mach numbers that are cached for a coarse level are reused by every 
+   finer level.
+ - If a cusfbamboo.cache.ResultCache is given, every level is stored in it, so repeating a study (e.g. with different tolerances, or more levels) only runs the new levels.
+ - The estimates assume that every level is in the asymptotic range, where the error is proportional to dx^order. If a quantity does not converge monotonically, its order cannot be
+   estimated, and a warning is given.
+"""
+
+import math
+import warnings
+import numpy as np
+
+DEFAULT_TOLERANCES = {"T_hw_max" : 1.0, "T_coolant_out" : 0.1, "dp_coolant" : 100.0}
+
+def observed_order(f_coarse, f_medium, f_fine, ratio):
+    """Estimate the observed order of accuracy from three solutions on grids with a constant refinement ratio.
+
+    Args:
+        f_coarse (float): Value on the coarsest grid.
+        f_medium (float): Value on the medium grid.
+        f_fine (float): Value on the finest grid.
+        ratio (float): Grid refinement ratio, i.e. dx_coarse / dx_medium = dx_medium / dx_fine.
+
+    Returns:
+        float: The observed order of accuracy. NaN if the values do not converge monotonically, or if the differences between them grow as the grid is refined (i.e. the order would not be positive).
+    """
+    difference_coarse = f_coarse - f_medium
+    difference_fine = f_medium - f_fine
+
+    if difference_fine == 0 or difference_coarse / difference_fine <= 1:
+        return np.nan
+
+    return math.log(difference_coarse / difference_fine) / math.log(ratio)
+
+def richardson_extrapolate(f_medium, f_fine, ratio, order):
+    """Richardson extrapolation, to estimate the value with zero grid spacing.
+
+    Args:
+        f_medium (float): Value on the coarser grid.
+        f_fine (float): Value on the finer grid.
+        ratio (float): Grid refinement ratio, i.e. dx_medium / dx_fine.
+        order (float): Order of accuracy.
+
+    Returns:
+        float: The extrapolated value.
+    """
+    return f_fine + (f_fine - f_medium) / (ratio**order - 1)
+
+def _quantities(results, p_coolant_in):
+    # Get the values being studied from the results of a summary-only analysis
+    return {"T_hw_max" : results["T_hw_max"],
+            "T_coolant_out" : results["T_coolant_out"],
+            "dp_coolant" : p_coolant_in - results["p_coolant_out"]}
+
+def grid_convergence(engine, tolerances = None, num_grid_coarse = 125, ratio = 2, levels = 4, analysis_kwargs = None, cache = None):
+    """Run a grid convergence study of a steady heating analysis, and recommend the smallest number of grid points that meets a set of error tolerances.
+
+    Args:
+        engine (Engine): The engine to analyse.
+        tolerances (dict, optional): Maximum acceptable discretisation error for each quantity, in the form {name : tolerance}. The quantities available are "T_hw_max" (K), "T_coolant_out" (K)
+            and "dp_coolant" (Pa). Quantities that are not included are still estimated, but do not affect the recommendation. Defaults to None, in which case DEFAULT_TOLERANCES is used.
+        num_grid_coarse (int, optional): Number of grid points on the coarsest level. Defaults to 125.
+        ratio (int, optional): Refinement ratio between levels. The number of grid points is multiplied by this at each level. Defaults to 2.
+        levels (int, optional): Number of levels to run. Must be at least 3. Defaults to 4.
+        analysis_kwargs (dict, optional): Other keyword arguments for Engine.steady_heating_analysis() (e.g. {"iter_each" : 3}). 'num_grid' and 'summary_only' are set by the study. Defaults to None.
+        cache (ResultCache, optional): cusfbamboo.cache.ResultCache to store the analysis at each level in, so that repeated studies can reuse them. Defaults to None.
+
+    Returns:
+        dict: Results of the study, with descriptions in the "info" key. Contains:
+            - "num_grid" - Number of grid points at each level.
+            - The value of each quantity at each level (e.g. "T_hw_max").
+            - "order", "extrapolated" and "error" - Dictionaries of the observed order, extrapolated value and estimated error at each level, for each quantity.
+            - "recommended_num_grid" - The smallest number of grid points that meets all the tolerances. None if any of the quantities it depends on could not be estimated.
+    """
+    assert type(levels) is int and levels >= 3, "'levels' must be an integer that is at least 3"
+    assert type(ratio) is int and ratio >= 2, "'ratio' must be an integer that is at least 2"
+    assert type(num_grid_coarse) is int and num_grid_coarse >= 2, "'num_grid_coarse' must be an integer that is at least 2"
+
+    if tolerances is None:
+        tolerances = DEFAULT_TOLERANCES
+
+    for name in tolerances:
+        if name not in DEFAULT_TOLERANCES:
+            raise ValueError(f"Unrecognised quantity '{name}' in tolerances. Try one of {list(DEFAULT_TOLERANCES.keys())}")
+
+    analysis_kwargs = {} if analysis_kwargs is None else dict(analysis_kwargs)
+
+    assert "num_grid" not in analysis_kwargs, "'num_grid' is set by the grid convergence study, so cannot be in 'analysis_kwargs'"
+
+    analysis_kwargs["summary_only"] = True
+
+    if cache is not None:
+        analysis_kwargs["cache"] = cache
+
+    # Use the same coolant inlet pressure as the analyses do
+    context = engine.run_context(num_grid = num_grid_coarse, counterflow = analysis_kwargs.get("counterflow", True), coolant_inlet = analysis_kwargs.get("coolant_inlet"))
+
+    num_grids = [num_grid_coarse * ratio**level for level in range(levels)]
+    values = {name : [] for name in DEFAULT_TOLERANCES}
+
+    for num_grid in num_grids:
+        level_results = engine.steady_heating_analysis(num_grid = num_grid, **analysis_kwargs)
+
+        for name, value in _quantities(level_results, context.p_coolant_in).items():
+            values[name].append(float(value))
+
+    results = {"num_grid" : num_grids, "order" : {}, "extrapolated" : {}, "error" : {}}
+    results.update(values)
+
+    required = {}
+
+    for name in DEFAULT_TOLERANCES:
+        f_coarse, f_medium, f_fine = values[name][-3:]
+
+        if f_medium == f_fine:
+            # Already converged to within rounding error
+            order = np.nan
+            extrapolated = f_fine
+            errors = [abs(value - f_fine) for value in values[name]]
+
+        else:
+            order = observed_order(f_coarse, f_medium, f_fine, ratio)
+
+            if np.isnan(order):
+                warnings.warn(f"'{name}' does not converge monotonically (or its changes grow as the grid is refined) over the last three levels, so its discretisation error cannot be estimated. Try a finer 'num_grid_coarse'.", stacklevel = 2)
+                extrapolated = np.nan
+                errors = [np.nan] * levels
+            else:
+                extrapolated = richardson_extrapolate(f_medium, f_fine, ratio, order)
+                errors = [abs(value - extrapolated) for value in values[name]]
+
+        results["order"][name] = order
+        results["extrapolated"][name] = extrapolated
+        results["error"][name] = errors
+
+        if name in tolerances:
+            if errors[-1] == 0:
+                required[name] = 2
+            elif np.isnan(errors[-1]):
+                required[name] = None
+            else:
+                # The error is proportional to dx^order, and dx is proportional to 1 / num_grid
+                required[name] = num_grids[-1] * (errors[-1] / tolerances[name])**(1 / order)
+
+    if any(value is None for value in required.values()):
+        results["recommended_num_grid"] = None
+    else:
+        results["recommended_num_grid"] = max([2] + [math.ceil(value) for value in required.values()])
+
+    if results["recommended_num_grid"] is not None and results["recommended_num_grid"] > num_grids[-1]:
+        warnings.warn(f"The recommended num_grid ({results['recommended_num_grid']}) is finer than the finest level of the study ({num_grids[-1]}), so is an extrapolation. Consider running more levels.", stacklevel = 2)
+
+    results["info"] = {"num_grid" : "Number of grid points at each level of the study",
+                       "T_hw_max" : "Maximum hot side wall temperature at each level (K)",
+                       "T_coolant_out" : "Coolant outlet static temperature at each level (K)",
+                       "dp_coolant" : "Coolant static pressure drop at each level (Pa)",
+                       "order" : "Observed order of accuracy of each quantity, from the last three levels (NaN if it could not be estimated)",
+                       "extrapolated" : "Richardson extrapolated value of each quantity, i.e. the estimated value with zero grid spacing",
+                       "error" : "Estimated discretisation error of each quantity at each level, relative to its extrapolated value",
+                       "recommended_num_grid" : "Smallest number of grid points for which the estimated error of every quantity in 'tolerances' is within its tolerance"}
+
+    return results
@@ -19,6 +19,10 @@ Notes:
    properties is available as a compromise.
 """
 
+import functools
+import hashlib
+import json
+import threading
 from math import gamma
 from multiprocessing.sharedctypes import Value
 import numpy as np
@@ -34,11 +38,34 @@ import cusfbamboo.rao
 import cusfbamboo.isen
 import cusfbamboo.hx
 import cusfbamboo.circuit
+import cusfbamboo.reducers
+import cusfbamboo.constraints
+import cusfbamboo.aio
+import cusfbamboo.config
+import cusfbamboo.profiling
+import cusfbamboo.transient
+import cusfbamboo.conduction
+import cusfbamboo.fins
+import cusfbamboo.throttle
+import cusfbamboo.jackets
+import cusfbamboo.network
+import cusfbamboo.stress
 
 # Constants
 R_BAR = 8.3144621e3         # Universal gas constant (J/K/kmol)
 REDH_LAMINAR = 2300         # Maximum Reynolds number for laminar flow in a pipe
 REDH_TURBULENT = 3500       # Minimum Reynolds number for turbulent flow in a pipe
+MACH_CACHE_SIZE = 32        # Maximum number of (geometry, gamma) combinations to keep the cached Mach numbers of
+MACH_CACHE_POINTS = 100000  # Maximum number of x positions to keep the cached Mach number of, for each (geometry, gamma) combination
+
+# Values at each grid point that need extra calculations (see iter_heating_analysis()), and the ones that come from cusfbamboo.stress.tangential_stresses()
+STRESS_FIELDS = {"sigma_t_thermal", "sigma_t_pressure", "sigma_t_max"}
+ROW_FIELDS = {"rho_coolant", "Dh_coolant", "boiling_regime", "chf_margin", "dQ_dLc"} | STRESS_FIELDS
+
+# Exhaust gas Mach numbers that have already been calculated, in the form {(geometry_key, gamma) : {x : M}}. These only depend on the engine contour and gamma, so they are 
+# shared between all Engine objects in this process. This means repeated analyses (e.g. in a sweep, or on each worker of a process pool) don't need to solve for them again.
+_MACH_CACHES = {}
+_MACH_CACHES_LOCK = threading.Lock()    # Held when adding to or removing from the caches, so threads (e.g. cusfbamboo.sweep() with threads) can share them
 
 class PerfectGas:
     """Object to store a perfect gas model (i.e. an ideal gas with constant cp and cv). You only need to input 2 properties to fully define it.
@@ -105,25 +132,26 @@ class Geometry:
         """
         self.xs = xs
         self.rs = rs
-        self._dr_dx = np.gradient(rs, xs)
 
     def __setattr__(self, name, value):
-        # If the user tries to set 'xs' or 'rs', we need to recalculate self.dr_dx
-        if name == "xs" and hasattr(self, "rs"):
-            self._dr_dx = np.gradient(self.rs, value)
-
-        elif name == "rs" and hasattr(self, "xs"):
-            self._dr_dx = np.gradient(value, self.xs)
-
         super(Geometry, self).__setattr__(name, value)
 
+        # If the user sets 'xs' or 'rs', we need to recalculate the values that we store for speed
+        if (name == "xs" or name == "rs") and hasattr(self, "xs") and hasattr(self, "rs"):
+            self._xs = np.array(self.xs, dtype = float)
+            self._rs = np.array(self.rs, dtype = float)
+            self._dr_dx = np.gradient(self._rs, self._xs)
+            self._x_t = self._xs[np.argmin(self._rs)]
+            self._r_t = np.min(self._rs)
+            self._version = getattr(self, "_version", 0) + 1     # Lets other objects know that any values they have cached for this geometry are out of date
+
     @property
     def x_t(self):
-        return self.xs[np.argmin(self.rs)]
+        return self._x_t
 
     @property
     def r_t(self):
-        return min(self.rs)
+        return self._r_t
 
     @property
     def A_t(self):
@@ -137,6 +165,13 @@ class Geometry:
     def A_e(self):
         return np.pi * self.r_e**2
 
+    @property
+    def key(self):
+        """
+        str: Hash of the contour, which is the same for any Geometry objects with identical 'xs' and 'rs'.
+        """
+        return hashlib.sha1(self._xs.tobytes() + self._rs.tobytes()).hexdigest()
+
 
     def plot(self):
         """
@@ -159,7 +194,7 @@ class Geometry:
         Returns:
             float: Distance from engine centreline to edge of inner wall (m)
         """
-        return np.interp(x, self.xs, self.rs)
+        return np.interp(x, self._xs, self._rs)
 
     def dr_dx(self, x):
         """Get the slope of the engine wall, dr/dx.
@@ -170,7 +205,7 @@ class Geometry:
         Returns:
             float: Rate of change of contour radius with respect to position, dr/dx
         """
-        return np.interp(x, self.xs, self._dr_dx)
+        return np.interp(x, self._xs, self._dr_dx)
 
     def A(self, x):
         """Get the flow area for the exhaust gas
@@ -237,10 +272,15 @@ class CoolingJacket:
             channel_width (float or callable): Width of a single coolant channel. Can be a constant float, or a function of axial position (x).
             xs (list): Minimum and maximum x value which the cooling jacket is present over (m), e.g. (x_min, x_max). Can be in either order. 
             restrain_fins (bool): Whether or not the fins in cooling channels are physically restrained by (i.e. attached to) the outer cooling jacket. This affects the pressure stress. Automatically ignored if blockage_ratio = 0. Defaults to False.
+            fin_model (str): Model for the heat transfer from the fins into the coolant. Either None, in which case the coolant is assumed to cover the whole outer wall surface and the fins are ignored, 
+                or "cross-section", in which case the channel floor and fins are modelled with the tabulated 2-D cross section conduction model in cusfbamboo.fins. The fins are assumed to 
+                be made of the same material as the outermost wall. Automatically ignored if blockage_ratio = 0. Defaults to None.
+            coolant_boiling (NucleateBoiling): Saturation properties of the coolant (see cusfbamboo.materials.NucleateBoiling), for modelling subcooled nucleate and film boiling in 
+                steady_heating_analysis(). Defaults to None, in which case boiling is ignored.
             """
 
         # Check that the user has not mispelt or used additional kwargs
-        allowed_kwargs = {"blockage_ratio", "number_of_channels", "channel_width", "xs", "restrain_fins"}
+        allowed_kwargs = {"blockage_ratio", "number_of_channels", "channel_width", "xs", "restrain_fins", "fin_model", "coolant_boiling"}
         left_over = set(kwargs.keys()) - allowed_kwargs
         assert not left_over, f'Unrecognised keyword arguments for CoolingJacket: {left_over}'
 
@@ -265,6 +305,10 @@ class CoolingJacket:
         else:
             self.restrain_fins = False
 
+        self.fin_model = kwargs.get("fin_model")
+        assert self.fin_model is None or self.fin_model == "cross-section", "'fin_model' must be either None or 'cross-section'"
+
+        self.coolant_boiling = kwargs.get("coolant_boiling")
 
         if self.configuration == "spiral":
             assert "channel_width" in kwargs, "Must input 'channel_width' in order to use configuration = 'spiral'"
@@ -417,6 +461,38 @@ class CoolingJacket:
         else:
             return self.f_darcy_turbulent(ReDh = ReDh, Dh = Dh, x = x)     
 
+class RunContext:
+    def __init__(self, cooling_jacket, dx, x_start, x_end, counterflow, **kwargs):
+        """Everything that is specific to a single heating analysis, which the cusfbamboo.hx.HXSolver callbacks need to know about. This is kept separate from the Engine object (which is never modified by an analysis), 
+        so several analyses of the same Engine can run at once (e.g. in a concurrent.futures.ThreadPoolExecutor).
+
+        Args:
+            cooling_jacket (CoolingJacket): The cooling jacket being analysed.
+            dx (float): Axial grid spacing (m). Negative for counterflow.
+            x_start (float): Axial position of the coolant inlet (m).
+            x_end (float): Axial position of the coolant outlet (m).
+            counterflow (bool): Whether or not the coolant flows in the opposite direction to the exhaust gas.
+
+        Keyword Args:
+            T_coolant_in (float): Coolant inlet static temperature to use instead of cooling_jacket.T_coolant_in (K).
+            p_coolant_in (float): Coolant inlet static pressure to use instead of cooling_jacket.p_coolant_in (Pa).
+            mdot_coolant (float): Coolant mass flow rate to use instead of cooling_jacket.mdot_coolant (kg/s).
+        """
+        # Check that the user has not mispelt or used additional kwargs
+        allowed_kwargs = {"T_coolant_in", "p_coolant_in", "mdot_coolant"}
+        left_over = set(kwargs.keys()) - allowed_kwargs
+        assert not left_over, f'Unrecognised coolant inlet conditions: {left_over}'
+
+        self.cooling_jacket = cooling_jacket
+        self.dx = dx
+        self.x_start = x_start
+        self.x_end = x_end
+        self.counterflow = counterflow
+
+        self.T_coolant_in = kwargs.get("T_coolant_in", cooling_jacket.T_coolant_in)
+        self.p_coolant_in = kwargs.get("p_coolant_in", cooling_jacket.p_coolant_in)
+        self.mdot_coolant = kwargs.get("mdot_coolant", cooling_jacket.mdot_coolant)
+
 
 class Engine:
     """Class for representing a liquid rocket engine.
@@ -431,6 +507,8 @@ class Engine:
     Keyword Args:
         walls (Wall or list): Either a single Wall object that specifies the combustion chamber wall, or a list of Wall objects that represent multiple layers with different materials. List must be in the order [hottest_wall, ... , coldest_wall].
         cooling_jacket (CoolingJacket): CoolingJacket object to specify the cooling jacket on the engine.
+        cooling_jackets (list): List of CoolingJacket objects, for an engine with several independent cooling circuits (e.g. one for the chamber and one for the nozzle extension). 
+            Each one must have an 'xs' input, and these must not overlap. Cannot be used with 'cooling_jacket'. See multi_jacket_analysis().
         exhaust_transport (TransportProperties): TransportProperties object that defines the exhaust gas transport properties.
 
     Attributes:
@@ -446,7 +524,7 @@ class Engine:
     def __init__(self, perfect_gas, chamber_conditions, geometry, coolant_convection = "gnielinski", exhaust_convection = "bartz-sigma", **kwargs):
 
         # Check that the user has not mispelt or used additional kwargs
-        allowed_kwargs = {"walls", "cooling_jacket", "exhaust_transport", "h_exhaust_sf", "h_coolant_sf"}
+        allowed_kwargs = {"walls", "cooling_jacket", "cooling_jackets", "exhaust_transport", "h_exhaust_sf", "h_coolant_sf"}
         left_over = set(kwargs.keys()) - allowed_kwargs
         assert not left_over, f'Unrecognised keyword arguments for Engine: {left_over}'
         
@@ -478,6 +556,10 @@ class Engine:
         if "cooling_jacket" in kwargs:
             self.cooling_jacket = kwargs["cooling_jacket"]
             assert type(self.cooling_jacket) is CoolingJacket, "cooling_jacket input must be a CoolingJacket object."
+
+        if "cooling_jackets" in kwargs:
+            assert "cooling_jacket" not in kwargs, "Only one of 'cooling_jacket' and 'cooling_jackets' can be given"
+            self.cooling_jackets = kwargs["cooling_jackets"]
         
         if "exhaust_transport" in kwargs:
             self.exhaust_transport = kwargs["exhaust_transport"]  
@@ -493,10 +575,28 @@ class Engine:
             self.h_coolant_sf = 1.0
 
     def __setattr__(self, name, value):
+        # If the geometry or gas changes, we'll need to look up the cached Mach numbers again
+        if name == "geometry" or name == "perfect_gas":
+            super(Engine, self).__setattr__("_mach_cache_marker", None)
+
         # If the user tries to set 'cooling_jacket' or 'wall' after the creation of the Engine object then we must run checks on the submitted values
         if name == "cooling_jacket":
             assert type(value) is CoolingJacket, "cooling_jacket input must be a CoolingJacket object."
         
+        elif name == "cooling_jackets":
+            value = list(value)
+            assert len(value) > 0, "'cooling_jackets' must contain at least one CoolingJacket"
+
+            for item in value:
+                assert type(item) is CoolingJacket, "All items in the 'cooling_jackets' list must be a CoolingJacket object."
+                assert hasattr(item, "xs") or len(value) == 1, "Every CoolingJacket in 'cooling_jackets' must have an 'xs' input, so they cover separate parts of the engine"
+
+            # The cooling jackets must cover separate ranges of x (they can touch)
+            ranges = sorted((float(min(item.xs)), float(max(item.xs))) for item in value if hasattr(item, "xs"))
+
+            for previous, current in zip(ranges[:-1], ranges[1:]):
+                assert previous[1] <= current[0], f"The 'xs' ranges of the cooling jackets must not overlap, but {previous} and {current} do"
+
         elif name == "walls":
             # If we got a single wall, turn it into a list of length 1.
             if not (type(value) is list):
@@ -507,9 +607,38 @@ class Engine:
 
         super(Engine, self).__setattr__(name, value)
 
+    def __getstate__(self):
+        # Don't send the Mach number cache when pickling - the receiving process has its own
+        state = self.__dict__.copy()
+        state.pop("_mach_values", None)
+        state.pop("_mach_cache_marker", None)
+        return state
+
     # Exhaust gas functions
+    def _mach_cache(self):
+        # Get the dictionary of cached Mach numbers for the current geometry and gamma, in the form {x : M}
+        marker = (id(self.geometry), self.geometry._version, self.perfect_gas.gamma)
+
+        if getattr(self, "_mach_cache_marker", None) != marker:
+            key = (self.geometry.key, self.perfect_gas.gamma)
+
+            with _MACH_CACHES_LOCK:
+                if key not in _MACH_CACHES:
+                    # Forget the oldest geometry if we have too many
+                    if len(_MACH_CACHES) >= MACH_CACHE_SIZE:
+                        _MACH_CACHES.pop(next(iter(_MACH_CACHES), None), None)
+
+                    _MACH_CACHES[key] = {}
+
+                values = _MACH_CACHES[key]
+
+            super(Engine, self).__setattr__("_mach_values", values)
+            super(Engine, self).__setattr__("_mach_cache_marker", marker)
+
+        return self._mach_values
+
     def M(self, x):
-        """Get exhaust gas Mach number.
+        """Get exhaust gas Mach number. Values are cached, so each position only needs to be solved for once.
 
         Args:
             x (float): Axial position along the engine (m). 
@@ -517,9 +646,15 @@ class Engine:
         Returns:
             float: Mach number of the freestream.
         """
+        cache = self._mach_cache()
+        Mach = cache.get(x)
+
+        if Mach is not None:
+            return Mach
+
         #If we're at the throat then M = 1 by default:
         if abs(x - self.geometry.x_t) <= 1e-12:
-            return 1.00
+            Mach = 1.00
 
         #If we're not at the throat:
         else:
@@ -527,7 +662,15 @@ class Engine:
                 Mach = cusfbamboo.isen.M_from_A_supersonic(A = self.geometry.A(x), A_t = self.geometry.A_t, gamma = self.perfect_gas.gamma)
             else:
                 Mach = cusfbamboo.isen.M_from_A_subsonic(A = self.geometry.A(x), A_t = self.geometry.A_t, gamma = self.perfect_gas.gamma)
-            return Mach
+
+        with _MACH_CACHES_LOCK:
+            # Forget the oldest position if we have too many (e.g. a long sweep over different grids)
+            if len(cache) >= MACH_CACHE_POINTS:
+                cache.pop(next(iter(cache), None), None)
+
+            cache[x] = Mach
+
+        return Mach
 
     def T(self, x):
         """Get temperature at a position along the nozzle.
@@ -596,18 +739,25 @@ class Engine:
                 y_bottom = y_top.copy()
 
             # Plot the cooling channels to scale (but only if we also have the 'walls' input given)
-            if hasattr(self, "cooling_jacket"):
-                if hasattr(self.cooling_jacket, "xs"):
-                    min_x_jacket = min(self.cooling_jacket.xs)
-                    max_x_jacket = max(self.cooling_jacket.xs)
+            if hasattr(self, "cooling_jackets"):
+                cooling_jackets = self.cooling_jackets
+            elif hasattr(self, "cooling_jacket"):
+                cooling_jackets = [self.cooling_jacket]
+            else:
+                cooling_jackets = []
+
+            for n, cooling_jacket in enumerate(cooling_jackets):
+                if hasattr(cooling_jacket, "xs"):
+                    min_x_jacket = min(cooling_jacket.xs)
+                    max_x_jacket = max(cooling_jacket.xs)
                 else:
                     min_x_jacket = self.geometry.xs[0]
                     max_x_jacket = self.geometry.xs[-1]
 
                 # Vertical cooling channels
-                if self.cooling_jacket.configuration == "vertical":
+                if cooling_jacket.configuration == "vertical":
                     for j in range(len(y_bottom)):
-                        y_top[j] = y_bottom[j] + self.cooling_jacket.channel_height(xs[j])
+                        y_top[j] = y_bottom[j] + cooling_jacket.channel_height(xs[j])
 
                     # Cooling channel may only be applied over a specific range
                     x_channel = []
@@ -620,15 +770,15 @@ class Engine:
                             y_bottom_channel.append(y_bottom[k])
                             y_top_channel.append(y_top[k])
 
-                    axs.fill_between(x_channel, y_bottom_channel, y_top_channel, label = f'Cooling channel', color = "blue")
+                    axs.fill_between(x_channel, y_bottom_channel, y_top_channel, label = 'Cooling channel' if n == 0 else None, color = "blue")
                     axs.fill_between(x_channel, -np.array(y_bottom_channel), -np.array(y_top_channel), color = "blue")
 
                 # Spiralling cooling channels - modified from Bamboo 0.1.1
-                elif self.cooling_jacket.configuration == "spiral":
+                elif cooling_jacket.configuration == "spiral":
                     #Just for the legends
                     axs.plot(0, 0, color = 'blue', label = 'Cooling channels')  
 
-                    if self.cooling_jacket.number_of_channels != 1:
+                    if cooling_jacket.number_of_channels != 1:
 
                         axs.plot(0, 0, color = 'red', label = 'Channel fins')  
                         fin_color = 'red'
@@ -641,15 +791,15 @@ class Engine:
 
                     while current_x < max_x_jacket:
                         y_jacket_inner = np.interp(current_x, xs, y_bottom)
-                        H = self.cooling_jacket.channel_height(current_x)           # Current channel height
-                        W = self.cooling_jacket.bundle_width(current_x)            # Current channel width
+                        H = cooling_jacket.channel_height(current_x)           # Current channel height
+                        W = cooling_jacket.bundle_width(current_x)            # Current channel width
 
                         #Show the ribs as filled in rectangles
-                        area_per_fin = W * H * self.cooling_jacket.blockage_ratio(current_x)/self.cooling_jacket.number_of_channels
+                        area_per_fin = W * H * cooling_jacket.blockage_ratio(current_x)/cooling_jacket.number_of_channels
                         fin_width = area_per_fin / H
 
-                        for j in range(self.cooling_jacket.number_of_channels):
-                            distance_to_next_rib = W/self.cooling_jacket.number_of_channels
+                        for j in range(cooling_jacket.number_of_channels):
+                            distance_to_next_rib = W/cooling_jacket.number_of_channels
 
                             # Make all ribs red
                             axs.add_patch(matplotlib.patches.Rectangle([current_x + j*distance_to_next_rib, y_jacket_inner], fin_width, H, color = fin_color, fill = True))
@@ -833,25 +983,29 @@ class Engine:
         x = state["x"]
         return self.A_coolant(x = x)
 
-    def V_c(self, state):
+    def V_c(self, state, context = None):
         x = state["x"]
         T_c = state["T_c"]
         p_c = state["p_c"]
 
         A_c = self.A_c(state)
         rho_c = self.cooling_jacket.coolant_transport.rho(T = T_c, p = p_c)
+        mdot_coolant = self.cooling_jacket.mdot_coolant if context is None else context.mdot_coolant
 
-        return self.cooling_jacket.mdot_coolant / (rho_c * A_c)
+        return mdot_coolant / (rho_c * A_c)
 
-    def Rdx(self, state):
-        R_list = []
+    def h_coolant(self, state):
+        """Coolant side convective heat transfer coefficient, including the scale factor 'h_coolant_sf'.
 
-        # Need a list of thermal circuit resistances [R1, R2 ...], in the order T_cold --> T_hot
+        Args:
+            state (dict): State at the grid point, containing the keys "x", "T_c", "p_c", "V_c" and "T_cw".
+
+        Returns:
+            float: Convective heat transfer coefficient (W/m2/K)
+        """
         x = state["x"]
-        y = self.geometry.r(x)
 
-        # -------------------------------- COOLANT --------------------------------
-        # Collect all the coolant transport properties, and find the convective resistance
+        # Collect all the coolant transport properties
         T_coolant_wall = state["T_cw"]
         V_coolant = state["V_c"]
         T_coolant = state["T_c"]
@@ -869,7 +1023,7 @@ class Engine:
         if ReDh_coolant < REDH_LAMINAR:
             warnings.warn(f"ReDh < {REDH_LAMINAR} in cooling channels: Laminar flow relations will be used. Constant wall temperature is assumed for Nusselt number.", stacklevel = 2)
             NuDh_coolant = 3.66       # Nusselt number for constant wall temperature approximation, Reference [1]
-            self.h_coolant = NuDh_coolant * k_coolant / Dh_coolant
+            h_coolant = NuDh_coolant * k_coolant / Dh_coolant
 
         # Transitional or turbulent flow
         else:
@@ -912,33 +1066,27 @@ class Engine:
                 h_coolant_lam = 3.66 * k_coolant / Dh_coolant      # Nusselt number for constant wall temperature approximation, Reference [1]
 
                 # "Blend" between laminar and turbulent
-                self.h_coolant = np.interp(ReDh_coolant, [REDH_LAMINAR, REDH_TURBULENT], [h_coolant_lam, h_coolant_turb])
+                h_coolant = np.interp(ReDh_coolant, [REDH_LAMINAR, REDH_TURBULENT], [h_coolant_lam, h_coolant_turb])
 
             else:
                 # Turbulent flow
-                self.h_coolant = h_coolant_turb
+                h_coolant = h_coolant_turb
 
-        self.h_coolant = self.h_coolant * self.h_coolant_sf             # Multiply h_coolant by the scale factor given by the user.
-        A_coolant = 2 * np.pi * (y + self.total_wall_thickness(x))      # Note, this is the area per unit axial length. We will multiply by 'dx' later in the cusfbamboo.hx.HXSolver
-        R_list.append(1.0 / (self.h_coolant * A_coolant))
-        
-        # -------------------------------- SOLID WALLS --------------------------------
-        # Find the thermal resistance of the solid boundaries between the coolant and the gas - note our resistance list goes in the order [Cold --> Hot], but the walls are in the order [Hot --> Cold]
-        for i in range(len(self.walls)):   
-            # Work in reverse from the cold side to the hot side
-            reversed_walls = list(reversed(self.walls))
+        return h_coolant * self.h_coolant_sf             # Multiply h_coolant by the scale factor given by the user.
 
-            # Calculate the inner radius - need to add up all the wall thickness up to (and excluding) the current wall
-            r1 = y
-            for j in range(len(self.walls) - i - 1):
-                r1 += self.walls[j].thickness(x)
+    def h_exhaust(self, state):
+        """Exhaust gas side convective heat transfer coefficient, including the scale factor 'h_exhaust_sf'.
 
-            r2 = r1 + reversed_walls[i].thickness(x)
+        Args:
+            state (dict): State at the grid point, containing the keys "x" and "T_hw".
 
-            R_list.append(np.log(r2/r1) / (2 * np.pi * reversed_walls[i].material.k))
+        Returns:
+            float: Convective heat transfer coefficient (W/m2/K)
+        """
+        x = state["x"]
+        y = self.geometry.r(x)
 
-        # -------------------------------- EXHAUST GAS --------------------------------
-        # Get the gas properties, and find the thermal resistance of the convection on the hot gas side
+        # Get the gas properties
         rho_exhaust = self.rho(x)
         T_exhaust = self.T(x)
         T_exhaust_wall = state["T_hw"]
@@ -1016,58 +1164,227 @@ class Engine:
                                                                Pr0 = Pr_exhaust_0,
                                                                rc_t = self.geometry.r_curvature_t)
 
-        A_exhaust = 2 * np.pi * y                                           # Note, this is the area per unit axial length. We will multiply by 'dx' later in the cusfbamboo.hx.HXSolver. 
-        R_list.append(1.0 / (self.h_exhaust_sf * h_exhaust * A_exhaust))    # Don't forget to multiply by any scale factor (self.h_exhaust_sf) that the user requested.
-        
-        return np.array(R_list) 
+        return h_exhaust * self.h_exhaust_sf            # Don't forget to multiply by any scale factor (self.h_exhaust_sf) that the user requested.
 
-    def extra_dQ_dx(self, state):
-        return 0.0      # Disabled fin heat transfer for now - it seemed to be massively excessive (I suspect the adiabatic tip assumption is questionable)
+    def R_coolant(self, state):
+        """Coolant side thermal resistance per unit axial length, between the coolant and the cold side of the outermost wall. If the CoolingJacket has fin_model = "cross-section",
+        this includes the heat transfer from the fins (see cusfbamboo.fins).
+
+        Args:
+            state (dict): State at the grid point, containing the keys "x", "T_c", "p_c", "V_c" and "T_cw".
 
+        Returns:
+            float: Thermal resistance (K m/W). Multiply by 'dx' to get the resistance of a grid cell.
+        """
         x = state["x"]
+        A_coolant = 2 * np.pi * (self.geometry.r(x) + self.total_wall_thickness(x))      # Area per unit axial length
         blockage_ratio = self.cooling_jacket.blockage_ratio(x)
 
-        if blockage_ratio == 0 or abs(blockage_ratio) < 1e-12: 
-            return 0.0      # Effectively no fins
+        if self.cooling_jacket.fin_model == "cross-section" and self.cooling_jacket.number_of_channels != 0 and abs(blockage_ratio) >= 1e-12:
+            # Distance between the middle of neighbouring channels
+            if self.cooling_jacket.configuration == "vertical":
+                pitch = A_coolant / self.cooling_jacket.number_of_channels
+            else:
+                pitch = self.cooling_jacket.channel_width(x)
+
+            return cusfbamboo.fins.coolant_resistance(h = self.h_coolant(state), 
+                                                      k = self.walls[-1].material.k, 
+                                                      thickness = self.walls[-1].thickness(x), 
+                                                      pitch = pitch, 
+                                                      blockage_ratio = blockage_ratio, 
+                                                      channel_height = self.cooling_jacket.channel_height(x), 
+                                                      area = A_coolant)
+
+        return 1.0 / (self.h_coolant(state) * A_coolant)
+
+    def _prepare_fin_tables(self, x_min, x_max, num_grid):
+        # Build every fin table that R_coolant() could need along the cooling jacket before the analysis starts, so a tapered channel never builds one during the march
+        if self.cooling_jacket.fin_model != "cross-section" or self.cooling_jacket.number_of_channels == 0:
+            return
+
+        xs = np.linspace(x_min, x_max, num_grid + 1)
+        blockage_ratios = np.array([self.cooling_jacket.blockage_ratio(x) for x in xs])
+        fin_heights = np.array([self.cooling_jacket.channel_height(x) / self.walls[-1].thickness(x) for x in xs])
+        finned = np.abs(blockage_ratios) >= 1e-12
+
+        if np.any(finned):
+            cusfbamboo.fins.prepare_tables(blockage_ratios = blockage_ratios[finned], fin_heights = fin_heights[finned])
+
+    def _nucleate_boiling(self, saturation, T_w):
+        # Nucleate boiling heat flux (W/m2) from Rohsenow's equation, for a wall temperature above the saturation temperature
+        return cusfbamboo.circuit.dQ_dA_nucleate(mu_l = saturation["mu_l"], 
+                                                 h_fg = saturation["h_fg"], 
+                                                 rho_l = saturation["rho_l"], 
+                                                 rho_v = saturation["rho_v"], 
+                                                 sigma = saturation["sigma"], 
+                                                 cp_l = saturation["cp_l"], 
+                                                 T_w = T_w, 
+                                                 T_sat = saturation["T_sat"], 
+                                                 C_sf = self.cooling_jacket.coolant_boiling.C_sf, 
+                                                 Pr_l = saturation["Pr_l"], 
+                                                 n = self.cooling_jacket.coolant_boiling.n)
+
+    def _saturation(self, p):
+        # Saturation properties for the boiling models at a grid point. Between the end of the saturation table and the critical pressure there is no data, so boiling is ignored
+        # (like for a supercritical coolant) instead of stopping the analysis - direct NucleateBoiling.saturation() queries still raise.
+        coolant_boiling = self.cooling_jacket.coolant_boiling
+
+        if coolant_boiling.p[-1] < p <= coolant_boiling.p_critical:
+            warnings.warn(f"Coolant pressure ({p} Pa) is between the end of the saturation table ({coolant_boiling.p[-1]} Pa) and the critical pressure ({coolant_boiling.p_critical} Pa). Boiling is not modelled here, so forced convection will be used.", stacklevel = 2)
+            return None
+
+        return coolant_boiling.saturation(p)
+
+    def _critical_heat_flux(self, saturation, T_c):
+        # Critical heat flux (W/m2), including the increase due to the coolant being subcooled
+        dQ_dA_critical = cusfbamboo.circuit.dQ_dA_nucleate_critical(h_fg = saturation["h_fg"], rho_v = saturation["rho_v"], sigma = saturation["sigma"], rho_l = saturation["rho_l"])
+
+        return dQ_dA_critical * cusfbamboo.circuit.dQ_dA_critical_subcooling(rho_l = saturation["rho_l"], 
+                                                                             rho_v = saturation["rho_v"], 
+                                                                             cp_l = saturation["cp_l"], 
+                                                                             h_fg = saturation["h_fg"], 
+                                                                             T_sat = saturation["T_sat"], 
+                                                                             T_bulk = T_c)
+
+    def R_coolant_boiling(self, state, R_coolant, R_hot, T_hot):
+        """Coolant side thermal resistance per unit axial length, including boiling (see the 'coolant_boiling' input of CoolingJacket). The boiling regime is chosen at each grid point:
+        
+         - Forced convection, if the cold side wall is below the saturation temperature, or the coolant is supercritical (or between the end of the saturation table and the critical 
+           pressure, with a warning).
+         - Nucleate boiling, with the heat flux from Rohsenow's equation added to the forced convection, if the wall is above the saturation temperature and the nucleate boiling heat 
+           flux is below the critical heat flux (including the increase due to subcooling).
+         - Stable film boiling, with the heat flux through the vapour film added to the forced convection, if nucleate boiling would need more than the critical heat flux. Keeping 
+           the forced convection means the coolant side heat transfer never drops below that of forced convection alone.
+
+        The boiling heat flux depends strongly on the cold side wall temperature, so it is found from the heat balance with the rest of the thermal circuit (instead of using 
+        the wall temperature from the last iteration), and converted into an equivalent resistance. Saturated bulk boiling (i.e. T_coolant > T_sat) is not modelled.
+
+        Args:
+            state (dict): State at the grid point, containing the keys "x", "T_c", "p_c", "V_c" and "T_cw".
+            R_coolant (float): Forced convection resistance per unit axial length (K m/W), from R_coolant().
+            R_hot (float): Total resistance per unit axial length between the cold side wall and the exhaust gas (K m/W).
+            T_hot (float): Exhaust gas recovery temperature (K).
+
+        Returns:
+            float: Thermal resistance (K m/W).
+        """
+        saturation = self._saturation(state["p_c"])
+        T_c = state["T_c"]
+
+        if saturation is None:
+            return R_coolant            # Supercritical, or beyond the saturation table
+
+        T_sat = saturation["T_sat"]
+        T_cw = T_c + (T_hot - T_c) * R_coolant / (R_coolant + R_hot)
+
+        if T_cw <= T_sat:
+            return R_coolant
+
+        if T_c >= T_sat:
+            warnings.warn(f"Coolant bulk temperature ({T_c} K) is above the saturation temperature ({T_sat} K). Saturated boiling is not modelled, so forced convection will be used.", stacklevel = 2)
+            return R_coolant
+
+        x = state["x"]
+        A_coolant = 2 * np.pi * (self.geometry.r(x) + self.total_wall_thickness(x))
+        dQ_dA_critical = self._critical_heat_flux(saturation, T_c)
+
+        # Nucleate boiling, on top of the forced convection
+        def nucleate_residual(T_w):
+            return (T_hot - T_w) / R_hot - (T_w - T_c) / R_coolant - A_coolant * self._nucleate_boiling(saturation, T_w)
+
+        T_cw = scipy.optimize.brentq(nucleate_residual, T_sat, T_cw)
+
+        if self._nucleate_boiling(saturation, T_cw) <= dQ_dA_critical:
+            return (T_cw - T_c) / ((T_hot - T_cw) / R_hot)
+
+        # Stable film boiling, on top of the forced convection - the vapour properties are taken at saturation, instead of the film temperature
+        def film_residual(T_w):
+            h_film = cusfbamboo.circuit.h_coolant_stable_film(k_vf = saturation["k_v"], 
+                                                              rho_vf = saturation["rho_v"], 
+                                                              rho_v = saturation["rho_v"], 
+                                                              rho_l = saturation["rho_l"], 
+                                                              h_fg = saturation["h_fg"], 
+                                                              cp_l = saturation["cp_l"], 
+                                                              dT = T_w - T_c, 
+                                                              mu_vf = saturation["mu_v"], 
+                                                              T_w = T_w, 
+                                                              T_sat = T_sat, 
+                                                              sigma = saturation["sigma"])
+
+            return (T_hot - T_w) / R_hot - (T_w - T_c) / R_coolant - A_coolant * h_film * (T_w - T_sat)
+
+        T_cw = scipy.optimize.brentq(film_residual, T_sat + 1e-6, T_hot)
+
+        return (T_cw - T_c) / ((T_hot - T_cw) / R_hot)
+
+    def boiling_regime(self, state, dQ_dx):
+        """Get the boiling regime and critical heat flux margin at a grid point, from a converged solution.
+
+        Args:
+            state (dict): State at the grid point, containing the keys "x", "T_c", "p_c" and "T_cw".
+            dQ_dx (float): Heat transfer rate into the coolant per unit axial length (W/m).
+
+        Returns:
+            tuple: (regime, chf_margin) - the boiling regime ("forced convection", "nucleate boiling" or "film boiling"), and the critical heat flux divided by the heat flux at the 
+            cold side wall (infinite if the coolant is supercritical or there is no heat flux).
+        """
+        saturation = self._saturation(state["p_c"])
+
+        if saturation is None:
+            return "forced convection", np.inf
+
+        x = state["x"]
+        dQ_dA = dQ_dx / (2 * np.pi * (self.geometry.r(x) + self.total_wall_thickness(x)))
+        dQ_dA_critical = self._critical_heat_flux(saturation, state["T_c"])
+        chf_margin = dQ_dA_critical / dQ_dA if dQ_dA > 0 else np.inf
+
+        if state["T_cw"] <= saturation["T_sat"] or state["T_c"] >= saturation["T_sat"]:
+            return "forced convection", chf_margin
+
+        elif self._nucleate_boiling(saturation, state["T_cw"]) <= dQ_dA_critical:
+            return "nucleate boiling", chf_margin
 
         else:
-            P = 2.0                                     # For dQ, the perimeter is 2 * dx. We must divide this by dx to get dQ/dx
-            L = self.cooling_jacket.channel_height(x)
+            return "film boiling", chf_margin
 
-            R = self.geometry.r(x)
-            for i in range(len(self.walls)):
-                R += self.walls[i].thickness(x)
+    def Rdx(self, state):
+        R_list = []
 
-            if self.cooling_jacket.configuration == "vertical":
-                # Base area (per dx) for a single fin = circumference * blockage_ratio / number_of_channels. Assume the fins are constant cross sectional area, equal to the base area.
-                Ac = 2 * np.pi * R * blockage_ratio / self.cooling_jacket.number_of_channels  
+        # Need a list of thermal circuit resistances [R1, R2 ...], in the order T_cold --> T_hot
+        x = state["x"]
+        y = self.geometry.r(x)
 
-            elif self.cooling_jacket.configuration == "spiral":
-                channel_width = self.cooling_jacket.channel_width(x) 
-                Ac = channel_width * blockage_ratio
-
-                # Need to correct the perimeter to take into account that the length travelled by a fluid along a the spiral channel is longer than 'dx'
-                # IS THIS THE CORRECT WAY OF TAKING THIS INTO ACCOUNT???
-                P = P / np.cos(self.helix_angle(x))
-
-            T_b = state["T_cw"]
-            T_inf = state["T_c"]
-
-            # extra_dQ_dx should always be called after R_th was called, so we can reuse the convective heat transfer coefficients calculacted from it.
-            dQ_dx_single_fin = cusfbamboo.circuit.Q_fin_adiabatic(P = P, 
-                                                              Ac = Ac, 
-                                                              k = self.walls[-1].material.k, 
-                                                              h = self.h_coolant, 
-                                                              L = L, 
-                                                              T_b = T_b, 
-                                                              T_inf = T_inf)
-            
-            if self.cooling_jacket.configuration == "vertical":
-                # Subtract the heat transfer that we added assuming there were no fins, and replace it with the heat transfer from the fins
-                return abs(dQ_dx_single_fin * self.cooling_jacket.number_of_channels) - 2 * np.pi * R * (1 - blockage_ratio) * self.h_coolant * (T_b - T_inf)   
+        # -------------------------------- COOLANT --------------------------------
+        R_list.append(self.R_coolant(state))
+        
+        # -------------------------------- SOLID WALLS --------------------------------
+        # Find the thermal resistance of the solid boundaries between the coolant and the gas - note our resistance list goes in the order [Cold --> Hot], but the walls are in the order [Hot --> Cold]
+        for i in range(len(self.walls)):   
+            # Work in reverse from the cold side to the hot side
+            reversed_walls = list(reversed(self.walls))
 
-            elif self.cooling_jacket.configuration == "spiral":
-                return abs(dQ_dx_single_fin * self.cooling_jacket.number_of_channels) - channel_width * (1 - blockage_ratio) * self.h_coolant * (T_b - T_inf)   
+            # Calculate the inner radius - need to add up all the wall thickness up to (and excluding) the current wall
+            r1 = y
+            for j in range(len(self.walls) - i - 1):
+                r1 += self.walls[j].thickness(x)
+
+            r2 = r1 + reversed_walls[i].thickness(x)
+
+            R_list.append(np.log(r2/r1) / (2 * np.pi * reversed_walls[i].material.k))
+
+        # -------------------------------- EXHAUST GAS --------------------------------
+        # Find the thermal resistance of the convection on the hot gas side
+        A_exhaust = 2 * np.pi * y                                           # Note, this is the area per unit axial length. We will multiply by 'dx' later in the cusfbamboo.hx.HXSolver. 
+        R_list.append(1.0 / (self.h_exhaust(state) * A_exhaust))
+
+        # -------------------------------- BOILING --------------------------------
+        if self.cooling_jacket.coolant_boiling is not None:
+            R_list[0] = self.R_coolant_boiling(state, R_coolant = R_list[0], R_hot = sum(R_list[1:]), T_hot = self.T_h(state))
+        
+        return np.array(R_list) 
+
+    def extra_dQ_dx(self, state):
+        return 0.0      # Fin heat transfer is included in the coolant thermal resistance instead (see the 'fin_model' input of CoolingJacket), so the wall temperatures account for it
 
     def dp_dx_f(self, state):
         x = state["x"]   
@@ -1088,19 +1405,21 @@ class Engine:
         return dp_dLc * self.dLc_dx(x)
 
     # Functions for thermal simulations
-    def steady_heating_analysis(self, num_grid = 1000, counterflow = True, iter_start = 5, iter_each = 2):
-        """Run a steady state cooling simulation.
+    def run_context(self, num_grid, counterflow, coolant_inlet = None):
+        """Get the RunContext for a heating analysis, which holds everything that is specific to that analysis (e.g. the grid spacing), so the Engine itself is never modified.
 
         Args:
             num_grid (int): Number of grid points to use (1-dimensional)
-            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
-            iter_start (int): Number of times to iterate on the entry conditions. Defaults to 5.
-            iter_each (int): Number of times to iterate on the solution at each datapoint. Defaults to 2.
-        """
+            counterflow (bool): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas.
+            coolant_inlet (dict, optional): Coolant inlet conditions to use instead of those in the CoolingJacket, e.g. {"p_coolant_in" : 25e5}. Can contain "T_coolant_in", "p_coolant_in" and "mdot_coolant". Defaults to None.
 
+        Returns:
+            RunContext: The RunContext for the analysis.
+        """
         dx = (self.geometry.xs[0] - self.geometry.xs[-1]) / num_grid
 
         # Check that we have all the required inputs.
+        assert not hasattr(self, "cooling_jackets"), "Engines with the 'cooling_jackets' input must be analysed with multi_jacket_analysis()"
         assert hasattr(self, "cooling_jacket"), "'cooling_jacket' input must be given to Engine object in order to run a steady cooling simulation"
         assert hasattr(self, "exhaust_transport"), "'exhaust_transport' input must be given to Engine object in order to run a steady cooling simulation"
         assert hasattr(self, "walls"), "'walls' input must be given to Engine object in order to run a cooling simulation"
@@ -1118,6 +1437,8 @@ class Engine:
             x_max = self.geometry.xs[-1]
             x_min = self.geometry.xs[0]
 
+        self._prepare_fin_tables(x_min = x_min, x_max = x_max, num_grid = num_grid)
+
         if counterflow:
             dx = -abs(dx)
             x_start = x_max
@@ -1128,147 +1449,1053 @@ class Engine:
             x_start = x_min
             x_end = x_max
 
-        # Set up and run simulation
-        self.dx = dx    
-        self.x_start = x_start
-        self.x_end = x_end
-        self.counterflow = counterflow
-
-        cooling_simulation = cusfbamboo.hx.HXSolver(T_c_in = self.cooling_jacket.T_coolant_in,
-                                                T_h = self.T_h, 
-                                                p_c_in = self.cooling_jacket.p_coolant_in, 
-                                                cp_c = self.cp_c, 
-                                                mdot_c = self.cooling_jacket.mdot_coolant, 
-                                                V_c = self.V_c, 
-                                                A_c = self.A_c, 
-                                                Rdx = self.Rdx, 
-                                                extra_dQ_dx = self.extra_dQ_dx, 
-                                                dp_dx_f = self.dp_dx_f, 
-                                                x_start = self.x_start, 
-                                                dx = self.dx, 
-                                                x_end = self.x_end)
-
-        cooling_simulation.run(iter_start = iter_start, iter_each = iter_each)
-
-        # Run through the results, and convert them into a convenient form, as well as calculating any useful-to-know values
-        if len(self.walls) > 1:
-            warnings.warn("More than one wall is present. Thermal stresses calculations will ignore any incompatibility in different thermal expansions.", stacklevel = 2)
-
-        results = {}
-        results["info"] = {}                                                            
-        results["x"]                    = [None] * len(cooling_simulation.state)     
-        results["T"]                    = [None] * len(cooling_simulation.state)       
-        results["T_coolant"]            = [None] * len(cooling_simulation.state)     
-        results["T_exhaust"]            = None
-        results["dQ_dx"]                = [None] * len(cooling_simulation.state)  
-        results["dQ_dLc"]               = [None] * len(cooling_simulation.state)       
-        results["dQ_dA"]                = [None] * len(cooling_simulation.state)  
-        results["Rdx"]                  = [None] * len(cooling_simulation.state)        
-        results["p_coolant"]            = [None] * len(cooling_simulation.state)           
-        results["rho_coolant"]          = [None] * len(cooling_simulation.state)        
-        results["V_coolant"]            = [None] * len(cooling_simulation.state)    
-        results["Dh_coolant"]           = [None] * len(cooling_simulation.state)    
-        results["sigma_t_thermal"]      = [None] * len(cooling_simulation.state)        
-        results["sigma_t_pressure"]     = [None] * len(cooling_simulation.state)        
-        results["sigma_t_max"]          = [None] * len(cooling_simulation.state)        
-
-        # Explanation of what all the keys mean
-        results["info"]["x"] = "Axial position along the engine (m)."
-        results["info"]["r"] = "Engine combustion chamber radius (m). r[i] is the value at x[i]."
-        results["info"]["T"] = "Static temperature at each position (K). T[i][j], is the temperature at x[i], at the j'th wall boundary. j = 0 corresponds to the coolant, j = -1 corresponds to the exhaust gas."
-        results["info"]["T_coolant"] = "Coolant static temperature at each position (K). T_coolant[i] is the value at x[i]."
-        results["info"]["T_exhaust"] = "Exhaust temperature at each position (K). T_exhaust[i] is the value at x[i]. "
-        results["info"]["dQ_dx"] = "Heat transfer rate per unit axial length (W/m). dQ_dx[i] is the value at x[i]."
-        results["info"]["dQ_dLc"] = "Heat transfer rate per unit length along the cooling channel (W/m) - equal to dQ/dx for 'vertical' channels but not for 'spiral' channels. dQ_dx[i] is the value at x[i]."
-        results["info"]["dQ_dA"] = "Heat transfer rate per unit chamber area at the innermost wall (W/m2). dQ_dA[i] is the value at x[i]."
-        results["info"]["Rdx"] = "Local thermal resistances at each position (K m/W), in the order coolant convection (index 0) --> exhaust convection. R_dx[i] a list of resistances at the value at x[i]"
-        results["info"]["rho_coolant"] = "Density of coolant (kg/m3). rho_coolant[i] is the value at x[i]."
-        results["info"]["p_coolant"] = "Static pressure of coolant (Pa). p_coolant[i] is the value at x[i]."
-        results["info"]["V_coolant"] = "Velocity of coolant (m/s). V_coolant[i] is the value at x[i]."
-        results["info"]["Dh_coolant"] = "Hydraulic diameter of the coolant."
-        results["info"]["sigma_t_thermal"] = "Tangential stress due to uneven thermal expansion (Pa). sigma_t_thermal[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
-        results["info"]["sigma_t_pressure"] = "Tangential stress due to pressure difference across wall (Pa). sigma_t_pressure[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
-        results["info"]["sigma_t_max"] = "Maximum tangential stress (Pa), equal to abs(sigma_t_thermal) + abs(sigma_t_pressure). sigma_t_max[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
-
-        for i in range(len(cooling_simulation.state)):
-            x = cooling_simulation.state[i]["x"]
-
-            # Collect all the data into a dictionary
-            results["x"][i] = x
-            results["T"][i] = list(cooling_simulation.state[i]["circuit"].T)
-            results["dQ_dx"][i] = -cooling_simulation.state[i]["circuit"].Qdot
-            results["dQ_dA"][i] = results["dQ_dx"][i] / (2 * np.pi * self.geometry.r(x = results["x"][i]))
-            results["p_coolant"][i] = cooling_simulation.state[i]["p_c"]
-            results["T_coolant"][i] = cooling_simulation.state[i]["T_c"]
-            results["V_coolant"][i] = cooling_simulation.state[i]["V_c"]
-            results["rho_coolant"][i] = self.cooling_jacket.coolant_transport.rho(T = results["T_coolant"][i], p = results["p_coolant"][i])
-            results["Rdx"][i] = cooling_simulation.state[i]["circuit"].R
-            results["Dh_coolant"][i] = self.Dh_coolant(x = results["x"][i])
+        return RunContext(cooling_jacket = self.cooling_jacket, 
+                          dx = dx, 
+                          x_start = x_start, 
+                          x_end = x_end, 
+                          counterflow = counterflow, 
+                          **({} if coolant_inlet is None else coolant_inlet))
+
+    def _heating_solver(self, num_grid, counterflow, store_state = True, initial_guess = None, solver = "march", coolant_inlet = None, profiler = None):
+        # Set up the cusfbamboo.hx.HXSolver (or cusfbamboo.hx.HXNewtonSolver) for a steady heating analysis. All the per-run state is kept in the RunContext, so the Engine isn't modified.
+        context = self.run_context(num_grid = num_grid, counterflow = counterflow, coolant_inlet = coolant_inlet)
+
+        inputs = {"T_c_in" : context.T_coolant_in,
+                  "T_h" : self.T_h, 
+                  "p_c_in" : context.p_coolant_in, 
+                  "cp_c" : self.cp_c, 
+                  "mdot_c" : context.mdot_coolant, 
+                  "V_c" : functools.partial(self.V_c, context = context), 
+                  "A_c" : self.A_c, 
+                  "Rdx" : self.Rdx, 
+                  "extra_dQ_dx" : self.extra_dQ_dx, 
+                  "dp_dx_f" : self.dp_dx_f, 
+                  "x_start" : context.x_start, 
+                  "dx" : context.dx, 
+                  "x_end" : context.x_end}
+
+        if solver == "march":
+            return cusfbamboo.hx.HXSolver(**inputs,
+                                          store_state = store_state,
+                                          initial_guess = None if initial_guess is None else self._solver_profile(initial_guess),
+                                          profiler = profiler)
+
+        elif solver == "newton":
+            return cusfbamboo.hx.HXNewtonSolver(**inputs, profiler = profiler)
 
+        else:
+            raise ValueError(f"Solver '{solver}' is not recognised. Try 'march' or 'newton'")
+
+    @staticmethod
+    def _solver_profile(results):
+        # Convert the results from steady_heating_analysis() into the form needed for the 'initial_guess' of a cusfbamboo.hx.HXSolver
+        return {"x" : results["x"],
+                "T_c" : results["T_coolant"],
+                "p_c" : results["p_coolant"],
+                "T_cw" : [T[1] for T in results["T"]],
+                "T_hw" : [T[-2] for T in results["T"]]}
+
+    def _station_output(self, station, fields = None):
+        # Convert the state dictionary at a single grid point (from cusfbamboo.hx.HXSolver) into a convenient form, as well as calculating any useful-to-know values
+        # Values that need extra calculations are only included if they are in 'fields' (or if fields = None)
+        row = {}
+        x = station["x"]
+
+        def wanted(*keys):
+            return fields is None or any(key in fields for key in keys)
+
+        row["x"] = x
+        row["T"] = list(station["circuit"].T)
+        row["dQ_dx"] = -station["circuit"].Qdot
+        row["dQ_dA"] = row["dQ_dx"] / (2 * np.pi * self.geometry.r(x = x))
+        row["p_coolant"] = station["p_c"]
+        row["T_coolant"] = station["T_c"]
+        row["V_coolant"] = station["V_c"]
+        row["Rdx"] = station["circuit"].R
+
+        if wanted("rho_coolant"):
+            row["rho_coolant"] = self.cooling_jacket.coolant_transport.rho(T = row["T_coolant"], p = row["p_coolant"])
+
+        if wanted("Dh_coolant"):
+            row["Dh_coolant"] = self.Dh_coolant(x = x)
+
+        if self.cooling_jacket.coolant_boiling is not None and wanted("boiling_regime", "chf_margin"):
+            row["boiling_regime"], row["chf_margin"] = self.boiling_regime({"x" : x, "T_c" : station["T_c"], "p_c" : station["p_c"], "T_cw" : station["circuit"].T[1]}, row["dQ_dx"])
+
+        if wanted("dQ_dLc"):
             if self.cooling_jacket.configuration == "vertical":
-                results["dQ_dLc"][i] = results["dQ_dx"][i]
+                row["dQ_dLc"] = row["dQ_dx"]
             
             elif self.cooling_jacket.configuration == "spiral":
                 dLc_dx = self.dLc_dx(x)
-                results["dQ_dLc"][i] = results["dQ_dx"][i] / dLc_dx
-                
+                row["dQ_dLc"] = row["dQ_dx"] / dLc_dx
 
-            # Calculate relevant stresses
-            results["sigma_t_thermal"][i] = [None] * len(self.walls)
-            results["sigma_t_pressure"][i] = [None] * len(self.walls)
-            results["sigma_t_max"][i] = [None] * len(self.walls)
-            
-            # Calculate these now to avoid them being recalculated unnecessarily
-            p_l = results["p_coolant"][i]                           # Coolant pressure (Pa)
-            p_g = self.p(results["x"][i])                           # Exhaust pressure (Pa)
-            blockage_ratio = self.cooling_jacket.blockage_ratio(x)  # Channel blockage ratio
-            D = 2 * self.geometry.r(x)                              # Engine diameter (up to relevant wall) (m)
-            t_w = 0                                                 # Wall thickness (will be updated as we go) (m)
+        # Calculate relevant stresses
+        if wanted("sigma_t_thermal", "sigma_t_pressure", "sigma_t_max"):
+            sigma_t_thermal, sigma_t_pressure, sigma_t_max = cusfbamboo.stress.tangential_stresses(self, x = [x], dQ_dA = [row["dQ_dA"]], p_coolant = [row["p_coolant"]])
+            row["sigma_t_thermal"] = sigma_t_thermal[0].tolist()
+            row["sigma_t_pressure"] = sigma_t_pressure[0].tolist()
+            row["sigma_t_max"] = sigma_t_max[0].tolist()
+
+        return row
+
+    def _checkpoint_tag(self, initial_guess):
+        # Identifier for checkpoint files, so an analysis never resumes from a checkpoint of a different engine
+        try:
+            definition = {"engine" : cusfbamboo.config.engine_to_dict(self),
+                          "initial_guess" : None if initial_guess is None else {key : np.asarray(value, dtype = float).tolist() for key, value in self._solver_profile(initial_guess).items()}}
+
+        except ValueError:
+            return None     # Engines with arbitrary functions can't be converted, so HXSolver.march() relies on re-evaluating them at the saved grid points instead
 
-            if self.cooling_jacket.configuration == "spiral":
-                pitch = self.cooling_jacket.bundle_width(x)
+        return hashlib.sha256(json.dumps(definition, sort_keys = True).encode()).hexdigest()
 
-            # Iterate through each wall
-            for j in range(len(self.walls)):
-                D += t_w
+    def _restart_options(self, num_grid, counterflow, iter_start, iter_each, initial_guess, coolant_inlet):
+        # Everything that must match for a previous analysis to be reused, other than the input functions (which are compared using cusfbamboo.hx.HXSolver.matches_record())
+        context = self.run_context(num_grid = num_grid, counterflow = counterflow, coolant_inlet = coolant_inlet)
 
-                # Thermal stress from Heister [9]
-                E = self.walls[j].material.E
-                alpha = self.walls[j].material.alpha
-                k = self.walls[j].material.k
-                poisson = self.walls[j].material.poisson
-                t_w = self.walls[j].thickness(x)
+        if initial_guess is None:
+            guess_hash = None
+        else:
+            profile = {key : np.asarray(value, dtype = float).tolist() for key, value in self._solver_profile(initial_guess).items()}
+            guess_hash = hashlib.sha256(json.dumps(profile, sort_keys = True).encode()).hexdigest()
+
+        return {"x_start" : float(context.x_start),
+                "dx" : float(context.dx),
+                "x_end" : float(context.x_end),
+                "T_coolant_in" : float(context.T_coolant_in),
+                "p_coolant_in" : float(context.p_coolant_in),
+                "mdot_coolant" : float(context.mdot_coolant),
+                "iter_start" : iter_start,
+                "iter_each" : iter_each,
+                "initial_guess" : guess_hash}
+
+    def _design_signature(self):
+        # Hash of everything that the solver callbacks depend on, apart from the functions of position in _design_inputs(). Returns None if something can't be converted (e.g. 
+        # transport properties that are lambdas), in which case the input functions have to be compared at every grid point instead.
+        try:
+            definition = {"class" : type(self).__qualname__,
+                          "perfect_gas" : [self.perfect_gas.gamma, self.perfect_gas.cp],
+                          "chamber_conditions" : [self.chamber_conditions.p0, self.chamber_conditions.T0],
+                          "geometry" : [self.geometry.x_t, self.geometry.A_t, getattr(self.geometry, "r_curvature_t", None), self.geometry.xs[0], self.geometry.xs[-1]],
+                          "convection" : [self.coolant_convection, self.exhaust_convection],
+                          "h_sf" : [cusfbamboo.config._value_to_dict(self.h_exhaust_sf, "h_exhaust_sf"), cusfbamboo.config._value_to_dict(self.h_coolant_sf, "h_coolant_sf")],
+                          "exhaust_transport" : cusfbamboo.config.transport_to_dict(self.exhaust_transport),
+                          "walls" : [cusfbamboo.config.material_to_dict(wall.material) for wall in self.walls],
+                          "cooling_jacket" : {"coolant_transport" : cusfbamboo.config.transport_to_dict(self.cooling_jacket.coolant_transport),
+                                              "configuration" : self.cooling_jacket.configuration,
+                                              "number_of_channels" : self.cooling_jacket.number_of_channels,
+                                              "restrain_fins" : self.cooling_jacket.restrain_fins,
+                                              "fin_model" : self.cooling_jacket.fin_model,
+                                              "coolant_boiling" : None if self.cooling_jacket.coolant_boiling is None else cusfbamboo.config.boiling_to_dict(self.cooling_jacket.coolant_boiling)}}
+
+        except ValueError:
+            return None
+
+        return hashlib.sha256(json.dumps(definition, sort_keys = True).encode()).hexdigest()
+
+    def _design_inputs(self, x):
+        # Values of the functions of position that the solver callbacks use at x. The coolant wall slope also depends on the values just downstream (see coolant_slope()).
+        jacket = self.cooling_jacket
+        values = [x, self.geometry.r(x), self.geometry.r(x + 1e-6), jacket.channel_height(x), jacket.blockage_ratio(x), jacket.roughness(x), 
+                  jacket.channel_width(x) if jacket.configuration == "spiral" else None]
+        values += [wall.thickness(x) for wall in self.walls] + [wall.thickness(x + 1e-6) for wall in self.walls]
+
+        return [None if value is None else float(value) for value in values]
+
+    def _reusable_records(self, cooling_simulation, previous, options):
+        # Find how many grid points of a previous analysis can be reused, by checking whether the input functions still give the same values at each of its grid points
+        assert "restart" in previous, "'previous' must be the results of an analysis with restartable = True"
+
+        if previous["restart"]["options"] != options:
+            return []
+
+        records = previous["restart"]["records"]
+        first_change = None
+
+        # If only functions of position have changed, the first grid point where one of them is different can be found without calling the (much slower) input functions
+        signature = self._design_signature()
+
+        if signature is not None and previous["restart"].get("signature") == signature:
+            first_change = len(records)
+
+            for i in range(len(records)):
+                if self._design_inputs(records[i][0]) != previous["restart"]["inputs"][i]:
+                    first_change = i
+                    break
+
+            # Check a sample of the grid points with the input functions themselves, in case the Engine has been changed in a way that the signature doesn't describe
+            samples = np.unique(np.linspace(0, first_change - 1, min(first_change, cusfbamboo.hx.CHECKPOINT_SAMPLES)).round().astype(int))
+
+            if not all(cooling_simulation.matches_record(np.asarray(records[i], dtype = float)) for i in samples):
+                first_change = None
+
+        if first_change is None:
+            first_change = len(records)
+
+            for i in range(len(records)):
+                if not cooling_simulation.matches_record(np.asarray(records[i], dtype = float)):
+                    first_change = i
+                    break
+
+        if first_change == cooling_simulation.num_points:
+            # Nothing has changed
+            keep = first_change
+
+        else:
+            # Grid point i depends on the inputs at grid point i+1 (e.g. the coolant flow area), so the one before the first change also needs to be solved again
+            keep = max(first_change - 1, 0)
 
-                corrected_dQ_dA = results["dQ_dA"][i] * self.geometry.r(x = results["x"][i]) / (D/2)        # Need to get the actual dQ/dA at the local wall radius (the local radius increases as you move out for each wall)
+        return records[:keep]
+
+    def iter_heating_analysis(self, num_grid = 1000, counterflow = True, iter_start = 5, iter_each = 2, initial_guess = None, solver = "march", coolant_inlet = None, checkpoint = None, checkpoint_every = 100, 
+                              previous = None, restartable = False, profiler = None, fields = None, progress = None):
+        """Generator version of steady_heating_analysis(), which yields the results at each grid point as soon as they have been calculated. Only the grid points currently 
+        being solved are kept in memory, so this can be used for online monitoring, writing results to disk as they are produced, or stopping early.
+
+        Args:
+            num_grid (int): Number of grid points to use (1-dimensional)
+            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
+            iter_start (int): Number of times to iterate on the entry conditions. Defaults to 5.
+            iter_each (int): Number of times to iterate on the solution at each datapoint. Defaults to 2.
+            initial_guess (dict, optional): Results from a previous steady_heating_analysis() (with summary_only = False), to warm-start the solver from. Defaults to None.
+            solver (str, optional): Either 'march' or 'newton'. See steady_heating_analysis() for details. With 'newton', every grid point is solved before any are yielded. Defaults to 'march'.
+            coolant_inlet (dict, optional): Coolant inlet conditions to use instead of those in the CoolingJacket, e.g. {"mdot_coolant" : 0.4}. See steady_heating_analysis(). Defaults to None.
+            checkpoint (str, optional): Path of a checkpoint file, to save progress to every 'checkpoint_every' grid points. See steady_heating_analysis(). Defaults to None.
+            checkpoint_every (int, optional): Number of grid points between writes to the checkpoint file. Defaults to 100.
+            previous (dict, optional): Results of a previous analysis with restartable = True, to reuse the unchanged grid points of. See steady_heating_analysis(). Defaults to None.
+            restartable (bool, optional): If True, each row also contains a "restart_record", which steady_heating_analysis() collects into results["restart"]. Defaults to False.
+            profiler (Profiler, optional): cusfbamboo.profiling.Profiler to record the solver callbacks, coolant and exhaust transport property calls, and iterations at each grid point in. 
+                Defaults to None.
+            fields (set, optional): Keys of the values that need extra calculations to include in each row (e.g. "rho_coolant", "Dh_coolant", "dQ_dLc", "sigma_t_max"). The values that come 
+                directly from the solver ("x", "T", "dQ_dx", "dQ_dA", "p_coolant", "T_coolant", "V_coolant" and "Rdx") are always included. Defaults to None, in which case every value is included.
+            progress (callable, optional): Function to call just before each row is yielded, as progress(index, num_points, x), where 'index' is the index of the grid point, 'num_points' is 
+                the total number of grid points and 'x' is the axial position of the grid point (m). Defaults to None.
+
+        Yields:
+            dict: Results at a single grid point, in the direction of coolant flow. Has the same keys as the lists returned by steady_heating_analysis() (e.g. "x", "T", "dQ_dA", "T_coolant", "p_coolant"), but with a single value for each.
+        """
+        kwargs = {"num_grid" : num_grid, "counterflow" : counterflow, "iter_start" : iter_start, "iter_each" : iter_each, "initial_guess" : initial_guess, "solver" : solver, 
+                  "coolant_inlet" : coolant_inlet, "checkpoint" : checkpoint, "checkpoint_every" : checkpoint_every, "previous" : previous, "restartable" : restartable, "fields" : fields, 
+                  "progress" : progress}
 
-                results["sigma_t_thermal"][i][j] = E * alpha * corrected_dQ_dA * t_w / (2 * (1 - poisson) * k)      
+        if profiler is None:
+            yield from self._heating_rows(**kwargs)
+            return
 
-                # Pressure stress from Heister [9]
-                D += t_w / 2        # Average diameter
+        with profiler.transport(self.cooling_jacket.coolant_transport, "coolant"), profiler.transport(self.exhaust_transport, "exhaust"):
+            profiler.start()
 
-                # If we don't have fins in the cooling channels
-                if abs(blockage_ratio) < 1e-12 or self.cooling_jacket.restrain_fins == False:
-                    results["sigma_t_pressure"][i][j] = (p_l - p_g) * D / (2 * t_w)           
+            try:
+                yield from self._heating_rows(**kwargs, profiler = profiler)
+            finally:
+                profiler.stop()
 
-                # If we have fins in the cooling channels, and the fins restrain the inner wall (by being attached to the outer jacket)
+    def _heating_rows(self, num_grid, counterflow, iter_start, iter_each, initial_guess, solver, coolant_inlet, checkpoint, checkpoint_every, previous, restartable, fields = None, profiler = None, 
+                      progress = None):
+        # Run the solver for iter_heating_analysis(), and yield the results at each grid point
+        if solver == "newton":
+            assert checkpoint is None, "Checkpoints can only be used with solver = 'march'"
+            assert previous is None and not restartable, "Incremental re-analysis can only be used with solver = 'march'"
+            cooling_simulation = self._heating_solver(num_grid = num_grid, counterflow = counterflow, solver = solver, coolant_inlet = coolant_inlet, profiler = profiler)
+            cooling_simulation.run(initial_guess = None if initial_guess is None else self._solver_profile(initial_guess), iter_start = iter_start, iter_each = iter_each)
+
+            if not cooling_simulation.converged:
+                warnings.warn(f"Newton solver did not converge within {cooling_simulation.iterations} iterations.", stacklevel = 2)
+
+            stations = cooling_simulation.state
+
+        else:
+            cooling_simulation = self._heating_solver(num_grid = num_grid, counterflow = counterflow, store_state = False, initial_guess = initial_guess, solver = solver, coolant_inlet = coolant_inlet, 
+                                                      profiler = profiler)
+            restart = []
+
+            if previous is not None:
+                restart = self._reusable_records(cooling_simulation, previous, self._restart_options(num_grid, counterflow, iter_start, iter_each, initial_guess, coolant_inlet))
+                restartable = True
+
+            stations = cooling_simulation.march(iter_start = iter_start, 
+                                                iter_each = iter_each, 
+                                                checkpoint = checkpoint, 
+                                                checkpoint_every = checkpoint_every, 
+                                                tag = None if checkpoint is None else self._checkpoint_tag(initial_guess),
+                                                restart = restart if len(restart) > 0 else None,
+                                                keep_records = restartable)
+
+        for index, station in enumerate(stations):
+            row = self._station_output(station, fields = fields)
+
+            if restartable:
+                row["restart_record"] = np.asarray(station["record"]).tolist()
+
+            if progress is not None:
+                progress(index, cooling_simulation.num_points, row["x"])
+
+            yield row
+
+    def steady_heating_analysis(self, num_grid = 1000, counterflow = True, iter_start = 5, iter_each = 2, summary_only = False, reducers = None, constraints = None, initial_guess = None, solver = "march", cache = None, coolant_inlet = None, callback = None, checkpoint = None, checkpoint_every = 100, 
+                                previous = None, restartable = False, profile = False, progress = None):
+        """Run a steady state cooling simulation.
+
+        Note:
+            With summary_only = True, the data at each grid point is passed through a set of running reducers (see cusfbamboo.reducers) as soon as it has been calculated, and is then discarded. 
+            Memory use therefore does not grow with num_grid, which makes very fine grids affordable (e.g. inside optimisation loops).
+
+        Note:
+            If 'constraints' are given, the simulation stops at the first grid point where one is violated. The results then only cover the grid points up to (and excluding) that one, 
+            with results["feasible"] = False, and results["violation"] describing which constraint was violated and where.
+
+        Note:
+            The default 'march' solver steps along the cooling channel, using a fixed number of iterations at each grid point. The 'newton' solver (cusfbamboo.hx.HXNewtonSolver) instead solves every 
+            grid point at once, and is second order accurate and fully converged. It is more expensive, but when given an 'initial_guess' from a similar design it usually only needs a few Newton steps.
+
+        Note:
+            The Engine is not modified by an analysis (everything specific to a run is kept in a RunContext), so several analyses of the same Engine, e.g. with different 'coolant_inlet' conditions, 
+            can be run at once from a concurrent.futures.ThreadPoolExecutor.
+
+        Args:
+            num_grid (int): Number of grid points to use (1-dimensional)
+            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
+            iter_start (int): Number of times to iterate on the entry conditions. Defaults to 5.
+            iter_each (int): Number of times to iterate on the solution at each datapoint. Defaults to 2.
+            summary_only (bool, optional): If True, only return a dictionary of scalar summary values, instead of the data at every grid point. Defaults to False.
+            reducers (dict, optional): Additional reducers to use when summary_only = True, in the form {name : Reducer}. These are added to (or replace) the ones from cusfbamboo.reducers.default_reducers(), and "chf_margin_min" if the CoolingJacket models boiling. Defaults to None.
+            constraints (Constraints or dict, optional): Design limits to check at each grid point, either as a cusfbamboo.constraints.Constraints object, or a dictionary of its keyword arguments (e.g. {"T_hw_max" : 800, "p_coolant_min" : 0}). Defaults to None.
+            initial_guess (dict, optional): Results from a previous steady_heating_analysis() (with summary_only = False) of a similar design, to warm-start the solver from. This usually allows 'iter_each' to be reduced. Defaults to None.
+            solver (str, optional): Either 'march' or 'newton'. Defaults to 'march'.
+            cache (ResultCache, optional): If given, results are loaded from this cusfbamboo.cache.ResultCache if an identical analysis has already been run, and stored in it otherwise. 
+                The engine must be convertible into an engine definition (see cusfbamboo.config). Defaults to None.
+            coolant_inlet (dict, optional): Coolant inlet conditions to use for this analysis instead of those in the CoolingJacket, e.g. {"p_coolant_in" : 25e5, "mdot_coolant" : 0.4}. 
+                Can contain "T_coolant_in", "p_coolant_in" and "mdot_coolant". Defaults to None.
+            callback (callable, optional): Function to call with the results at each grid point as soon as they have been calculated, i.e. callback(row), where 'row' is as yielded by 
+                iter_heating_analysis(). Any exception it raises stops the analysis. Not called if the results are loaded from a 'cache'. Defaults to None.
+            checkpoint (str, optional): Path of a checkpoint file (see cusfbamboo.hx.HXSolver.march()). Progress is appended to it every 'checkpoint_every' grid points, and if the file already 
+                exists (e.g. because a previous run was killed), the analysis resumes from the last saved grid point. A ValueError is raised if the checkpoint is from a different engine or 
+                set of options. Only for solver = 'march'. Defaults to None.
+            checkpoint_every (int, optional): Number of grid points between writes to the checkpoint file. Defaults to 100.
+            previous (dict, optional): Results of a previous analysis (with restartable = True) of a similar engine, using the same options. The inputs at each of its grid points are compared 
+                with this engine's, and the march restarts from the saved state just before the first difference, reusing everything upstream of it. The results are identical to a full analysis. 
+                Only for solver = 'march'. The new results are also restartable. Defaults to None.
+            restartable (bool, optional): If True, the results contain a "restart" key, with the data needed to use them as 'previous' in a later analysis. Defaults to False.
+            profile (bool, optional): If True, the results contain a "profile" key, with the number of calls to (and time spent in) each solver callback, the number of calls to each coolant
+                and exhaust transport property, and the number of iterations at each grid point (see cusfbamboo.profiling.Profiler.report()). Cannot be used with a 'cache'. Defaults to False.
+            progress (callable, optional): Function to call as each grid point is solved, i.e. progress(index, num_points, x), e.g. for progress bars. Unlike 'callback', it is not given the results, so 
+                values that are not needed are still skipped (see iter_heating_analysis()). Any exception it raises stops the analysis. Not called if the results are loaded from a 'cache'. 
+                Defaults to None.
+
+        Returns:
+            dict: Results of the analysis. If summary_only = True, this only contains the reduced values (e.g. "T_hw_max", "T_coolant_out"), with descriptions in the "info" key.
+        """
+        assert not hasattr(self, "cooling_jackets"), "Engines with the 'cooling_jackets' input must be analysed with multi_jacket_analysis()"
+
+        if cache is not None:
+            assert not profile, "'profile' cannot be used with a 'cache', since cached results would not have been timed"
+
+            options = {"num_grid" : num_grid, "counterflow" : counterflow, "iter_start" : iter_start, "iter_each" : iter_each, "summary_only" : summary_only, 
+                       "reducers" : reducers, "constraints" : constraints, "initial_guess" : initial_guess, "solver" : solver, "coolant_inlet" : coolant_inlet, 
+                       "restartable" : restartable or previous is not None}
+
+            # Only the parts of the initial guess that the solver uses affect the results
+            key = cache.key(self, **dict(options, initial_guess = None if initial_guess is None else self._solver_profile(initial_guess)))
+            results = cache.get(key)
+
+            if results is None:
+                results = self.steady_heating_analysis(**options, callback = callback, checkpoint = checkpoint, checkpoint_every = checkpoint_every, previous = previous, progress = progress)
+                cache.put(key, results)
+
+            return results
+
+        if len(self.walls) > 1:
+            warnings.warn("More than one wall is present. Thermal stresses calculations will ignore any incompatibility in different thermal expansions.", stacklevel = 2)
+
+        if type(constraints) is dict:
+            constraints = cusfbamboo.constraints.Constraints(**constraints)
+
+        profiler = cusfbamboo.profiling.Profiler() if profile else None
+
+        restartable_rows = restartable
+        restartable = restartable or previous is not None
+        restart_records = []
+        restart_inputs = []
+
+        results = {}
+        results["info"] = {}
+
+        if summary_only:
+            summary_reducers = cusfbamboo.reducers.default_reducers()
+
+            if self.cooling_jacket.coolant_boiling is not None:
+                summary_reducers["chf_margin_min"] = cusfbamboo.reducers.Min("chf_margin")
+
+            if reducers is not None:
+                summary_reducers.update(reducers)
+
+            for reducer in summary_reducers.values():
+                reducer.reset()
+
+            # Only calculate the values that the reducers (and constraints) use, unless the callback needs every value
+            fields = set()
+
+            for item in list(summary_reducers.values()) + ([] if constraints is None else [constraints]):
+                if fields is None or item.fields is None:
+                    fields = None
                 else:
-                    if self.cooling_jacket.configuration == "vertical":
-                        w = np.pi * D * (1 - blockage_ratio) / self.cooling_jacket.number_of_channels
+                    fields |= item.fields
 
-                    elif self.cooling_jacket.configuration == "spiral":
-                        w = pitch * (1 - blockage_ratio)
-                    
-                    results["sigma_t_pressure"][i][j] = 0.5 * (p_l - p_g) * (w / t_w)**2
+            if callback is not None:
+                fields = None
 
-                # Total stress from Heister [9]
-                results["sigma_t_pressure"][i][j] = - results["sigma_t_pressure"][i][j]     # Use the convention that tensile stress is positive
-                results["sigma_t_max"][i][j] = abs(results["sigma_t_thermal"][i][j]) + abs(results["sigma_t_pressure"][i][j])
+        else:
+            # The stresses are calculated for every grid point at once after the march, unless the callback or the constraints need them at each grid point
+            stresses_after = callback is None and (constraints is None or not (constraints.fields & STRESS_FIELDS))
+            fields = ROW_FIELDS - STRESS_FIELDS if stresses_after else None
+
+            # Collect the results at each grid point into a dictionary of lists
+            results["x"]                    = []
+            results["T"]                    = []
+            results["T_coolant"]            = []
+            results["T_exhaust"]            = None
+            results["dQ_dx"]                = []
+            results["dQ_dLc"]               = []
+            results["dQ_dA"]                = []
+            results["Rdx"]                  = []
+            results["p_coolant"]            = []
+            results["rho_coolant"]          = []
+            results["V_coolant"]            = []
+            results["Dh_coolant"]           = []
+            results["sigma_t_thermal"]      = []
+            results["sigma_t_pressure"]     = []
+            results["sigma_t_max"]          = []
+
+            if self.cooling_jacket.coolant_boiling is not None:
+                results["boiling_regime"]   = []
+                results["chf_margin"]       = []
+                results["info"]["boiling_regime"] = "Coolant side heat transfer regime at each position, either 'forced convection', 'nucleate boiling' or 'film boiling'. boiling_regime[i] is the value at x[i]."
+                results["info"]["chf_margin"] = "Critical heat flux divided by the heat flux at the cold side wall. chf_margin[i] is the value at x[i]. Values below 1 mean the heat flux is above the critical heat flux for nucleate boiling."
+
+            # Explanation of what all the keys mean
+            results["info"]["x"] = "Axial position along the engine (m)."
+            results["info"]["r"] = "Engine combustion chamber radius (m). r[i] is the value at x[i]."
+            results["info"]["T"] = "Static temperature at each position (K). T[i][j], is the temperature at x[i], at the j'th wall boundary. j = 0 corresponds to the coolant, j = -1 corresponds to the exhaust gas."
+            results["info"]["T_coolant"] = "Coolant static temperature at each position (K). T_coolant[i] is the value at x[i]."
+            results["info"]["T_exhaust"] = "Exhaust temperature at each position (K). T_exhaust[i] is the value at x[i]. "
+            results["info"]["dQ_dx"] = "Heat transfer rate per unit axial length (W/m). dQ_dx[i] is the value at x[i]."
+            results["info"]["dQ_dLc"] = "Heat transfer rate per unit length along the cooling channel (W/m) - equal to dQ/dx for 'vertical' channels but not for 'spiral' channels. dQ_dx[i] is the value at x[i]."
+            results["info"]["dQ_dA"] = "Heat transfer rate per unit chamber area at the innermost wall (W/m2). dQ_dA[i] is the value at x[i]."
+            results["info"]["Rdx"] = "Local thermal resistances at each position (K m/W), in the order coolant convection (index 0) --> exhaust convection. R_dx[i] a list of resistances at the value at x[i]"
+            results["info"]["rho_coolant"] = "Density of coolant (kg/m3). rho_coolant[i] is the value at x[i]."
+            results["info"]["p_coolant"] = "Static pressure of coolant (Pa). p_coolant[i] is the value at x[i]."
+            results["info"]["V_coolant"] = "Velocity of coolant (m/s). V_coolant[i] is the value at x[i]."
+            results["info"]["Dh_coolant"] = "Hydraulic diameter of the coolant."
+            results["info"]["sigma_t_thermal"] = "Tangential stress due to uneven thermal expansion (Pa). sigma_t_thermal[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
+            results["info"]["sigma_t_pressure"] = "Tangential stress due to pressure difference across wall (Pa). sigma_t_pressure[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
+            results["info"]["sigma_t_max"] = "Maximum tangential stress (Pa), equal to abs(sigma_t_thermal) + abs(sigma_t_pressure). sigma_t_max[i][j] corresponds to the stress at x[i], across the j'th wall. j = 0 is the wall in contact with the exhaust gas, j = -1 is the wall in contact with the coolant."
+
+        rows = self.iter_heating_analysis(num_grid = num_grid, counterflow = counterflow, iter_start = iter_start, iter_each = iter_each, initial_guess = initial_guess, solver = solver, coolant_inlet = coolant_inlet, 
+                                          checkpoint = checkpoint, checkpoint_every = checkpoint_every, previous = previous, restartable = restartable_rows, profiler = profiler, fields = fields, 
+                                          progress = progress)
+        violation = None
+
+        for row in rows:
+            if restartable:
+                restart_records.append(row.pop("restart_record"))
+                restart_inputs.append(self._design_inputs(row["x"]))
+
+            if callback is not None:
+                callback(row)
+
+            # Stop as soon as we violate a constraint
+            if constraints is not None:
+                violation = constraints.check(row)
+
+                if violation is not None:
+                    rows.close()
+                    break
+
+            if summary_only:
+                for reducer in summary_reducers.values():
+                    reducer.update(row)
 
-                # Remove t_w / 2, so the next wall calculation uses the right diameter
-                D -= t_w / 2
+            else:
+                for key in row:
+                    results[key].append(row[key])
+
+        if constraints is not None:
+            results["feasible"] = violation is None
+            results["violation"] = violation
+            results["info"]["feasible"] = "Whether or not all of the constraints were satisfied. If False, the analysis was stopped at the first grid point where a constraint was violated."
+            results["info"]["violation"] = "None if feasible. Otherwise a dictionary describing the first constraint violation, with the keys 'constraint', 'x', 'value', 'limit' and 'wall'."
+
+        if restartable:
+            results["restart"] = {"options" : self._restart_options(num_grid, counterflow, iter_start, iter_each, initial_guess, coolant_inlet),
+                                  "records" : restart_records,
+                                  "signature" : self._design_signature(),
+                                  "inputs" : restart_inputs}
+            results["info"]["restart"] = "Data needed to reuse these results in an incremental re-analysis (see the 'previous' input of steady_heating_analysis())."
+
+        if profile:
+            rows.close()        # Stops the timer, if a constraint ended the analysis early
+            results["profile"] = profiler.report()
+            results["info"]["profile"] = "Calls to (and inclusive wall time of) each solver callback, calls to each transport property, and iterations at each grid point (see cusfbamboo.profiling)."
+
+        if summary_only:
+            for name in summary_reducers:
+                results[name] = summary_reducers[name].result()
+                results["info"][name] = summary_reducers[name].description
+
+            return results
 
         # Stuff we can collect all at once
         results["r"] = self.geometry.r(results["x"])  
-        results["T_exhaust"] = list(np.array(results["T"])[:, -1])
+        results["T_exhaust"] = [T[-1] for T in results["T"]]
+
+        if stresses_after and len(results["x"]) > 0:
+            stresses = cusfbamboo.stress.tangential_stresses(self, x = results["x"], dQ_dA = results["dQ_dA"], p_coolant = results["p_coolant"])
+
+            for key, value in zip(["sigma_t_thermal", "sigma_t_pressure", "sigma_t_max"], stresses):
+                results[key] = value.tolist()
+
+        return results
+
+    def stress_analysis(self, results):
+        """Calculate the stresses and failure metrics in every wall at every grid point, from the results of a steady heating analysis. See cusfbamboo.stress for details.
+
+        Note:
+            The results can come from a previous session (e.g. a cusfbamboo.cache.ResultCache), since the heating analysis is not repeated, but they must be for this Engine's geometry,
+            walls and cooling jacket. The yield margins and fatigue lives need the 'yield_strength', 'ultimate_strength' and 'ductility' inputs of each wall's Material.
+
+        Args:
+            results (dict): Results from steady_heating_analysis(), with summary_only = False.
+
+        Returns:
+            dict: Arrays with shape (grid points, walls), including "sigma_t_max", "sigma_vm" (von Mises stress), "yield_margin" and "cycles_to_failure". Descriptions are stored
+            in the "info" key.
+        """
+        return cusfbamboo.stress.stress_analysis(self, results)
+
+    async def steady_heating_analysis_async(self, executor = None, timeout = None, progress = None, progress_every = 1, **kwargs):
+        """Asynchronous version of steady_heating_analysis(), for use with asyncio. The analysis runs on an executor, so the event loop is not blocked. See cusfbamboo.aio for details.
+
+        Args:
+            executor (concurrent.futures.Executor, optional): Executor to run the analysis on. Defaults to None, in which case the event loop's default executor (a thread pool) is used.
+            timeout (float, optional): Maximum time to wait for the analysis (s). If it takes longer, the analysis is abandoned and asyncio.TimeoutError is raised. Defaults to None (no limit).
+            progress (asyncio.Queue or callable, optional): Where to send progress events - either a queue to put them in, or a function that is called with each event. Defaults to None.
+            progress_every (int, optional): Number of grid points between progress events. Defaults to 1.
+
+        Keyword Args:
+            Any keyword arguments for steady_heating_analysis(), e.g. num_grid = 1000.
+
+        Returns:
+            dict: Results of the analysis.
+        """
+        return await cusfbamboo.aio.steady_heating_analysis(self, executor = executor, timeout = timeout, progress = progress, progress_every = progress_every, **kwargs)
 
-        return results
\ No newline at end of file
+    def throttle_analysis(self, points, num_grid = 1000, workers = 1, iter_each_warm = 1, **kwargs):
+        """Run a steady heating analysis at each operating point of a throttle schedule, and stack the results into arrays over the operating envelope. See cusfbamboo.throttle for details.
+
+        Note:
+            Each operating point is warm-started from the one before it, using 'iter_each_warm' iterations at each grid point, and everything that only depends on the geometry
+            (e.g. the exhaust gas Mach numbers and the cooling jacket flow areas) is only calculated once. The Engine itself is not modified.
+
+        Args:
+            points (list): List of operating points in schedule order, each as a dictionary. Each can contain "chamber_conditions" (a ChamberConditions object) or "p0" and "T0", and 
+                any of "T_coolant_in", "p_coolant_in" and "mdot_coolant". Anything not given is taken from the Engine and its CoolingJacket, e.g. [{"p0" : 15e5, "mdot_coolant" : 0.4}, ...].
+            num_grid (int, optional): Number of grid points to use (1-dimensional). Defaults to 1000.
+            workers (int, optional): Number of processes to run blocks of neighbouring operating points on. Defaults to 1.
+            iter_each_warm (int, optional): Number of times to iterate on the solution at each datapoint, for warm-started operating points. Defaults to 1.
+
+        Keyword Args:
+            Any other keyword arguments for steady_heating_analysis() (e.g. counterflow, iter_each), apart from 'summary_only', 'coolant_inlet' and 'initial_guess'.
+
+        Returns:
+            dict: Stacked results, where the first index of each array is the operating point (e.g. results["T_hw"][n][i] is the value at points[n] and x[i]), with descriptions 
+            in the "info" key. Also contains the summary values of a summary-only analysis (e.g. "T_hw_max") at each operating point.
+        """
+        return cusfbamboo.throttle.throttle_analysis(self, points, workers = workers, iter_each_warm = iter_each_warm, num_grid = num_grid, **kwargs)
+
+    def multi_jacket_analysis(self, num_grid = 1000, counterflow = True, coolant_inlet = None, workers = 1, **kwargs):
+        """Run a steady heating analysis of an Engine with several independent cooling circuits (see the 'cooling_jackets' input), and assemble the results over the full contour. 
+        See cusfbamboo.jackets for details.
+
+        Note:
+            The circuits are not thermally coupled, since they cover separate parts of the engine, so each one is marched on its own. With more than one worker, they are marched in 
+            parallel, in which case the Engine must be picklable (see cusfbamboo.config). The Engine itself is not modified.
+
+        Args:
+            num_grid (int, optional): Number of grid points over the full length of the engine. Each circuit uses the same grid spacing. Defaults to 1000.
+            counterflow (bool or list, optional): Whether or not the coolant flows counterflow to the exhaust gas. Can be a list with a value for each cooling jacket. Defaults to True.
+            coolant_inlet (list, optional): List of coolant inlet conditions to use instead of those in each CoolingJacket, with a dictionary (e.g. {"mdot_coolant" : 0.4}) or None
+                for each cooling jacket. Defaults to None.
+            workers (int, optional): Number of processes to march the circuits on. Defaults to 1.
+
+        Keyword Args:
+            Any other keyword arguments for steady_heating_analysis() (e.g. iter_each), apart from 'summary_only', 'checkpoint' and 'previous'.
+
+        Returns:
+            dict: Results at every grid point of every circuit, in order of increasing x, with the same keys as steady_heating_analysis(). Also contains "circuit" (the index of the 
+            cooling jacket at each grid point) and "circuits" (the results for each circuit on its own). Descriptions are stored in the "info" key.
+        """
+        return cusfbamboo.jackets.multi_jacket_analysis(self, num_grid = num_grid, counterflow = counterflow, coolant_inlet = coolant_inlet, workers = workers, **kwargs)
+
+    def network_analysis(self, network, mdot_coolant, T_coolant_in = None, p_coolant_in = None, num_grid = 1000, counterflow = True, samples = 5, spread = 1.5, iter_each_warm = 1, **kwargs):
+        """Solve for the distribution of coolant between groups of parallel channels, fed by inlet and outlet manifolds (see cusfbamboo.network.FlowNetwork), and the temperatures in 
+        each channel group. See cusfbamboo.network for details.
+
+        Note:
+            The manifolds and channel groups are solved as a hydraulic network, using the pressure drop through each channel group interpolated from a few steady heating analyses of 
+            each distinct channel design (i.e. each distinct CoolingJacket in the network). The number of analyses therefore does not grow with the number of channel groups. 
+            The Engine's own cooling jacket(s) are not used, and the Engine itself is not modified.
+
+        Args:
+            network (FlowNetwork): The manifolds and channel groups.
+            mdot_coolant (float): Total coolant mass flow rate into the inlet manifold (kg/s).
+            T_coolant_in (float, optional): Coolant inlet static temperature (K). Defaults to None, in which case the value for the first channel group's CoolingJacket is used.
+            p_coolant_in (float, optional): Coolant static pressure at the inlet port (Pa). Defaults to None, in which case the value for the first channel group's CoolingJacket is used.
+            num_grid (int, optional): Number of grid points for each steady heating analysis. Defaults to 1000.
+            counterflow (bool, optional): Whether or not the coolant flows counterflow to the exhaust gas. Defaults to True.
+            samples (int, optional): Number of steady heating analyses of each channel design to start with, spread around the mean flow per channel. More are added if needed. Defaults to 5.
+            spread (float, optional): Ratio between the highest (or lowest) starting flow per channel and the mean flow per channel. Defaults to 1.5.
+            iter_each_warm (int, optional): Number of iterations at each grid point, for analyses that are warm-started from an existing one. Defaults to 1.
+
+        Keyword Args:
+            Any other keyword arguments for steady_heating_analysis() (e.g. iter_each), apart from 'summary_only', 'coolant_inlet', 'initial_guess' and 'checkpoint'.
+
+        Returns:
+            dict: Results for each channel group (e.g. "mdot", "flow_ratio" and "T_hw_max", and values at each grid point such as "T_hw"), and each manifold junction and segment. 
+            Descriptions are stored in the "info" key.
+        """
+        return cusfbamboo.network.network_analysis(self, network, mdot_coolant = mdot_coolant, T_coolant_in = T_coolant_in, p_coolant_in = p_coolant_in, samples = samples, 
+                                                   spread = spread, iter_each_warm = iter_each_warm, num_grid = num_grid, counterflow = counterflow, **kwargs)
+
+    def solve_coolant_inlet(self, target, value, vary = "p_coolant_in", x0 = None, x1 = None, bracket = None, method = "secant", num_grid = 1000, num_grid_coarse = 100, 
+                            counterflow = True, iter_start = 5, iter_each = 2, iter_each_warm = 1, rtol = 1e-4, maxiter = 20):
+        """Find the coolant inlet pressure or mass flow rate that gives a target coolant outlet pressure or temperature, using a shooting method.
+
+        Note:
+            The root is first found on a coarse grid (num_grid_coarse), and then refined with secant iterations on the full grid (num_grid), starting from the coarse solution. 
+            Every analysis after the first is warm-started from the previous solution, so that fewer iterations are needed at each grid point (iter_each_warm). 
+            A targeted design point therefore usually costs the equivalent of 2-3 full analyses.
+
+        Args:
+            target (str): The outlet value to match. Either "p_coolant_out" or "T_coolant_out".
+            value (float): The desired outlet value (Pa or K).
+            vary (str, optional): The CoolingJacket input to vary. Either "p_coolant_in" or "mdot_coolant". Defaults to "p_coolant_in".
+            x0 (float, optional): First guess of the varied input. Defaults to the current value in the CoolingJacket.
+            x1 (float, optional): Second guess of the varied input, only used with method = "secant". Defaults to 1.05 * x0.
+            bracket (tuple, optional): (min, max) values of the varied input, which must bracket the solution. Only used (and required) with method = "brentq". Defaults to None.
+            method (str, optional): Root finding method for the coarse grid. Either "secant" or "brentq". Defaults to "secant".
+            num_grid (int, optional): Number of grid points for the final analysis. Defaults to 1000.
+            num_grid_coarse (int, optional): Number of grid points for the coarse iterations. Defaults to 100.
+            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
+            iter_start (int, optional): Number of times to iterate on the entry conditions. Defaults to 5.
+            iter_each (int, optional): Number of times to iterate on the solution at each datapoint, for analyses without a warm start. Defaults to 2.
+            iter_each_warm (int, optional): Number of times to iterate on the solution at each datapoint, for warm-started analyses. Defaults to 1.
+            rtol (float, optional): Relative tolerance on the outlet value. Defaults to 1e-4.
+            maxiter (int, optional): Maximum number of analyses on each grid. Defaults to 20.
+
+        Returns:
+            dict: Dictionary with the keys "value" (the varied input that was found), "results" (the full steady_heating_analysis() results on the fine grid), "residual" (error in the outlet value), 
+            "analyses_coarse" and "analyses_fine" (the number of analyses run on each grid).
+        """
+        assert target == "p_coolant_out" or target == "T_coolant_out", "'target' input must be either 'p_coolant_out' or 'T_coolant_out'"
+        assert vary == "p_coolant_in" or vary == "mdot_coolant", "'vary' input must be either 'p_coolant_in' or 'mdot_coolant'"
+        assert method == "secant" or method == "brentq", "'method' input must be either 'secant' or 'brentq'"
+
+        output_key = {"p_coolant_out" : "p_coolant", "T_coolant_out" : "T_coolant"}[target]
+        tolerance = rtol * abs(value)
+
+        # Each analysis is warm-started from the last one, on either grid
+        previous = {"results" : None, "count" : 0}
+
+        def residual(inlet_value, grid):
+            coolant_inlet = {vary : inlet_value}
+
+            if previous["results"] is None:
+                results = self.steady_heating_analysis(num_grid = grid, counterflow = counterflow, iter_start = iter_start, iter_each = iter_each, coolant_inlet = coolant_inlet)
+            else:
+                results = self.steady_heating_analysis(num_grid = grid, counterflow = counterflow, iter_start = iter_start, iter_each = iter_each_warm, initial_guess = previous["results"], coolant_inlet = coolant_inlet)
+
+            previous["results"] = results
+            previous["count"] += 1
+            return results[output_key][-1] - value
+
+        def secant_step(x0, x1, f0, f1):
+            # A flat residual (e.g. a choked or saturated outlet) would otherwise send the next guess to infinity
+            if f1 == f0:
+                raise ValueError(f"Shooting method cannot continue, because the outlet value did not change between {vary} = {x0} and {vary} = {x1} (error = {f1}). "
+                                 f"Try different starting guesses, or method = 'brentq' with a 'bracket' that contains the solution.")
+
+            return x1 - f1 * (x1 - x0) / (f1 - f0)
+
+        # Coarse grid
+        if x0 is None:
+            x0 = getattr(self.cooling_jacket, vary)
+
+        if method == "brentq":
+            assert bracket is not None, "Must give the 'bracket' input to use method = 'brentq'"
+            solution = scipy.optimize.brentq(residual, bracket[0], bracket[1], args = (num_grid_coarse,), xtol = rtol * abs(x0), rtol = rtol, maxiter = maxiter)
+
+            # brentq doesn't give us the slope, so the first fine grid step will use a small perturbation instead
+            slope = None
+
+        else:
+            if x1 is None:
+                x1 = 1.05 * x0
+
+            f0 = residual(x0, num_grid_coarse)
+            f1 = residual(x1, num_grid_coarse)
+            counter = 2
+
+            while abs(f1) > tolerance and counter < maxiter:
+                x0, x1 = x1, secant_step(x0, x1, f0, f1)
+                f0 = f1
+                f1 = residual(x1, num_grid_coarse)
+                counter += 1
+
+            solution = x1
+            slope = (f1 - f0) / (x1 - x0) if x1 != x0 else None
+
+        analyses_coarse = previous["count"]
+
+        # Fine grid - secant iterations starting from the coarse solution, using the coarse slope for the first step
+        x0 = solution
+        f0 = residual(x0, num_grid)
+        results = previous["results"]
+
+        if abs(f0) > tolerance:
+            if slope is None or slope == 0:
+                x1 = 1.001 * x0
+            else:
+                x1 = x0 - f0 / slope
+
+            f1 = residual(x1, num_grid)
+            results = previous["results"]
+            counter = 2
+
+            while abs(f1) > tolerance and counter < maxiter:
+                x0, x1 = x1, secant_step(x0, x1, f0, f1)
+                f0 = f1
+                f1 = residual(x1, num_grid)
+                results = previous["results"]
+                counter += 1
+
+            solution = x1
+            f0 = f1
+
+        if abs(f0) > tolerance:
+            warnings.warn(f"Shooting method did not converge within {maxiter} iterations. Outlet value error = {f0}", stacklevel = 2)
+
+        return {"value" : solution,
+                "results" : results,
+                "residual" : f0,
+                "analyses_coarse" : analyses_coarse,
+                "analyses_fine" : previous["count"] - analyses_coarse}
+
+    def _wall_nodes(self, xs, nodes_per_layer):
+        # Split every wall into 'nodes_per_layer' radial nodes at each axial position, from the hot side to the cold side. Returns the radii of the faces between the nodes, with the 
+        # shape (positions, nodes + 1), and the thermal conductivity and volumetric heat capacity (rho * cp) of each node, with the shape (positions, nodes).
+        num_nodes = len(self.walls) * nodes_per_layer
+        r_faces = np.empty((len(xs), num_nodes + 1))
+        k = np.empty((len(xs), num_nodes))
+        rho_cp = np.empty((len(xs), num_nodes))
+
+        for i, x in enumerate(xs):
+            r = self.geometry.r(x)
+
+            for j, wall in enumerate(self.walls):
+                thickness = wall.thickness(x)
+                nodes = slice(j * nodes_per_layer, (j + 1) * nodes_per_layer)
+
+                r_faces[i, j * nodes_per_layer : (j + 1) * nodes_per_layer + 1] = np.linspace(r, r + thickness, nodes_per_layer + 1)
+                k[i, nodes] = wall.material.k
+                rho_cp[i, nodes] = wall.material.rho * wall.material.cp
+
+                r += thickness
+
+        return r_faces, k, rho_cp
+
+    def _march_coolant(self, context, xs, T_cw, dQ_dx):
+        # March the coolant along the grid points 'xs', using the steady flow energy and momentum equations from cusfbamboo.hx.HXSolver, with a known heat transfer rate into the coolant. 
+        # dQ_dx(i, state) is called at every grid point in order, and must return the heat transfer rate into the coolant per unit axial length (W/m), where 'state' contains the keys 
+        # "x", "T_c", "p_c", "T_cw" and "V_c". Returns the coolant temperature and pressure at each grid point.
+        num_points = len(xs)
+        dx = abs(context.dx)
+        T_c = np.empty(num_points)
+        p_c = np.empty(num_points)
+        T_c[0] = context.T_coolant_in
+        p_c[0] = context.p_coolant_in
+
+        for i in range(num_points):
+            state = {"x" : xs[i], "T_c" : T_c[i], "p_c" : p_c[i], "T_cw" : T_cw[i]}
+            state["V_c"] = self.V_c(state, context)
+            dQ_dx_i = dQ_dx(i, state) + self.extra_dQ_dx(state)
+
+            if i == num_points - 1:
+                break
+
+            T_c[i+1] = T_c[i] + dQ_dx_i * dx / (context.mdot_coolant * self.cp_c(state))
+
+            next_state = {"x" : xs[i+1], "T_c" : T_c[i+1], "p_c" : p_c[i]}
+            p_c[i+1] = p_c[i] - context.mdot_coolant / self.A_c(state) * (self.V_c(next_state, context) - state["V_c"]) - abs(self.dp_dx_f(state)) * dx
+
+        return T_c, p_c
+
+    def steady_heating_analysis_2d(self, num_grid = 1000, counterflow = True, nodes_per_layer = 4, iter_start = 5, iter_each = 2, coolant_inlet = None, tol = 0.01, max_iter = 50):
+        """Run a steady heating analysis with 2-D axisymmetric (x, r) conduction through the walls, so that axial conduction (e.g. away from the throat, or at the ends of the cooling 
+        jacket) is included. Uses cusfbamboo.conduction.AxisymmetricWall and AxisymmetricSolver.
+
+        Note:
+            A normal (1-D) steady_heating_analysis() is run first, to start from. The 2-D wall temperatures and the coolant march are then solved alternately until the hot side wall 
+            temperatures change by less than 'tol' between iterations. The exhaust gas and coolant heat transfer coefficients are updated at each iteration.
+
+            The conduction matrix is cached for each set of walls and grid, so later analyses of the same walls (e.g. with different coolant inlet conditions) don't need to assemble it 
+            again. Its sparse LU factorization is kept for the duration of the analysis, and reused by every coupling iteration. Large walls (10^5 - 10^6 nodes) are practical, since 
+            the matrix is banded.
+
+        Args:
+            num_grid (int, optional): Number of axial grid points. Defaults to 1000.
+            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
+            nodes_per_layer (int, optional): Number of radial nodes in each wall. Defaults to 4.
+            iter_start (int, optional): Number of times to iterate on the entry conditions, for the initial 1-D analysis. Defaults to 5.
+            iter_each (int, optional): Number of times to iterate on the solution at each datapoint, for the initial 1-D analysis. Defaults to 2.
+            coolant_inlet (dict, optional): Coolant inlet conditions to use instead of those in the CoolingJacket, e.g. {"mdot_coolant" : 0.4}. See steady_heating_analysis(). Defaults to None.
+            tol (float, optional): Convergence tolerance on the hot side wall temperatures (K). Defaults to 0.01.
+            max_iter (int, optional): Maximum number of coupling iterations. Defaults to 50.
+
+        Returns:
+            dict: Results of the analysis, with descriptions in the "info" key.
+        """
+        assert type(nodes_per_layer) is int and nodes_per_layer >= 1, "'nodes_per_layer' must be an integer that is at least 1"
+
+        context = self.run_context(num_grid = num_grid, counterflow = counterflow, coolant_inlet = coolant_inlet)
+        initial = self.steady_heating_analysis(num_grid = num_grid, counterflow = counterflow, iter_start = iter_start, iter_each = iter_each, coolant_inlet = coolant_inlet)
+
+        xs = np.array(initial["x"])
+        T_c = np.array(initial["T_coolant"])
+        p_c = np.array(initial["p_coolant"])
+        T_hw = np.array([T[-2] for T in initial["T"]])
+        T_cw = np.array([T[1] for T in initial["T"]])
+        dQ_dx_c = np.array(initial["dQ_dx"])
+
+        r_faces, k, _ = self._wall_nodes(xs, nodes_per_layer)
+        wall = cusfbamboo.conduction.axisymmetric_wall(r_faces = r_faces, k = k, dx = context.dx)
+        solver = cusfbamboo.conduction.AxisymmetricSolver(wall)
+        A_h = 2 * np.pi * r_faces[:, 0]         # Hot side area per unit axial length
+
+        V_c = np.empty(len(xs))
+        G_c = np.empty(len(xs))
+        T = None
+        converged = False
+
+        def coolant_conductance(i, state):
+            V_c[i] = state["V_c"]
+            G_c[i] = wall.boundary_conductance(1.0 / self.R_coolant(state), wall.R_c[i])
+            return dQ_dx_c[i]
+
+        for iteration in range(1, max_iter + 1):
+            # Coolant march with the heat transfer from the last wall solution (or from the 1-D analysis to start with)
+            T_c, p_c = self._march_coolant(context, xs, T_cw, coolant_conductance)
+
+            T_r = np.array([self.T_h({"x" : x, "T_hw" : value}) for x, value in zip(xs, T_hw)])
+            G_h = wall.boundary_conductance(np.array([self.h_exhaust({"x" : x, "T_hw" : value}) for x, value in zip(xs, T_hw)]) * A_h, wall.R_h)
+
+            T = solver.solve(T_h = T_r, G_h = G_h, T_c = T_c, G_c = G_c, T_guess = T)
+            T_hw_new, T_cw, dQ_dx_h, dQ_dx_c = wall.surface_temperatures(T, T_r, G_h, T_c, G_c)
+
+            change = np.max(np.abs(T_hw_new - T_hw))
+            T_hw = T_hw_new
+
+            if change < tol:
+                converged = True
+                break
+
+        if not converged:
+            warnings.warn(f"2-D wall conduction did not converge within {max_iter} iterations. Maximum change in the hot side wall temperature = {change} K", stacklevel = 2)
+
+        results = {"x" : xs,
+                   "r" : r_faces[:, 0],
+                   "r_nodes" : wall.r,
+                   "T_wall" : T,
+                   "T_hw" : T_hw,
+                   "T_cw" : T_cw,
+                   "T_coolant" : T_c,
+                   "p_coolant" : p_c,
+                   "V_coolant" : V_c,
+                   "dQ_dx" : dQ_dx_h,
+                   "dQ_dA" : dQ_dx_h / A_h,
+                   "dQ_dx_coolant" : dQ_dx_c,
+                   "T_hw_1d" : np.array([T[-2] for T in initial["T"]]),
+                   "iterations" : iteration,
+                   "converged" : converged,
+                   "factorizations" : solver.factorizations}
+
+        results["info"] = {"x" : "Axial position along the engine (m).",
+                           "r" : "Engine combustion chamber radius (m). r[i] is the value at x[i].",
+                           "r_nodes" : "Radius of each wall node (m). r_nodes[i][j] is the value at x[i], for the j'th node. j = 0 is nearest the exhaust gas, j = -1 is nearest the coolant.",
+                           "T_wall" : "Temperature of each wall node (K). T_wall[i][j] is the value at x[i], for the j'th node.",
+                           "T_hw" : "Hot side (exhaust gas side) wall surface temperature (K). T_hw[i] is the value at x[i].",
+                           "T_cw" : "Cold side (coolant side) wall surface temperature (K). T_cw[i] is the value at x[i].",
+                           "T_coolant" : "Coolant static temperature (K). T_coolant[i] is the value at x[i].",
+                           "p_coolant" : "Coolant static pressure (Pa). p_coolant[i] is the value at x[i].",
+                           "V_coolant" : "Coolant velocity (m/s). V_coolant[i] is the value at x[i].",
+                           "dQ_dx" : "Heat transfer rate per unit axial length from the exhaust gas into the wall (W/m). dQ_dx[i] is the value at x[i].",
+                           "dQ_dA" : "Heat transfer rate per unit chamber area from the exhaust gas into the wall (W/m2). dQ_dA[i] is the value at x[i].",
+                           "dQ_dx_coolant" : "Heat transfer rate per unit axial length from the wall into the coolant (W/m). Differs from dQ_dx because of axial conduction through the wall.",
+                           "T_hw_1d" : "Hot side wall temperature from the initial 1-D analysis, without axial conduction (K). T_hw_1d[i] is the value at x[i].",
+                           "iterations" : "Number of coupling iterations between the wall conduction and the coolant march.",
+                           "converged" : "Whether or not the coupling iterations converged to within 'tol'.",
+                           "factorizations" : "Number of times the conduction matrix was factorized during this analysis (1 if the first factorization was reused throughout)."}
+
+        return results
+
+    def transient_heating_analysis(self, t_end, dt, p0 = None, T0 = None, mdot_coolant = None, T_initial = None, num_grid = 200, nodes_per_layer = 3, counterflow = True, 
+                                   T_hw_ref = None, store_every = 1):
+        """Run a transient heating analysis of the walls, e.g. for an engine startup or shutdown. Uses cusfbamboo.transient.TransientWallSolver, so each wall needs a material with 'rho' and 'cp'.
+
+        Note:
+            The walls are split into 'nodes_per_layer' radial nodes at each grid point, and integrated in time with the implicit Euler method, so 'dt' is only limited by how quickly the 
+            boundary conditions change. Axial conduction through the walls is neglected.
+
+            The coolant is treated as quasi-steady (its residence time is much shorter than the time constant of the walls), and is marched along the cooling jacket at every time step
+            using the wall temperatures from the start of the step.
+
+            The exhaust gas side is evaluated once, at the Engine's ChamberConditions, and then scaled with the chamber conditions at each time step. The recovery temperature is scaled 
+            with T0, and the heat transfer coefficient with (p0 / c*)^0.8, i.e. p0^0.8 T0^-0.4, following the Bartz correlation. The Mach number distribution is assumed to stay the 
+            same (i.e. the nozzle is choked and flowing full).
+
+            The run time is proportional to the number of grid points multiplied by the number of time steps.
+
+        Args:
+            t_end (float): Time to finish the analysis at (s). The analysis starts at t = 0.
+            dt (float): Time step (s).
+            p0 (float or callable, optional): Chamber stagnation pressure (Pa), either constant or a function of time, p0(t). Defaults to the Engine's ChamberConditions.p0.
+            T0 (float or callable, optional): Chamber stagnation temperature (K), either constant or a function of time, T0(t). Defaults to the Engine's ChamberConditions.T0.
+            mdot_coolant (float or callable, optional): Coolant mass flow rate (kg/s), either constant or a function of time, mdot_coolant(t). Must be positive. Defaults to the CoolingJacket's mdot_coolant.
+            T_initial (float or callable, optional): Initial wall temperature (K), either constant or a function of position, T_initial(x). Defaults to the coolant inlet temperature.
+            num_grid (int, optional): Number of axial grid points. Defaults to 200.
+            nodes_per_layer (int, optional): Number of radial nodes in each wall. Defaults to 3.
+            counterflow (bool, optional): Whether or not the cooling is flowing coutnerflow or coflow, relative to the exhaust gas. Defaults to True (which means counterflow).
+            T_hw_ref (float, optional): Hot side wall temperature to evaluate the exhaust gas heat transfer coefficient at (K). Defaults to None, in which case the wall temperatures from a 
+                steady heating analysis at the Engine's ChamberConditions are used.
+            store_every (int, optional): Only store the results every 'store_every' time steps (the first and last time steps are always stored). Defaults to 1.
+
+        Returns:
+            dict: Results of the analysis, with descriptions in the "info" key. Values that change with time are numpy arrays, where the first index is the time (e.g. T_hw[n][i] is the
+            value at t[n] and x[i]).
+        """
+        assert t_end > 0, "'t_end' must be positive"
+        assert dt > 0, "'dt' must be positive"
+        assert type(nodes_per_layer) is int and nodes_per_layer >= 1, "'nodes_per_layer' must be an integer that is at least 1"
+        assert type(store_every) is int and store_every >= 1, "'store_every' must be an integer that is at least 1"
+
+        for wall in self.walls:
+            assert not (np.isnan(wall.material.rho) or np.isnan(wall.material.cp)), "Every wall Material must have 'rho' and 'cp' for a transient heating analysis"
+
+        def schedule(value, default):
+            if value is None:
+                return lambda t: default
+            elif callable(value):
+                return value
+            else:
+                return lambda t: value
+
+        p0 = schedule(p0, self.chamber_conditions.p0)
+        T0 = schedule(T0, self.chamber_conditions.T0)
+        mdot_coolant = schedule(mdot_coolant, self.cooling_jacket.mdot_coolant)
+
+        # Same grid as a steady heating analysis
+        context = self.run_context(num_grid = num_grid, counterflow = counterflow)
+        num_points = int(abs((context.x_end - context.x_start) / context.dx))
+        xs = context.x_start + context.dx * np.arange(num_points)
+
+        r_faces, k, rho_cp = self._wall_nodes(xs, nodes_per_layer)
+        num_nodes = k.shape[1]
+        wall_solver = cusfbamboo.transient.TransientWallSolver(r_faces = r_faces, k = k, rho_cp = rho_cp)
+
+        # Exhaust gas side at the reference chamber conditions - only evaluated once
+        if T_hw_ref is None:
+            steady = self.steady_heating_analysis(num_grid = num_grid, counterflow = counterflow)
+            order = np.argsort(steady["x"])
+            T_hw_ref = np.interp(xs, np.array(steady["x"])[order], np.array([T[-2] for T in steady["T"]])[order])
+        else:
+            T_hw_ref = np.full(num_points, float(T_hw_ref))
+
+        p0_ref = self.chamber_conditions.p0
+        T0_ref = self.chamber_conditions.T0
+        T_r_ref = np.array([self.T_h({"x" : x, "T_hw" : T_hw}) for x, T_hw in zip(xs, T_hw_ref)])
+        hA_h_ref = np.array([self.h_exhaust({"x" : x, "T_hw" : T_hw}) for x, T_hw in zip(xs, T_hw_ref)]) * 2 * np.pi * r_faces[:, 0]
+
+        def boundaries(t, T, T_cw):
+            # Boundary conditions at time t, with the coolant marched along the jacket using the node temperatures T and cold side wall temperatures T_cw
+            p0_t = p0(t)
+            T0_t = T0(t)
+            context.mdot_coolant = mdot_coolant(t)
+
+            assert context.mdot_coolant > 0, f"'mdot_coolant' must be positive, but is {context.mdot_coolant} at t = {t} s"
+            assert T0_t > 0, f"'T0' must be positive, but is {T0_t} at t = {t} s"
+
+            T_r = T_r_ref * T0_t / T0_ref
+            G_h = wall_solver.boundary_conductance(hA_h_ref * max(p0_t / p0_ref, 0.0)**0.8 * (T0_t / T0_ref)**(-0.4), wall_solver.R_h)
+
+            G_c = np.empty(num_points)
+
+            def dQ_dx(i, state):
+                G_c[i] = wall_solver.boundary_conductance(1.0 / self.R_coolant(state), wall_solver.R_c[i])
+                return G_c[i] * (T[i, -1] - state["T_c"])
+
+            T_c, p_c = self._march_coolant(context, xs, T_cw, dQ_dx)
+
+            return T_r, G_h, T_c, p_c, G_c, p0_t, T0_t, context.mdot_coolant
+
+        # Initial conditions
+        T = np.empty((num_points, num_nodes))
+
+        if T_initial is None:
+            T[:] = context.T_coolant_in
+        elif callable(T_initial):
+            T[:] = np.array([T_initial(x) for x in xs])[:, np.newaxis]
+        else:
+            T[:] = T_initial
+
+        T_cw = T[:, -1].copy()
+
+        results = {"t" : [], "T_nodes" : [], "T_hw" : [], "T_cw" : [], "T_coolant" : [], "p_coolant" : [], "dQ_dx" : [], "dQ_dx_coolant" : [], "p0" : [], "T0" : [], "mdot_coolant" : []}
+        num_steps = int(np.ceil(t_end / dt - 1e-9))
+
+        for n in range(num_steps + 1):
+            t = n * dt
+            T_r, G_h, T_c, p_c, G_c, p0_t, T0_t, mdot_t = boundaries(t, T, T_cw)
+
+            if n > 0:
+                T = wall_solver.step(T, dt, T_r, G_h, T_c, G_c)
+
+            T_hw, T_cw, dQ_dx_h, dQ_dx_c = wall_solver.surface_temperatures(T, T_r, G_h, T_c, G_c)
+
+            if n % store_every == 0 or n == num_steps:
+                for key, value in zip(["t", "T_nodes", "T_hw", "T_cw", "T_coolant", "p_coolant", "dQ_dx", "dQ_dx_coolant", "p0", "T0", "mdot_coolant"], 
+                                      [t, T, T_hw, T_cw, T_c, p_c, dQ_dx_h, dQ_dx_c, p0_t, T0_t, mdot_t]):
+                    results[key].append(value)
+
+        results = {key : np.array(value) for key, value in results.items()}
+        results["x"] = xs
+        results["r"] = r_faces[:, 0]
+        results["r_nodes"] = wall_solver.r
+        results["dQ_dA"] = results["dQ_dx"] / (2 * np.pi * results["r"])
+
+        results["info"] = {"t" : "Time of each set of stored results (s).",
+                           "x" : "Axial position along the engine (m).",
+                           "r" : "Engine combustion chamber radius (m). r[i] is the value at x[i].",
+                           "r_nodes" : "Radius of each wall node (m). r_nodes[i][j] is the value at x[i], for the j'th node. j = 0 is nearest the exhaust gas, j = -1 is nearest the coolant.",
+                           "T_nodes" : "Temperature of each wall node (K). T_nodes[n][i][j] is the value at t[n], at x[i], for the j'th node.",
+                           "T_hw" : "Hot side (exhaust gas side) wall surface temperature (K). T_hw[n][i] is the value at t[n] and x[i].",
+                           "T_cw" : "Cold side (coolant side) wall surface temperature (K). T_cw[n][i] is the value at t[n] and x[i].",
+                           "T_coolant" : "Coolant static temperature (K). T_coolant[n][i] is the value at t[n] and x[i].",
+                           "p_coolant" : "Coolant static pressure (Pa). p_coolant[n][i] is the value at t[n] and x[i].",
+                           "dQ_dx" : "Heat transfer rate per unit axial length from the exhaust gas into the wall (W/m). dQ_dx[n][i] is the value at t[n] and x[i].",
+                           "dQ_dA" : "Heat transfer rate per unit chamber area from the exhaust gas into the wall (W/m2). dQ_dA[n][i] is the value at t[n] and x[i].",
+                           "dQ_dx_coolant" : "Heat transfer rate per unit axial length from the wall into the coolant (W/m). Differs from dQ_dx while the wall is heating up or cooling down.",
+                           "p0" : "Chamber stagnation pressure at each time (Pa).",
+                           "T0" : "Chamber stagnation temperature at each time (K).",
+                           "mdot_coolant" : "Coolant mass flow rate at each time (kg/s)."}
+
+        return results
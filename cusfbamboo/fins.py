@@ -0,0 +1,302 @@
+"""
+Conduction through the cross section of a cooling channel (the wall beneath the channel, and the fin or 'rib' between neighbouring channels), for the heat transfer from the fins into the
+coolant. Used by Engine.Rdx() when the CoolingJacket has fin_model = "cross-section".
+
+The cross section is modelled as a flat, symmetric half-cell, from the middle of a channel to the middle of a fin. The base of the wall (its hot side) is isothermal, the channel floor and the
+sides of the fin are cooled by the coolant, and the top of the fin (against the outer jacket) and the planes of symmetry are adiabatic. This is solved as a small 2-D finite volume problem.
+
+Non-dimensionalised by the wall thickness 't' and thermal conductivity 'k', the solution only depends on the Biot number (h t / k), the width of the half-cell, the blockage ratio and the
+fin height. The overall surface efficiency (i.e. the fin efficiency of the channel floor and fin together) is tabulated over all four of these. Each FinTable covers the Biot numbers and
+half-cell widths for one blockage ratio and fin height in BLOCKAGE_RATIOS and FIN_HEIGHTS, and is only built when a design needs it. Looking up a grid point then only needs an
+interpolation between the neighbouring tables, instead of a mesh solve, so channels that taper (i.e. a different blockage ratio or fin height at every grid point) reuse the same tables.
+
+Engine.run_context() calls prepare_tables() with the range of blockage ratios and fin heights along the cooling jacket, so every table is built before an analysis starts.
+
+References:
+ - [1] - Incropera, F. P., Fundamentals of Heat and Mass Transfer, 6th Edition, Section 3.6.5 (overall surface efficiency)
+"""
+
+import threading
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+BIOT_NUMBERS = np.logspace(-5, 4, 37)       # Biot numbers (h t / k) to tabulate
+HALF_WIDTHS = np.logspace(-1, 2, 16)        # Half-cell widths (divided by the wall thickness) to tabulate
+BLOCKAGE_RATIOS = np.linspace(0.02, 0.98, 97) # Blockage ratios to tabulate (one FinTable each)
+FIN_HEIGHTS = np.logspace(-1, 2, 19)        # Fin heights (divided by the wall thickness) to tabulate (one FinTable each)
+TABLE_CACHE_SIZE = 2048                     # Maximum number of tables to keep (more than len(BLOCKAGE_RATIOS) * len(FIN_HEIGHTS), so tables are never rebuilt)
+LOG_BIOT_NUMBERS = np.log(BIOT_NUMBERS)
+LOG_HALF_WIDTHS = np.log(HALF_WIDTHS)
+LOG_FIN_HEIGHTS = np.log(FIN_HEIGHTS)
+
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()     # Held when adding to or removing from _TABLES, so threads can share the tables
+
+def cross_section_heat(biot, half_width, blockage_ratio, fin_height, cells = (16, 8, 8, 16)):
+    """Solve for the heat transfer through a half-cell of the channel cross section, for a set of Biot numbers, with the wall thickness and thermal conductivity both equal to 1.
+
+    Args:
+        biot (numpy.ndarray): Biot numbers (h t / k) of the coolant side.
+        half_width (float): Distance from the middle of a channel to the middle of a fin, divided by the wall thickness.
+        blockage_ratio (float): Proportion of the cell width that is occupied by the fin.
+        fin_height (float): Height of the fin (i.e. the channel height), divided by the wall thickness.
+        cells (tuple, optional): Number of cells (across the channel, across the half-fin, through the wall, up the fin). Defaults to (16, 8, 8, 16).
+
+    Returns:
+        numpy.ndarray: Heat transfer rate out of the half-cell per unit channel length, for a unit temperature difference between the base of the wall and the coolant, at each Biot number.
+    """
+    assert 0 < blockage_ratio < 1, "'blockage_ratio' must be between 0 and 1"
+    assert half_width > 0 and fin_height > 0, "'half_width' and 'fin_height' must be positive"
+
+    cells_channel, cells_fin, cells_wall, cells_height = cells
+    channel_width = half_width * (1 - blockage_ratio)
+
+    # Tensor product grid, where the fin only occupies the columns beyond the channel
+    x_faces = np.concatenate([np.linspace(0, channel_width, cells_channel + 1), np.linspace(channel_width, half_width, cells_fin + 1)[1:]])
+    y_faces = np.concatenate([np.linspace(0, 1, cells_wall + 1), np.linspace(1, 1 + fin_height, cells_height + 1)[1:]])
+    dx = np.diff(x_faces)
+    dy = np.diff(y_faces)
+
+    active = np.ones((len(dy), len(dx)), dtype = bool)
+    active[cells_wall:, :cells_channel] = False
+    index = -np.ones(active.shape, dtype = int)
+    index[active] = np.arange(np.count_nonzero(active))
+    size = np.count_nonzero(active)
+
+    rows = []
+    columns = []
+    conductances = []
+
+    # Conduction between neighbouring cells, in the x and y directions
+    for axis, spacing, length in [(1, dx, dy), (0, dy, dx)]:
+        first = index[:, :-1] if axis == 1 else index[:-1, :]
+        second = index[:, 1:] if axis == 1 else index[1:, :]
+        distance = (spacing[:-1] + spacing[1:]) / 2
+        G = (length[:, np.newaxis] / distance[np.newaxis, :]) if axis == 1 else (length[np.newaxis, :] / distance[:, np.newaxis])
+        G = np.broadcast_to(G, first.shape)
+        both = (first >= 0) & (second >= 0)
+
+        rows.append(first[both])
+        columns.append(second[both])
+        conductances.append(G[both])
+
+    rows = np.concatenate(rows)
+    columns = np.concatenate(columns)
+    conductances = np.concatenate(conductances)
+    diagonal = np.bincount(rows, weights = conductances, minlength = size) + np.bincount(columns, weights = conductances, minlength = size)
+
+    # Isothermal base of the wall (T = 1), through half a cell
+    base = index[0, :]
+    G_base = dx / (dy[0] / 2)
+    diagonal[base] += G_base
+
+    # Cooled surfaces - the channel floor, and the side of the fin, with the length of each face and the distance from the face to the cell centre
+    floor = index[cells_wall - 1, :cells_channel]
+    side = index[cells_wall:, cells_channel]
+    cooled = np.concatenate([floor, side])
+    face_length = np.concatenate([dx[:cells_channel], dy[cells_wall:]])
+    face_distance = np.concatenate([np.full(cells_channel, dy[cells_wall - 1] / 2), np.full(len(side), dx[cells_channel] / 2)])
+
+    K = scipy.sparse.coo_matrix((np.concatenate([-conductances, -conductances, diagonal]),
+                                 (np.concatenate([rows, columns, np.arange(size)]), np.concatenate([columns, rows, np.arange(size)]))),
+                                shape = (size, size)).tocsc()
+
+    rhs = np.zeros(size)
+    rhs[base] = G_base
+
+    # The Biot number only changes the diagonal of the cooled cells, so K is factorized once, and each Biot number is a small dense solve (Woodbury identity)
+    lu = scipy.sparse.linalg.splu(K)
+    T_adiabatic = lu.solve(rhs)
+    selection = np.zeros((size, len(cooled)))
+    selection[cooled, np.arange(len(cooled))] = 1.0
+    Z = lu.solve(selection)
+    heat = []
+
+    for Bi in np.atleast_1d(biot):
+        # Convection in series with conduction from the face to the cell centre (coolant at T = 0)
+        G_cooled = face_length / (1 / Bi + face_distance)
+        y = np.linalg.solve(np.eye(len(cooled)) + G_cooled[:, np.newaxis] * Z[cooled, :], G_cooled * T_adiabatic[cooled])
+        T = T_adiabatic - Z @ y
+        heat.append(np.sum(G_base * (1 - T[base])))
+
+    return np.array(heat)
+
+def surface_efficiency(heat, biot, half_width, blockage_ratio, fin_height):
+    """Overall surface efficiency of the channel floor and fin, from the heat transfer through a half-cell. The resistance of a flat wall (of the full cell width) is removed,
+    so that what is left is the coolant side resistance, which is then compared to convection from the wetted area at 100% efficiency.
+
+    Args:
+        heat (numpy.ndarray): Heat transfer rate out of the half-cell, from cross_section_heat().
+        biot (numpy.ndarray): Biot numbers (h t / k).
+        half_width (float): Distance from the middle of a channel to the middle of a fin, divided by the wall thickness.
+        blockage_ratio (float): Proportion of the cell width that is occupied by the fin.
+        fin_height (float): Height of the fin, divided by the wall thickness.
+
+    Returns:
+        numpy.ndarray: Overall surface efficiency.
+    """
+    wetted_length = half_width * (1 - blockage_ratio) + fin_height
+    R_coolant = 1.0 / heat - 1.0 / half_width           # Resistance of the half-cell, minus that of a flat wall of the same width (t / k = 1)
+
+    return 1.0 / (R_coolant * biot * wetted_length)
+
+class FinTable:
+    def __init__(self, blockage_ratio, fin_height):
+        """Table of the overall surface efficiency of a channel cross section, for a given blockage ratio and fin height, over the range of Biot numbers in BIOT_NUMBERS and half-cell widths
+        in HALF_WIDTHS. Values outside the range are clipped to it.
+
+        Args:
+            blockage_ratio (float): Proportion of the cell width that is occupied by the fin.
+            fin_height (float): Height of the fin (i.e. the channel height), divided by the wall thickness.
+        """
+        self.blockage_ratio = blockage_ratio
+        self.fin_height = fin_height
+
+        efficiency = np.empty((len(BIOT_NUMBERS), len(HALF_WIDTHS)))
+
+        for j, half_width in enumerate(HALF_WIDTHS):
+            heat = cross_section_heat(BIOT_NUMBERS, half_width, blockage_ratio, fin_height)
+            efficiency[:, j] = surface_efficiency(heat, BIOT_NUMBERS, half_width, blockage_ratio, fin_height)
+
+        self.efficiency = efficiency
+
+    def __call__(self, biot, half_width):
+        """Look up the overall surface efficiency, with bilinear interpolation in log(biot) and log(half_width).
+
+        Args:
+            biot (float): Biot number (h t / k).
+            half_width (float): Distance from the middle of a channel to the middle of a fin, divided by the wall thickness.
+
+        Returns:
+            float: Overall surface efficiency.
+        """
+        # Both axes are evenly spaced in log space, so the position in the table can be found directly
+        u = (np.log(biot) - LOG_BIOT_NUMBERS[0]) / (LOG_BIOT_NUMBERS[1] - LOG_BIOT_NUMBERS[0])
+        v = (np.log(half_width) - LOG_HALF_WIDTHS[0]) / (LOG_HALF_WIDTHS[1] - LOG_HALF_WIDTHS[0])
+        u = min(max(u, 0.0), len(BIOT_NUMBERS) - 1.0)
+        v = min(max(v, 0.0), len(HALF_WIDTHS) - 1.0)
+
+        i = min(int(u), len(BIOT_NUMBERS) - 2)
+        j = min(int(v), len(HALF_WIDTHS) - 2)
+        u -= i
+        v -= j
+
+        table = self.efficiency
+        return float((1 - u) * ((1 - v) * table[i, j] + v * table[i, j + 1]) + u * ((1 - v) * table[i + 1, j] + v * table[i + 1, j + 1]))
+
+def fin_table(blockage_ratio, fin_height):
+    """Get the FinTable for a blockage ratio and fin height, reusing a cached one if it has already been made. Normally only used with the values in BLOCKAGE_RATIOS and FIN_HEIGHTS
+    (see efficiency()).
+
+    Args:
+        blockage_ratio (float): Proportion of the cell width that is occupied by the fin.
+        fin_height (float): Height of the fin (i.e. the channel height), divided by the wall thickness.
+
+    Returns:
+        FinTable: The table.
+    """
+    key = (float(blockage_ratio), float(fin_height))
+    table = _TABLES.get(key)
+
+    if table is None:
+        # Build the table without holding the lock, so other threads can keep using the cache. If two threads build the same table, the first one stored is kept.
+        table = FinTable(blockage_ratio = key[0], fin_height = key[1])
+
+        with _TABLES_LOCK:
+            # Forget the oldest table if we have too many
+            if key not in _TABLES and len(_TABLES) >= TABLE_CACHE_SIZE:
+                _TABLES.pop(next(iter(_TABLES), None), None)
+
+            table = _TABLES.setdefault(key, table)
+
+    return table
+
+def _bracket(value, axis):
+    # Index of the interval of an evenly spaced axis that contains a value (clipped to the axis), and the position within it
+    u = (value - axis[0]) / (axis[1] - axis[0])
+    u = min(max(u, 0.0), len(axis) - 1.0)
+    i = min(int(u), len(axis) - 2)
+
+    return i, u - i
+
+def _neighbours(blockage_ratio, fin_height):
+    # The tabulated blockage ratios and fin heights around a value, with their (non-zero) interpolation weights
+    i, u = _bracket(blockage_ratio, BLOCKAGE_RATIOS)
+    j, v = _bracket(np.log(fin_height), LOG_FIN_HEIGHTS)
+    neighbours = []
+
+    for di, weight_i in [(0, 1 - u), (1, u)]:
+        for dj, weight_j in [(0, 1 - v), (1, v)]:
+            if weight_i * weight_j > 0:
+                neighbours.append((BLOCKAGE_RATIOS[i + di], FIN_HEIGHTS[j + dj], weight_i * weight_j))
+
+    return neighbours
+
+def prepare_tables(blockage_ratios, fin_heights):
+    """Build every FinTable that is needed to look up the blockage ratios and fin heights along a cooling jacket, so that efficiency() does not have to build any more. The values
+    between neighbouring points are covered too, so the points do not have to be the same as the grid points of the analysis.
+
+    Args:
+        blockage_ratios (list): Blockage ratios at a set of points along the cooling jacket, in order.
+        fin_heights (list): Fin heights, divided by the wall thickness, at the same points.
+
+    Returns:
+        int: Number of tables that had to be built (i.e. were not already cached).
+    """
+    indices = [(_bracket(blockage_ratio, BLOCKAGE_RATIOS)[0], _bracket(np.log(fin_height), LOG_FIN_HEIGHTS)[0]) for blockage_ratio, fin_height in zip(blockage_ratios, fin_heights)]
+    needed = set()
+
+    # Every table around the values between neighbouring points
+    for (i_1, j_1), (i_2, j_2) in zip(indices, indices[1:] + indices[-1:]):
+        for i in range(min(i_1, i_2), max(i_1, i_2) + 2):
+            for j in range(min(j_1, j_2), max(j_1, j_2) + 2):
+                needed.add((float(BLOCKAGE_RATIOS[i]), float(FIN_HEIGHTS[j])))
+
+    built = len(needed - set(_TABLES))
+
+    for blockage_ratio, fin_height in sorted(needed):
+        fin_table(blockage_ratio, fin_height)
+
+    return built
+
+def efficiency(biot, half_width, blockage_ratio, fin_height):
+    """Look up the overall surface efficiency of a channel cross section, with linear interpolation of its logarithm between the tables for the neighbouring values in 
+    BLOCKAGE_RATIOS and in log(FIN_HEIGHTS). Values outside the range of the tables are clipped to it.
+
+    Args:
+        biot (float): Biot number (h t / k).
+        half_width (float): Distance from the middle of a channel to the middle of a fin, divided by the wall thickness.
+        blockage_ratio (float): Proportion of the cell width that is occupied by the fin.
+        fin_height (float): Height of the fin (i.e. the channel height), divided by the wall thickness.
+
+    Returns:
+        float: Overall surface efficiency.
+    """
+    # The efficiency of a long fin is roughly proportional to a power of its height, so log(efficiency) is interpolated
+    log_efficiency = sum(weight * np.log(fin_table(blockage_ratio_table, fin_height_table)(biot, half_width)) for blockage_ratio_table, fin_height_table, weight in _neighbours(blockage_ratio, fin_height))
+
+    return float(np.exp(log_efficiency))
+
+def coolant_resistance(h, k, thickness, pitch, blockage_ratio, channel_height, area):
+    """Coolant side thermal resistance per unit axial length, including the heat transfer from the fins. The conduction resistance of the wall itself is not included.
+
+    Args:
+        h (float): Coolant convective heat transfer coefficient (W/m2/K).
+        k (float): Thermal conductivity of the wall and fins (W/m/K).
+        thickness (float): Thickness of the wall that the fins are attached to (m).
+        pitch (float): Width of one channel and one fin, i.e. the distance between the middle of neighbouring channels (m).
+        blockage_ratio (float): Proportion of the pitch that is occupied by the fin.
+        channel_height (float): Height of the channels and fins (m).
+        area (float): Cold side surface area of the wall per unit axial length (m), i.e. the area that the channels cover.
+
+    Returns:
+        float: Thermal resistance (K m/W).
+    """
+    half_width = pitch / 2
+    eta = efficiency(h * thickness / k, half_width / thickness, blockage_ratio, channel_height / thickness)
+
+    # Wetted area per unit area of the wall, for the channel floor and both sides of each fin
+    wetted_area = area * ((1 - blockage_ratio) * half_width + channel_height) / half_width
+
+    return 1.0 / (h * eta * wetted_area)
@@ -7,10 +7,46 @@ Notation:
  - 'w': At the wall (e.g. T_cw is the wall temperature on the cold side)
 """
 
+import json
+import os
+import numpy as np
+import scipy.linalg
+
 from cusfbamboo.circuit import ThermalCircuit
 
+# Checkpoint files start with a single line of JSON describing the solver, followed by one record of float64 values for each grid point, in the order of CHECKPOINT_FIELDS followed 
+# by the thermal resistances. The "next_" values are for the following grid point, at the moment the current grid point finished iterating, so the march can continue exactly where it left off.
+# The "_iter" values are the wall temperatures that the thermal resistances were calculated with (i.e. before the last iteration updated them).
+CHECKPOINT_FORMAT = "cusfbamboo-hx-checkpoint"
+CHECKPOINT_VERSION = 2
+CHECKPOINT_FIELDS = ["x", "T_c", "p_c", "T_cw", "T_hw", "V_c", "cp_c", "T_h", "T_cw_iter", "T_hw_iter", "dp_dx_f", "extra_dQ_dx", 
+                     "next_T_c", "next_p_c", "next_T_cw", "next_T_hw", "next_V_c", "next_cp_c"]
+CHECKPOINT_SAMPLES = 16     # Number of saved grid points to re-check the input functions at, before resuming from a checkpoint
+
+def read_checkpoint(path):
+    """Read a checkpoint file written by HXSolver.march().
+
+    Args:
+        path (str): Path to the checkpoint file.
+
+    Returns:
+        tuple: (header, records), where 'header' is a dictionary describing the solver, and 'records' is a 2D numpy array with a row for each grid point that was saved. 
+        Any incomplete record at the end of the file (e.g. from a process that was killed while writing) is ignored.
+    """
+    with open(path, "rb") as f:
+        header = json.loads(f.readline().decode())
+        data = f.read()
+
+    assert header.get("format") == CHECKPOINT_FORMAT, f"{path} is not a heat exchanger checkpoint file"
+
+    record_length = len(CHECKPOINT_FIELDS) + header["num_R"]
+    number_of_records = len(data) // (8 * record_length)
+    records = np.frombuffer(data[:8 * record_length * number_of_records], dtype = "<f8").reshape(number_of_records, record_length)
+
+    return header, records
+
 class HXSolver:
-    def __init__(self, T_c_in, T_h, p_c_in, cp_c, mdot_c, V_c, A_c, Rdx, extra_dQ_dx, dp_dx_f, x_start, dx, x_end):
+    def __init__(self, T_c_in, T_h, p_c_in, cp_c, mdot_c, V_c, A_c, Rdx, extra_dQ_dx, dp_dx_f, x_start, dx, x_end, store_state = True, initial_guess = None, profiler = None):
         """Class for solving heat exchanger problems.
 
         Args:
@@ -27,6 +63,10 @@ class HXSolver:
             x_start (float): Initial value of x to start at (m)
             dx (float): dx to move by for each step, corresponding to the direction that coolant flows in. Usually negative for counterflow heat exchanger (m)
             x_end (float): Value of x to stop at (m)
+            store_state (bool, optional): Whether or not to keep the data for every grid point in 'state'. If False, only the current and next grid point are kept (so memory use does not grow with the number of grid points), and the data must be collected as the simulation runs, using the 'callback' argument of run(). Defaults to True.
+            initial_guess (dict, optional): A previous solution to warm-start from, as a dictionary of lists with the keys "x", "T_c", "p_c", "T_cw" and "T_hw". The changes in each value between grid points are used as the initial guesses, instead of assuming no change. 
+                It does not need to use the same grid points, as it is linearly interpolated. Defaults to None.
+            profiler (Profiler, optional): cusfbamboo.profiling.Profiler to record the calls to each callback, and the number of iterations at each grid point, in. Defaults to None.
         """
 
         self.T_c_in = T_c_in     
@@ -42,6 +82,25 @@ class HXSolver:
         self.x_start = x_start     
         self.dx = dx                
         self.x_end = x_end         
+        self.store_state = store_state
+        self.thermal_circuit = ThermalCircuit
+
+        self.num_points = int( abs((self.x_end - self.x_start) / self.dx) )
+
+        # Interpolate the previous solution onto our grid points, if we were given one
+        if initial_guess is None:
+            self.guess = None
+
+        else:
+            xs = self.x_start + self.dx * np.arange(self.num_points)
+            order = np.argsort(initial_guess["x"])
+            self.guess = {}
+
+            for key in ["T_c", "p_c", "T_cw", "T_hw"]:
+                self.guess[key] = np.interp(xs, np.array(initial_guess["x"])[order], np.array(initial_guess[key])[order])
+
+        if profiler is not None:
+            profiler.instrument(self)
 
         self.reset()
     
@@ -51,25 +110,49 @@ class HXSolver:
         """
         self.i = 0
         
-        # Set up an empty list of dictionaries
-        self.state = [None] * int( abs((self.x_end - self.x_start) / self.dx) )    
-        for i in range(len(self.state)):
-            self.state[i] = {}
+        if self.store_state:
+            # Set up an empty list of dictionaries
+            self.state = [None] * self.num_points
+            for i in range(len(self.state)):
+                self.state[i] = {}
+
+        else:
+            # Only keep the grid points we're currently working on, indexed by their grid point number
+            self.state = {0 : {}, 1 : {}}
 
         self.state[0]["x"] = self.x_start
         self.state[0]["p_c"] = self.p_c_in
         self.state[0]["T_c"] = self.T_c_in
-        self.state[0]["T_cw"] = self.state[0]["T_c"]
-        self.state[0]["T_hw"] = self.T_h(self.state[0])
+
+        if self.guess is None:
+            self.state[0]["T_cw"] = self.state[0]["T_c"]
+            self.state[0]["T_hw"] = self.T_h(self.state[0])
+        
+        else:
+            self.state[0]["T_cw"] = self.guess["T_cw"][0]
+            self.state[0]["T_hw"] = self.guess["T_hw"][0]
+
         self.state[0]["V_c"] = self.V_c(self.state[0])
         self.state[0]["cp_c"] = self.cp_c(self.state[0])
 
         # Initial guess for the next T_c, T_wc, T_wh, and p_c
         self.state[1]["x"] = self.state[0]["x"] + self.dx
-        self.state[1]["T_c"] = self.state[0]["T_c"]
-        self.state[1]["T_cw"] = self.state[0]["T_cw"] 
-        self.state[1]["T_hw"] = self.state[0]["T_hw"]
-        self.state[1]["p_c"] = self.state[0]["p_c"] 
+
+        if self.guess is None:
+            self.state[1]["T_c"] = self.state[0]["T_c"]
+            self.state[1]["T_cw"] = self.state[0]["T_cw"] 
+            self.state[1]["T_hw"] = self.state[0]["T_hw"]
+            self.state[1]["p_c"] = self.state[0]["p_c"] 
+
+        else:
+            self.warm_start_guess(0)
+
+    def warm_start_guess(self, i):
+        """
+        Use the previous solution given as 'initial_guess' to guess T_c, T_cw, T_hw and p_c at grid point i+1, by adding the change between grid points i and i+1 in the previous solution onto the current values at grid point i.
+        """
+        for key in ["T_c", "T_cw", "T_hw", "p_c"]:
+            self.state[i+1][key] = self.state[i][key] + self.guess[key][i+1] - self.guess[key][i]
 
     def iterate(self):
         """
@@ -78,17 +161,22 @@ class HXSolver:
         i = self.i 
         #print(f'{100*abs((self.state[i]["x"] - self.x_start) / (self.x_start - self.x_end)):.2f}%, Tc = {self.state[i]["T_c"]}, pc = {self.state[i]["p_c"]}')
 
+        # Keep the wall temperatures that the thermal circuit is calculated with, for checkpoint records
+        self.state[i]["T_cw_iter"] = self.state[i]["T_cw"]
+        self.state[i]["T_hw_iter"] = self.state[i]["T_hw"]
+
         # Calculate thermal resistance and solve thermal circuit
-        self.state[i]["circuit"] = ThermalCircuit(T1 = self.state[self.i]["T_c"], 
-                                                  T2 = self.T_h(self.state[i]),
-                                                  R = self.Rdx(self.state[i]))       
+        self.state[i]["circuit"] = self.thermal_circuit(T1 = self.state[self.i]["T_c"], 
+                                                        T2 = self.T_h(self.state[i]),
+                                                        R = self.Rdx(self.state[i]))       
 
         self.state[i]["T_hw"] = self.state[i]["circuit"].T[-2]
         self.state[i]["T_cw"] = self.state[i]["circuit"].T[1]
 
         # For the last point we only need to iterate for wall temperature
-        if i != len(self.state) - 1:
-            dQ_dx_i = - self.state[i]["circuit"].Qdot + self.extra_dQ_dx(self.state[i])       # extra_Q is positive into the coolant, but circuit.Qdot is positive into the exhaust
+        if i != self.num_points - 1:
+            self.state[i]["extra_dQ_dx"] = self.extra_dQ_dx(self.state[i])
+            dQ_dx_i = - self.state[i]["circuit"].Qdot + self.state[i]["extra_dQ_dx"]       # extra_Q is positive into the coolant, but circuit.Qdot is positive into the exhaust
 
             # Steady flow energy equation to get the i+1 coolant temperature
             self.state[i]["cp_c"] = self.cp_c(self.state[i])
@@ -106,6 +194,7 @@ class HXSolver:
             self.state[i+1]["V_c"] = self.V_c(self.state[i+1])     # Update V_c[i+1], since we have a new T_c[i+1]
 
             dp_dx_f_i = self.dp_dx_f(self.state[i]) 
+            self.state[i]["dp_dx_f"] = dp_dx_f_i
 
             self.state[i+1]["p_c"] = self.state[i]["p_c"] - self.mdot_c / self.A_c(self.state[i]) * (self.state[i+1]["V_c"] - self.state[i]["V_c"]) - abs(dp_dx_f_i) * abs(self.dx)
 
@@ -117,23 +206,135 @@ class HXSolver:
         i = self.i
         #print(f"i = {i}")
 
+        # Forget about the previous grid point if we're not storing the full state
+        if not self.store_state:
+            del self.state[i-1]
+
         # Don't try and guess the future state if we're on the last grid point
-        if i != len(self.state) - 1:           
+        if i != self.num_points - 1:           
+            if not self.store_state:
+                self.state[i+1] = {}
+
             self.state[i+1]["x"] = self.state[i]["x"] + self.dx
 
             # Initial guess for the next T_c, T_wc, T_wh, and p_c
-            self.state[i+1]["T_c"] = self.state[i]["T_c"] + self.dx
-            self.state[i+1]["T_cw"] = self.state[i]["T_cw"] 
-            self.state[i+1]["T_hw"] = self.state[i]["T_hw"] 
-            self.state[i+1]["p_c"] = self.state[i]["p_c"] 
+            if self.guess is None:
+                self.state[i+1]["T_c"] = self.state[i]["T_c"] + self.dx
+                self.state[i+1]["T_cw"] = self.state[i]["T_cw"] 
+                self.state[i+1]["T_hw"] = self.state[i]["T_hw"] 
+                self.state[i+1]["p_c"] = self.state[i]["p_c"] 
 
+            else:
+                self.warm_start_guess(i)
 
-    def run(self, iter_start = 5, iter_each = 2):
-        """Run the simulation until we reach x >= x_end.
+
+    def _checkpoint_header(self, iter_start, iter_each, num_R, tag):
+        # Everything that must match for a checkpoint to be resumed by this solver
+        return {"format" : CHECKPOINT_FORMAT,
+                "version" : CHECKPOINT_VERSION,
+                "num_R" : num_R,
+                "tag" : tag,
+                "options" : {"x_start" : float(self.x_start),
+                             "dx" : float(self.dx),
+                             "x_end" : float(self.x_end),
+                             "num_points" : self.num_points,
+                             "T_c_in" : float(self.T_c_in),
+                             "p_c_in" : float(self.p_c_in),
+                             "mdot_c" : float(self.mdot_c),
+                             "iter_start" : iter_start,
+                             "iter_each" : iter_each,
+                             "warm_start" : self.guess is not None}}
+
+    def _checkpoint_record(self, i):
+        # Values needed to restore grid point i (and the guess for grid point i+1)
+        station = self.state[i]
+        following = self.state[i+1] if i != self.num_points - 1 else {}
+
+        values = [station["x"], station["T_c"], station["p_c"], station["T_cw"], station["T_hw"], station.get("V_c", np.nan), station.get("cp_c", np.nan), station["circuit"].T[-1], 
+                  station["T_cw_iter"], station["T_hw_iter"], station.get("dp_dx_f", np.nan), station.get("extra_dQ_dx", np.nan)]
+        values += [following.get(key, np.nan) for key in ["T_c", "p_c", "T_cw", "T_hw", "V_c", "cp_c"]]
+
+        return np.concatenate([values, station["circuit"].R])
+
+    def matches_record(self, record):
+        """Check whether this solver's input functions (e.g. Rdx, V_c) give exactly the same values as the ones that produced a checkpoint record, when given the same states 
+        as on the record's last iteration. This is used to find which grid points of a previous solution are still valid for a modified problem.
+
+        Args:
+            record (array): A single checkpoint record (see read_checkpoint()).
+
+        Returns:
+            bool: True if every input function gives the same value.
+        """
+        fields = dict(zip(CHECKPOINT_FIELDS, record))
+        station = {key : fields[key] for key in ["x", "T_c", "p_c", "T_cw", "T_hw", "V_c"]}
+
+        # The thermal circuit was solved with the wall temperatures from before the last iteration
+        circuit_station = dict(station, T_cw = fields["T_cw_iter"], T_hw = fields["T_hw_iter"])
+
+        if not np.array_equal(self.Rdx(circuit_station), record[len(CHECKPOINT_FIELDS):]) or self.T_h(circuit_station) != fields["T_h"]:
+            return False
+
+        if self.V_c(station) != fields["V_c"] or self.cp_c(station) != fields["cp_c"]:
+            return False
+
+        # dp_dx_f and extra_dQ_dx aren't used on the last grid point, so they aren't recorded there
+        if not np.isnan(fields["dp_dx_f"]) and (self.dp_dx_f(station) != fields["dp_dx_f"] or self.extra_dQ_dx(station) != fields["extra_dQ_dx"]):
+            return False
+
+        return True
+
+    @staticmethod
+    def _checkpoint_station(record):
+        # Rebuild the state dictionary of a grid point from its checkpoint record
+        fields = dict(zip(CHECKPOINT_FIELDS, record))
+
+        station = {key : fields[key] for key in ["x", "T_c", "p_c", "T_cw", "T_hw", "V_c", "cp_c"]}
+        station["circuit"] = ThermalCircuit(T1 = fields["T_c"], T2 = fields["T_h"], R = np.array(record[len(CHECKPOINT_FIELDS):]))
+
+        return station
+
+    def _restore(self, records):
+        # Restore the solver to the moment the last grid point in 'records' finished iterating
+        self.reset()
+        self.i = len(records) - 1
+
+        if not self.store_state:
+            self.state = {}
+
+        for i in range(len(records)):
+            if self.store_state or i == self.i:
+                self.state[i] = self._checkpoint_station(records[i])
+
+        if self.i != self.num_points - 1:
+            fields = dict(zip(CHECKPOINT_FIELDS, records[-1]))
+            self.state[self.i + 1] = {"x" : self.state[self.i]["x"] + self.dx}
+
+            for key in ["T_c", "p_c", "T_cw", "T_hw", "V_c", "cp_c"]:
+                self.state[self.i + 1][key] = fields["next_" + key]
+
+    def march(self, iter_start = 5, iter_each = 2, checkpoint = None, checkpoint_every = 100, tag = None, restart = None, keep_records = False):
+        """Generator that runs the simulation until we reach x >= x_end, yielding the state dictionary of each grid point as soon as it has finished iterating. 
+        
+        Stopping early (e.g. by breaking out of a for loop) simply leaves the remaining grid points unsolved.
+
+        Note:
+            If a 'checkpoint' file is given, the solved grid points are appended to it every 'checkpoint_every' grid points (and when the march stops). If the file already exists, 
+            the march resumes from the last grid point in it instead of starting again - the saved grid points are yielded first, and the results are identical to an uninterrupted march.
+            Before resuming, the input functions are re-evaluated at a sample of the saved grid points (see matches_record()), and a ValueError is raised if any of them have changed.
 
         Args:
             iter_start (int, optional): Number of iterations to use on the first gridpoint. Defaults to 5.
-            iter_each (int, optional): Number of iterations to use on each intermediate grid point. Defaults to 1.
+            iter_each (int, optional): Number of iterations to use on each intermediate grid point. Defaults to 2.
+            checkpoint (str, optional): Path of a checkpoint file to save progress to (and resume from, if it exists). Defaults to None.
+            checkpoint_every (int, optional): Number of grid points between writes to the checkpoint file. Defaults to 100.
+            tag (str, optional): Extra identifier stored in the checkpoint file, which must match when resuming (e.g. a hash of the problem definition). Defaults to None.
+            restart (array, optional): Records of already-solved grid points to continue from, in the same form as the checkpoint records (e.g. the 'record' values from a previous march with 
+                keep_records = True). Like resuming from a checkpoint, these grid points are yielded first. Cannot be used with 'checkpoint'. Defaults to None.
+            keep_records (bool, optional): If True, each yielded state dictionary also contains a "record" key, which can be used in 'restart'. Defaults to False.
+
+        Yields:
+            dict: The state at each grid point, in order of increasing grid point number (i.e. in the direction of coolant flow).
         """
         assert type(iter_start) is int, "'iter_start' must be an integer"
         assert iter_start >= 1, "'iter_start' must be at least 1"
@@ -141,21 +342,347 @@ class HXSolver:
         assert type(iter_each) is int, "'iter_each' must be an integer"
         assert iter_each >= 1, "'iter_each' must be at least 1"
 
-        # Initialise our 'state'
-        self.reset()
+        assert type(checkpoint_every) is int and checkpoint_every >= 1, "'checkpoint_every' must be an integer that is at least 1"
+
+        assert restart is None or checkpoint is None, "Cannot use 'restart' and 'checkpoint' at the same time"
+
+        records = None if restart is None or len(restart) == 0 else np.asarray(restart, dtype = float)
+
+        if checkpoint is not None and os.path.exists(checkpoint) and os.path.getsize(checkpoint) > 0:
+            header, records = read_checkpoint(checkpoint)
+            expected = self._checkpoint_header(iter_start, iter_each, header["num_R"], tag)
+
+            # The tag can't describe everything (e.g. lambdas), so also check that the input functions still give the saved values, at grid points spread along the checkpoint
+            samples = np.unique(np.linspace(0, len(records) - 1, min(len(records), CHECKPOINT_SAMPLES)).round().astype(int))
+
+            if header["version"] != CHECKPOINT_VERSION or header["options"] != expected["options"] or header["tag"] != tag \
+                    or not all(self.matches_record(records[i]) for i in samples):
+                raise ValueError(f"Checkpoint file '{checkpoint}' was written by a different problem or set of solver options, so it cannot be resumed. Delete it to start again.")
+
+            # Remove any incomplete record at the end of the file, so new records can be appended
+            with open(checkpoint, "rb") as f:
+                header_length = len(f.readline())
+
+            os.truncate(checkpoint, header_length + records.nbytes)
+
+            if len(records) == 0:
+                records = None
+
+        pending = []
+
+        def save():
+            # Append the grid points solved since the last save
+            if checkpoint is None or len(pending) == 0:
+                return
+
+            with open(checkpoint, "ab") as f:
+                if f.tell() == 0:
+                    f.write((json.dumps(self._checkpoint_header(iter_start, iter_each, len(pending[0]) - len(CHECKPOINT_FIELDS), tag)) + "\n").encode())
+
+                f.write(np.array(pending, dtype = "<f8").tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            pending.clear()
+
+        def solved(i):
+            # Called each time a grid point has finished iterating
+            if keep_records:
+                self.state[i]["record"] = self._checkpoint_record(i)
+
+            if checkpoint is not None:
+                pending.append(self._checkpoint_record(i))
+
+                if len(pending) >= checkpoint_every or i == self.num_points - 1:
+                    save()
+
+        try:
+            if records is None:
+                # Initialise our 'state'
+                self.reset()
+
+                # Perform the required amount of iterations on the first grid point
+                counter = 0
+                while counter < iter_start:
+                    self.iterate()
+                    counter += 1
+
+                solved(self.i)
+                yield self.state[self.i]
+
+            else:
+                # Continue from the checkpoint, after giving back the grid points that were already solved
+                self._restore(records)
+
+                for i in range(len(records)):
+                    station = self.state[i] if self.store_state else self._checkpoint_station(records[i])
+
+                    if keep_records:
+                        station["record"] = records[i]
+
+                    yield station
+
+            while self.i < self.num_points - 1:
+                # Move to next grid point
+                self.step()
+
+                # Perform the required number of iterations
+                counter = 0
+                while counter < iter_each:
+                    self.iterate()
+                    counter += 1
+
+                solved(self.i)
+                yield self.state[self.i]
+
+        finally:
+            # Don't lose any progress if the march is stopped early
+            save()
+
+    def run(self, iter_start = 5, iter_each = 2, callback = None, checkpoint = None, checkpoint_every = 100, tag = None):
+        """Run the simulation until we reach x >= x_end.
+
+        Args:
+            iter_start (int, optional): Number of iterations to use on the first gridpoint. Defaults to 5.
+            iter_each (int, optional): Number of iterations to use on each intermediate grid point. Defaults to 1.
+            callback (callable, optional): Function that is called with the state dictionary of each grid point once it has finished iterating, i.e. callback(state[i]). Defaults to None.
+            checkpoint (str, optional): Path of a checkpoint file to save progress to, and resume from if it already exists. See march(). Defaults to None.
+            checkpoint_every (int, optional): Number of grid points between writes to the checkpoint file. Defaults to 100.
+            tag (str, optional): Extra identifier stored in the checkpoint file, which must match when resuming. Defaults to None.
+        """
+        for station in self.march(iter_start = iter_start, iter_each = iter_each, checkpoint = checkpoint, checkpoint_every = checkpoint_every, tag = tag):
+            if callback is not None:
+                callback(station)
+
+    def resume(self, checkpoint, callback = None, checkpoint_every = 100, tag = None):
+        """Continue a simulation from the last grid point saved in a checkpoint file, using the same 'iter_start' and 'iter_each' as the original run.
+
+        Args:
+            checkpoint (str): Path of the checkpoint file, from a previous run() or march() with the 'checkpoint' input.
+            callback (callable, optional): Function that is called with the state dictionary of each grid point, including the ones loaded from the checkpoint. Defaults to None.
+            checkpoint_every (int, optional): Number of grid points between writes to the checkpoint file. Defaults to 100.
+            tag (str, optional): Extra identifier, which must match the one stored in the checkpoint file. Defaults to None.
+        """
+        header, records = read_checkpoint(checkpoint)
+
+        self.run(iter_start = header["options"]["iter_start"], 
+                 iter_each = header["options"]["iter_each"], 
+                 callback = callback, 
+                 checkpoint = checkpoint, 
+                 checkpoint_every = checkpoint_every, 
+                 tag = tag)
+
+class HXNewtonSolver:
+    def __init__(self, T_c_in, T_h, p_c_in, cp_c, mdot_c, V_c, A_c, Rdx, extra_dQ_dx, dp_dx_f, x_start, dx, x_end, profiler = None):
+        """Class for solving heat exchanger problems with Newton's method, treating every grid point at once. Takes the same inputs as HXSolver.
+
+        Note:
+            The unknowns at each grid point are T_c, p_c, T_cw and T_hw. The energy and momentum equations between neighbouring grid points (using the trapezium rule for heat transfer and friction, 
+            so they are second order accurate) and the thermal circuit at each grid point are all solved together. Since each equation only involves neighbouring grid points, the Jacobian is banded,
+            and is found by finite differences, perturbing every other grid point at the same time. The marching solution from HXSolver is used as the initial guess, unless a previous solution is given.
+
+        Args:
+            T_c_in (float): Coolant inlet static temperature (K)
+            T_h (callable): Exhaust gas recovery temperature (K). Must be a function of 'state'.
+            p_c_in (float): Coolant inlet static pressure (Pa)
+            cp_c (callable): Coolant isobaric specific heat capacity (J/kg/K). Must be a function of 'state'.
+            mdot_c (float): Coolant mass flow rate (kg/s)
+            V_c (callable): Coolant velocity (m/s). Must be a function of 'state'.
+            A_c (callable): Coolant flow area (m2). Must be a function of 'state'.
+            Rdx (callable): List of thermal resistances [R1, R2 ... etc], in the order T_cold --> T_hot. Note they need to be 1D resistances, so Qdot is per unit length. Must be a function of 'state'.
+            extra_dQ_dx (callable): Extra heat transfer rate (positive into the coolant), to add on (W), to represent things like fins protruding into the coolant flow. Must be a function of 'state'.
+            dp_dx_f (callable): Frictional pressure drop per unit length (Pa/m)
+            x_start (float): Initial value of x to start at (m)
+            dx (float): dx to move by for each step, corresponding to the direction that coolant flows in. Usually negative for counterflow heat exchanger (m)
+            x_end (float): Value of x to stop at (m)
+            profiler (Profiler, optional): cusfbamboo.profiling.Profiler to record the calls to each callback, and the number of evaluations at each grid point, in. Defaults to None.
+        """
+        self.T_c_in = T_c_in     
+        self.T_h = T_h             
+        self.p_c_in = p_c_in      
+        self.cp_c = cp_c          
+        self.mdot_c = mdot_c  
+        self.V_c = V_c    
+        self.A_c = A_c
+        self.Rdx = Rdx            
+        self.extra_dQ_dx = extra_dQ_dx
+        self.dp_dx_f = dp_dx_f         
+        self.x_start = x_start     
+        self.dx = dx                
+        self.x_end = x_end         
+
+        self.thermal_circuit = ThermalCircuit
+
+        self.num_points = int( abs((self.x_end - self.x_start) / self.dx) )
+        self.x = self.x_start + self.dx * np.arange(self.num_points)
+
+        if profiler is not None:
+            profiler.instrument(self)
+
+    def evaluate(self, i, z):
+        """Solve the thermal circuit and find the flow properties at grid point i, given the unknowns 'z' = [T_c, p_c, T_cw, T_hw] at that grid point.
+
+        Args:
+            i (int): Grid point number.
+            z (numpy.ndarray): Array of [T_c, p_c, T_cw, T_hw] at grid point i.
+
+        Returns:
+            dict: State dictionary at grid point i, including the thermal circuit.
+        """
+        state = {"x" : self.x[i], "T_c" : z[0], "p_c" : z[1], "T_cw" : z[2], "T_hw" : z[3]}
+
+        state["V_c"] = self.V_c(state)
+        state["cp_c"] = self.cp_c(state)
+        state["A_c"] = self.A_c(state)
+        state["dp_dx_f"] = self.dp_dx_f(state)
+        state["circuit"] = self.thermal_circuit(T1 = state["T_c"], 
+                                                T2 = self.T_h(state),
+                                                R = self.Rdx(state))
+        state["dQ_dx"] = - state["circuit"].Qdot + self.extra_dQ_dx(state)        # extra_Q is positive into the coolant, but circuit.Qdot is positive into the exhaust
+
+        return state
+
+    def _quantities(self, states):
+        # Collect the values needed for the residuals into arrays
+        keys = ["V_c", "cp_c", "A_c", "dp_dx_f", "dQ_dx"]
+        q = {key : np.array([state[key] for state in states]) for key in keys}
+        q["T_cw_circuit"] = np.array([state["circuit"].T[1] for state in states])
+        q["T_hw_circuit"] = np.array([state["circuit"].T[-2] for state in states])
+        return q
+
+    def residuals(self, Z, q):
+        """Residuals of the discretised equations at every grid point, scaled by the inlet temperature and pressure.
+
+        Args:
+            Z (numpy.ndarray): Unknowns, with shape (num_points, 4). Z[i] = [T_c, p_c, T_cw, T_hw] at grid point i.
+            q (dict): Arrays of the flow properties at each grid point ("V_c", "cp_c", "A_c", "dp_dx_f", "dQ_dx", "T_cw_circuit", "T_hw_circuit").
+
+        Returns:
+            numpy.ndarray: Residuals, with shape (num_points, 4). Row i contains the energy and momentum equations between grid points i-1 and i (or the inlet conditions for i = 0), and the thermal circuit at grid point i.
+        """
+        T_c, p_c, T_cw, T_hw = Z[:, 0], Z[:, 1], Z[:, 2], Z[:, 3]
+        r = np.zeros(Z.shape)
+
+        # Inlet conditions
+        r[0, 0] = T_c[0] - self.T_c_in
+        r[0, 1] = p_c[0] - self.p_c_in
+
+        # Steady flow energy equation, with the trapezium rule for the heat transfer
+        cp_mean = 0.5 * (q["cp_c"][:-1] + q["cp_c"][1:])
+        r[1:, 0] = T_c[1:] - T_c[:-1]                                                       \
+                   - 0.5 * (q["V_c"][:-1]**2 - q["V_c"][1:]**2) / cp_mean                   \
+                   - 0.5 * (q["dQ_dx"][:-1] + q["dQ_dx"][1:]) * abs(self.dx) / (self.mdot_c * cp_mean)
+
+        # Momentum equation, with the trapezium rule for friction
+        A_mean = 0.5 * (q["A_c"][:-1] + q["A_c"][1:])
+        r[1:, 1] = p_c[1:] - p_c[:-1]                                                       \
+                   + self.mdot_c / A_mean * (q["V_c"][1:] - q["V_c"][:-1])                  \
+                   + 0.5 * (abs(q["dp_dx_f"][:-1]) + abs(q["dp_dx_f"][1:])) * abs(self.dx)
+
+        # Thermal circuit
+        r[:, 2] = T_cw - q["T_cw_circuit"]
+        r[:, 3] = T_hw - q["T_hw_circuit"]
+
+        r[:, [0, 2, 3]] /= self.T_c_in
+        r[:, 1] /= self.p_c_in
+
+        return r
+
+    def run(self, initial_guess = None, tol = 1e-9, max_iter = 20, iter_start = 5, iter_each = 2):
+        """Solve every grid point at once, using Newton's method.
+
+        Args:
+            initial_guess (dict, optional): A previous solution to start from, as a dictionary of lists with the keys "x", "T_c", "p_c", "T_cw" and "T_hw". It is linearly interpolated onto the grid. 
+                Defaults to None, in which case HXSolver is used to get the initial guess.
+            tol (float, optional): Convergence tolerance on the (scaled) Newton step. Defaults to 1e-9.
+            max_iter (int, optional): Maximum number of Newton iterations. Defaults to 20.
+            iter_start (int, optional): 'iter_start' input for HXSolver, if it is used for the initial guess. Defaults to 5.
+            iter_each (int, optional): 'iter_each' input for HXSolver, if it is used for the initial guess. Defaults to 2.
+
+        Attributes:
+            state (list): List of state dictionaries at each grid point, in the same form as HXSolver.state.
+            iterations (int): Number of Newton iterations used.
+            converged (bool): Whether or not the tolerance was met.
+        """
+        if initial_guess is None:
+            marching_simulation = HXSolver(T_c_in = self.T_c_in, T_h = self.T_h, p_c_in = self.p_c_in, cp_c = self.cp_c, mdot_c = self.mdot_c, V_c = self.V_c, 
+                                           A_c = self.A_c, Rdx = self.Rdx, extra_dQ_dx = self.extra_dQ_dx, dp_dx_f = self.dp_dx_f, 
+                                           x_start = self.x_start, dx = self.dx, x_end = self.x_end)
+            marching_simulation.thermal_circuit = self.thermal_circuit
+            marching_simulation.run(iter_start = iter_start, iter_each = iter_each)
+            Z = np.array([[state["T_c"], state["p_c"], state["T_cw"], state["T_hw"]] for state in marching_simulation.state], dtype = float)
+
+        else:
+            order = np.argsort(initial_guess["x"])
+            Z = np.zeros((self.num_points, 4))
+
+            for k, key in enumerate(["T_c", "p_c", "T_cw", "T_hw"]):
+                Z[:, k] = np.interp(self.x, np.array(initial_guess["x"])[order], np.array(initial_guess[key])[order])
+
+        N = self.num_points
+        scale = np.array([self.T_c_in, self.p_c_in, self.T_c_in, self.T_c_in])
+
+        states = [self.evaluate(i, Z[i]) for i in range(N)]
+        r = self.residuals(Z, self._quantities(states))
+
+        self.converged = False
+        self.iterations = 0
+
+        while self.iterations < max_iter:
+            # Banded Jacobian, stored in the form used by scipy.linalg.solve_banded(). Ordering the unknowns as [T_c0, p_c0, T_cw0, T_hw0, T_c1, ...] means the 
+            # equations in row i only depend on the unknowns at grid points i-1 and i, so there are at most 7 non-zero diagonals below the main one, and 3 above.
+            lower, upper = 7, 3
+            ab = np.zeros((lower + upper + 1, 4*N))
+
+            for k in range(4):
+                # Perturbing every other grid point at once, since each grid point only affects its own residuals and the next grid point's
+                for colour in range(2):
+                    perturbed = np.arange(colour, N, 2)
+                    h = 1e-7 * np.maximum(abs(Z[perturbed, k]), scale[k])
+
+                    Z_perturbed = Z.copy()
+                    Z_perturbed[perturbed, k] += h
+
+                    states_perturbed = list(states)
+                    for i in perturbed:
+                        states_perturbed[i] = self.evaluate(i, Z_perturbed[i])
+
+                    dr = (self.residuals(Z_perturbed, self._quantities(states_perturbed)) - r)
+
+                    for n, j in enumerate(perturbed):
+                        col = 4*j + k
+
+                        for row_point in [j, j + 1]:
+                            if row_point < N:
+                                rows = 4*row_point + np.arange(4)
+                                ab[upper + rows - col, col] = dr[row_point] / h[n]
+
+            step = scipy.linalg.solve_banded((lower, upper), ab, -r.flatten()).reshape(N, 4)
+
+            # Backtrack if the Newton step makes the residuals worse
+            norm = np.linalg.norm(r)
+            relaxation = 1.0
+
+            while True:
+                Z_new = Z + relaxation * step
+                states_new = [self.evaluate(i, Z_new[i]) for i in range(N)]
+                r_new = self.residuals(Z_new, self._quantities(states_new))
+
+                if np.linalg.norm(r_new) < norm or relaxation < 1e-3:
+                    break
+
+                relaxation = relaxation / 2
+
+            Z, states, r = Z_new, states_new, r_new
+            self.iterations += 1
+
+            if np.max(abs(relaxation * step) / scale) < tol:
+                self.converged = True
+                break
+
+        # Store the solution in the same form as HXSolver.state
+        for i in range(N):
+            states[i]["T_cw"] = states[i]["circuit"].T[1]
+            states[i]["T_hw"] = states[i]["circuit"].T[-2]
 
-        # Perform the required amount of iterations on the first grid point
-        counter = 0
-        while counter < iter_start:
-            self.iterate()
-            counter += 1
-
-        while self.i < len(self.state) - 1:
-            # Move to next grid point
-            self.step()
-
-            # Perform the required number of iterations
-            counter = 0
-            while counter < iter_each:
-                self.iterate()
-                counter += 1
+        self.state = states
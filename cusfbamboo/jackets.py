@@ -0,0 +1,127 @@
+"""
+Engines with more than one cooling circuit, e.g. separate circuits for the combustion chamber and the nozzle extension. Used by Engine.multi_jacket_analysis().
+
+Each CoolingJacket in Engine.cooling_jackets covers its own range of x (its 'xs' input), and has its own coolant, inlet conditions and flow direction. The walls only conduct radially
+in a steady heating analysis, so circuits that cover separate ranges are not thermally coupled, and each one can be marched on its own. With more than one worker, the circuits are
+marched in parallel over a pool of processes. The results are then assembled in order of x, over the full contour.
+
+Example:
+    engine = cusfbamboo.Engine(..., cooling_jackets = [chamber_jacket, nozzle_jacket])
+    results = engine.multi_jacket_analysis(counterflow = [True, False], workers = 2)
+    results["T"][i]                 # Value at x[i], from whichever circuit covers x[i]
+    results["circuits"][1]          # Results for nozzle_jacket on its own
+
+Notes:
+ - Every circuit uses the same grid spacing (set by 'num_grid' over the full length of the engine), so the number of grid points in each circuit is proportional to its length.
+ - Parts of the engine that are not covered by any of the cooling jackets are not included in the results. Where two circuits meet, the grid point at the boundary is taken from the 
+   circuit that comes first in Engine.cooling_jackets, so x is strictly increasing.
+ - With more than one worker, the Engine must be picklable (see cusfbamboo.config), and on Windows the analysis must be started from within an 'if __name__ == "__main__":' block.
+"""
+
+import concurrent.futures
+import copy
+import itertools
+import numpy as np
+
+def jacket_engine(engine, index):
+    """Get a copy of an Engine with several cooling jackets, which only has one of them (as its 'cooling_jacket'), so it can be analysed on its own.
+
+    Args:
+        engine (Engine): Engine with the 'cooling_jackets' input.
+        index (int): Index of the cooling jacket to keep.
+
+    Returns:
+        Engine: The copy.
+    """
+    single_engine = copy.copy(engine)
+    del single_engine.cooling_jackets
+    single_engine.cooling_jacket = engine.cooling_jackets[index]
+
+    return single_engine
+
+def _run_circuit(engine, index, analysis_kwargs):
+    return jacket_engine(engine, index).steady_heating_analysis(**analysis_kwargs)
+
+def combine(results):
+    """Assemble the results from each cooling circuit over the full contour, in order of increasing x.
+
+    Args:
+        results (list): List of results dictionaries, from Engine.steady_heating_analysis() with summary_only = False, for each cooling circuit.
+
+    Returns:
+        dict: The combined results. Only contains the values that are available for every circuit. If circuits share a grid point (i.e. where they meet), it is only included once, 
+        from the first circuit.
+    """
+    keys = [key for key, value in results[0].items() if type(value) is list and all(type(result.get(key)) is list for result in results[1:])]
+
+    # Sort every grid point in every circuit by x
+    points = [(x, n, i) for n, result in enumerate(results) for i, x in enumerate(result["x"])]
+    points.sort()
+
+    # Circuits that touch both have a grid point at the boundary between them, so only keep the first circuit's (within rounding error of the grid)
+    tolerance = 1e-9 * (points[-1][0] - points[0][0])
+    unique = [points[0]]
+
+    for point in points[1:]:
+        if point[0] - unique[-1][0] > tolerance:
+            unique.append(point)
+
+    points = unique
+
+    combined = {key : [results[n][key][i] for x, n, i in points] for key in keys}
+    combined["circuit"] = [n for x, n, i in points]
+    combined["r"] = np.array([results[n]["r"][i] for x, n, i in points])
+    combined["circuits"] = results
+
+    combined["info"] = {key : results[0]["info"][key] for key in keys + ["r"] if key in results[0]["info"]}
+    combined["info"]["x"] = "Axial position along the engine (m), in increasing order, over every cooling circuit."
+    combined["info"]["circuit"] = "Index of the cooling jacket (in Engine.cooling_jackets) that covers each position. circuit[i] is the value at x[i]."
+    combined["info"]["circuits"] = "Results for each cooling circuit on its own. circuits[n] is the result for Engine.cooling_jackets[n]."
+
+    return combined
+
+def multi_jacket_analysis(engine, num_grid = 1000, counterflow = True, coolant_inlet = None, workers = 1, **kwargs):
+    """Run a steady heating analysis of each cooling circuit, and assemble the results over the full contour. See Engine.multi_jacket_analysis().
+
+    Args:
+        engine (Engine): Engine with the 'cooling_jackets' input.
+        num_grid (int, optional): Number of grid points over the full length of the engine. Defaults to 1000.
+        counterflow (bool or list, optional): Whether or not the coolant flows counterflow to the exhaust gas. Can be a list with a value for each cooling jacket. Defaults to True.
+        coolant_inlet (list, optional): List of coolant inlet conditions to use instead of those in each CoolingJacket (see Engine.steady_heating_analysis()), with a dictionary or None
+            for each cooling jacket. Defaults to None.
+        workers (int, optional): Number of processes to use. Defaults to 1.
+
+    Keyword Args:
+        Any other keyword arguments for Engine.steady_heating_analysis(), apart from 'summary_only', 'checkpoint' and 'previous', which are used for every circuit.
+
+    Returns:
+        dict: The combined results (see combine()).
+    """
+    assert hasattr(engine, "cooling_jackets"), "The Engine must have the 'cooling_jackets' input to run a multi_jacket_analysis()"
+    assert type(workers) is int and workers >= 1, "'workers' must be an integer that is at least 1"
+
+    for key in ["summary_only", "checkpoint", "previous"]:
+        assert key not in kwargs, f"'{key}' cannot be used with a multi_jacket_analysis()"
+
+    circuits = len(engine.cooling_jackets)
+
+    if type(counterflow) is bool:
+        counterflow = [counterflow] * circuits
+
+    if coolant_inlet is None:
+        coolant_inlet = [None] * circuits
+
+    assert len(counterflow) == circuits, f"'counterflow' must be a bool, or a list with a value for each of the {circuits} cooling jackets"
+    assert len(coolant_inlet) == circuits, f"'coolant_inlet' must be None, or a list with a value for each of the {circuits} cooling jackets"
+
+    analysis_kwargs = [dict(kwargs, num_grid = num_grid, counterflow = counterflow[n], coolant_inlet = coolant_inlet[n]) for n in range(circuits)]
+
+    if workers == 1:
+        results = [_run_circuit(engine, n, analysis_kwargs[n]) for n in range(circuits)]
+
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = min(workers, circuits)) as executor:
+            # executor.map() returns the results in the order they were submitted
+            results = list(executor.map(_run_circuit, itertools.repeat(engine), range(circuits), analysis_kwargs))
+
+    return combine(results)
@@ -3,11 +3,17 @@ Classes for representing solid materials, fluids and transport properties. Also
 
 References *need to get solid materials references
 - [1] - CoolProp, http://coolprop.org/
+- [2] - Incropera, F. P., Fundamentals of Heat and Mass Transfer, 6th Edition, Table A.6 (saturated water)
 """
 
+import numpy as np
+
+SATURATION_PROPERTIES = ["T_sat", "h_fg", "sigma", "rho_l", "rho_v", "mu_l", "cp_l", "Pr_l", "mu_v", "k_v"]
+
 # Classes
 class Material:
-    """Class used to specify a material and its properties. For calculating temperatures, only 'k' must be defined. For stresses, you also need E, alpha, and poisson.
+    """Class used to specify a material and its properties. For calculating temperatures, only 'k' must be defined. For stresses, you also need E, alpha, and poisson. For transient 
+    temperatures, you also need rho and cp.
 
     Args:
         k (float): Thermal conductivity (W/m/K)
@@ -16,6 +22,12 @@ class Material:
         E (float): Young's modulus (Pa)
         alpha (float): Thermal expansion coefficient (strain/K)
         poisson (float): Poisson's ratio
+        rho (float): Density (kg/m^3)
+        cp (float): Specific heat capacity (J/kg/K)
+        yield_strength (float or callable): Yield strength (Pa), for the yield margins in cusfbamboo.stress. Can be a constant float, or a function of temperature (K), e.g. a
+            cusfbamboo.config.TabulatedProfile with temperatures as its x values.
+        ultimate_strength (float or callable): Ultimate tensile strength (Pa), for the fatigue lives in cusfbamboo.stress. Can be a constant float, or a function of temperature (K).
+        ductility (float): True strain at fracture, i.e. ln(1 / (1 - reduction in area)), for the fatigue lives in cusfbamboo.stress.
     """
     def __init__(self, k, **kwargs):
         self.k = k                  
@@ -35,6 +47,20 @@ class Material:
         else:
             self.poisson = float("NaN")
 
+        if "rho" in kwargs:
+            self.rho = kwargs["rho"]
+        else:
+            self.rho = float("NaN")
+
+        if "cp" in kwargs:
+            self.cp = kwargs["cp"]
+        else:
+            self.cp = float("NaN")
+
+        self.yield_strength = kwargs.get("yield_strength", float("NaN"))
+        self.ultimate_strength = kwargs.get("ultimate_strength", float("NaN"))
+        self.ductility = kwargs.get("ductility", float("NaN"))
+
 class TransportProperties:
     def __init__(self, Pr, mu, k, cp = None, rho = None, gamma_coolant = None):
         """
@@ -171,28 +197,139 @@ class TransportProperties:
             return self._gamma_coolant
 
 class NucleateBoiling:
-    def __init__(self, vapour_transport, liquid_transport, sigma, h_fg, C_sf):
-        """Class for representing the information needed to model nucleate boiling. Not currently used.
+    def __init__(self, p, T_sat, h_fg, sigma, rho_l, rho_v, mu_l, cp_l, Pr_l, mu_v, k_v, C_sf, n = 1.7, p_critical = None):
+        """Saturation properties and surface-fluid coefficients needed to model boiling of a coolant, for use as the 'coolant_boiling' input of a CoolingJacket. 
+        
+        The saturation properties are given as tables over pressure, and are linearly interpolated in log(p), so no fluid library calls are needed during an analysis.
+        Pressures below the table use the first row. Above 'p_critical', the coolant is supercritical and cannot boil. Pressures between the end of the table and 'p_critical' raise a
+        ValueError, since the saturation properties change too quickly near the critical point to extrapolate, so the table should go as close to the critical point as possible. 
+        Heating analyses use forced convection (with a warning) at these pressures instead.
 
         Args:
-            vapour_transport (TransportProperties): The transport properties of the vapour phase.
-            liquid_transport (TransportProperties): The transport properties of the liquid phase.
-            sigma (callable): Surface tension of the liquid-vapour interface (N/m), as a function of temperature (K) and pressure (Pa) in the form sigma(T,p).
-            h_fg (callable): Enthalpy between vapour and liquid phases, as a function of pressure (Pa). h_fg = h_g - h_f. (J/kg/K)
-            C_sf (float): Surface-fluid coefficient. Will be different for different material + fluid combinations. Some examples are available in References [4] and [6] given in bamboo.circuit.py.
+            p (list): Pressures (Pa), in increasing order.
+            T_sat (list): Saturation temperature at each pressure (K).
+            h_fg (list): Enthalpy between vapour and liquid phases at each pressure, h_fg = h_g - h_f (J/kg).
+            sigma (list): Surface tension of the liquid-vapour interface at each pressure (N/m).
+            rho_l (list): Density of the saturated liquid at each pressure (kg/m3).
+            rho_v (list): Density of the saturated vapour at each pressure (kg/m3).
+            mu_l (list): Absolute viscosity of the saturated liquid at each pressure (Pa s).
+            cp_l (list): Isobaric specific heat capacity of the saturated liquid at each pressure (J/kg/K).
+            Pr_l (list): Prandtl number of the saturated liquid at each pressure.
+            mu_v (list): Absolute viscosity of the saturated vapour at each pressure (Pa s). Only used for film boiling.
+            k_v (list): Thermal conductivity of the saturated vapour at each pressure (W/m/K). Only used for film boiling.
+            C_sf (float): Surface-fluid coefficient. Will be different for different material + fluid combinations. Some examples are available in References [4] and [6] given in cusfbamboo.circuit.py.
+            n (float, optional): Prandtl number exponent in Rohsenow's equation. Defaults to 1.7 (use 1.0 for water).
+            p_critical (float, optional): Critical pressure (Pa). Defaults to None, in which case the last pressure in the table is used.
         """
+        self.p = [float(item) for item in p]
+        self.C_sf = C_sf
+        self.n = n
+        self.p_critical = self.p[-1] if p_critical is None else float(p_critical)
+
+        values = [T_sat, h_fg, sigma, rho_l, rho_v, mu_l, cp_l, Pr_l, mu_v, k_v]
+
+        for name, value in zip(SATURATION_PROPERTIES, values):
+            assert len(value) == len(self.p), f"'{name}' must be the same length as 'p'"
+            setattr(self, name, [float(item) for item in value])
+
+        assert np.all(np.diff(self.p) > 0), "'p' must be in increasing order"
 
-        raise ValueError("NucleateBoiling class is not yet implemented")
-    
+        self._log_p = np.log(self.p)
+        self._table = np.array(values, dtype = float)
+
+    @staticmethod
+    def from_coolprop(fluid, C_sf, n = 1.7, p_min = 1e5, p_max = None, points = 50):
+        """Tabulate the saturation properties of a fluid using CoolProp [1]. Requires CoolProp to be installed (e.g. 'pip install CoolProp'). CoolProp is only used here, and not during an analysis.
+
+        Args:
+            fluid (str): CoolProp fluid name, e.g. "Water" or "Ethanol".
+            C_sf (float): Surface-fluid coefficient.
+            n (float, optional): Prandtl number exponent in Rohsenow's equation. Defaults to 1.7.
+            p_min (float, optional): Lowest pressure to tabulate (Pa). Defaults to 1e5.
+            p_max (float, optional): Highest pressure to tabulate (Pa). Defaults to None, in which case 98% of the critical pressure is used.
+            points (int, optional): Number of pressures to tabulate, which are evenly spaced in log(p). Defaults to 50.
+
+        Returns:
+            NucleateBoiling: The tabulated saturation properties.
+        """
+        try:
+            from CoolProp.CoolProp import PropsSI
+        except ImportError:
+            raise ImportError("CoolProp must be installed to use NucleateBoiling.from_coolprop() (e.g. 'pip install CoolProp')")
+
+        p_critical = PropsSI("PCRIT", fluid)
+
+        if p_max is None:
+            p_max = 0.98 * p_critical
+
+        p = np.geomspace(p_min, p_max, points)
+
+        def liquid(output):
+            return PropsSI(output, "P", p, "Q", 0, fluid)
+
+        def vapour(output):
+            return PropsSI(output, "P", p, "Q", 1, fluid)
+
+        return NucleateBoiling(p = p, 
+                               T_sat = liquid("T"), 
+                               h_fg = vapour("HMASS") - liquid("HMASS"), 
+                               sigma = liquid("SURFACE_TENSION"), 
+                               rho_l = liquid("DMASS"), 
+                               rho_v = vapour("DMASS"), 
+                               mu_l = liquid("VISCOSITY"), 
+                               cp_l = liquid("CPMASS"), 
+                               Pr_l = liquid("PRANDTL"), 
+                               mu_v = vapour("VISCOSITY"), 
+                               k_v = vapour("CONDUCTIVITY"), 
+                               C_sf = C_sf, 
+                               n = n, 
+                               p_critical = p_critical)
+
+    def saturation(self, p):
+        """Get the saturation properties at a pressure.
+
+        Args:
+            p (float): Pressure (Pa)
+
+        Returns:
+            dict: The saturation properties, with the keys in SATURATION_PROPERTIES (e.g. "T_sat", "h_fg"). None if the pressure is above the critical pressure.
+        """
+        if p > self.p_critical:
+            return None
+
+        if p > self.p[-1]:
+            raise ValueError(f"Pressure ({p} Pa) is above the end of the saturation table ({self.p[-1]} Pa), but below the critical pressure ({self.p_critical} Pa). Extend the table closer to the critical pressure.")
+
+        # Interpolate every property at once, with the same weights
+        log_p = np.log(max(p, self.p[0]))
+        j = min(max(np.searchsorted(self._log_p, log_p) - 1, 0), len(self.p) - 2)
+        w = min(max((log_p - self._log_p[j]) / (self._log_p[j + 1] - self._log_p[j]), 0.0), 1.0)
+        values = (1 - w) * self._table[:, j] + w * self._table[:, j + 1]
+
+        return dict(zip(SATURATION_PROPERTIES, values.tolist()))
 
 # Solids
-CopperC106 = Material(E = 117e9, poisson = 0.34, alpha = 16.9e-6, k = 391.2)
-StainlessSteel304 = Material(E = 193e9, poisson = 0.29, alpha = 16e-6, k = 14.0)
-Graphite = Material(E = float('NaN'), poisson = float('NaN'), alpha = float('NaN'), k = 63.81001)
+CopperC106 = Material(E = 117e9, poisson = 0.34, alpha = 16.9e-6, k = 391.2, rho = 8940, cp = 385)
+StainlessSteel304 = Material(E = 193e9, poisson = 0.29, alpha = 16e-6, k = 14.0, rho = 8000, cp = 500)
+Graphite = Material(E = float('NaN'), poisson = float('NaN'), alpha = float('NaN'), k = 63.81001, rho = 1800, cp = 710)
 
 # Fluids
 Water = TransportProperties(Pr = 6.159, mu = 0.89307e-3, k = 0.60627, cp = 4181.38, rho =  997.085)         # Water at 298 K and 1 bar [1]
 Ethanol = TransportProperties(Pr = 16.152, mu = 1.0855e-3, k = 0.163526, cp = 2433.31, rho = 785.26)        # Ethanol at 298 K and 1 bar [1]
 CO2 = TransportProperties(mu = 3.74e-5, k =  0.0737, Pr = 0.72)                                             # Representative values for CO2 gas
 
-
+# Boiling
+WaterBoiling = NucleateBoiling(p = [1.0133e5, 2.455e5, 5.000e5, 9.319e5, 16.08e5, 26.40e5, 41.0e5, 61.2e5, 88.0e5, 123.5e5, 169.2e5, 190.9e5, 202.7e5, 215.1e5],  # Approximate values for saturated water [2], with C_sf for water on copper
+                               T_sat = [373.15, 400, 425, 450, 475, 500, 525, 550, 575, 600, 625, 635, 640, 645],
+                               h_fg = [2257e3, 2183e3, 2106e3, 2024e3, 1934e3, 1825e3, 1709e3, 1566e3, 1396e3, 1225e3, 875e3, 681e3, 553e3, 350e3],
+                               sigma = [58.9e-3, 53.6e-3, 48.4e-3, 42.9e-3, 37.3e-3, 31.5e-3, 25.6e-3, 19.7e-3, 13.9e-3, 8.4e-3, 3.3e-3, 1.57e-3, 0.81e-3, 0.18e-3],
+                               rho_l = [957.9, 937.2, 915.0, 890.5, 865.1, 835.4, 797.0, 756.0, 708.0, 650.0, 568.0, 517.0, 482.0, 425.0],
+                               rho_v = [0.5956, 1.368, 2.652, 4.789, 8.065, 13.07, 20.6, 31.6, 47.3, 72.5, 118.0, 151.3, 177.3, 224.2],
+                               mu_l = [279e-6, 217e-6, 177e-6, 152e-6, 134e-6, 118e-6, 107e-6, 97e-6, 88e-6, 81e-6, 72e-6, 64e-6, 57e-6, 48e-6],
+                               cp_l = [4217, 4256, 4312, 4400, 4510, 4660, 4840, 5240, 5800, 7000, 10100, 12500, 15800, 27000],
+                               Pr_l = [1.76, 1.34, 1.12, 0.99, 0.91, 0.86, 0.84, 0.86, 0.91, 1.1, 1.6, 1.9, 2.2, 3.4],
+                               mu_v = [12.02e-6, 13.05e-6, 13.96e-6, 14.85e-6, 15.75e-6, 16.59e-6, 17.6e-6, 18.6e-6, 19.7e-6, 22.7e-6, 25.9e-6, 28.0e-6, 30.0e-6, 33.5e-6],
+                               k_v = [0.0248, 0.0272, 0.0298, 0.0331, 0.0369, 0.0423, 0.049, 0.056, 0.065, 0.079, 0.100, 0.122, 0.141, 0.175],
+                               C_sf = 0.013, 
+                               n = 1.0, 
+                               p_critical = 220.64e5)
@@ -0,0 +1,594 @@
+"""
+Flow distribution between groups of parallel cooling channels, fed by an inlet manifold and collected by an outlet manifold. Used by Engine.network_analysis().
+
+A CoolingJacket assumes that the coolant is split evenly between identical channels. Here, the channels are split into ChannelGroups (in order around the manifolds), which can each
+have a different geometry. The inlet manifold, the outlet manifold and the channel groups form a hydraulic network, which is solved for the pressure at every manifold junction and the
+mass flow rate through every manifold segment and channel group, with damped Newton iterations on a sparse Jacobian.
+
+Every channel group that uses the same CoolingJacket shares a 'characteristic' - the results of steady heating analyses of that CoolingJacket at a few mass flow rates per channel.
+The pressure drop through each group, and its wall and coolant temperatures, are interpolated from its characteristic (in log(mdot)). Hundreds of channel groups therefore only need
+a handful of analyses for each distinct channel design, rather than one analysis each. If the solved flow through a group is outside the range of its characteristic, another analysis
+is added and the network is solved again. Each analysis is warm-started from the nearest existing one, and all the analyses of a design share the same cached cooling jacket and wall
+geometry (see cusfbamboo.throttle.cache_geometry()). The exhaust gas Mach numbers are cached by the Engine, so are shared between every design.
+
+Example:
+    narrow = cusfbamboo.CoolingJacket(..., number_of_channels = 120)
+    wide = cusfbamboo.CoolingJacket(..., number_of_channels = 80)
+    groups = [cusfbamboo.network.ChannelGroup(narrow, channels = 3) for n in range(20)] + [cusfbamboo.network.ChannelGroup(wide, channels = 2) for n in range(30)]
+    manifold = cusfbamboo.network.Manifold(area = 1e-4, segment_length = 5e-3)
+    network = cusfbamboo.network.FlowNetwork(groups, inlet_manifold = manifold, outlet_manifold = manifold, inlet_port = 0, outlet_port = -1)
+    results = engine.network_analysis(network, mdot_coolant = 0.5)
+    results["flow_ratio"][g]        # Flow per channel in group g, divided by the mean flow per channel
+    results["T_hw"][g][i]           # Hot side wall temperature of group g at x[i]
+
+Notes:
+ - Only 'vertical' channels are supported. The CoolingJacket of a group describes the shape of its channels as if they covered the whole circumference, so its 'number_of_channels'
+   sets the size of each channel. Its inlet conditions (T_coolant_in, p_coolant_in and mdot_coolant) are not used.
+ - Each channel is analysed as if its neighbours had the same flow, i.e. there is no heat transfer between channel groups.
+ - The characteristics are found at the network inlet pressure, so the (usually small) effect of the manifold pressure losses on the coolant properties is ignored.
+ - The manifold losses are modelled with a friction factor and a minor loss coefficient for each segment. Changes in static pressure due to the changing velocity along the manifolds
+   (i.e. pressure recovery) are not modelled separately, but can be included in the loss coefficient.
+"""
+
+import copy
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+import warnings
+
+import cusfbamboo.engine
+import cusfbamboo.throttle
+
+PROFILE_KEYS = ["T_hw", "T_cw", "T_coolant", "dp_coolant", "V_coolant", "dQ_dA"]       # Values at each grid point that are interpolated for each channel group
+
+class Manifold:
+    def __init__(self, area, segment_length, hydraulic_diameter = None, loss_coefficient = 0.0):
+        """Class for representing an inlet or outlet manifold, which is split into segments between the junctions with neighbouring channel groups.
+
+        Args:
+            area (float): Flow area of the manifold (m2).
+            segment_length (float or list): Length of the manifold between neighbouring channel groups (m). Can be a list with a value for each segment.
+            hydraulic_diameter (float, optional): Hydraulic diameter of the manifold (m). Defaults to None, in which case a circular cross section is assumed.
+            loss_coefficient (float or list, optional): Minor loss coefficient of each segment, based on the dynamic pressure in the manifold (e.g. for bends or junctions).
+                Can be a list with a value for each segment. Defaults to 0.
+        """
+        assert area > 0, "'area' must be positive"
+
+        self.area = area
+        self.segment_length = segment_length
+        self.hydraulic_diameter = (4 * area / np.pi)**0.5 if hydraulic_diameter is None else hydraulic_diameter
+        self.loss_coefficient = loss_coefficient
+
+    def f_darcy(self, ReDh):
+        """Darcy friction factor for a smooth walled manifold, with the same laminar and turbulent correlations as a CoolingJacket.
+
+        Args:
+            ReDh (numpy.ndarray): Reynolds number based on the hydraulic diameter, for each segment.
+
+        Returns:
+            numpy.ndarray: Darcy friction factor for each segment.
+        """
+        ReDh = np.maximum(ReDh, 1.0)
+        f_laminar = 64.0 / ReDh
+        f_turbulent = (0.79 * np.log(np.maximum(ReDh, cusfbamboo.engine.REDH_TURBULENT)) - 1.64)**(-2)
+
+        # "Blend" between the laminar and turbulent region
+        blend = np.clip((ReDh - cusfbamboo.engine.REDH_LAMINAR) / (cusfbamboo.engine.REDH_TURBULENT - cusfbamboo.engine.REDH_LAMINAR), 0.0, 1.0)
+
+        return (1 - blend) * f_laminar + blend * f_turbulent
+
+    def pressure_drop(self, mdot, rho, mu):
+        """Pressure drop along each segment, and its derivative with respect to the segment mass flow rate. The friction factor is treated as a constant in the derivative.
+
+        Args:
+            mdot (numpy.ndarray): Mass flow rate through each segment (kg/s). Can be negative for reversed flow.
+            rho (float): Coolant density (kg/m3).
+            mu (float): Coolant absolute viscosity (Pa s).
+
+        Returns:
+            tuple: (dp, ddp_dmdot) - the pressure drop in the direction of positive flow (Pa), and its derivative (Pa s/kg), for each segment.
+        """
+        mdot = np.asarray(mdot, dtype = float)
+        ReDh = np.abs(mdot) * self.hydraulic_diameter / (mu * self.area)
+        zeta = self.f_darcy(ReDh) * np.asarray(self.segment_length) / self.hydraulic_diameter + np.asarray(self.loss_coefficient)
+        zeta = np.broadcast_to(zeta, mdot.shape)
+
+        dp = zeta * mdot * np.abs(mdot) / (2 * rho * self.area**2)
+        ddp_dmdot = zeta * np.abs(mdot) / (rho * self.area**2)
+
+        return dp, ddp_dmdot
+
+class ChannelGroup:
+    def __init__(self, cooling_jacket, channels, loss_coefficient = 0.0):
+        """Class for representing a group of identical, neighbouring cooling channels, that are connected to the same junction of the inlet and outlet manifolds.
+
+        Args:
+            cooling_jacket (CoolingJacket): Cooling jacket that describes the shape of the channels, as if they covered the whole circumference. Must have 'vertical' channels. Groups that use the
+                same CoolingJacket object share its characteristic, so the same object should be reused for identical channels.
+            channels (int): Number of channels in the group.
+            loss_coefficient (float, optional): Minor loss coefficient for the entry to and exit from each channel (e.g. an inlet orifice), based on the dynamic pressure at the channel inlet.
+                Defaults to 0.
+        """
+        assert cooling_jacket.configuration == "vertical", "Only 'vertical' cooling channels can be used in a ChannelGroup"
+        assert getattr(cooling_jacket, "number_of_channels", 0) >= 1, "The CoolingJacket of a ChannelGroup must have 'number_of_channels' of at least 1"
+        assert type(channels) is int and channels >= 1, "'channels' must be an integer that is at least 1"
+
+        self.cooling_jacket = cooling_jacket
+        self.channels = channels
+        self.loss_coefficient = loss_coefficient
+
+class FlowNetwork:
+    def __init__(self, groups, inlet_manifold, outlet_manifold, inlet_port = 0, outlet_port = -1):
+        """Class for representing the hydraulic network of an inlet manifold, an outlet manifold and the channel groups between them. Channel group 'g' connects junction 'g' of the inlet
+        manifold to junction 'g' of the outlet manifold.
+
+        Args:
+            groups (list): List of ChannelGroups, in order along the manifolds.
+            inlet_manifold (Manifold): The inlet manifold.
+            outlet_manifold (Manifold): The outlet manifold.
+            inlet_port (int, optional): Index of the junction where the coolant enters the inlet manifold. Defaults to 0.
+            outlet_port (int, optional): Index of the junction where the coolant leaves the outlet manifold. Defaults to -1, which (with inlet_port = 0) is a 'Z' configuration.
+                Use outlet_port = 0 for a 'U' configuration.
+        """
+        assert len(groups) >= 1, "'groups' must contain at least one ChannelGroup"
+
+        for group in groups:
+            assert isinstance(group, ChannelGroup), f"Every item of 'groups' must be a ChannelGroup, not {type(group)}"
+
+        for manifold in [inlet_manifold, outlet_manifold]:
+            for value in [manifold.segment_length, manifold.loss_coefficient]:
+                assert np.ndim(value) == 0 or len(value) == len(groups) - 1, f"Manifold segment values must be a float, or a list with a value for each of the {len(groups) - 1} segments"
+
+        self.groups = groups
+        self.inlet_manifold = inlet_manifold
+        self.outlet_manifold = outlet_manifold
+        self.inlet_port = range(len(groups))[inlet_port]
+        self.outlet_port = range(len(groups))[outlet_port]
+
+        # Node 'n' is junction n of the inlet manifold, and node N + n is junction n of the outlet manifold
+        # Edges are the inlet manifold segments, then the outlet manifold segments, then the channel groups - all directed from the lower numbered node
+        N = len(groups)
+        segments = np.arange(N - 1)
+        self.tails = np.concatenate([segments, N + segments, np.arange(N)])
+        self.heads = np.concatenate([segments + 1, N + segments + 1, N + np.arange(N)])
+
+        edges = np.arange(len(self.tails))
+        self.incidence = scipy.sparse.coo_matrix((np.concatenate([np.ones(len(edges)), -np.ones(len(edges))]), (np.concatenate([self.heads, self.tails]), np.concatenate([edges, edges]))),
+                                                 shape = (2 * N, len(edges))).tocsr()
+
+    def initial_flows(self, mdot_groups):
+        """Manifold segment flows that satisfy continuity, for a given flow through each channel group.
+
+        Args:
+            mdot_groups (numpy.ndarray): Mass flow rate through each channel group (kg/s).
+
+        Returns:
+            numpy.ndarray: Mass flow rate through each edge (kg/s), i.e. the inlet manifold segments, then the outlet manifold segments, then the channel groups.
+        """
+        before = np.cumsum(mdot_groups)[:-1]             # Total flow through the groups up to and including each segment's first junction
+        after = np.sum(mdot_groups) - before
+
+        segments = np.arange(len(mdot_groups) - 1)
+        inlet = np.where(segments >= self.inlet_port, after, -before)
+        outlet = np.where(segments < self.outlet_port, before, -after)
+
+        return np.concatenate([inlet, outlet, mdot_groups])
+
+def solve_flow_split(network, mdot_coolant, p_coolant_in, group_pressure_drop, inlet_properties, outlet_properties, mdot_groups = None, tol = 1e-10, max_iter = 100):
+    """Solve a FlowNetwork for the pressure at every junction and the mass flow rate through every edge, with damped Newton iterations.
+
+    Note:
+        The unknowns are the junction pressures and the edge mass flow rates. The equations are conservation of mass at every junction (apart from the inlet port, where the pressure is
+        fixed instead), and the pressure drop along every edge.
+
+    Args:
+        network (FlowNetwork): The network.
+        mdot_coolant (float): Total coolant mass flow rate (kg/s).
+        p_coolant_in (float): Coolant static pressure at the inlet port (Pa).
+        group_pressure_drop (callable): Function of the mass flow rate through each channel group (numpy.ndarray), which returns the pressure drop through each group and its derivative,
+            i.e. (dp, ddp_dmdot).
+        inlet_properties (tuple): (density, absolute viscosity) of the coolant in the inlet manifold (kg/m3, Pa s).
+        outlet_properties (tuple): (density, absolute viscosity) of the coolant in the outlet manifold (kg/m3, Pa s).
+        mdot_groups (numpy.ndarray, optional): Initial guess of the flow through each channel group (kg/s). Defaults to None, in which case the flow is split evenly between channels.
+        tol (float, optional): Tolerance on the residuals, relative to the total mass flow rate and the mean channel group pressure drop. Defaults to 1e-10.
+        max_iter (int, optional): Maximum number of Newton iterations. Defaults to 100.
+
+    Returns:
+        dict: "p" (pressure at each junction, with the inlet manifold first), "mdot" (mass flow rate through each edge, with the inlet manifold segments, then the outlet manifold
+        segments, then the channel groups) and "iterations".
+    """
+    N = len(network.groups)
+    nodes = 2 * N
+
+    if mdot_groups is None:
+        channels = np.array([group.channels for group in network.groups])
+        mdot_groups = mdot_coolant * channels / np.sum(channels)
+
+    mdot = network.initial_flows(np.asarray(mdot_groups, dtype = float))
+    p = np.full(nodes, float(p_coolant_in))
+
+    source = np.zeros(nodes)
+    source[network.inlet_port] += mdot_coolant
+    source[N + network.outlet_port] -= mdot_coolant
+
+    # The mass balance at the inlet port is replaced by its fixed pressure (the total mass balance makes it redundant)
+    keep = np.ones(nodes)
+    keep[network.inlet_port] = 0.0
+    incidence = scipy.sparse.diags(keep) @ network.incidence
+    fixed = scipy.sparse.coo_matrix(([1.0], ([network.inlet_port], [network.inlet_port])), shape = (nodes, nodes))
+
+    dp_scale = np.mean(np.abs(group_pressure_drop(mdot[-N:])[0]))
+    scale = np.concatenate([np.full(nodes, 1.0 / mdot_coolant), np.full(len(mdot), 1.0 / dp_scale)])
+    scale[network.inlet_port] = 1.0 / dp_scale
+
+    def residuals(p, mdot):
+        dp_inlet, ddp_inlet = network.inlet_manifold.pressure_drop(mdot[:N - 1], *inlet_properties)
+        dp_outlet, ddp_outlet = network.outlet_manifold.pressure_drop(mdot[N - 1:2 * N - 2], *outlet_properties)
+        dp_groups, ddp_groups = group_pressure_drop(mdot[-N:])
+
+        mass = incidence @ mdot + source * keep
+        mass[network.inlet_port] = p[network.inlet_port] - p_coolant_in
+        edges = p[network.tails] - p[network.heads] - np.concatenate([dp_inlet, dp_outlet, dp_groups])
+
+        return np.concatenate([mass, edges]), np.concatenate([ddp_inlet, ddp_outlet, ddp_groups])
+
+    F, ddp = residuals(p, mdot)
+    norm = np.max(np.abs(F * scale))
+    iterations = 0
+
+    while norm > tol and iterations < max_iter:
+        # Stop the Jacobian from being singular when a manifold segment has no flow
+        ddp = np.maximum(ddp, 1e-6 * dp_scale / mdot_coolant)
+
+        J = scipy.sparse.bmat([[fixed, incidence], [-network.incidence.T, -scipy.sparse.diags(ddp)]], format = "csc")
+        step = scipy.sparse.linalg.spsolve(J, -F)
+
+        # Backtracking line search
+        damping = 1.0
+
+        while True:
+            p_new = p + damping * step[:nodes]
+            mdot_new = mdot + damping * step[nodes:]
+            F_new, ddp_new = residuals(p_new, mdot_new)
+            norm_new = np.max(np.abs(F_new * scale))
+
+            if norm_new < norm or damping < 1e-3:
+                break
+
+            damping /= 2
+
+        p, mdot, F, ddp, norm = p_new, mdot_new, F_new, ddp_new, norm_new
+        iterations += 1
+
+    if norm > tol:
+        warnings.warn(f"Flow network did not converge after {iterations} iterations (scaled residual = {norm:.3g})", stacklevel = 2)
+
+    return {"p" : p, "mdot" : mdot, "iterations" : iterations}
+
+class Characteristic:
+    def __init__(self, engine, cooling_jacket, coolant_inlet, analysis_kwargs, iter_each_warm = 1):
+        """Results of steady heating analyses of one channel design at a range of mass flow rates per channel, for interpolating the behaviour of every channel group that uses it.
+
+        Args:
+            engine (Engine): The Engine being analysed.
+            cooling_jacket (CoolingJacket): Cooling jacket that describes the channel design.
+            coolant_inlet (dict): Coolant inlet temperature and pressure ("T_coolant_in" and "p_coolant_in").
+            analysis_kwargs (dict): Keyword arguments for Engine.steady_heating_analysis().
+            iter_each_warm (int, optional): Number of iterations at each grid point, for analyses that are warm-started from an existing one. Defaults to 1.
+
+        Attributes:
+            mdot (numpy.ndarray): Mass flow rates per channel that have been analysed (kg/s), in increasing order.
+            results (list): Results from Engine.steady_heating_analysis(), for each value in 'mdot'.
+            T_out (numpy.ndarray): Coolant outlet temperature (K), for each value in 'mdot'.
+            Q (numpy.ndarray): Heat transfer rate into the coolant of one channel (W), for each value in 'mdot'.
+            profiles (dict): Values at each grid point (see PROFILE_KEYS), with shape (len(mdot), grid points).
+        """
+        design_engine = copy.copy(engine)
+
+        if hasattr(design_engine, "cooling_jackets"):
+            del design_engine.cooling_jackets
+
+        design_engine.cooling_jacket = cooling_jacket
+
+        self.engine = cusfbamboo.throttle.cache_geometry(design_engine)
+        self.cooling_jacket = cooling_jacket
+        self.coolant_inlet = coolant_inlet
+        self.analysis_kwargs = analysis_kwargs
+        self.iter_each_warm = iter_each_warm
+        self.mdot = np.array([])
+        self.results = []
+
+    def add(self, mdot_channel):
+        """Run a steady heating analysis at a mass flow rate per channel, warm-started from the nearest existing analysis.
+
+        Args:
+            mdot_channel (float): Mass flow rate per channel (kg/s).
+        """
+        kwargs = dict(self.analysis_kwargs, coolant_inlet = dict(self.coolant_inlet, mdot_coolant = mdot_channel * self.cooling_jacket.number_of_channels))
+
+        if self.results:
+            kwargs["initial_guess"] = self.results[np.argmin(np.abs(np.log(self.mdot / mdot_channel)))]
+            kwargs["iter_each"] = self.iter_each_warm
+
+        result = self.engine.steady_heating_analysis(**kwargs)
+
+        index = np.searchsorted(self.mdot, mdot_channel)
+        self.mdot = np.insert(self.mdot, index, mdot_channel)
+        self.results.insert(index, result)
+
+        # Values that are interpolated later
+        self._log_mdot = np.log(self.mdot)
+        self._log_dp = np.log([self.coolant_inlet["p_coolant_in"] - result["p_coolant"][-1] for result in self.results])
+        self.profiles = {key : np.array([self._profile(result, key) for result in self.results]) for key in PROFILE_KEYS}
+        self.T_out = np.array([result["T_coolant"][-1] for result in self.results])
+        self.Q = np.array([self._heat(result) for result in self.results]) / self.cooling_jacket.number_of_channels
+
+    def _heat(self, result):
+        # Trapezium rule integral of dQ_dx over the length of the cooling jacket
+        dQ_dx = np.asarray(result["dQ_dx"])
+        return np.sum((dQ_dx[1:] + dQ_dx[:-1]) / 2 * np.abs(np.diff(result["x"])))
+
+    def _profile(self, result, key):
+        if key == "T_hw":
+            return [T[-2] for T in result["T"]]
+
+        elif key == "T_cw":
+            return [T[1] for T in result["T"]]
+
+        elif key == "dp_coolant":
+            return [self.coolant_inlet["p_coolant_in"] - p for p in result["p_coolant"]]
+
+        else:
+            return result[key]
+
+    def pressure_drop(self, mdot_channel):
+        """Pressure drop through a channel (from the inlet to the outlet of the cooling jacket), with piecewise linear interpolation in log(mdot) and log(dp). Values outside the range of
+        'mdot' are extrapolated, with the pressure drop proportional to the mass flow rate below 1/1000 of the lowest value (so that the network iterations can pass through zero flow).
+
+        Args:
+            mdot_channel (numpy.ndarray): Mass flow rate per channel (kg/s).
+
+        Returns:
+            tuple: (dp, ddp_dmdot) - the pressure drop (Pa) and its derivative (Pa s/kg).
+        """
+        assert len(self.mdot) >= 2, "A Characteristic needs at least two analyses to interpolate between"
+
+        mdot_channel = np.asarray(mdot_channel, dtype = float)
+        floor = self.mdot[0] * 1e-3
+        log_mdot = np.log(np.maximum(mdot_channel, floor))
+
+        i = np.clip(np.searchsorted(self._log_mdot, log_mdot) - 1, 0, len(self.mdot) - 2)
+        slope = (self._log_dp[i + 1] - self._log_dp[i]) / (self._log_mdot[i + 1] - self._log_mdot[i])
+        dp = np.exp(self._log_dp[i] + slope * (log_mdot - self._log_mdot[i]))
+        ddp_dmdot = slope * dp / np.exp(log_mdot)
+
+        below = mdot_channel < floor
+        ddp_dmdot = np.where(below, dp / floor, ddp_dmdot)
+        dp = np.where(below, dp * mdot_channel / floor, dp)
+
+        return dp, ddp_dmdot
+
+    def weights(self, mdot_channel):
+        """Linear interpolation weights in log(mdot). Values outside the range of 'mdot' are clipped to it.
+
+        Args:
+            mdot_channel (numpy.ndarray): Mass flow rate per channel (kg/s).
+
+        Returns:
+            tuple: (i, u) - the index of the analysis below each value, and the weight of the analysis above it.
+        """
+        position = np.interp(np.log(np.maximum(mdot_channel, self.mdot[0])), self._log_mdot, np.arange(len(self.mdot)))
+        i = np.minimum(position.astype(int), len(self.mdot) - 2)
+
+        return i, position - i
+
+    def interpolate(self, values, mdot_channel):
+        """Interpolate a value for each mass flow rate per channel.
+
+        Args:
+            values (numpy.ndarray): Values for each analysis in 'results', with the analysis as the first index.
+            mdot_channel (numpy.ndarray): Mass flow rate per channel (kg/s).
+
+        Returns:
+            numpy.ndarray: The interpolated values, with the mass flow rate as the first index.
+        """
+        i, u = self.weights(mdot_channel)
+        u = u.reshape(u.shape + (1,) * (values.ndim - 1))
+
+        return (1 - u) * values[i] + u * values[i + 1]
+
+def network_analysis(engine, network, mdot_coolant, T_coolant_in = None, p_coolant_in = None, samples = 5, spread = 1.5, iter_each_warm = 1, max_outer = 10, **kwargs):
+    """Solve for the flow split between the channel groups of a FlowNetwork, and the resulting temperatures in each group. See Engine.network_analysis().
+
+    Args:
+        engine (Engine): The Engine to analyse.
+        network (FlowNetwork): The manifolds and channel groups.
+        mdot_coolant (float): Total coolant mass flow rate into the inlet manifold (kg/s).
+        T_coolant_in (float, optional): Coolant inlet static temperature (K). Defaults to None, in which case the value for the first channel group's CoolingJacket is used.
+        p_coolant_in (float, optional): Coolant static pressure at the inlet port (Pa). Defaults to None, in which case the value for the first channel group's CoolingJacket is used.
+        samples (int, optional): Number of analyses of each channel design to start with. Defaults to 5.
+        spread (float, optional): The starting analyses are spaced evenly in log(mdot), from the mean flow per channel divided by 'spread' to the mean flow multiplied by 'spread'. Defaults to 1.5.
+        iter_each_warm (int, optional): Number of iterations at each grid point, for analyses that are warm-started from an existing one. Defaults to 1.
+        max_outer (int, optional): Maximum number of times to solve the network, while adding analyses and updating the outlet manifold properties. Defaults to 10.
+
+    Keyword Args:
+        Any other keyword arguments for Engine.steady_heating_analysis() (e.g. num_grid, counterflow), apart from 'summary_only', 'coolant_inlet', 'initial_guess' and 'checkpoint'.
+
+    Returns:
+        dict: Results for the network. Descriptions are stored in the "info" key.
+    """
+    for key in ["summary_only", "coolant_inlet", "initial_guess", "checkpoint"]:
+        assert key not in kwargs, f"'{key}' is set by the network analysis, so cannot be given"
+
+    assert type(samples) is int and samples >= 2, "'samples' must be an integer that is at least 2"
+    assert spread > 1, "'spread' must be greater than 1"
+
+    first_jacket = network.groups[0].cooling_jacket
+    T_coolant_in = first_jacket.T_coolant_in if T_coolant_in is None else T_coolant_in
+    p_coolant_in = first_jacket.p_coolant_in if p_coolant_in is None else p_coolant_in
+    coolant_transport = first_jacket.coolant_transport
+
+    N = len(network.groups)
+    channels = np.array([group.channels for group in network.groups], dtype = float)
+    loss_coefficients = np.array([group.loss_coefficient for group in network.groups], dtype = float)
+    mdot_mean = mdot_coolant / np.sum(channels)
+
+    # One characteristic for each distinct CoolingJacket, shared by every group that uses it
+    characteristics = {}
+    design_groups = {}
+
+    for g, group in enumerate(network.groups):
+        key = id(group.cooling_jacket)
+
+        if key not in characteristics:
+            characteristics[key] = Characteristic(engine = engine, cooling_jacket = group.cooling_jacket, coolant_inlet = {"T_coolant_in" : T_coolant_in, "p_coolant_in" : p_coolant_in},
+                                                  analysis_kwargs = kwargs, iter_each_warm = iter_each_warm)
+            design_groups[key] = []
+
+        design_groups[key].append(g)
+
+    design_groups = {key : np.array(indices) for key, indices in design_groups.items()}
+
+    for characteristic in characteristics.values():
+        # Start from the mean flow, so that the others can be warm-started outwards from it
+        for mdot_channel in sorted(mdot_mean * spread**np.linspace(-1, 1, samples), key = lambda mdot_channel : abs(np.log(mdot_channel / mdot_mean))):
+            characteristic.add(mdot_channel)
+
+    x = np.array(next(iter(characteristics.values())).results[0]["x"])
+
+    for characteristic in characteristics.values():
+        assert len(characteristic.results[0]["x"]) == len(x) and np.allclose(characteristic.results[0]["x"], x), \
+            "Every CoolingJacket in the network must cover the same range of x"
+
+    # Flow area of each channel at its inlet, for the channel entry and exit losses
+    A_channel = np.empty(N)
+
+    for key, indices in design_groups.items():
+        characteristic = characteristics[key]
+        A_channel[indices] = characteristic.engine.A_coolant(x[0]) / characteristic.cooling_jacket.number_of_channels
+
+    rho_in = coolant_transport.rho(T = T_coolant_in, p = p_coolant_in)
+    inlet_properties = (rho_in, coolant_transport.mu(T = T_coolant_in, p = p_coolant_in))
+
+    def group_pressure_drop(mdot_groups):
+        mdot_channel = mdot_groups / channels
+        dp = loss_coefficients * mdot_channel * np.abs(mdot_channel) / (2 * rho_in * A_channel**2)
+        ddp_dmdot = loss_coefficients * np.abs(mdot_channel) / (rho_in * A_channel**2)
+
+        for key, indices in design_groups.items():
+            dp_channel, ddp_channel = characteristics[key].pressure_drop(mdot_channel[indices])
+            dp[indices] += dp_channel
+            ddp_dmdot[indices] += ddp_channel
+
+        return dp, ddp_dmdot / channels
+
+    def group_values(values, mdot_channel):
+        # Interpolate values from each design's characteristic, for every group
+        output = None
+
+        for key, indices in design_groups.items():
+            interpolated = characteristics[key].interpolate(values(characteristics[key]), mdot_channel[indices])
+
+            if output is None:
+                output = np.empty((N,) + interpolated.shape[1:])
+
+            output[indices] = interpolated
+
+        return output
+
+    T_mixed = T_coolant_in
+    mdot_groups = None
+    iterations = 0
+
+    for outer in range(max_outer):
+        p_outlet = p_coolant_in - np.mean(group_pressure_drop(mdot_coolant * channels / np.sum(channels))[0])
+        outlet_properties = (coolant_transport.rho(T = T_mixed, p = p_outlet), coolant_transport.mu(T = T_mixed, p = p_outlet))
+
+        solution = solve_flow_split(network = network, mdot_coolant = mdot_coolant, p_coolant_in = p_coolant_in, group_pressure_drop = group_pressure_drop,
+                                    inlet_properties = inlet_properties, outlet_properties = outlet_properties, mdot_groups = mdot_groups)
+
+        iterations += solution["iterations"]
+        mdot_groups = solution["mdot"][-N:]
+        mdot_channel = mdot_groups / channels
+
+        # Extend any characteristics that do not cover the solved flows
+        extended = False
+
+        for key, indices in design_groups.items():
+            characteristic = characteristics[key]
+            lowest = np.min(mdot_channel[indices])
+            highest = np.max(mdot_channel[indices])
+
+            if lowest <= 0:
+                warnings.warn(f"The flow through a channel group is reversed or zero (mdot = {lowest:.3g} kg/s per channel), so its temperatures are not reliable", stacklevel = 2)
+
+            elif lowest < characteristic.mdot[0] * (1 - 1e-6):
+                characteristic.add(lowest / 1.1)
+                extended = True
+
+            if highest > characteristic.mdot[-1] * (1 + 1e-6):
+                characteristic.add(highest * 1.1)
+                extended = True
+
+        T_out = group_values(lambda characteristic : characteristic.T_out, mdot_channel)
+        T_mixed_new = np.sum(mdot_groups * T_out) / mdot_coolant
+        converged = not extended and abs(T_mixed_new - T_mixed) < 1e-3
+        T_mixed = T_mixed_new
+
+        if converged:
+            break
+
+    else:
+        warnings.warn(f"Flow network analysis did not converge after {max_outer} solutions of the network", stacklevel = 2)
+
+    p = solution["p"]
+    mdot = solution["mdot"]
+    dp_groups = group_pressure_drop(mdot_groups)[0]
+    dp_entry = loss_coefficients * mdot_channel * np.abs(mdot_channel) / (2 * rho_in * A_channel**2)
+
+    results = {"x" : x,
+               "mdot" : mdot_groups,
+               "mdot_channel" : mdot_channel,
+               "flow_ratio" : mdot_channel / mdot_mean,
+               "dp" : dp_groups,
+               "p_inlet_manifold" : p[:N],
+               "p_outlet_manifold" : p[N:],
+               "mdot_inlet_manifold" : mdot[:N - 1],
+               "mdot_outlet_manifold" : mdot[N - 1:2 * N - 2],
+               "p_coolant_out" : p[N + network.outlet_port],
+               "T_coolant_out" : T_out,
+               "T_coolant_mixed" : T_mixed,
+               "Q" : group_values(lambda characteristic : characteristic.Q, mdot_channel) * channels}
+
+    for key in PROFILE_KEYS:
+        results[key] = group_values(lambda characteristic : characteristic.profiles[key], mdot_channel)
+
+    results["p_coolant"] = p[:N, np.newaxis] - dp_entry[:, np.newaxis] - results.pop("dp_coolant")
+    results["T_hw_max"] = np.max(results["T_hw"], axis = 1)
+    results["analyses"] = sum(len(characteristic.results) for characteristic in characteristics.values())
+    results["iterations"] = iterations
+
+    results["info"] = {"x" : "Axial position along the engine (m), in the order the coolant flows through it, which is the same for every channel group.",
+                       "mdot" : "Coolant mass flow rate through each channel group (kg/s). mdot[g] is the value for network.groups[g].",
+                       "mdot_channel" : "Coolant mass flow rate through each channel of each channel group (kg/s).",
+                       "flow_ratio" : "Mass flow rate per channel of each channel group, divided by the mean mass flow rate per channel of the whole network.",
+                       "dp" : "Static pressure drop through each channel group, from the inlet manifold to the outlet manifold (Pa).",
+                       "p_inlet_manifold" : "Static pressure at each junction of the inlet manifold (Pa). p_inlet_manifold[g] is the value where network.groups[g] is connected.",
+                       "p_outlet_manifold" : "Static pressure at each junction of the outlet manifold (Pa). p_outlet_manifold[g] is the value where network.groups[g] is connected.",
+                       "mdot_inlet_manifold" : "Mass flow rate through each segment of the inlet manifold (kg/s), positive from junction g to junction g + 1.",
+                       "mdot_outlet_manifold" : "Mass flow rate through each segment of the outlet manifold (kg/s), positive from junction g to junction g + 1.",
+                       "p_coolant_out" : "Coolant static pressure at the outlet port (Pa).",
+                       "T_coolant_out" : "Coolant static temperature at the outlet of each channel group (K).",
+                       "T_coolant_mixed" : "Mass-weighted mean coolant temperature in the outlet manifold (K).",
+                       "Q" : "Total heat transfer rate into the coolant of each channel group (W).",
+                       "T_hw" : "Hot side (exhaust gas side) wall temperature (K). T_hw[g][i] is the value for channel group g at x[i].",
+                       "T_cw" : "Cold side (coolant side) wall temperature (K). T_cw[g][i] is the value for channel group g at x[i].",
+                       "T_coolant" : "Coolant static temperature (K). T_coolant[g][i] is the value for channel group g at x[i].",
+                       "p_coolant" : "Coolant static pressure (Pa). p_coolant[g][i] is the value for channel group g at x[i].",
+                       "V_coolant" : "Coolant velocity (m/s). V_coolant[g][i] is the value for channel group g at x[i].",
+                       "dQ_dA" : "Heat transfer rate per unit chamber area at the innermost wall (W/m2), if the whole circumference had the channels of group g. dQ_dA[g][i] is the value at x[i].",
+                       "T_hw_max" : "Maximum hot side wall temperature of each channel group (K).",
+                       "analyses" : "Number of steady heating analyses that were run, over every channel design.",
+                       "iterations" : "Total number of Newton iterations used to solve the network."}
+
+    return results
@@ -0,0 +1,184 @@
+"""
+Opt-in profiling of heating analyses, to find out where the time goes.
+
+A Profiler wraps the callbacks of a cusfbamboo.hx.HXSolver (or HXNewtonSolver) and the methods of TransportProperties objects with counters and timers. Nothing is wrapped unless a
+Profiler is used, so there is no overhead otherwise.
+
+Example:
+    results = engine.steady_heating_analysis(num_grid = 1000, profile = True)
+    results["profile"]["callbacks"]["Rdx"]          # {"calls" : ..., "time" : ...}
+
+    profiler = cusfbamboo.profiling.Profiler()
+    for row in engine.iter_heating_analysis(num_grid = 1000, profiler = profiler):
+        ...
+    print(profiler.summary())
+
+Notes:
+ - Callback times are inclusive, i.e. the time for "Rdx" includes the time spent evaluating the transport properties that it needs.
+ - Transport properties are profiled by temporarily replacing the methods of the TransportProperties objects themselves. If the same TransportProperties object (e.g. cusfbamboo.materials.Water)
+   is being used by another analysis at the same time, that analysis's property calls are also counted.
+"""
+
+import collections
+import contextlib
+import time
+
+SOLVER_CALLBACKS = ["T_h", "cp_c", "V_c", "A_c", "Rdx", "extra_dQ_dx", "dp_dx_f", "thermal_circuit"]
+TRANSPORT_PROPERTIES = ["Pr", "mu", "k", "cp", "rho", "gamma_coolant"]
+
+class Profiler:
+    """Collects call counts and timings from heating analyses.
+
+    Attributes:
+        calls (dict): Number of calls to each solver callback, in the form {name : calls}. "thermal_circuit" is the construction (and solution) of each ThermalCircuit.
+        times (dict): Cumulative wall time spent in each solver callback (s), in the form {name : time}.
+        property_calls (dict): Number of calls to each transport property, in the form {label : {property : calls}}.
+        iterations (dict): Number of iterations (HXSolver) or evaluations (HXNewtonSolver) at each grid point, in the form {grid point number : count}.
+        wall_time (float): Total wall time between start() and stop() (s).
+    """
+    def __init__(self):
+        self.calls = collections.defaultdict(int)
+        self.times = collections.defaultdict(float)
+        self.property_calls = {}
+        self.iterations = collections.defaultdict(int)
+        self.wall_time = 0.0
+        self._started = None
+
+    def start(self):
+        """
+        Start timing the total wall time.
+        """
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """
+        Stop timing the total wall time, and add it to 'wall_time'.
+        """
+        if self._started is not None:
+            self.wall_time += time.perf_counter() - self._started
+            self._started = None
+
+    def timed(self, name, function):
+        """Wrap a function so that its calls are counted and timed under 'name'.
+
+        Args:
+            name (str): Name to record the calls under.
+            function (callable): Function to wrap.
+
+        Returns:
+            callable: The wrapped function.
+        """
+        calls = self.calls
+        times = self.times
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[name] += time.perf_counter() - start
+                calls[name] += 1
+
+        return wrapper
+
+    def instrument(self, solver):
+        """Wrap the callbacks of a heat exchanger solver, and count the iterations at each grid point. Called by HXSolver and HXNewtonSolver when they are given a 'profiler'.
+
+        Args:
+            solver (HXSolver or HXNewtonSolver): The solver to instrument.
+        """
+        for name in SOLVER_CALLBACKS:
+            setattr(solver, name, self.timed(name, getattr(solver, name)))
+
+        iterations = self.iterations
+
+        if hasattr(solver, "iterate"):
+            iterate = solver.iterate
+
+            def counted_iterate():
+                iterations[solver.i] += 1
+                return iterate()
+
+            solver.iterate = counted_iterate
+
+        else:
+            evaluate = solver.evaluate
+
+            def counted_evaluate(i, z):
+                iterations[i] += 1
+                return evaluate(i, z)
+
+            solver.evaluate = counted_evaluate
+
+    @contextlib.contextmanager
+    def transport(self, transport, label):
+        """Context manager that counts the calls to each property of a TransportProperties object, under 'label', until the end of the 'with' block.
+
+        Args:
+            transport (TransportProperties): The object to profile.
+            label (str): Name to record the calls under (e.g. "coolant").
+        """
+        counts = self.property_calls.setdefault(label, {name : 0 for name in TRANSPORT_PROPERTIES})
+        patched = []
+
+        for name in TRANSPORT_PROPERTIES:
+            if name in vars(transport):
+                # Already being profiled (e.g. the same object is used for two labels)
+                continue
+
+            method = getattr(transport, name)
+
+            def counted(*args, _method = method, _name = name, **kwargs):
+                counts[_name] += 1
+                return _method(*args, **kwargs)
+
+            setattr(transport, name, counted)
+            patched.append(name)
+
+        try:
+            yield
+
+        finally:
+            for name in patched:
+                delattr(transport, name)
+
+    def report(self):
+        """Get the results as a dictionary.
+
+        Returns:
+            dict: Dictionary with the keys:
+                - "wall_time" - Total wall time (s).
+                - "callbacks" - {name : {"calls" : ..., "time" : ...}} for each solver callback, with cumulative (inclusive) times in seconds.
+                - "properties" - {label : {property : calls}} for each profiled TransportProperties object.
+                - "iterations" - List of the number of iterations at each grid point, in grid point order.
+        """
+        number_of_points = max(self.iterations.keys()) + 1 if self.iterations else 0
+
+        return {"wall_time" : self.wall_time,
+                "callbacks" : {name : {"calls" : self.calls[name], "time" : self.times[name]} for name in self.calls},
+                "properties" : {label : dict(counts) for label, counts in self.property_calls.items()},
+                "iterations" : [self.iterations.get(i, 0) for i in range(number_of_points)]}
+
+    def summary(self):
+        """Get a human readable table of the results.
+
+        Returns:
+            str: The table.
+        """
+        report = self.report()
+        lines = [f"Total wall time: {report['wall_time']:.4f} s", "", f"{'Callback':<20}{'Calls':>12}{'Time (s)':>12}{'Per call (us)':>16}"]
+
+        for name, value in sorted(report["callbacks"].items(), key = lambda item: -item[1]["time"]):
+            per_call = 1e6 * value["time"] / value["calls"] if value["calls"] else 0.0
+            lines.append(f"{name:<20}{value['calls']:>12}{value['time']:>12.4f}{per_call:>16.2f}")
+
+        for label, counts in report["properties"].items():
+            lines.append("")
+            lines.append(f"{label} property calls: " + ", ".join(f"{name} = {calls}" for name, calls in counts.items() if calls > 0))
+
+        if report["iterations"]:
+            lines.append("")
+            lines.append(f"Iterations per grid point: min = {min(report['iterations'])}, max = {max(report['iterations'])}, total = {sum(report['iterations'])}")
+
+        return "\n".join(lines)
@@ -0,0 +1,309 @@
+"""
+Property services, which let many analyses share a single property backend (e.g. CoolProp), with queries batched together to reduce the overhead of each call.
+
+A backend evaluates a property (e.g. "mu") for arrays of temperatures and pressures. A service sits in front of a backend, and answers queries from any number of threads:
+ - LocalPropertyService - Evaluates queries in this process, one at a time. Useful as a stand-in for testing, or when there is only one analysis running.
+ - ProcessPropertyService - Sends queries to a backend running in a separate worker process, over a pipe. Queries that arrive from different threads at around the same time
+   are sent together, as a single vectorised call to the backend.
+
+A service can then be used by an Engine through a normal TransportProperties object (see transport_properties()).
+
+Example:
+    with cusfbamboo.property_service.ProcessPropertyService(CoolPropBackend("Ethanol")) as service:
+        coolant_transport = cusfbamboo.property_service.transport_properties(service)
+        ...
+
+Notes:
+ - The backend is sent to the worker process when the service starts, so it must be picklable (CoolPropBackend only stores the fluid name, and sets up CoolProp in the worker).
+ - On Windows, a ProcessPropertyService must be started from within an 'if __name__ == "__main__":' block.
+"""
+
+import concurrent.futures
+import multiprocessing
+import queue
+import threading
+import time
+import numpy as np
+
+import cusfbamboo.materials
+
+PROPERTY_NAMES = ["Pr", "mu", "k", "cp", "rho", "gamma_coolant"]
+COOLPROP_OUTPUTS = {"Pr" : "PRANDTL", "mu" : "VISCOSITY", "k" : "CONDUCTIVITY", "cp" : "CPMASS", "rho" : "DMASS"}      # CoolProp output names for each property
+
+# Backends
+class TransportBackend:
+    def __init__(self, transport):
+        """Backend that evaluates the properties of an existing TransportProperties object. Mainly useful for testing.
+
+        Args:
+            transport (TransportProperties): The TransportProperties object to use.
+        """
+        self.transport = transport
+
+    def __call__(self, name, T, p):
+        function = getattr(self.transport, name)
+        return np.array([function(T = T[i], p = p[i]) for i in range(len(T))], dtype = float)
+
+class CoolPropBackend:
+    def __init__(self, fluid):
+        """Backend that uses CoolProp's PropsSI() function. Requires CoolProp to be installed (e.g. 'pip install CoolProp').
+
+        Args:
+            fluid (str): CoolProp fluid name, e.g. "Water" or "Ethanol".
+        """
+        self.fluid = fluid
+
+    def __call__(self, name, T, p):
+        try:
+            from CoolProp.CoolProp import PropsSI
+        except ImportError:
+            raise ImportError("CoolProp must be installed to use CoolPropBackend (e.g. 'pip install CoolProp')")
+
+        if name == "gamma_coolant":
+            return PropsSI("CPMASS", "T", T, "P", p, self.fluid) / PropsSI("CVMASS", "T", T, "P", p, self.fluid)
+
+        return np.asarray(PropsSI(COOLPROP_OUTPUTS[name], "T", T, "P", p, self.fluid), dtype = float)
+
+# Services
+class PropertyService:
+    """Base class for property services. Services can be used as context managers, in which case they are closed at the end of the 'with' block.
+    """
+    def query_many(self, name, T, p):
+        """Evaluate a property at several states at once.
+
+        Args:
+            name (str): Name of the property, e.g. "mu". Must be one of "Pr", "mu", "k", "cp", "rho" or "gamma_coolant".
+            T (array): Temperatures (K).
+            p (array): Pressures (Pa), with the same length as T.
+
+        Returns:
+            numpy.ndarray: The property at each state.
+        """
+        raise NotImplementedError
+
+    def query(self, name, T, p):
+        """Evaluate a property at a single state.
+
+        Args:
+            name (str): Name of the property, e.g. "mu".
+            T (float): Temperature (K).
+            p (float): Pressure (Pa).
+
+        Returns:
+            float: The property.
+        """
+        return float(self.query_many(name, [T], [p])[0])
+
+    def close(self):
+        """
+        Stop the service, and free any resources it uses.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _check(name, T, p):
+        assert name in PROPERTY_NAMES, f"Unrecognised property '{name}'. Try one of {PROPERTY_NAMES}"
+
+        T = np.asarray(T, dtype = float).ravel()
+        p = np.asarray(p, dtype = float).ravel()
+
+        assert len(T) == len(p), "'T' and 'p' must be the same length"
+
+        return T, p
+
+class LocalPropertyService(PropertyService):
+    def __init__(self, backend):
+        """Property service that evaluates queries in this process, one at a time (so backends that aren't thread-safe can still be used from several threads).
+
+        Args:
+            backend (callable): Property backend, called as backend(name, T, p) with arrays of temperatures and pressures (e.g. CoolPropBackend or TransportBackend).
+        """
+        self.backend = backend
+        self._lock = threading.Lock()
+
+    def query_many(self, name, T, p):
+        T, p = self._check(name, T, p)
+
+        with self._lock:
+            return np.asarray(self.backend(name, T, p), dtype = float)
+
+def _serve(backend, connection):
+    # Main loop of the worker process. Each message is a list of (name, T, p) queries, and the reply is either a list of result arrays, or an exception.
+    while True:
+        message = connection.recv()
+
+        if message is None:
+            break
+
+        try:
+            reply = [np.asarray(backend(name, T, p), dtype = float) for name, T, p in message]
+        except Exception as error:
+            reply = error
+
+        connection.send(reply)
+
+    connection.close()
+
+class ProcessPropertyService(PropertyService):
+    def __init__(self, backend, batch_window = 0.0, max_batch = 4096, context = None):
+        """Property service that evaluates queries in a separate worker process. Queries from all threads are collected by a dispatcher thread, and sent to the worker in batches,
+        with all the queries for the same property evaluated as a single vectorised call to the backend.
+
+        Args:
+            backend (callable): Property backend, called as backend(name, T, p) with arrays of temperatures and pressures (e.g. CoolPropBackend). Must be picklable.
+            batch_window (float, optional): Time to wait for more queries before sending a batch (s). Defaults to 0, in which case a batch contains all the queries that arrived
+                while the previous batch was being evaluated.
+            max_batch (int, optional): Maximum number of queries in a single batch. Defaults to 4096.
+            context (multiprocessing.context.BaseContext, optional): multiprocessing context used to start the worker, e.g. multiprocessing.get_context("spawn"). Defaults to None (the default context).
+        """
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.queries = 0
+
+        context = multiprocessing if context is None else context
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(target = _serve, args = (backend, worker_connection), daemon = True)
+        self._process.start()
+        worker_connection.close()
+
+        self._requests = queue.Queue()
+        self._closed = False
+        self._dispatcher = threading.Thread(target = self._dispatch, daemon = True)
+        self._dispatcher.start()
+
+    def query_many(self, name, T, p):
+        assert not self._closed, "ProcessPropertyService has been closed"
+        T, p = self._check(name, T, p)
+
+        future = concurrent.futures.Future()
+        self._requests.put((name, T, p, future))
+
+        return future.result()
+
+    def _collect(self):
+        # Get the next batch of requests, or None if the service is closing
+        request = self._requests.get()
+
+        if request is None:
+            return None
+
+        batch = [request]
+        size = len(request[1])
+        deadline = time.perf_counter() + self.batch_window
+
+        while size < self.max_batch:
+            try:
+                if self.batch_window > 0:
+                    request = self._requests.get(timeout = max(0.0, deadline - time.perf_counter()))
+                else:
+                    request = self._requests.get_nowait()
+
+            except queue.Empty:
+                break
+
+            if request is None:
+                # Finish this batch, and then stop
+                self._requests.put(None)
+                break
+
+            batch.append(request)
+            size += len(request[1])
+
+        return batch
+
+    def _dispatch(self):
+        # Runs on the dispatcher thread - send batches of requests to the worker, and pass the results back to each request
+        while True:
+            batch = self._collect()
+
+            if batch is None:
+                break
+
+            # Group the queries by property, so each property is a single call to the backend
+            names = []
+            groups = {}
+
+            for request in batch:
+                if request[0] not in groups:
+                    names.append(request[0])
+                    groups[request[0]] = []
+
+                groups[request[0]].append(request)
+
+            message = [(name, np.concatenate([request[1] for request in groups[name]]), np.concatenate([request[2] for request in groups[name]])) for name in names]
+
+            try:
+                self._connection.send(message)
+                reply = self._connection.recv()
+            except (EOFError, OSError) as error:
+                reply = RuntimeError(f"Property service worker process has stopped: {error}")
+
+            self.batches += 1
+            self.queries += len(batch)
+
+            if isinstance(reply, Exception):
+                for request in batch:
+                    request[3].set_exception(reply)
+                continue
+
+            for name, values in zip(names, reply):
+                start = 0
+
+                for request in groups[name]:
+                    request[3].set_result(values[start:start + len(request[1])])
+                    start += len(request[1])
+
+    def close(self):
+        if self._closed:
+            return
+
+        self._closed = True
+        self._requests.put(None)
+        self._dispatcher.join()
+
+        try:
+            self._connection.send(None)
+        except (EOFError, OSError):
+            pass
+
+        self._process.join()
+        self._connection.close()
+
+# Using services with an Engine
+class ServiceProperty:
+    def __init__(self, service, name):
+        """A single property from a property service, as a function of temperature and pressure, for use as an input to TransportProperties.
+
+        Args:
+            service (PropertyService): The property service.
+            name (str): Name of the property, e.g. "mu".
+        """
+        self.service = service
+        self.name = name
+
+    def __call__(self, T, p):
+        return self.service.query(self.name, T, p)
+
+def transport_properties(service, compressible = False):
+    """Get a TransportProperties object that gets all of its properties from a property service.
+
+    Args:
+        service (PropertyService): The property service.
+        compressible (bool, optional): Whether or not the fluid is a compressible coolant, in which case 'gamma_coolant' is also taken from the service. Defaults to False.
+
+    Returns:
+        TransportProperties: The TransportProperties object.
+    """
+    return cusfbamboo.materials.TransportProperties(Pr = ServiceProperty(service, "Pr"),
+                                                    mu = ServiceProperty(service, "mu"),
+                                                    k = ServiceProperty(service, "k"),
+                                                    cp = ServiceProperty(service, "cp"),
+                                                    rho = ServiceProperty(service, "rho"),
+                                                    gamma_coolant = ServiceProperty(service, "gamma_coolant") if compressible else None)
@@ -0,0 +1,208 @@
+"""
+Running reducers, for summarising a heating analysis without storing the data at every grid point.
+
+Each reducer is given the data at one grid point at a time (in the same form as a single entry of the lists returned by Engine.steady_heating_analysis(),
+e.g. row["dQ_dA"], row["T"]), and keeps track of a single running value. This means the memory used does not grow with the number of grid points.
+
+Custom reducers can be made by inheriting from Reducer, and defining the reset(), update() and result() methods.
+
+Values at a grid point that no reducer needs are not calculated in a summary-only analysis. Each reducer lists the values it reads with its 'fields' property. Reducers with a
+callable 'key', or that define their own update() method, need every value unless they override 'fields'.
+
+NaN values (e.g. stresses for a Material without E) are ignored by Max and Min, which only give NaN if every value was NaN.
+"""
+
+import numpy as np
+
+class Reducer:
+    def __init__(self, key, index = None):
+        """Base class for running reducers.
+
+        Args:
+            key (str or callable): Key of the value to reduce, e.g. "dQ_dA". Otherwise a function of the data at a grid point, i.e. key(row).
+            index (int, optional): If the value is a list (e.g. key = "T"), the index of the item to use. Defaults to None, in which case list values are reduced to their maximum item.
+        """
+        self.key = key
+        self.index = index
+        self.reset()
+
+    def value(self, row):
+        """Get the value of interest from the data at a single grid point.
+
+        Args:
+            row (dict): Data at a single grid point.
+
+        Returns:
+            float: Value to be reduced
+        """
+        if callable(self.key):
+            value = self.key(row)
+        else:
+            value = row[self.key]
+
+        if self.index is not None:
+            return value[self.index]
+
+        elif np.ndim(value) > 0:
+            return np.fmax.reduce(np.ravel(value))
+
+        else:
+            return value
+
+    @property
+    def fields(self):
+        """Keys of the values that this reducer reads from the data at each grid point, or None if it may need any of them.
+
+        Returns:
+            set: The keys, or None.
+        """
+        if callable(self.key) or type(self).update.__module__ != __name__:
+            return None
+
+        return {self.key}
+
+    @property
+    def description(self):
+        return f"{type(self).__name__} of '{self.key}'" if self.index is None else f"{type(self).__name__} of '{self.key}[{self.index}]'"
+
+    def reset(self):
+        """
+        Reset the reducer, ready for a new analysis.
+        """
+        raise NotImplementedError
+
+    def update(self, row):
+        """Update the running value using the data at the next grid point.
+
+        Args:
+            row (dict): Data at a single grid point.
+        """
+        raise NotImplementedError
+
+    def result(self):
+        """Get the reduced value.
+
+        Returns:
+            float: The reduced value.
+        """
+        raise NotImplementedError
+
+class Max(Reducer):
+    """Running maximum.
+    """
+    def reset(self):
+        self._result = float("NaN")
+
+    def update(self, row):
+        self._result = float(np.fmax(self._result, self.value(row)))
+
+    def result(self):
+        return self._result
+
+class Min(Reducer):
+    """Running minimum.
+    """
+    def reset(self):
+        self._result = float("NaN")
+
+    def update(self, row):
+        self._result = float(np.fmin(self._result, self.value(row)))
+
+    def result(self):
+        return self._result
+
+class ArgMax(Reducer):
+    def __init__(self, key, index = None, arg = "x"):
+        """Value of 'arg' (usually the axial position) at which the maximum occurs.
+
+        Args:
+            key (str or callable): Key of the value to find the maximum of, e.g. "dQ_dA". Otherwise a function of the data at a grid point, i.e. key(row).
+            index (int, optional): If the value is a list (e.g. key = "T"), the index of the item to use. Defaults to None, in which case list values are reduced to their maximum item.
+            arg (str, optional): Key of the value to return at the maximum. Defaults to "x".
+        """
+        self.arg = arg
+        super().__init__(key = key, index = index)
+
+    @property
+    def fields(self):
+        fields = super().fields
+        return None if fields is None else fields | {self.arg}
+
+    def reset(self):
+        self._max = -np.inf
+        self._result = float("NaN")
+
+    def update(self, row):
+        value = self.value(row)
+
+        if value > self._max:
+            self._max = value
+            self._result = row[self.arg]
+
+    def result(self):
+        return self._result
+
+class ArgMin(ArgMax):
+    """Value of 'arg' (usually the axial position) at which the minimum occurs. Takes the same inputs as ArgMax.
+    """
+    def value(self, row):
+        return -super().value(row)
+
+class Integral(Reducer):
+    def __init__(self, key, index = None, over = "x"):
+        """Running integral, using the trapezium rule. The integral is always taken in the direction of increasing 'over', regardless of the coolant flow direction.
+
+        Args:
+            key (str or callable): Key of the value to integrate, e.g. "dQ_dx". Otherwise a function of the data at a grid point, i.e. key(row).
+            index (int, optional): If the value is a list (e.g. key = "T"), the index of the item to use. Defaults to None, in which case list values are reduced to their maximum item.
+            over (str, optional): Key of the variable to integrate over. Defaults to "x".
+        """
+        self.over = over
+        super().__init__(key = key, index = index)
+
+    @property
+    def fields(self):
+        fields = super().fields
+        return None if fields is None else fields | {self.over}
+
+    def reset(self):
+        self._result = 0.0
+        self._last = None
+
+    def update(self, row):
+        value = self.value(row)
+        position = row[self.over]
+
+        if self._last is not None:
+            self._result += 0.5 * (value + self._last[1]) * abs(position - self._last[0])
+
+        self._last = (position, value)
+
+    def result(self):
+        return self._result
+
+class Final(Reducer):
+    """Value at the last grid point (i.e. the coolant outlet).
+    """
+    def reset(self):
+        self._result = float("NaN")
+
+    def update(self, row):
+        self._result = self.value(row)
+
+    def result(self):
+        return self._result
+
+def default_reducers():
+    """Get the reducers used by default in a summary-only heating analysis. A new set of reducers is made each time this is called.
+
+    Returns:
+        dict: Dictionary of reducers, with the keys being the names of the values they produce.
+    """
+    return {"T_hw_max"          : Max("T", index = -2),
+            "x_T_hw_max"        : ArgMax("T", index = -2),
+            "dQ_dA_max"         : Max("dQ_dA"),
+            "T_coolant_out"     : Final("T_coolant"),
+            "p_coolant_out"     : Final("p_coolant"),
+            "Q_total"           : Integral("dQ_dx"),
+            "sigma_t_max"       : Max("sigma_t_max")}
@@ -0,0 +1,244 @@
+"""
+Wall stresses and failure metrics, calculated for every grid point and every wall at once. Used by Engine.steady_heating_analysis() (for the tangential stresses, once the march has finished) and
+Engine.stress_analysis().
+
+The inputs are the results of a heating analysis, so the stresses can be recalculated from stored results (e.g. from a cusfbamboo.cache.ResultCache, or a file written with numpy),
+without repeating the analysis. Every value is an array with shape (grid points, walls), where j = 0 is the wall in contact with the exhaust gas, and j = -1 is the wall in contact
+with the coolant.
+
+Stresses:
+ - The thermal and pressure stresses are the tangential stresses from Heister [1], with tensile stress positive, as in a steady heating analysis.
+ - The thermal stress is equal and biaxial (tangential and axial), compressive on the hot side of a wall and tensile on the cold side. The pressure stress is only tangential.
+   The von Mises stress is found on both surfaces of each wall, and the larger value is used.
+ - The yield margin is the yield strength (at each surface's temperature) divided by the von Mises stress there, minus one, using the smaller of the two surfaces.
+ - The low cycle fatigue life uses Manson's method of universal slopes [2], with the elastic strain range (von Mises stress / E) of one start-up and shut-down cycle,
+   using the surface with the shorter life. This ignores plasticity and creep, so it is only an estimate, and is not conservative once the wall yields.
+
+The failure metrics need the Material inputs 'yield_strength', 'ultimate_strength' and 'ductility'. Values are NaN for walls that do not have them.
+
+References:
+ - [1] - Heister et al., Rocket Propulsion (https://doi.org/10.1017/9781108381376)
+ - [2] - Manson, S. S., Fatigue: A Complex Subject - Some Simple Approximations, Experimental Mechanics, 1965
+"""
+
+import numpy as np
+
+MAX_CYCLES = 1e10           # Fatigue lives longer than this are returned as infinity
+
+def _per_station(value, x):
+    # Evaluate a float, or a function of axial position, at every grid point
+    if callable(value):
+        return np.array([value(item) for item in x], dtype = float)
+
+    return np.full(len(x), float(value))
+
+def _at_temperature(value, T):
+    # Evaluate a float, or a function of temperature, for an array of temperatures
+    if callable(value):
+        return np.vectorize(value, otypes = [float])(T)
+
+    return np.full(np.shape(T), float(value))
+
+def _cooling_jackets(engine, x, circuit = None):
+    # The CoolingJacket that covers each position - an Engine with 'cooling_jackets' (see cusfbamboo.jackets) has a different one along the contour
+    if not hasattr(engine, "cooling_jackets"):
+        return [engine.cooling_jacket] * len(x)
+
+    if circuit is not None:
+        assert len(circuit) == len(x), "'circuit' must have a value for each position"
+        return [engine.cooling_jackets[n] for n in circuit]
+
+    # Allow for rounding error in the grid at the ends of each cooling jacket
+    tolerance = 1e-9 * abs(engine.geometry.xs[-1] - engine.geometry.xs[0])
+    jackets = []
+
+    for item in x:
+        covering = [jacket for jacket in engine.cooling_jackets if not hasattr(jacket, "xs") or min(jacket.xs) - tolerance <= item <= max(jacket.xs) + tolerance]
+        assert len(covering) > 0, f"None of the cooling jackets cover x = {item}"
+        jackets.append(covering[0])
+
+    return jackets
+
+def tangential_stresses(engine, x, dQ_dA, p_coolant, circuit = None):
+    """Thermal and pressure tangential stresses in each wall, at a set of grid points.
+
+    Args:
+        engine (Engine): The Engine that was analysed.
+        x (numpy.ndarray): Axial positions (m).
+        dQ_dA (numpy.ndarray): Heat transfer rate per unit chamber area at the innermost wall (W/m2), at each position.
+        p_coolant (numpy.ndarray): Coolant static pressure (Pa), at each position.
+        circuit (list, optional): For an Engine with 'cooling_jackets', the index of the cooling jacket that covers each position (e.g. results["circuit"] from 
+            Engine.multi_jacket_analysis()). Defaults to None, in which case the cooling jacket whose 'xs' covers each position is used.
+
+    Returns:
+        tuple: (sigma_t_thermal, sigma_t_pressure, sigma_t_max) - the thermal, pressure and maximum (abs(sigma_t_thermal) + abs(sigma_t_pressure)) tangential stresses (Pa),
+        each with shape (len(x), len(engine.walls)).
+    """
+    x = np.asarray(x, dtype = float)
+    dQ_dA = np.asarray(dQ_dA, dtype = float)
+    p_coolant = np.asarray(p_coolant, dtype = float)
+    cooling_jackets = _cooling_jackets(engine, x, circuit)
+
+    r = engine.geometry.r(x = x)
+    p_g = np.array([engine.p(item) for item in x])
+    blockage_ratio = np.array([cooling_jacket.blockage_ratio(item) for cooling_jacket, item in zip(cooling_jackets, x)], dtype = float)
+    t_w = np.column_stack([_per_station(wall.thickness, x) for wall in engine.walls])
+
+    E = np.array([wall.material.E for wall in engine.walls])
+    alpha = np.array([wall.material.alpha for wall in engine.walls])
+    k = np.array([wall.material.k for wall in engine.walls])
+    poisson = np.array([wall.material.poisson for wall in engine.walls])
+
+    # Diameter up to each wall, which increases by the thickness of each of the walls inside it
+    D = 2 * r[:, np.newaxis] + np.cumsum(t_w, axis = 1) - t_w
+
+    # Thermal stress from Heister [1], using the actual dQ/dA at the local wall radius
+    corrected_dQ_dA = dQ_dA[:, np.newaxis] * r[:, np.newaxis] / (D / 2)
+    sigma_t_thermal = E * alpha * corrected_dQ_dA * t_w / (2 * (1 - poisson) * k)
+
+    # Pressure stress from Heister [1], using the average diameter of each wall
+    D_mean = D + t_w / 2
+    dp = (p_coolant - p_g)[:, np.newaxis]
+    sigma_t_pressure = dp * D_mean / (2 * t_w)
+
+    # If we have fins in the cooling channels, and the fins restrain the inner wall (by being attached to the outer jacket)
+    finned = np.abs(blockage_ratio) >= 1e-12
+
+    for cooling_jacket in {id(item) : item for item in cooling_jackets}.values():
+        restrained = finned & np.array([item is cooling_jacket for item in cooling_jackets])
+
+        if not (cooling_jacket.restrain_fins and np.any(restrained)):
+            continue
+
+        if cooling_jacket.configuration == "vertical":
+            w = np.pi * D_mean[restrained] * (1 - blockage_ratio[restrained, np.newaxis]) / cooling_jacket.number_of_channels
+
+        elif cooling_jacket.configuration == "spiral":
+            pitch = np.array([cooling_jacket.bundle_width(item) for item in x[restrained]], dtype = float)
+            w = (pitch * (1 - blockage_ratio[restrained]))[:, np.newaxis]
+
+        sigma_t_pressure[restrained] = 0.5 * dp[restrained] * (w / t_w[restrained])**2
+
+    # Use the convention that tensile stress is positive
+    sigma_t_pressure = -sigma_t_pressure
+    sigma_t_max = np.abs(sigma_t_thermal) + np.abs(sigma_t_pressure)
+
+    return sigma_t_thermal, sigma_t_pressure, sigma_t_max
+
+def von_mises(sigma_t_thermal, sigma_t_pressure):
+    """Von Mises stress on the hot and cold side surfaces of each wall.
+
+    Args:
+        sigma_t_thermal (numpy.ndarray): Thermal tangential stress (Pa), from tangential_stresses().
+        sigma_t_pressure (numpy.ndarray): Pressure tangential stress (Pa), from tangential_stresses().
+
+    Returns:
+        tuple: (sigma_vm_hot, sigma_vm_cold) - the von Mises stress on the hot and cold side surfaces (Pa), with the same shape as the inputs.
+    """
+    sigma_vm = []
+
+    for sign in [-1, 1]:
+        # Equal biaxial thermal stress (compressive on the hot side), plus the tangential pressure stress
+        sigma_tangential = sign * sigma_t_thermal + sigma_t_pressure
+        sigma_axial = sign * sigma_t_thermal
+        sigma_vm.append((sigma_tangential**2 - sigma_tangential * sigma_axial + sigma_axial**2)**0.5)
+
+    return tuple(sigma_vm)
+
+def cycles_to_failure(strain_range, ultimate_strength, E, ductility):
+    """Number of cycles to low cycle fatigue failure, from Manson's method of universal slopes [2], i.e. strain_range = 3.5 (ultimate_strength / E) N^-0.12 + ductility^0.6 N^-0.6.
+
+    Args:
+        strain_range (numpy.ndarray): Total strain range of each cycle.
+        ultimate_strength (numpy.ndarray): Ultimate tensile strength (Pa).
+        E (numpy.ndarray): Young's modulus (Pa).
+        ductility (numpy.ndarray): True strain at fracture, i.e. ln(1 / (1 - reduction in area)).
+
+    Returns:
+        numpy.ndarray: Number of cycles to failure. Values longer than MAX_CYCLES are infinite.
+    """
+    strain_range, ultimate_strength, E, ductility = np.broadcast_arrays(*[np.asarray(value, dtype = float) for value in [strain_range, ultimate_strength, E, ductility]])
+
+    def strain(N):
+        return 3.5 * ultimate_strength / E * N**(-0.12) + ductility**0.6 * N**(-0.6)
+
+    # The strain range decreases with N, so bisect in log10(N) for every value at once
+    low = np.zeros(strain_range.shape)
+    high = np.full(strain_range.shape, np.log10(MAX_CYCLES))
+
+    for i in range(60):
+        middle = (low + high) / 2
+        above = strain(10**middle) > strain_range
+        low = np.where(above, middle, low)
+        high = np.where(above, high, middle)
+
+    N = 10**((low + high) / 2)
+    N = np.where(strain_range < strain(MAX_CYCLES), np.inf, N)
+    N = np.where(strain_range > strain(1.0), 1.0, N)
+
+    return np.where(np.isnan(strain_range) | np.isnan(ultimate_strength) | np.isnan(E) | np.isnan(ductility), np.nan, N)
+
+def stress_analysis(engine, results):
+    """Calculate the wall stresses and failure metrics from the results of a heating analysis. See Engine.stress_analysis().
+
+    Args:
+        engine (Engine): The Engine that was analysed.
+        results (dict): Results from Engine.steady_heating_analysis() (with summary_only = False) or Engine.multi_jacket_analysis(), which may have been loaded from disk. Must contain 
+            "x", "T", "dQ_dA" and "p_coolant".
+
+    Returns:
+        dict: Stresses and failure metrics, with shape (grid points, walls). Descriptions are stored in the "info" key.
+    """
+    for key in ["x", "T", "dQ_dA", "p_coolant"]:
+        assert key in results, f"'results' must contain '{key}', from a steady heating analysis with summary_only = False"
+
+    x = np.asarray(results["x"], dtype = float)
+    T = np.asarray(results["T"], dtype = float)
+    walls = len(engine.walls)
+
+    assert T.ndim == 2 and T.shape == (len(x), walls + 3), f"'results' must be for an Engine with {walls} walls"
+
+    sigma_t_thermal, sigma_t_pressure, sigma_t_max = tangential_stresses(engine, x = x, dQ_dA = results["dQ_dA"], p_coolant = results["p_coolant"], circuit = results.get("circuit"))
+    sigma_vm_hot, sigma_vm_cold = von_mises(sigma_t_thermal, sigma_t_pressure)
+
+    # T[i] goes from the coolant to the exhaust gas, so the hot side of wall j is T[i][-2 - j], and its cold side is T[i][-3 - j]
+    T_hot = T[:, -2:-2 - walls:-1]
+    T_cold = T[:, -3:-3 - walls:-1]
+
+    yield_margin = np.empty((len(x), walls))
+    cycles = np.empty((len(x), walls))
+
+    for j, wall in enumerate(engine.walls):
+        material = wall.material
+        margins = []
+        lives = []
+
+        for sigma_vm, T_surface in [(sigma_vm_hot[:, j], T_hot[:, j]), (sigma_vm_cold[:, j], T_cold[:, j])]:
+            margins.append(_at_temperature(material.yield_strength, T_surface) / sigma_vm - 1)
+            lives.append(cycles_to_failure(strain_range = sigma_vm / material.E, ultimate_strength = _at_temperature(material.ultimate_strength, T_surface),
+                                           E = material.E, ductility = material.ductility))
+
+        yield_margin[:, j] = np.minimum(*margins)
+        cycles[:, j] = np.minimum(*lives)
+
+    output = {"x" : x,
+              "sigma_t_thermal" : sigma_t_thermal,
+              "sigma_t_pressure" : sigma_t_pressure,
+              "sigma_t_max" : sigma_t_max,
+              "sigma_vm" : np.maximum(sigma_vm_hot, sigma_vm_cold),
+              "sigma_vm_hot" : sigma_vm_hot,
+              "sigma_vm_cold" : sigma_vm_cold,
+              "yield_margin" : yield_margin,
+              "cycles_to_failure" : cycles}
+
+    output["info"] = {"x" : "Axial position along the engine (m), in the same order as the results.",
+                      "sigma_t_thermal" : "Tangential stress due to uneven thermal expansion (Pa). sigma_t_thermal[i][j] is the value at x[i], across the j'th wall.",
+                      "sigma_t_pressure" : "Tangential stress due to pressure difference across wall (Pa). sigma_t_pressure[i][j] is the value at x[i], across the j'th wall.",
+                      "sigma_t_max" : "Maximum tangential stress (Pa), equal to abs(sigma_t_thermal) + abs(sigma_t_pressure). sigma_t_max[i][j] is the value at x[i], across the j'th wall.",
+                      "sigma_vm" : "Von Mises stress (Pa), on whichever surface of the wall it is larger. sigma_vm[i][j] is the value at x[i], in the j'th wall.",
+                      "sigma_vm_hot" : "Von Mises stress on the hot side surface of each wall (Pa). sigma_vm_hot[i][j] is the value at x[i], in the j'th wall.",
+                      "sigma_vm_cold" : "Von Mises stress on the cold side surface of each wall (Pa). sigma_vm_cold[i][j] is the value at x[i], in the j'th wall.",
+                      "yield_margin" : "Yield strength divided by von Mises stress, minus one, on whichever surface of the wall it is smaller. Negative values have yielded. yield_margin[i][j] is the value at x[i], in the j'th wall.",
+                      "cycles_to_failure" : "Estimated number of start-up and shut-down cycles until low cycle fatigue failure, on whichever surface of the wall it is smaller. cycles_to_failure[i][j] is the value at x[i], in the j'th wall."}
+
+    return output
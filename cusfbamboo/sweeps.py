@@ -0,0 +1,146 @@
+"""
+Tools for running parametric sweeps of steady heating analyses, optionally in parallel over a pool of processes.
+
+Example:
+    def make_engine(channel_height, mdot_coolant):
+        ...
+        return engine
+
+    table = cusfbamboo.sweep(make_engine, {"channel_height" : [1e-3, 2e-3], "mdot_coolant" : [0.2, 0.3, 0.4]}, workers = 4)
+
+Notes:
+ - To use more than one worker, 'engine_factory' must be picklable (e.g. a function defined at the top level of a module, not a lambda), and on Windows the sweep must be started
+   from within an 'if __name__ == "__main__":' block.
+ - If a cusfbamboo.cache.ResultCache is given, each case is stored as soon as it finishes, so restarting a sweep after a crash skips the cases that were already completed.
+ - Expensive values that only depend on the engine geometry (e.g. the exhaust gas Mach numbers) are cached within each worker process, so they are reused between all the cases that
+   a worker runs. Any other state you want to reuse (e.g. property tables) can be set up once per worker with the 'initializer' input.
+"""
+
+import concurrent.futures
+import itertools
+import math
+import numpy as np
+
+def parameter_cases(param_grid):
+    """Get the list of cases to run for a parameter grid.
+
+    Args:
+        param_grid (dict or list): Either a dictionary of lists, in which case every combination is used (varying the last key fastest), or a list of dictionaries, one for each case.
+
+    Returns:
+        list: List of dictionaries, with the parameters for each case.
+    """
+    if type(param_grid) is dict:
+        names = list(param_grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*[param_grid[name] for name in names])]
+
+    else:
+        return [dict(case) for case in param_grid]
+
+def _run_case(engine_factory, params, analysis_kwargs):
+    # Build the engine and run the analysis for a single case
+    engine = engine_factory(**params)
+    return engine.steady_heating_analysis(**analysis_kwargs)
+
+def _run_chunk(engine_factory, chunk, analysis_kwargs):
+    # Run a list of cases on a worker
+    return [_run_case(engine_factory, params, analysis_kwargs) for params in chunk]
+
+def columns(cases, results):
+    """Collect the parameters and results from a list of cases into a columnar table.
+
+    Args:
+        cases (list): List of dictionaries of the parameters used in each case.
+        results (list): List of results dictionaries, from Engine.steady_heating_analysis(), for each case.
+
+    Returns:
+        dict: Dictionary of columns, each with one entry per case. Scalar values are stored as numpy arrays, and anything else (e.g. lists of values at each grid point) as lists.
+        Descriptions of the results are stored in the "info" key. If a parameter has the same name as a result, the parameter keeps the name, and the result is stored as "result_<name>".
+    """
+    table = {"info" : {}}
+    parameters = []
+    outputs = []
+
+    for case in cases:
+        for name in case:
+            if name not in parameters:
+                parameters.append(name)
+
+    for result in results:
+        for name in result:
+            if name != "info" and name not in outputs:
+                outputs.append(name)
+
+            elif name == "info":
+                table["info"].update(result["info"])
+
+    # (column name, whether it is a parameter, key in the case or result) for each column
+    names = [(name, True, name) for name in parameters] + [(f"result_{name}" if name in parameters else name, False, name) for name in outputs]
+
+    for column, is_parameter, key in names:
+        if column != key:
+            table["info"][column] = table["info"].get(key, f"'{key}' from the results, renamed because a parameter has the same name.")
+
+        values = []
+
+        for case, result in zip(cases, results):
+            if is_parameter:
+                values.append(case.get(key))
+            else:
+                values.append(result.get(key))
+
+        if all(np.ndim(value) == 0 and value is not None and not isinstance(value, dict) for value in values):
+            table[column] = np.array(values)
+        else:
+            table[column] = values
+
+    return table
+
+def sweep(engine_factory, param_grid, workers = 1, analysis_kwargs = None, chunksize = None, initializer = None, initargs = (), cache = None):
+    """Run Engine.steady_heating_analysis() for every case in a parameter grid, and collect the results into a columnar table.
+
+    The results are always in the same order as the cases (see parameter_cases()), and do not depend on the number of workers.
+
+    Args:
+        engine_factory (callable): Function that returns the Engine object for a case, called with the parameters of the case as keyword arguments, i.e. engine_factory(**params).
+        param_grid (dict or list): Either a dictionary of lists, in which case every combination is used, or a list of dictionaries, one for each case.
+        workers (int, optional): Number of processes to use. Defaults to 1, in which case everything is run in this process.
+        analysis_kwargs (dict, optional): Keyword arguments for Engine.steady_heating_analysis(). Defaults to None, which is equivalent to {"summary_only" : True}.
+        chunksize (int, optional): Number of cases to send to a worker at a time. Defaults to None, in which case the cases are split into roughly 4 chunks per worker.
+        initializer (callable, optional): Function to call once when each worker process starts, e.g. to set up property tables. Defaults to None.
+        initargs (tuple, optional): Arguments to pass to 'initializer'. Defaults to ().
+        cache (ResultCache, optional): cusfbamboo.cache.ResultCache to store the result of each case in. Cases that are already in the cache are loaded instead of being re-run, so a sweep that 
+            was interrupted can be restarted without repeating the completed cases. Defaults to None.
+
+    Returns:
+        dict: Dictionary of columns, with one for each parameter and each result. See columns().
+    """
+    assert type(workers) is int and workers >= 1, "'workers' must be an integer that is at least 1"
+
+    if analysis_kwargs is None:
+        analysis_kwargs = {"summary_only" : True}
+
+    if cache is not None:
+        analysis_kwargs = dict(analysis_kwargs, cache = cache)
+
+    cases = parameter_cases(param_grid)
+
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+
+        results = _run_chunk(engine_factory, cases, analysis_kwargs)
+
+    else:
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(cases) / (4 * workers)))
+
+        chunks = [cases[i:i + chunksize] for i in range(0, len(cases), chunksize)]
+        results = []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers, initializer = initializer, initargs = initargs) as executor:
+            # executor.map() returns the chunks in the order they were submitted
+            for chunk_results in executor.map(_run_chunk, itertools.repeat(engine_factory), chunks, itertools.repeat(analysis_kwargs)):
+                results.extend(chunk_results)
+
+    return columns(cases, results)
@@ -0,0 +1,218 @@
+"""
+Steady heating analyses over a throttle schedule, i.e. a sequence of operating points with different chamber conditions and coolant inlet conditions. Used by Engine.throttle_analysis().
+
+Example:
+    points = [{"p0" : p0, "mdot_coolant" : 0.5 * p0 / 20e5} for p0 in np.linspace(10e5, 20e5, 6)]
+    envelope = engine.throttle_analysis(points, num_grid = 500)
+    envelope["T_hw_max"]            # One value for each operating point
+    envelope["T_hw"][n][i]          # Value at points[n], at x[i]
+
+Notes:
+ - Every operating point uses the same grid, so values that only depend on the geometry are reused between them. The exhaust gas Mach numbers are cached by the Engine itself, and the
+   cooling jacket geometry (e.g. the coolant flow area, hydraulic diameter and path length) and the wall thicknesses at each grid point are cached for the duration of the analysis.
+ - Each operating point is warm-started from the solution at the one before it, so the points should be in schedule order (neighbouring points should be similar).
+ - With more than one worker, the points are split into contiguous blocks that are run in parallel. The first point of each block is solved from a cold start (with 'iter_each'
+   iterations) instead of being warm-started, so its results differ from a single worker by the iteration error of the march. The Engine must be picklable (see cusfbamboo.config),
+   and on Windows the analysis must be started from within an 'if __name__ == "__main__":' block.
+"""
+
+import concurrent.futures
+import copy
+import itertools
+import numpy as np
+
+import cusfbamboo.engine
+import cusfbamboo.isen
+import cusfbamboo.reducers
+
+POINT_KEYS = ["chamber_conditions", "p0", "T0", "T_coolant_in", "p_coolant_in", "mdot_coolant"]
+GEOMETRY_FUNCTIONS = ["total_wall_thickness", "A_coolant", "Dh_coolant", "dLc_dx"]
+
+def cache_geometry(engine):
+    """Get a copy of an Engine, where the functions that only depend on the geometry, cooling jacket and walls at a position (see GEOMETRY_FUNCTIONS) remember their values.
+    The copy must not have its geometry, cooling jacket or walls modified.
+
+    Args:
+        engine (Engine): Engine to copy.
+
+    Returns:
+        Engine: The copy.
+    """
+    cached_engine = copy.copy(engine)
+
+    for name in GEOMETRY_FUNCTIONS:
+        function = getattr(engine, name)
+        values = {}
+
+        def cached(x, _function = function, _values = values):
+            if x not in _values:
+                _values[x] = _function(x)
+
+            return _values[x]
+
+        setattr(cached_engine, name, cached)
+
+    return cached_engine
+
+def operating_point(engine, point):
+    """Get a copy of an Engine at an operating point. Copies of an Engine from cache_geometry() share its cached values.
+
+    Args:
+        engine (Engine): The Engine to copy.
+        point (dict): The operating point. Can contain "chamber_conditions" (a ChamberConditions object), or "p0" and "T0", which replace those of the Engine's ChamberConditions.
+            Any coolant inlet conditions ("T_coolant_in", "p_coolant_in" and "mdot_coolant") are not used here.
+
+    Returns:
+        Engine: The copy.
+    """
+    left_over = set(point.keys()) - set(POINT_KEYS)
+    assert not left_over, f"Unrecognised operating point values: {left_over}. Try any of {POINT_KEYS}"
+    assert not ("chamber_conditions" in point and ("p0" in point or "T0" in point)), "An operating point cannot contain both 'chamber_conditions' and 'p0' or 'T0'"
+
+    if "chamber_conditions" in point:
+        chamber_conditions = point["chamber_conditions"]
+    else:
+        chamber_conditions = cusfbamboo.engine.ChamberConditions(p0 = point.get("p0", engine.chamber_conditions.p0), T0 = point.get("T0", engine.chamber_conditions.T0))
+
+    point_engine = copy.copy(engine)
+    point_engine.chamber_conditions = chamber_conditions
+
+    # These are only calculated when an Engine is created, so must be updated for the new chamber conditions
+    point_engine.mdot = cusfbamboo.isen.get_choked_mdot(point_engine.perfect_gas, chamber_conditions, point_engine.geometry.A_t)
+    point_engine.c_star = chamber_conditions.p0 * point_engine.geometry.A_t / point_engine.mdot
+
+    return point_engine
+
+def _run_block(engine, points, analysis_kwargs, iter_each_warm):
+    # Run a contiguous block of operating points, warm-starting each one from the last
+    engine = cache_geometry(engine)
+    results = []
+
+    for point in points:
+        coolant_inlet = {key : point[key] for key in ["T_coolant_in", "p_coolant_in", "mdot_coolant"] if key in point}
+        kwargs = dict(analysis_kwargs, coolant_inlet = coolant_inlet if coolant_inlet else None)
+
+        if results:
+            kwargs["initial_guess"] = results[-1]
+            kwargs["iter_each"] = iter_each_warm
+
+        results.append(operating_point(engine, point).steady_heating_analysis(**kwargs))
+
+    return results
+
+def stack(engine, points, results):
+    """Stack the results at each operating point into arrays over the operating envelope.
+
+    Args:
+        engine (Engine): The Engine that was analysed.
+        points (list): List of the operating points (see operating_point()).
+        results (list): List of results dictionaries, from Engine.steady_heating_analysis() with summary_only = False, for each operating point.
+
+    Returns:
+        dict: Dictionary of numpy arrays, where the first index is the operating point. Descriptions are stored in the "info" key.
+    """
+    envelope = {"x" : np.array(results[0]["x"]), "r" : np.array(results[0]["r"]), "info" : {}}
+
+    # Operating conditions
+    conditions = {"p0" : [], "T0" : [], "mdot" : [], "T_coolant_in" : [], "p_coolant_in" : [], "mdot_coolant" : []}
+
+    for point in points:
+        point_engine = operating_point(engine, point)
+        conditions["p0"].append(point_engine.chamber_conditions.p0)
+        conditions["T0"].append(point_engine.chamber_conditions.T0)
+        conditions["mdot"].append(point_engine.mdot)
+
+        for key in ["T_coolant_in", "p_coolant_in", "mdot_coolant"]:
+            conditions[key].append(point.get(key, getattr(engine.cooling_jacket, key)))
+
+    envelope.update({key : np.array(value) for key, value in conditions.items()})
+
+    # Values at each grid point
+    for key in ["T", "T_coolant", "p_coolant", "V_coolant", "dQ_dx", "dQ_dA"]:
+        envelope[key] = np.array([result[key] for result in results])
+
+    envelope["T_cw"] = envelope["T"][:, :, 1]
+    envelope["T_hw"] = envelope["T"][:, :, -2]
+
+    # Same summary values as a summary-only analysis
+    summary = cusfbamboo.reducers.default_reducers()
+
+    for name in summary:
+        envelope[name] = []
+
+    for result in results:
+        for reducer in summary.values():
+            reducer.reset()
+
+        for i in range(len(result["x"])):
+            row = {key : result[key][i] for key in ["x", "T", "dQ_dA", "dQ_dx", "T_coolant", "p_coolant", "sigma_t_max"]}
+
+            for reducer in summary.values():
+                reducer.update(row)
+
+        for name, reducer in summary.items():
+            envelope[name].append(reducer.result())
+
+    for name, reducer in summary.items():
+        envelope[name] = np.array(envelope[name])
+        envelope["info"][name] = reducer.description
+
+    envelope["info"].update({"x" : "Axial position along the engine (m), which is the same for every operating point.",
+                             "r" : "Engine combustion chamber radius (m). r[i] is the value at x[i].",
+                             "p0" : "Chamber stagnation pressure at each operating point (Pa).",
+                             "T0" : "Chamber stagnation temperature at each operating point (K).",
+                             "mdot" : "Exhaust gas mass flow rate at each operating point (kg/s).",
+                             "T_coolant_in" : "Coolant inlet temperature at each operating point (K).",
+                             "p_coolant_in" : "Coolant inlet pressure at each operating point (Pa).",
+                             "mdot_coolant" : "Coolant mass flow rate at each operating point (kg/s).",
+                             "T" : "Static temperature (K). T[n][i][j] is the value at operating point n, at x[i], at the j'th wall boundary. j = 0 corresponds to the coolant, j = -1 corresponds to the exhaust gas.",
+                             "T_hw" : "Hot side (exhaust gas side) wall temperature (K). T_hw[n][i] is the value at operating point n and x[i].",
+                             "T_cw" : "Cold side (coolant side) wall temperature (K). T_cw[n][i] is the value at operating point n and x[i].",
+                             "T_coolant" : "Coolant static temperature (K). T_coolant[n][i] is the value at operating point n and x[i].",
+                             "p_coolant" : "Coolant static pressure (Pa). p_coolant[n][i] is the value at operating point n and x[i].",
+                             "V_coolant" : "Coolant velocity (m/s). V_coolant[n][i] is the value at operating point n and x[i].",
+                             "dQ_dx" : "Heat transfer rate per unit axial length (W/m). dQ_dx[n][i] is the value at operating point n and x[i].",
+                             "dQ_dA" : "Heat transfer rate per unit chamber area at the innermost wall (W/m2). dQ_dA[n][i] is the value at operating point n and x[i]."})
+
+    return envelope
+
+def throttle_analysis(engine, points, workers = 1, iter_each_warm = 1, **kwargs):
+    """Run a steady heating analysis at each operating point in a throttle schedule, and stack the results. See Engine.throttle_analysis().
+
+    Args:
+        engine (Engine): The Engine to analyse.
+        points (list): List of operating points, in schedule order (see operating_point()).
+        workers (int, optional): Number of processes to use. Defaults to 1.
+        iter_each_warm (int, optional): Number of iterations at each grid point, for operating points that are warm-started from the previous one. Defaults to 1.
+
+    Keyword Args:
+        Any keyword arguments for Engine.steady_heating_analysis(), apart from 'summary_only', 'coolant_inlet' and 'initial_guess'.
+
+    Returns:
+        dict: Stacked results over the operating envelope (see stack()).
+    """
+    assert type(workers) is int and workers >= 1, "'workers' must be an integer that is at least 1"
+    assert len(points) > 0, "'points' must contain at least one operating point"
+
+    for key in ["summary_only", "coolant_inlet", "initial_guess"]:
+        assert key not in kwargs, f"'{key}' is set by the throttle analysis, so cannot be given"
+
+    points = [dict(point) for point in points]
+
+    # Check the points before running anything
+    for point in points:
+        operating_point(engine, point)
+
+    if workers == 1:
+        results = _run_block(engine, points, kwargs, iter_each_warm)
+
+    else:
+        blocks = [list(block) for block in np.array_split(np.arange(len(points)), min(workers, len(points)))]
+        results = []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = len(blocks)) as executor:
+            # executor.map() returns the blocks in the order they were submitted
+            for block_results in executor.map(_run_block, itertools.repeat(engine), [[points[i] for i in block] for block in blocks], itertools.repeat(kwargs), itertools.repeat(iter_each_warm)):
+                results.extend(block_results)
+
+    return stack(engine, points, results)
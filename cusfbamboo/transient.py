@@ -0,0 +1,83 @@
+"""
+Transient conduction through the walls of an engine, for startup and shutdown analyses.
+
+Each wall is split into a number of radial nodes at every axial station, and the heat conduction equation is integrated in time with the implicit (backward) Euler method, so the time
+step is not limited by the thermal diffusivity of the walls. Axial conduction is neglected, so the linear system at each time step is tridiagonal (one block per station), and is solved
+as a banded system in O(stations x nodes) operations. Used by Engine.transient_heating_analysis().
+
+Notation:
+ - 'c': Cold side (usually coolant)
+ - 'h': Hot side (usually exhaust gas)
+ - Nodes are numbered from the hot side (j = 0) to the cold side (j = -1), like the walls in an Engine.
+"""
+
+import numpy as np
+import scipy.linalg
+
+import cusfbamboo.conduction
+
+class TransientWallSolver(cusfbamboo.conduction.RadialWall):
+    def __init__(self, r_faces, k, rho_cp):
+        """Implicit solver for transient radial conduction through a cylindrical wall, at a set of independent axial stations. All values are per unit axial length.
+
+        Args:
+            r_faces (numpy.ndarray): Radii of the faces between nodes (m), with shape (stations, nodes + 1). r_faces[:, 0] is the hot side surface and r_faces[:, -1] is the cold side surface.
+            k (numpy.ndarray): Thermal conductivity of each node (W/m/K), with shape (stations, nodes).
+            rho_cp (numpy.ndarray): Volumetric heat capacity of each node (J/m^3/K), i.e. density * specific heat capacity, with shape (stations, nodes).
+
+        Attributes:
+            C (numpy.ndarray): Heat capacity of each node per unit axial length (J/m/K).
+            See cusfbamboo.conduction.RadialWall for the others.
+        """
+        super().__init__(r_faces = r_faces, k = k)
+
+        r_faces = np.asarray(r_faces, dtype = float)
+        rho_cp = np.asarray(rho_cp, dtype = float)
+
+        assert rho_cp.shape == (self.stations, self.nodes), "'rho_cp' must have the shape (stations, nodes)"
+        assert np.all(rho_cp > 0), "'rho_cp' must be positive"
+
+        self.C = rho_cp * np.pi * (r_faces[:, 1:]**2 - r_faces[:, :-1]**2)
+
+    def step(self, T, dt, T_h, G_h, T_c, G_c):
+        """Advance the node temperatures by one implicit Euler time step, with the fluid temperatures and conductances held at their values for the end of the step.
+
+        Args:
+            T (numpy.ndarray): Node temperatures at the start of the step (K), with shape (stations, nodes).
+            dt (float): Time step (s).
+            T_h (numpy.ndarray): Hot fluid temperature at each station (K), e.g. the exhaust recovery temperature.
+            G_h (numpy.ndarray): Conductance between the hot fluid and the first node at each station (W/m/K), from boundary_conductance().
+            T_c (numpy.ndarray): Cold fluid temperature at each station (K).
+            G_c (numpy.ndarray): Conductance between the cold fluid and the last node at each station (W/m/K), from boundary_conductance().
+
+        Returns:
+            numpy.ndarray: Node temperatures at the end of the step (K), with shape (stations, nodes).
+        """
+        assert dt > 0, "'dt' must be positive"
+
+        C_dt = self.C / dt
+
+        # Conductances to the left (hotter) and right (colder) of each node
+        G_left = np.empty_like(C_dt)
+        G_right = np.empty_like(C_dt)
+        G_left[:, 0] = G_h
+        G_left[:, 1:] = self.G
+        G_right[:, -1] = G_c
+        G_right[:, :-1] = self.G
+
+        rhs = C_dt * T
+        rhs[:, 0] += G_h * T_h
+        rhs[:, -1] += G_c * T_c
+
+        # Banded form for scipy.linalg.solve_banded() - the off-diagonal terms between the last node of one station and the first node of the next are zero, since there is no axial conduction
+        size = self.stations * self.nodes
+        off_diagonal = np.zeros((self.stations, self.nodes))
+        off_diagonal[:, :-1] = -self.G
+        off_diagonal = off_diagonal.ravel()[:-1]
+
+        ab = np.zeros((3, size))
+        ab[0, 1:] = off_diagonal
+        ab[1] = (C_dt + G_left + G_right).ravel()
+        ab[2, :-1] = off_diagonal
+
+        return scipy.linalg.solve_banded((1, 1), ab, rhs.ravel(), check_finite = False).reshape(self.stations, self.nodes)
@@ -2,6 +2,7 @@
 Allows installation via pip, e.g. by navigating to this directory with the command prompt, and using 'pip install .'
 """
 
+import re
 import sys
 from setuptools import setup, find_packages
 
@@ -10,17 +11,20 @@ from pathlib import Path
 this_directory = Path(__file__).parent
 long_description = (this_directory / "README.md").read_text()
 
+# The version number is only written in cusfbamboo/__init__.py. It is read as text, because importing the package would need its dependencies to already be installed.
+version = re.search(r'^__version__ = "(.+)"', (this_directory / "cusfbamboo" / "__init__.py").read_text(), re.MULTILINE).group(1)
+
 setup(
     name='cusfbamboo',
     author = 'Daniel Gibbons',                 
     author_email = 'daniel.u.gibbons@gmail.com',        
-    version = '0.2.4',
+    version = version,
     license = '	AGPL-3.0',
     packages = find_packages(),
     install_requires = ['numpy', 'matplotlib', 'scipy'],
     description = 'Cooling system modelling for liquid rocket engines',
     keywords = ['rocket', 'engine', 'liquid', 'cooling', 'spaceflight', 'thermal'],
-    download_url = 'https://github.com/cuspaceflight/bamboo/archive/refs/tags/0.2.4.tar.gz',
+    download_url = f'https://github.com/cuspaceflight/bamboo/archive/refs/tags/{version}.tar.gz',
     url = 'https://github.com/cuspaceflight/bamboo',
     classifiers = [
         'Development Status :: 4 - Beta',     
@@ -0,0 +1,77 @@
+"""
+Shared fixtures for the tests. Every analysis uses a small engine and a coarse grid, so that the whole suite runs in a reasonable time.
+"""
+
+import warnings
+import pytest
+
+import cusfbamboo as bam
+
+NUM_GRID = 60               # Grid points for most of the analyses in the tests
+
+def make_engine(configuration = "vertical", walls = None, **jacket_kwargs):
+    """Make a small water cooled engine with a Rao nozzle.
+
+    Args:
+        configuration (str, optional): Cooling channel configuration, either 'vertical' or 'spiral'. Defaults to "vertical".
+        walls (list, optional): Walls of the engine. Defaults to None, in which case a single 2 mm copper wall is used.
+
+    Keyword Args:
+        Any keyword arguments for the CoolingJacket, which replace the defaults.
+
+    Returns:
+        Engine: The engine.
+    """
+    xs, rs = bam.rao.get_rao_contour(r_c = 0.045, r_t = 0.02, area_ratio = 4, L_c = 0.10, theta_conv = 45)
+
+    engine = bam.Engine(perfect_gas = bam.PerfectGas(gamma = 1.31, cp = 830),
+                        chamber_conditions = bam.ChamberConditions(p0 = 10e5, T0 = 2800),
+                        geometry = bam.Geometry(xs = xs, rs = rs),
+                        exhaust_transport = bam.materials.CO2,
+                        walls = bam.Wall(material = bam.materials.CopperC106, thickness = 2e-3) if walls is None else walls)
+
+    kwargs = {"T_coolant_in" : 298.15, "p_coolant_in" : 30e5, "mdot_coolant" : 0.5, "channel_height" : 2e-3, "coolant_transport" : bam.materials.Water}
+
+    if configuration == "vertical":
+        kwargs.update({"blockage_ratio" : 0.5, "number_of_channels" : 100})
+    else:
+        kwargs.update({"blockage_ratio" : 0.2, "number_of_channels" : 2, "channel_width" : 5e-3})
+
+    kwargs.update(jacket_kwargs)
+
+    engine.cooling_jacket = bam.CoolingJacket(configuration = configuration, **kwargs)
+
+    return engine
+
+def make_multi_jacket_engine():
+    """Make the engine from make_engine(), but with separate cooling circuits for the chamber and the nozzle, which meet at the throat.
+
+    Returns:
+        Engine: The engine.
+    """
+    engine = make_engine()
+    xs = engine.geometry.xs
+    x_t = engine.geometry.x_t
+
+    chamber_jacket = make_engine(xs = [xs[0], x_t]).cooling_jacket
+    nozzle_jacket = make_engine(xs = [x_t, xs[-1]], mdot_coolant = 0.3, channel_height = 3e-3).cooling_jacket
+
+    del engine.cooling_jacket
+    engine.cooling_jackets = [chamber_jacket, nozzle_jacket]
+
+    return engine
+
+@pytest.fixture(autouse = True)
+def quiet():
+    # The engines in the tests are not realistic designs, so the solvers often warn about them
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+@pytest.fixture
+def engine():
+    return make_engine()
+
+@pytest.fixture
+def spiral_engine():
+    return make_engine("spiral")
@@ -0,0 +1,73 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def test_matches_synchronous_analysis(engine):
+    events = []
+    results = asyncio.run(bam.aio.steady_heating_analysis(engine, num_grid = NUM_GRID, progress = events.append, progress_every = 10))
+
+    assert np.array_equal(results["T_coolant"], engine.steady_heating_analysis(num_grid = NUM_GRID)["T_coolant"])
+    assert events[0]["event"] == "started" and events[-1]["event"] == "finished"
+
+    fractions = [event["fraction"] for event in events if event["event"] == "station"]
+    assert len(fractions) == NUM_GRID // 10
+    assert np.all(np.diff(fractions) > 0) and fractions[-1] == 1
+
+def test_progress_does_not_need_every_value(engine, monkeypatch):
+    # Asynchronous analyses should skip the same values as synchronous ones, and not set up the run twice
+    fields = []
+    contexts = []
+    iter_heating_analysis = engine.iter_heating_analysis
+    run_context = engine.run_context
+
+    def recorded_rows(**kwargs):
+        fields.append(kwargs["fields"])
+        return iter_heating_analysis(**kwargs)
+
+    def recorded_context(**kwargs):
+        contexts.append(kwargs)
+        return run_context(**kwargs)
+
+    monkeypatch.setattr(engine, "iter_heating_analysis", recorded_rows)
+    monkeypatch.setattr(engine, "run_context", recorded_context)
+
+    for summary_only in [True, False]:
+        events = []
+        asyncio.run(bam.aio.steady_heating_analysis(engine, num_grid = NUM_GRID, summary_only = summary_only, progress = events.append))
+        engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = summary_only)
+
+        assert fields[-2] is not None and fields[-2] == fields[-1]
+        assert len([event for event in events if event["event"] == "station"]) == NUM_GRID
+
+    assert len(contexts) == 4
+
+def test_batch_keeps_order(engine):
+    cases = [(engine, {"coolant_inlet" : {"mdot_coolant" : mdot_coolant}}) for mdot_coolant in [0.3, 0.5]]
+    results = asyncio.run(bam.aio.run_batch(cases, max_concurrency = 1, num_grid = NUM_GRID, summary_only = True))
+
+    assert results[0]["T_coolant_out"] > results[1]["T_coolant_out"]
+
+def test_timeout_abandons_analysis(engine):
+    queue = asyncio.Queue()
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await bam.aio.steady_heating_analysis(engine, num_grid = 100000, timeout = 0.05, progress = queue)
+
+    asyncio.run(main())
+
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait()["event"])
+
+    assert "timeout" in events and "finished" not in events
+
+def test_batch_returns_exceptions():
+    results = asyncio.run(bam.aio.run_batch([make_engine(), object()], return_exceptions = True, num_grid = NUM_GRID, summary_only = True))
+
+    assert "T_coolant_out" in results[0]
+    assert isinstance(results[1], Exception)
@@ -0,0 +1,44 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "benchmarks", "benchmark_heating.py")
+
+def load_benchmarks():
+    spec = importlib.util.spec_from_file_location("benchmark_heating", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_runs_without_pythonpath(tmp_path):
+    env = {key : value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    process = subprocess.run([sys.executable, SCRIPT, "--help"], cwd = str(tmp_path), env = env, capture_output = True, text = True)
+
+    assert process.returncode == 0, process.stderr
+
+def test_case_counts_callbacks():
+    benchmarks = load_benchmarks()
+    case = benchmarks.run_case("pavli", 50, "gnielinski", None, "vertical", benchmarks.HYDROGEN_PROPERTIES, repeat = 1)
+
+    assert case["runtime"] > 0
+    assert case["callback_counts"]["Rdx"] > 0
+    assert case["callback_counts"]["coolant.mu"] > 0
+    assert benchmarks.case_id(case) == "pavli/50/gnielinski/smooth/vertical"
+
+def test_compare_finds_regressions():
+    benchmarks = load_benchmarks()
+    case = {"engine" : "pavli", "num_grid" : 50, "coolant_convection" : "gnielinski", "roughness" : None, "configuration" : "vertical", "runtime" : 1.0}
+    previous = {"properties" : benchmarks._properties_name(), "cases" : [dict(case, runtime = 0.5)]}
+
+    assert benchmarks.compare([case], previous, threshold = 0.1) == ["pavli/50/gnielinski/smooth/vertical"]
+    assert benchmarks.compare([dict(case, runtime = 0.52)], previous, threshold = 0.1) == []
+
+def test_timed_engines_are_not_instrumented():
+    benchmarks = load_benchmarks()
+    engine, counterflow = benchmarks.build_case("pavli", "vertical", "gnielinski", None, benchmarks.HYDROGEN_PROPERTIES)
+
+    # Constant properties stay constant, and the solver callbacks are the Engine's own methods
+    assert engine.cooling_jacket.coolant_transport._mu == benchmarks.HYDROGEN_PROPERTIES["mu"]
+    assert "Rdx" not in vars(engine)
@@ -0,0 +1,58 @@
+"""
+Tests for coolant boiling (the 'coolant_boiling' input of CoolingJacket, and cusfbamboo.materials.NucleateBoiling).
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def hot_engine(**jacket_kwargs):
+    # Low pressure coolant and a high chamber pressure, so that much of the jacket is beyond the critical heat flux
+    engine = make_engine(p_coolant_in = 2e5, mdot_coolant = 1.0, **jacket_kwargs)
+    engine.chamber_conditions = bam.ChamberConditions(p0 = 60e5, T0 = 2800)
+
+    return engine
+
+def test_film_boiling_keeps_forced_convection():
+    engine = hot_engine(coolant_boiling = bam.materials.WaterBoiling)
+    state = {"x" : engine.geometry.x_t, "T_c" : 300.0, "p_c" : 2e5, "V_c" : 10.0, "T_cw" : 400.0}
+    R_coolant = engine.R_coolant(state)
+    R_hot = 0.02 * R_coolant
+
+    # From forced convection, through nucleate boiling, into film boiling
+    R_boiling = [engine.R_coolant_boiling(state, R_coolant, R_hot, T_hot) for T_hot in np.linspace(300, 3000, 200)]
+
+    assert max(R_boiling) <= R_coolant * (1 + 1e-9)
+
+def test_film_boiling_does_not_overheat_the_wall():
+    forced = hot_engine().steady_heating_analysis(num_grid = NUM_GRID)
+    boiling = hot_engine(coolant_boiling = bam.materials.WaterBoiling).steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert "film boiling" in boiling["boiling_regime"]
+
+    T_hw_forced = max(T[-2] for T in forced["T"])
+    T_hw_boiling = max(T[-2] for T in boiling["T"])
+    assert T_hw_boiling < T_hw_forced + 0.02 * (T_hw_forced - 298.15)
+
+def test_water_table_reaches_near_critical():
+    saturation = bam.materials.WaterBoiling.saturation(210e5)
+
+    assert 640 < saturation["T_sat"] < 645
+    assert saturation["rho_l"] > saturation["rho_v"]
+    assert bam.materials.WaterBoiling.saturation(230e5) is None
+
+def test_pressure_beyond_table_raises():
+    with pytest.raises(ValueError):
+        bam.materials.WaterBoiling.saturation(218e5)
+
+def test_analysis_beyond_table_uses_forced_convection():
+    # Subcritical, but above the end of the water table - the analysis should carry on without boiling
+    forced = make_engine(p_coolant_in = 218e5).steady_heating_analysis(num_grid = NUM_GRID)
+
+    with pytest.warns(UserWarning, match = "saturation table"):
+        boiling = make_engine(p_coolant_in = 218e5, coolant_boiling = bam.materials.WaterBoiling).steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert np.allclose(boiling["T"], forced["T"])
+    assert set(boiling["boiling_regime"]) == {"forced convection"}
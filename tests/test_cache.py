@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def test_cached_results_are_reused(engine, tmp_path, monkeypatch):
+    cache = bam.cache.ResultCache(str(tmp_path))
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, cache = cache)
+
+    # A second analysis must not run the solver
+    monkeypatch.setattr(engine, "iter_heating_analysis", None)
+    cached = engine.steady_heating_analysis(num_grid = NUM_GRID, cache = cache)
+
+    assert np.array_equal(cached["T_coolant"], results["T_coolant"])
+    assert np.array_equal(cached["T"], results["T"])
+
+def test_key_depends_on_options_and_version(engine, tmp_path, monkeypatch):
+    cache = bam.cache.ResultCache(str(tmp_path))
+    key = cache.key(engine, num_grid = NUM_GRID)
+
+    assert cache.key(engine, num_grid = NUM_GRID) == key
+    assert cache.key(engine, num_grid = NUM_GRID + 1) != key
+
+    monkeypatch.setattr(bam, "__version__", "0.0.0")
+    assert cache.key(engine, num_grid = NUM_GRID) != key
+
+def test_version_has_a_single_source():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    version = subprocess.run([sys.executable, "setup.py", "--version"], cwd = root, capture_output = True, text = True).stdout.split()[-1]
+
+    assert version == bam.__version__
+
+def test_editing_a_table_file_changes_the_key(tmp_path):
+    path = str(tmp_path / "k.json")
+
+    def load_engine(k):
+        with open(path, "w") as f:
+            json.dump({"T" : [250, 700], "values" : [k, k]}, f)
+
+        definition = bam.config.engine_to_dict(make_engine())
+        definition["cooling_jacket"]["coolant_transport"] = {"cp" : 4180.0, "mu" : 8.9e-4, "Pr" : 6.0, "rho" : 1000.0, "k" : {"type" : "table", "file" : path}}
+        return bam.config.engine_from_dict(definition)
+
+    cache = bam.cache.ResultCache(str(tmp_path / "cache"))
+    engine = load_engine(0.6)
+    cache.put(cache.key(engine, num_grid = NUM_GRID), engine.steady_heating_analysis(num_grid = NUM_GRID))
+
+    # The definition only refers to the file, but its new contents must not use the stored results
+    edited = load_engine(0.05)
+
+    assert bam.config.engine_to_dict(edited) == bam.config.engine_to_dict(engine)
+    assert cache.key(edited, num_grid = NUM_GRID) != cache.key(engine, num_grid = NUM_GRID)
+    assert cache.get(cache.key(edited, num_grid = NUM_GRID)) is None
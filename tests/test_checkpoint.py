@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def interrupted(engine, path, stations):
+    # Start an analysis with a checkpoint, and stop it part way through
+    rows = engine.iter_heating_analysis(num_grid = NUM_GRID, checkpoint = path, checkpoint_every = 5)
+
+    for i in range(stations):
+        next(rows)
+
+    rows.close()
+
+def test_resume_matches_uninterrupted_run(engine, tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    interrupted(engine, path, 23)
+
+    header, records = bam.hx.read_checkpoint(path)
+    assert len(records) == 23
+
+    resumed = engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
+    full = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    for key in ["T", "T_coolant", "p_coolant", "dQ_dA"]:
+        assert np.array_equal(resumed[key], full[key])
+
+def test_changed_engine_does_not_resume(engine, tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    interrupted(engine, path, 23)
+    engine.cooling_jacket.mdot_coolant = 0.6
+
+    with pytest.raises(ValueError):
+        engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
+
+def test_changed_function_does_not_resume(tmp_path):
+    # Engines with lambdas can't be hashed, so the saved grid points must be re-checked
+    path = str(tmp_path / "run.ckpt")
+    engine = make_engine()
+    engine.cooling_jacket._channel_height = lambda x : 2e-3
+    interrupted(engine, path, 23)
+
+    engine.cooling_jacket._channel_height = lambda x : 2e-3 if x > 0 else 3e-3
+
+    with pytest.raises(ValueError):
+        engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
+
+    # The original function still resumes
+    engine.cooling_jacket._channel_height = lambda x : 2e-3
+    resumed = engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
+    os.remove(path)
+
+    assert np.array_equal(resumed["T_coolant"], engine.steady_heating_analysis(num_grid = NUM_GRID)["T_coolant"])
+
+def test_completed_checkpoint_of_changed_function_is_not_reused(tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    engine = make_engine()
+    engine.cooling_jacket._channel_height = lambda x : 2e-3
+    engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
+
+    # Only the last few grid points change
+    x_change = engine.geometry.xs[0] + 0.05 * (engine.geometry.xs[-1] - engine.geometry.xs[0])
+    engine.cooling_jacket._channel_height = lambda x : 2e-3 if x > x_change else 3e-3
+
+    with pytest.raises(ValueError):
+        engine.steady_heating_analysis(num_grid = NUM_GRID, checkpoint = path)
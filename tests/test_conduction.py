@@ -0,0 +1,107 @@
+"""
+Tests for cusfbamboo.conduction and Engine.steady_heating_analysis_2d().
+"""
+
+import concurrent.futures
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import NUM_GRID
+
+def make_wall(stations = 5, nodes = 4, r_hot = 0.02, thickness = 2e-3, k = 300.0, dx = 1e-3):
+    r_faces = np.tile(np.linspace(r_hot, r_hot + thickness, nodes + 1), (stations, 1))
+    return bam.conduction.AxisymmetricWall(r_faces = r_faces, k = np.full((stations, nodes), k), dx = dx)
+
+def test_radial_conduction_matches_cylinder():
+    wall = make_wall()
+    G_h = wall.boundary_conductance(np.full(5, 1e12), wall.R_h)
+    G_c = wall.boundary_conductance(np.full(5, 1e12), wall.R_c)
+
+    T = bam.conduction.AxisymmetricSolver(wall).solve(T_h = np.full(5, 1000.0), G_h = G_h, T_c = np.full(5, 300.0), G_c = G_c)
+    T_hw, T_cw, dQ_dx_h, dQ_dx_c = wall.surface_temperatures(T, 1000.0, G_h, 300.0, G_c)
+
+    # Fixed surface temperatures, so the heat flow is 2 pi k (T_hw - T_cw) / ln(r_c / r_h)
+    expected = 2 * np.pi * 300.0 * 700.0 / np.log(0.022 / 0.02)
+
+    assert T_hw == pytest.approx(1000.0, abs = 1e-3)
+    assert T_cw == pytest.approx(300.0, abs = 1e-3)
+    assert dQ_dx_h == pytest.approx(expected, rel = 1e-4)
+    assert dQ_dx_c == pytest.approx(expected, rel = 1e-4)
+
+def test_axial_conduction_conserves_energy():
+    wall = make_wall(stations = 20)
+    T_h = np.where(np.arange(20) < 10, 3000.0, 500.0)
+    G_h = wall.boundary_conductance(np.full(20, 50.0), wall.R_h)
+    G_c = wall.boundary_conductance(np.full(20, 200.0), wall.R_c)
+
+    T = bam.conduction.AxisymmetricSolver(wall).solve(T_h = T_h, G_h = G_h, T_c = np.full(20, 300.0), G_c = G_c)
+    _, _, dQ_dx_h, dQ_dx_c = wall.surface_temperatures(T, T_h, G_h, 300.0, G_c)
+
+    # Adiabatic ends, so all the heat in comes out, but not at the same stations
+    assert dQ_dx_h.sum() == pytest.approx(dQ_dx_c.sum(), rel = 1e-8)
+    assert not np.allclose(dQ_dx_h, dQ_dx_c)
+
+def test_factorization_is_reused():
+    wall = make_wall()
+    G_h = wall.boundary_conductance(np.full(5, 100.0), wall.R_h)
+    G_c = wall.boundary_conductance(np.full(5, 1000.0), wall.R_c)
+
+    solver = bam.conduction.AxisymmetricSolver(wall)
+    solver.solve(T_h = np.full(5, 2000.0), G_h = G_h, T_c = np.full(5, 300.0), G_c = G_c)
+    T = solver.solve(T_h = np.full(5, 2000.0), G_h = 1.1 * G_h, T_c = np.full(5, 300.0), G_c = 0.9 * G_c)
+
+    # A nearby set of conductances is solved with the preconditioned iterations, not a new factorization
+    assert solver.factorizations == 1
+    assert wall.matrix(1.1 * G_h, 0.9 * G_c) @ np.ravel(T) == pytest.approx(np.ravel(np.column_stack([1.1 * G_h * 2000.0] + [np.zeros(5)] * 2 + [0.9 * G_c * 300.0])), abs = 1e-6)
+
+def test_walls_are_cached():
+    r_faces = np.tile(np.linspace(0.02, 0.022, 4), (3, 1))
+    k = np.full((3, 3), 300.0)
+
+    assert bam.conduction.axisymmetric_wall(r_faces, k, 1e-3) is bam.conduction.axisymmetric_wall(r_faces.copy(), k.copy(), -1e-3)
+    assert bam.conduction.axisymmetric_wall(r_faces, 2 * k, 1e-3) is not bam.conduction.axisymmetric_wall(r_faces, k, 1e-3)
+
+def test_bad_wall():
+    with pytest.raises(AssertionError):
+        bam.conduction.AxisymmetricWall(r_faces = np.array([[0.022, 0.02]]), k = np.array([[300.0]]), dx = 1e-3)
+
+def test_engine_2d_analysis(engine):
+    results = engine.steady_heating_analysis_2d(num_grid = NUM_GRID, nodes_per_layer = 2)
+
+    assert results["converged"]
+    assert results["T_wall"].shape == (len(results["x"]), 2)
+
+    # Copper conducts heat away from the throat, so the peak is lower than without axial conduction
+    assert results["T_hw"].max() <= results["T_hw_1d"].max() + 0.1
+    assert results["T_hw"] == pytest.approx(results["T_hw_1d"], rel = 0.1)
+
+    # The same walls again, which share the cached wall but factorize it for themselves
+    again = engine.steady_heating_analysis_2d(num_grid = NUM_GRID, nodes_per_layer = 2, coolant_inlet = {"mdot_coolant" : 0.45})
+    assert again["factorizations"] == 1
+
+def test_solvers_do_not_share_factorizations():
+    # Refactorizing for one analysis must not change the reference conductances of another analysis of the same (cached) wall
+    wall = make_wall()
+    G_h = wall.boundary_conductance(np.full(5, 100.0), wall.R_h)
+    G_c = wall.boundary_conductance(np.full(5, 1000.0), wall.R_c)
+
+    first = bam.conduction.AxisymmetricSolver(wall)
+    second = bam.conduction.AxisymmetricSolver(wall)
+    first.solve(T_h = np.full(5, 2000.0), G_h = G_h, T_c = np.full(5, 300.0), G_c = G_c)
+    second.solve(T_h = np.full(5, 2000.0), G_h = 1e4 * G_h, T_c = np.full(5, 300.0), G_c = G_c)
+    second.solve(T_h = np.full(5, 2000.0), G_h = 1e-4 * G_h, T_c = np.full(5, 300.0), G_c = G_c, max_iter = 1)
+
+    assert np.array_equal(first._G_h_ref, G_h) and first.factorizations == 1
+    assert second.factorizations == 2
+    assert "_lu" not in vars(wall)
+
+def test_concurrent_analyses_match(engine):
+    serial = engine.steady_heating_analysis_2d(num_grid = NUM_GRID, nodes_per_layer = 2)
+
+    with concurrent.futures.ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda i: engine.steady_heating_analysis_2d(num_grid = NUM_GRID, nodes_per_layer = 2), range(4)))
+
+    for result in results:
+        assert result["T_hw"] == pytest.approx(serial["T_hw"], abs = 1e-6)
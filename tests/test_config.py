@@ -0,0 +1,46 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def test_round_trip(engine, tmp_path):
+    path = str(tmp_path / "engine.json")
+    bam.config.save(engine, path)
+    loaded = bam.config.load(path)
+
+    assert bam.config.engine_to_dict(loaded) == bam.config.engine_to_dict(engine)
+    assert loaded.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True) == engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True)
+
+def test_engine_is_picklable(engine):
+    copy = pickle.loads(pickle.dumps(engine))
+    assert bam.config.engine_to_dict(copy) == bam.config.engine_to_dict(engine)
+
+def test_relative_table_paths_in_wall_materials(tmp_path, monkeypatch):
+    # Material tables are relative to the engine definition, like the coolant tables
+    os.makedirs(tmp_path / "tables")
+    with open(tmp_path / "tables" / "yield.json", "w") as f:
+        json.dump({"T" : [300, 800], "values" : [300e6, 100e6]}, f)
+
+    definition = bam.config.engine_to_dict(make_engine())
+    definition["walls"][0]["material"] = {"k" : 390.0, "E" : 117e9, "alpha" : 17e-6, "poisson" : 0.33, "yield_strength" : {"type" : "table", "file" : os.path.join("tables", "yield.json")}}
+
+    with open(tmp_path / "engine.json", "w") as f:
+        json.dump(definition, f)
+
+    monkeypatch.chdir(os.path.dirname(tmp_path))
+    engine = bam.config.load(str(tmp_path / "engine.json"))
+    yield_strength = engine.walls[0].material.yield_strength
+
+    assert np.isclose(yield_strength(550), 200e6)
+    assert bam.config.engine_to_dict(engine)["walls"][0]["material"]["yield_strength"] == {"type" : "table", "file" : os.path.join("tables", "yield.json")}
+
+def test_lambdas_cannot_be_saved(engine):
+    engine.cooling_jacket._channel_height = lambda x : 2e-3
+
+    with pytest.raises(ValueError):
+        bam.config.engine_to_dict(engine)
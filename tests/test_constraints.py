@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import NUM_GRID
+
+def test_feasible_design_runs_to_the_end(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, constraints = {"T_hw_max" : 5000, "p_coolant_min" : 0})
+
+    assert results["feasible"]
+    assert results["violation"] is None
+    assert len(results["x"]) == NUM_GRID
+
+def test_stops_at_first_violation(engine):
+    full = engine.steady_heating_analysis(num_grid = NUM_GRID)
+    T_hw = np.array([T[-2] for T in full["T"]])
+    limit = (T_hw.min() + T_hw.max()) / 2
+    first = int(np.argmax(T_hw > limit))
+
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, constraints = {"T_hw_max" : limit})
+
+    assert not results["feasible"]
+    assert results["violation"]["constraint"] == "T_hw_max"
+    assert results["violation"]["wall"] == 0
+    assert results["violation"]["x"] == full["x"][first]
+    assert len(results["x"]) == first           # Only the grid points before the violation are kept
+
+def test_summary_mode_reports_violation(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True, constraints = {"p_coolant_min" : 50e5})
+
+    assert not results["feasible"]
+    assert results["violation"]["constraint"] == "p_coolant_min"
+    assert results["violation"]["limit"] == 50e5
+
+def test_per_wall_limits():
+    constraints = bam.constraints.Constraints(T_hw_max = [None, 400])
+    row = {"x" : 0.0, "T" : [300, 350, 450, 900, 2000], "p_coolant" : 1e5, "T_coolant" : 300}
+
+    # Wall 0 is not checked, and the hot side of wall 1 is at 450 K
+    assert constraints.check(row)["wall"] == 1
+
+    with pytest.raises(AssertionError):
+        bam.constraints.Constraints(T_hw_max = [400]).check(row)
+
+def test_unrecognised_keyword():
+    with pytest.raises(AssertionError):
+        bam.constraints.Constraints(T_wall_max = 800)
@@ -0,0 +1,55 @@
+import math
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+
+class FakeEngine:
+    # Quantities with an error of exactly C * dx^2, where dx = L / num_grid like in a heating analysis
+    def run_context(self, num_grid, counterflow, coolant_inlet = None):
+        return bam.engine.RunContext(cooling_jacket = bam.CoolingJacket(T_coolant_in = 300, p_coolant_in = 10e5, mdot_coolant = 1, channel_height = 1e-3, coolant_transport = bam.materials.Water), 
+                                     dx = 1 / num_grid, x_start = 1, x_end = 0, counterflow = True)
+
+    def steady_heating_analysis(self, num_grid, **kwargs):
+        dx = 1 / num_grid
+        return {"T_hw_max" : 800 + 1e4 * dx**2, "T_coolant_out" : 350 - 1e3 * dx**2, "p_coolant_out" : 9e5 + 1e7 * dx**2}
+
+def test_levels_are_nested(engine):
+    study = bam.convergence.grid_convergence(engine, num_grid_coarse = 20, levels = 3)
+    assert study["num_grid"] == [20, 40, 80]
+
+    coarse = engine.steady_heating_analysis(num_grid = 20)["x"]
+    fine = engine.steady_heating_analysis(num_grid = 40)["x"]
+
+    # Every coarse grid point is also a fine grid point
+    assert np.allclose(coarse, fine[::2], rtol = 0, atol = 1e-12)
+
+def test_recommendation_from_known_error():
+    study = bam.convergence.grid_convergence(FakeEngine(), tolerances = {"T_hw_max" : 1.0}, num_grid_coarse = 10, levels = 3)
+
+    assert np.isclose(study["order"]["T_hw_max"], 2)
+    assert np.isclose(study["extrapolated"]["T_hw_max"], 800)
+
+    # 1e4 * dx^2 <= 1 needs dx <= 0.01
+    assert abs(study["recommended_num_grid"] - 100) <= 1
+
+def test_recommendation_uses_every_tolerance():
+    study = bam.convergence.grid_convergence(FakeEngine(), tolerances = {"T_hw_max" : 1.0, "dp_coolant" : 25.0}, num_grid_coarse = 10, levels = 3)
+
+    # 1e7 * dx^2 <= 25 needs the finest grid
+    assert study["recommended_num_grid"] == math.ceil(math.sqrt(1e7 / 25))
+
+def test_growing_differences_have_no_recommendation():
+    # Differences that keep their sign but grow with refinement would give a negative order
+    assert np.isnan(bam.convergence.observed_order(800, 801, 803, 2))
+
+    class DivergingEngine(FakeEngine):
+        def steady_heating_analysis(self, num_grid, **kwargs):
+            return dict(super().steady_heating_analysis(num_grid), T_hw_max = 800 + 1e-3 * num_grid**2)
+
+    with pytest.warns(UserWarning, match = "T_hw_max"):
+        study = bam.convergence.grid_convergence(DivergingEngine(), tolerances = {"T_hw_max" : 1.0}, num_grid_coarse = 10, levels = 3)
+
+    assert np.isnan(study["order"]["T_hw_max"])
+    assert study["recommended_num_grid"] is None
@@ -0,0 +1,82 @@
+"""
+Tests for the channel cross section model in cusfbamboo.fins (CoolingJacket fin_model = "cross-section").
+"""
+
+import concurrent.futures
+import sys
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def tapered_engine():
+    # Channels that taper along the whole engine, so every grid point has a different blockage ratio and fin height
+    engine = make_engine(fin_model = "cross-section")
+    engine.cooling_jacket._blockage_ratio = lambda x: 0.3 + 0.8 * (x - engine.geometry.xs[0])
+    engine.cooling_jacket._channel_height = lambda x: 1.5e-3 + 0.004 * (x - engine.geometry.xs[0])
+
+    return engine
+
+@pytest.fixture
+def no_tables(monkeypatch):
+    monkeypatch.setattr(bam.fins, "_TABLES", {})
+
+def test_interpolation_matches_exact_table(no_tables):
+    for blockage_ratio, fin_height in [(0.13, 0.3), (0.37, 1.4), (0.61, 5.5), (0.85, 27)]:
+        exact = bam.fins.FinTable(blockage_ratio, fin_height)
+
+        for biot in [1e-3, 1e-1, 3]:
+            for half_width in [0.5, 3, 20]:
+                assert bam.fins.efficiency(biot, half_width, blockage_ratio, fin_height) == pytest.approx(exact(biot, half_width), rel = 0.02)
+
+def test_tapered_channels_build_tables_before_the_march(no_tables, monkeypatch):
+    engine = tapered_engine()
+    builds = []
+    FinTable = bam.fins.FinTable
+
+    def counted(blockage_ratio, fin_height):
+        builds.append((blockage_ratio, fin_height))
+        return FinTable(blockage_ratio, fin_height)
+
+    monkeypatch.setattr(bam.fins, "FinTable", counted)
+    engine.run_context(num_grid = NUM_GRID, counterflow = True)
+    prepared = len(builds)
+
+    # The tables only depend on the design, not the number of grid points
+    assert 0 < prepared < 50
+    assert bam.fins.prepare_tables([0.3, 0.35], [0.75, 0.8]) == 0
+
+    def forbidden(blockage_ratio, fin_height):
+        raise AssertionError("A fin table was built during the march")
+
+    monkeypatch.setattr(bam.fins, "FinTable", forbidden)
+
+    engine.steady_heating_analysis(num_grid = 4 * NUM_GRID)
+
+def test_tapered_analysis_is_continuous(no_tables):
+    results = tapered_engine().steady_heating_analysis(num_grid = NUM_GRID)
+    T_cw = np.array([T[1] for T in results["T"]])
+
+    # Interpolating between tables, so there are no jumps where the rounded design values used to change
+    assert np.max(np.abs(np.diff(T_cw))) < 0.2 * (T_cw.max() - T_cw.min())
+
+def test_table_cache_can_be_shared_by_threads(no_tables, monkeypatch):
+    # Threads that fill the cache past its limit at the same time must not both try to forget the same table
+    monkeypatch.setattr(bam.fins, "TABLE_CACHE_SIZE", 4)
+    monkeypatch.setattr(bam.fins, "FinTable", lambda blockage_ratio, fin_height: (blockage_ratio, fin_height))
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def build(offset):
+        return [bam.fins.fin_table(0.5, fin_height + offset * 1e-9) for fin_height in np.linspace(0.1, 10, 400)]
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            tables = list(executor.map(build, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert tables[3][10] == (0.5, np.linspace(0.1, 10, 400)[10] + 3e-9)
+    assert len(bam.fins._TABLES) <= 4
@@ -0,0 +1,64 @@
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def x_fraction(engine, fraction):
+    # Position a fraction of the way along the engine, from the injector end (i.e. the end of a counterflow march)
+    return engine.geometry.xs[0] + fraction * (engine.geometry.xs[-1] - engine.geometry.xs[0])
+
+def count_checks(monkeypatch):
+    calls = []
+    matches_record = bam.hx.HXSolver.matches_record
+
+    def counted(self, record):
+        calls.append(record[0])
+        return matches_record(self, record)
+
+    monkeypatch.setattr(bam.hx.HXSolver, "matches_record", counted)
+    return calls
+
+def test_matches_full_analysis():
+    engine = make_engine()
+    previous = engine.steady_heating_analysis(num_grid = NUM_GRID, restartable = True)
+
+    # Change the channels in a band in the middle of the engine only
+    x_1, x_2 = x_fraction(engine, 0.4), x_fraction(engine, 0.6)
+    engine.cooling_jacket._channel_height = lambda x : 2.5e-3 if x_1 < x < x_2 else 2e-3
+
+    incremental = engine.steady_heating_analysis(num_grid = NUM_GRID, previous = previous)
+    full = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    for key in ["T", "T_coolant", "p_coolant", "dQ_dA"]:
+        assert np.array_equal(incremental[key], full[key]), key
+
+def test_downstream_change_only_checks_a_sample(monkeypatch):
+    engine = make_engine()
+    previous = engine.steady_heating_analysis(num_grid = 400, restartable = True)
+
+    x_change = x_fraction(engine, 0.05)
+    engine.cooling_jacket._channel_height = lambda x : 2e-3 if x > x_change else 2.5e-3
+
+    calls = count_checks(monkeypatch)
+    incremental = engine.steady_heating_analysis(num_grid = 400, previous = previous)
+
+    assert len(calls) <= bam.hx.CHECKPOINT_SAMPLES
+    assert np.array_equal(incremental["T"], engine.steady_heating_analysis(num_grid = 400)["T"])
+
+def test_unhashable_transport_checks_every_grid_point(monkeypatch):
+    engine = make_engine(coolant_transport = bam.TransportProperties(Pr = lambda T, p : 6.159, mu = 0.89307e-3, k = 0.60627, cp = 4181.38, rho = 997.085))
+    previous = engine.steady_heating_analysis(num_grid = NUM_GRID, restartable = True)
+
+    calls = count_checks(monkeypatch)
+    engine.steady_heating_analysis(num_grid = NUM_GRID, previous = previous)
+
+    assert len(calls) == NUM_GRID
+
+def test_changed_property_is_found():
+    engine = make_engine()
+    previous = engine.steady_heating_analysis(num_grid = NUM_GRID, restartable = True)
+    engine.cooling_jacket.coolant_transport = bam.materials.Ethanol
+
+    incremental = engine.steady_heating_analysis(num_grid = NUM_GRID, previous = previous)
+
+    assert np.array_equal(incremental["T"], engine.steady_heating_analysis(num_grid = NUM_GRID)["T"])
@@ -0,0 +1,48 @@
+"""
+Tests for engines with several cooling circuits (Engine.multi_jacket_analysis() and cusfbamboo.jackets).
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_multi_jacket_engine, NUM_GRID
+
+@pytest.fixture
+def multi_jacket_engine():
+    return make_multi_jacket_engine()
+
+def test_x_strictly_increasing(multi_jacket_engine):
+    # Both circuits start at the throat
+    results = multi_jacket_engine.multi_jacket_analysis(num_grid = NUM_GRID, counterflow = [True, False])
+    x_t = multi_jacket_engine.geometry.x_t
+
+    # Both circuits have a grid point at the throat, but the combined results only have one
+    assert any(abs(x - x_t) < 1e-12 for x in results["circuits"][0]["x"])
+    assert any(abs(x - x_t) < 1e-12 for x in results["circuits"][1]["x"])
+    assert np.all(np.diff(results["x"]) > 0)
+    assert len(results["x"]) == len(results["circuits"][0]["x"]) + len(results["circuits"][1]["x"]) - 1
+
+    for key in ["T", "T_coolant", "circuit", "r"]:
+        assert len(results[key]) == len(results["x"])
+
+def test_circuits_are_independent(multi_jacket_engine):
+    results = multi_jacket_engine.multi_jacket_analysis(num_grid = NUM_GRID, counterflow = [True, False])
+    nozzle = bam.jackets.jacket_engine(multi_jacket_engine, 1).steady_heating_analysis(num_grid = NUM_GRID, counterflow = False)
+
+    assert results["circuits"][1]["T_coolant"] == pytest.approx(nozzle["T_coolant"])
+
+    # Every point after the throat comes from the nozzle circuit
+    x_t = multi_jacket_engine.geometry.x_t
+    assert all(circuit == 1 for x, circuit in zip(results["x"], results["circuit"]) if x > x_t + 1e-9)
+
+def test_combine_drops_shared_boundary():
+    info = {"x" : "", "T" : "", "r" : ""}
+    first = {"x" : [0.0, 0.1, 0.2], "T" : [1, 2, 3], "r" : [1, 1, 1], "info" : info}
+    second = {"x" : [0.3, 0.2 + 1e-17], "T" : [5, 4], "r" : [2, 2], "info" : info}
+
+    combined = bam.jackets.combine([first, second])
+
+    assert combined["x"] == [0.0, 0.1, 0.2, 0.3]
+    assert combined["T"] == [1, 2, 3, 5]
+    assert combined["circuit"] == [0, 0, 0, 1]
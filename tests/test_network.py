@@ -0,0 +1,65 @@
+"""
+Tests for flow networks of channel groups and manifolds (Engine.network_analysis() and cusfbamboo.network).
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def manifold(area = 1.0):
+    # A large area makes the manifold losses negligible
+    return bam.network.Manifold(area = area, segment_length = 5e-3)
+
+def test_one_group_matches_jacket(engine):
+    network = bam.network.FlowNetwork([bam.network.ChannelGroup(engine.cooling_jacket, channels = 100)], inlet_manifold = manifold(), outlet_manifold = manifold())
+    results = engine.network_analysis(network, mdot_coolant = 0.5, num_grid = NUM_GRID)
+    standalone = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert results["mdot"] == pytest.approx([0.5])
+    assert results["flow_ratio"] == pytest.approx([1.0])
+    assert results["T_hw"][0] == pytest.approx([T[-2] for T in standalone["T"]], rel = 1e-6)
+    assert results["T_coolant_out"][0] == pytest.approx(standalone["T_coolant"][-1], rel = 1e-6)
+    assert results["dp"][0] == pytest.approx(engine.cooling_jacket.p_coolant_in - standalone["p_coolant"][-1], rel = 1e-6)
+
+def test_flow_is_conserved(engine):
+    narrow = engine.cooling_jacket
+    wide = make_engine(number_of_channels = 60).cooling_jacket
+    groups = [bam.network.ChannelGroup(narrow, channels = 5) for n in range(6)] + [bam.network.ChannelGroup(wide, channels = 3) for n in range(6)]
+    network = bam.network.FlowNetwork(groups, inlet_manifold = manifold(1e-4), outlet_manifold = manifold(1e-4))
+
+    results = engine.network_analysis(network, mdot_coolant = 0.5, num_grid = NUM_GRID)
+    N = len(groups)
+
+    assert np.sum(results["mdot"]) == pytest.approx(0.5, rel = 1e-8)
+
+    # Mass balance at every junction of the inlet manifold ('Z' configuration, so the coolant enters at junction 0)
+    inflow = np.concatenate([[0.5], results["mdot_inlet_manifold"]])
+    outflow = np.concatenate([results["mdot_inlet_manifold"], [0.0]])
+    assert inflow - outflow == pytest.approx(results["mdot"], abs = 1e-8)
+
+    # ...and of the outlet manifold, which it leaves at junction N - 1
+    inflow = np.concatenate([[0.0], results["mdot_outlet_manifold"]]) + results["mdot"]
+    outflow = np.concatenate([results["mdot_outlet_manifold"], [0.5]])
+    assert inflow == pytest.approx(outflow, abs = 1e-8)
+
+    # Wider channels have less resistance, so take more flow per channel
+    assert np.all(results["flow_ratio"][N // 2:] > np.max(results["flow_ratio"][:N // 2]))
+    assert results["analyses"] >= 2 * 5
+
+def test_flow_split_of_linear_groups():
+    engine = make_engine()
+    groups = [bam.network.ChannelGroup(engine.cooling_jacket, channels = 1) for n in range(3)]
+    network = bam.network.FlowNetwork(groups, inlet_manifold = manifold(1e3), outlet_manifold = manifold(1e3))
+    resistance = np.array([1.0, 2.0, 4.0]) * 1e5
+
+    # Negligible manifold losses, so the groups are in parallel and the flow is inversely proportional to the resistance
+    solution = bam.network.solve_flow_split(network, mdot_coolant = 0.7, p_coolant_in = 10e5, group_pressure_drop = lambda mdot : (resistance * mdot, resistance),
+                                            inlet_properties = (1000.0, 1e-3), outlet_properties = (1000.0, 1e-3))
+
+    assert solution["mdot"][-3:] == pytest.approx([0.4, 0.2, 0.1], rel = 1e-6)
+
+def test_bad_group(spiral_engine):
+    with pytest.raises(AssertionError):
+        bam.network.ChannelGroup(spiral_engine.cooling_jacket, channels = 2)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from conftest import NUM_GRID
+
+def test_newton_agrees_with_march(engine):
+    march = engine.steady_heating_analysis(num_grid = NUM_GRID, iter_each = 20)
+    newton = engine.steady_heating_analysis(num_grid = NUM_GRID, solver = "newton")
+
+    # The march uses a first order step and the Newton solver the trapezium rule, so they only differ by the discretisation error
+    rise = march["T_coolant"][-1] - march["T_coolant"][0]
+
+    assert np.max(np.abs(np.array(newton["T_coolant"]) - march["T_coolant"])) < 0.02 * rise
+    assert np.allclose(newton["p_coolant"], march["p_coolant"], rtol = 1e-3)
+    assert np.allclose([T[-2] for T in newton["T"]], [T[-2] for T in march["T"]], rtol = 1e-2)
+
+def test_newton_converges(engine):
+    cooling_simulation = engine._heating_solver(num_grid = NUM_GRID, counterflow = True, solver = "newton")
+    cooling_simulation.run()
+
+    assert cooling_simulation.converged
+    assert cooling_simulation.iterations < 20
+
+def test_newton_warm_start(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, solver = "newton")
+    warm = engine.steady_heating_analysis(num_grid = NUM_GRID, solver = "newton", initial_guess = results)
+
+    assert np.allclose(warm["T_coolant"], results["T_coolant"], rtol = 1e-6)
+
+def test_unknown_solver(engine):
+    with pytest.raises(ValueError):
+        engine.steady_heating_analysis(num_grid = NUM_GRID, solver = "shooting")
@@ -0,0 +1,26 @@
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import NUM_GRID
+
+def test_profile_counts_iterations_and_calls(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, profile = True, iter_start = 5, iter_each = 2)
+    profile = results["profile"]
+
+    assert profile["iterations"] == [5] + [2] * (NUM_GRID - 1)
+    assert profile["callbacks"]["Rdx"]["calls"] == sum(profile["iterations"])
+    assert profile["properties"]["coolant"]["cp"] > 0
+    assert profile["wall_time"] > 0
+
+def test_profiling_does_not_change_results(engine):
+    profiled = engine.steady_heating_analysis(num_grid = NUM_GRID, profile = True)
+    plain = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert np.array_equal(profiled["T"], plain["T"])
+
+def test_transport_methods_are_restored(engine):
+    profiler = bam.profiling.Profiler()
+    list(engine.iter_heating_analysis(num_grid = NUM_GRID, profiler = profiler))
+
+    assert "mu" not in vars(bam.materials.Water)
+    assert "Rdx" in profiler.summary()
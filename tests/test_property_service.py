@@ -0,0 +1,33 @@
+import concurrent.futures
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def test_local_service_matches_transport():
+    with bam.property_service.LocalPropertyService(bam.property_service.TransportBackend(bam.materials.Water)) as service:
+        assert service.query("mu", 300, 1e5) == bam.materials.Water.mu(T = 300, p = 1e5)
+        assert np.allclose(service.query_many("cp", [300, 350], [1e5, 2e5]), [bam.materials.Water.cp(T = 300, p = 1e5), bam.materials.Water.cp(T = 350, p = 2e5)])
+
+        with pytest.raises(AssertionError):
+            service.query("viscosity", 300, 1e5)
+
+def test_engine_with_service_matches_direct_properties():
+    direct = make_engine().steady_heating_analysis(num_grid = NUM_GRID)
+
+    with bam.property_service.LocalPropertyService(bam.property_service.TransportBackend(bam.materials.Water)) as service:
+        engine = make_engine(coolant_transport = bam.property_service.transport_properties(service))
+        results = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert np.allclose(results["T_coolant"], direct["T_coolant"], rtol = 1e-12)
+
+def test_process_service_batches_threads():
+    with bam.property_service.ProcessPropertyService(bam.property_service.TransportBackend(bam.materials.Water), batch_window = 0.01) as service:
+        T = np.linspace(280, 360, 16)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+            values = list(executor.map(lambda T_i : service.query("k", T_i, 2e5), T))
+
+    assert np.allclose(values, [bam.materials.Water.k(T = T_i, p = 2e5) for T_i in T])
@@ -0,0 +1,79 @@
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def rows(values, key = "value"):
+    return [{key : value, "x" : float(i)} for i, value in enumerate(values)]
+
+def reduce(reducer, data):
+    reducer.reset()
+
+    for row in data:
+        reducer.update(row)
+
+    return reducer.result()
+
+def test_max_and_min_ignore_nan_in_any_order():
+    for values in [[np.nan, 1.0, 3.0], [1.0, np.nan, 3.0], [3.0, 1.0, np.nan]]:
+        assert reduce(bam.reducers.Max("value"), rows(values)) == 3.0
+        assert reduce(bam.reducers.Min("value"), rows(values)) == 1.0
+
+def test_max_and_min_of_all_nan_are_nan():
+    assert np.isnan(reduce(bam.reducers.Max("value"), rows([np.nan, np.nan])))
+    assert np.isnan(reduce(bam.reducers.Min("value"), rows([np.nan, np.nan])))
+
+def test_list_values_ignore_nan():
+    assert reduce(bam.reducers.Max("value"), rows([[np.nan, 2.0], [1.0, np.nan]])) == 2.0
+
+def test_integral_and_final():
+    data = rows([0.0, 1.0, 2.0])
+    assert reduce(bam.reducers.Integral("value"), data) == 2.0
+    assert reduce(bam.reducers.Final("value"), data) == 2.0
+    assert reduce(bam.reducers.ArgMax("value"), data) == 2.0
+    assert reduce(bam.reducers.ArgMin("value"), data) == 0.0
+
+def test_fields():
+    assert bam.reducers.Max("T", index = -2).fields == {"T"}
+    assert bam.reducers.Integral("dQ_dx").fields == {"dQ_dx", "x"}
+    assert bam.reducers.Max(lambda row : row["T"][0]).fields is None
+
+    class Custom(bam.reducers.Reducer):
+        def reset(self):
+            self.count = 0
+
+        def update(self, row):
+            self.count += 1
+
+        def result(self):
+            return self.count
+
+    assert Custom("T").fields is None
+
+def test_summary_matches_full_analysis(engine):
+    full = engine.steady_heating_analysis(num_grid = NUM_GRID)
+    summary = engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True)
+
+    assert set(summary.keys()) - {"info"} == set(bam.reducers.default_reducers().keys())
+    assert summary["T_hw_max"] == max(T[-2] for T in full["T"])
+    assert summary["T_coolant_out"] == full["T_coolant"][-1]
+    assert summary["sigma_t_max"] == np.max(full["sigma_t_max"])
+
+def test_summary_of_material_without_stress_properties_is_nan():
+    engine = make_engine(walls = bam.Wall(material = bam.materials.Graphite, thickness = 2e-3))
+    summary = engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True)
+
+    assert np.isnan(summary["sigma_t_max"])
+    assert np.isfinite(summary["T_hw_max"])
+
+def test_rows_only_contain_requested_fields(engine):
+    row = next(engine.iter_heating_analysis(num_grid = NUM_GRID, fields = set()))
+    assert "sigma_t_max" not in row and "rho_coolant" not in row
+    assert {"x", "T", "dQ_dA", "p_coolant", "T_coolant"} <= set(row.keys())
+
+    row = next(engine.iter_heating_analysis(num_grid = NUM_GRID))
+    assert "sigma_t_max" in row and "rho_coolant" in row
+
+def test_summary_with_callable_reducer(engine):
+    summary = engine.steady_heating_analysis(num_grid = NUM_GRID, summary_only = True, reducers = {"rho_max" : bam.reducers.Max(lambda row : row["rho_coolant"])})
+    assert summary["rho_max"] > 900
@@ -0,0 +1,17 @@
+import pytest
+
+from conftest import NUM_GRID
+
+def test_finds_inlet_pressure_for_outlet_pressure(engine):
+    solution = engine.solve_coolant_inlet(target = "p_coolant_out", value = 20e5, num_grid = NUM_GRID, num_grid_coarse = 20)
+
+    assert abs(solution["results"]["p_coolant"][-1] - 20e5) < 1e-4 * 20e5
+    assert solution["results"]["p_coolant"][0] == solution["value"]
+    assert solution["analyses_fine"] >= 1
+
+def test_flat_residual_raises_clear_error(engine, monkeypatch):
+    # An outlet value that does not depend on the varied input gives a zero secant slope
+    monkeypatch.setattr(engine, "steady_heating_analysis", lambda **kwargs : {"p_coolant" : [30e5, 25e5]})
+
+    with pytest.raises(ValueError, match = "did not change"):
+        engine.solve_coolant_inlet(target = "p_coolant_out", value = 20e5, num_grid = NUM_GRID, num_grid_coarse = 20)
@@ -0,0 +1,38 @@
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import NUM_GRID
+
+def test_rows_match_steady_heating_analysis(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID)
+    rows = list(engine.iter_heating_analysis(num_grid = NUM_GRID))
+
+    assert len(rows) == len(results["x"])
+
+    for key in ["x", "T", "dQ_dA", "p_coolant", "T_coolant"]:
+        assert np.array_equal([row[key] for row in rows], results[key]), key
+
+def test_rows_are_in_direction_of_coolant_flow(engine):
+    counterflow = [row["x"] for row in engine.iter_heating_analysis(num_grid = NUM_GRID)]
+    coflow = [row["x"] for row in engine.iter_heating_analysis(num_grid = NUM_GRID, counterflow = False)]
+
+    assert np.all(np.diff(counterflow) < 0)
+    assert np.all(np.diff(coflow) > 0)
+
+def test_stopping_early(engine):
+    full = list(engine.iter_heating_analysis(num_grid = NUM_GRID))
+    rows = engine.iter_heating_analysis(num_grid = NUM_GRID)
+
+    first = [next(rows) for i in range(10)]
+    rows.close()
+
+    # The grid points solved before stopping are the same as in a complete run
+    assert [row["T_coolant"] for row in first] == [row["T_coolant"] for row in full[:10]]
+
+def test_march_keeps_only_current_grid_points(engine):
+    cooling_simulation = engine._heating_solver(num_grid = NUM_GRID, counterflow = True, store_state = False)
+
+    for i, station in enumerate(cooling_simulation.march()):
+        assert len(cooling_simulation.state) <= 2
+
+    assert i == cooling_simulation.num_points - 1
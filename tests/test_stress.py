@@ -0,0 +1,56 @@
+"""
+Tests for the wall stresses (cusfbamboo.stress and Engine.stress_analysis()).
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, make_multi_jacket_engine, NUM_GRID
+
+def test_stresses_match_each_grid_point(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID)
+    rows = list(engine.iter_heating_analysis(num_grid = NUM_GRID))
+
+    for key in ["sigma_t_thermal", "sigma_t_pressure", "sigma_t_max"]:
+        assert np.array(results[key]) == pytest.approx(np.array([row[key] for row in rows]))
+
+def test_stresses_calculated_once(engine, monkeypatch):
+    calls = []
+    tangential_stresses = bam.stress.tangential_stresses
+
+    def counted(*args, **kwargs):
+        calls.append(len(kwargs["x"]))
+        return tangential_stresses(*args, **kwargs)
+
+    monkeypatch.setattr(bam.stress, "tangential_stresses", counted)
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID)
+
+    assert calls == [len(results["x"])]
+
+def test_stress_constraint_still_checked_at_each_grid_point(engine):
+    results = engine.steady_heating_analysis(num_grid = NUM_GRID, constraints = {"sigma_t_max" : 1.0})
+
+    assert not results["feasible"]
+    assert results["violation"]["constraint"] == "sigma_t_max"
+
+def test_multi_jacket_stresses():
+    engine = make_multi_jacket_engine()
+    engine.cooling_jackets[1].restrain_fins = True
+
+    results = engine.multi_jacket_analysis(num_grid = NUM_GRID, counterflow = [True, False])
+    stresses = engine.stress_analysis(results)
+
+    # Each grid point uses the cooling jacket of the circuit that covers it
+    for n in range(2):
+        circuit = results["circuits"][n]
+        single = bam.jackets.jacket_engine(engine, n).stress_analysis(circuit)
+        indices = [i for i, value in enumerate(results["circuit"]) if value == n]
+        order = [circuit["x"].index(results["x"][i]) for i in indices]
+
+        assert stresses["sigma_t_pressure"][indices] == pytest.approx(single["sigma_t_pressure"][order])
+        assert stresses["sigma_t_max"][indices] == pytest.approx(np.array(circuit["sigma_t_max"])[order])
+
+    # Without the circuit of each grid point, the jacket is found from its 'xs'
+    by_position = bam.stress.tangential_stresses(engine, x = results["x"], dQ_dA = results["dQ_dA"], p_coolant = results["p_coolant"])
+    assert by_position[1] == pytest.approx(stresses["sigma_t_pressure"])
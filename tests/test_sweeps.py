@@ -0,0 +1,61 @@
+import concurrent.futures
+import sys
+
+import numpy as np
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def engine_factory(mdot_coolant):
+    engine = make_engine()
+    engine.cooling_jacket.mdot_coolant = mdot_coolant
+    return engine
+
+def test_parameter_cases():
+    cases = bam.sweeps.parameter_cases({"a" : [1, 2], "b" : [3, 4, 5]})
+
+    assert len(cases) == 6
+    assert cases[1] == {"a" : 1, "b" : 4}
+
+def test_sweep_columns():
+    table = bam.sweeps.sweep(engine_factory, {"mdot_coolant" : [0.4, 0.5]}, analysis_kwargs = {"summary_only" : True, "num_grid" : NUM_GRID})
+
+    assert np.array_equal(table["mdot_coolant"], [0.4, 0.5])
+    assert table["T_coolant_out"][0] > table["T_coolant_out"][1]       # Less coolant heats up more
+    assert "info" in table
+
+def test_parameters_do_not_overwrite_results():
+    table = bam.sweeps.columns([{"T_hw_max" : 800}], [{"T_hw_max" : 650.0, "info" : {"T_hw_max" : "Hottest wall temperature"}}])
+
+    assert table["T_hw_max"][0] == 800
+    assert table["result_T_hw_max"][0] == 650.0
+    assert table["info"]["result_T_hw_max"] == "Hottest wall temperature"
+
+def test_mach_cache_size_is_limited(engine, monkeypatch):
+    monkeypatch.setattr(bam.engine, "MACH_CACHE_POINTS", 10)
+    bam.engine._MACH_CACHES.clear()
+
+    for x in np.linspace(engine.geometry.xs[0], engine.geometry.xs[-1], 50):
+        engine.M(x)
+
+    assert len(engine._mach_cache()) == 10
+    assert engine.M(engine.geometry.xs[-1]) > 1
+
+def test_mach_cache_can_be_shared_by_threads(engine, monkeypatch):
+    # Threads that fill the cache past its limit at the same time must not both try to forget the same position
+    monkeypatch.setattr(bam.engine, "MACH_CACHE_POINTS", 4)
+    bam.engine._MACH_CACHES.clear()
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def march(offset):
+        for x in np.linspace(engine.geometry.xs[0], engine.geometry.xs[-1], 400) + offset * 1e-9:
+            engine.M(x)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(8) as executor:
+            list(executor.map(march, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert len(engine._mach_cache()) <= 4
@@ -0,0 +1,29 @@
+import concurrent.futures
+
+import numpy as np
+
+from conftest import NUM_GRID
+
+def test_concurrent_analyses_of_one_engine(engine):
+    flows = [0.3, 0.4, 0.5, 0.6]
+
+    def analyse(mdot_coolant):
+        return engine.steady_heating_analysis(num_grid = NUM_GRID, coolant_inlet = {"mdot_coolant" : mdot_coolant})
+
+    sequential = [analyse(mdot_coolant) for mdot_coolant in flows]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 4) as executor:
+        concurrent_results = list(executor.map(analyse, flows))
+
+    for a, b in zip(sequential, concurrent_results):
+        assert np.array_equal(a["T_coolant"], b["T_coolant"])
+        assert np.array_equal(a["p_coolant"], b["p_coolant"])
+
+    # The overrides only apply to each run, not the engine
+    assert engine.cooling_jacket.mdot_coolant == 0.5
+
+def test_coolant_inlet_override_matches_changed_jacket(engine):
+    override = engine.steady_heating_analysis(num_grid = NUM_GRID, coolant_inlet = {"T_coolant_in" : 320})
+    engine.cooling_jacket.T_coolant_in = 320
+
+    assert np.array_equal(override["T_coolant"], engine.steady_heating_analysis(num_grid = NUM_GRID)["T_coolant"])
@@ -0,0 +1,81 @@
+"""
+Tests for Engine.throttle_analysis() and cusfbamboo.throttle.
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import NUM_GRID
+
+POINTS = [{"p0" : 8e5, "mdot_coolant" : 0.4}, {"p0" : 10e5}, {"p0" : 12e5, "T0" : 2900, "T_coolant_in" : 300}]
+
+def test_matches_separate_analyses(engine):
+    envelope = engine.throttle_analysis(POINTS, num_grid = NUM_GRID, iter_each = 10, iter_each_warm = 3)
+    T_coolant_in = engine.cooling_jacket.T_coolant_in
+
+    for n, point in enumerate(POINTS):
+        point_engine = bam.throttle.operating_point(engine, {key : point[key] for key in ["p0", "T0"] if key in point})
+        coolant_inlet = {key : point[key] for key in ["T_coolant_in", "mdot_coolant"] if key in point}
+        results = point_engine.steady_heating_analysis(num_grid = NUM_GRID, iter_each = 10, coolant_inlet = coolant_inlet if coolant_inlet else None)
+        T_hw = np.array([T[-2] for T in results["T"]])
+
+        if n == 0:
+            # Cold start, exactly like a separate analysis
+            assert envelope["T_hw"][n] == pytest.approx(T_hw)
+        else:
+            # Warm-started, so only differs by the iteration error of the march
+            assert envelope["T_hw"][n] == pytest.approx(T_hw, abs = 0.01 * (T_hw.max() - T_coolant_in))
+
+        assert envelope["T_coolant"][n][-1] == pytest.approx(results["T_coolant"][-1], abs = 0.1)
+
+def test_stacked_shapes_and_conditions(engine):
+    envelope = engine.throttle_analysis(POINTS, num_grid = NUM_GRID)
+
+    assert envelope["T_hw"].shape == (len(POINTS), len(envelope["x"]))
+    assert list(envelope["p0"]) == [8e5, 10e5, 12e5]
+    assert list(envelope["T0"]) == [2800, 2800, 2900]
+    assert list(envelope["mdot_coolant"]) == [0.4, 0.5, 0.5]
+    assert envelope["T_coolant_in"][-1] == 300
+    assert envelope["T_hw_max"] == pytest.approx(envelope["T_hw"].max(axis = 1))
+
+    # More heating at higher chamber pressure
+    assert envelope["dQ_dx"][0].sum() < envelope["dQ_dx"][1].sum() < envelope["dQ_dx"][2].sum()
+
+def test_operating_point_does_not_modify_engine(engine):
+    point_engine = bam.throttle.operating_point(engine, {"p0" : 20e5})
+
+    assert engine.chamber_conditions.p0 == 10e5
+    assert point_engine.mdot == pytest.approx(2 * engine.mdot)
+    assert point_engine.c_star == pytest.approx(engine.c_star)
+
+def test_cache_geometry_reuses_values(engine):
+    calls = []
+    original = engine.A_coolant
+
+    def counted(x):
+        calls.append(x)
+        return original(x)
+
+    engine.A_coolant = counted
+    cached = bam.throttle.cache_geometry(engine)
+
+    assert cached.A_coolant(0.01) == cached.A_coolant(0.01) == original(0.01)
+    assert calls == [0.01]
+
+def test_bad_points(engine):
+    with pytest.raises(AssertionError):
+        engine.throttle_analysis([{"p_chamber" : 10e5}], num_grid = NUM_GRID)
+
+    with pytest.raises(AssertionError):
+        engine.throttle_analysis([{"p0" : 10e5, "chamber_conditions" : engine.chamber_conditions}], num_grid = NUM_GRID)
+
+    with pytest.raises(AssertionError):
+        engine.throttle_analysis(POINTS, num_grid = NUM_GRID, summary_only = True)
+
+def test_workers_give_same_points(engine):
+    serial = engine.throttle_analysis(POINTS, num_grid = NUM_GRID, iter_each = 10, iter_each_warm = 10)
+    parallel = engine.throttle_analysis(POINTS, num_grid = NUM_GRID, iter_each = 10, iter_each_warm = 10, workers = 2)
+
+    assert parallel["T_hw_max"] == pytest.approx(serial["T_hw_max"], abs = 0.5)
+    assert list(parallel["p0"]) == list(serial["p0"])
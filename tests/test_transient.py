@@ -0,0 +1,48 @@
+"""
+Tests for Engine.transient_heating_analysis().
+"""
+
+import numpy as np
+import pytest
+
+import cusfbamboo as bam
+from conftest import make_engine, NUM_GRID
+
+def test_approaches_steady_state(engine):
+    steady = engine.steady_heating_analysis(num_grid = NUM_GRID)
+    transient = engine.transient_heating_analysis(t_end = 20, dt = 1, num_grid = NUM_GRID, nodes_per_layer = 2, store_every = 5)
+
+    order = np.argsort(steady["x"])
+    T_hw_steady = np.interp(transient["x"], np.array(steady["x"])[order], np.array([T[-2] for T in steady["T"]])[order])
+    rise = T_hw_steady - engine.cooling_jacket.T_coolant_in
+
+    assert np.all(np.abs(transient["T_hw"][-1] - T_hw_steady) < 0.05 * rise)
+
+def test_stores_first_and_last_times(engine):
+    results = engine.transient_heating_analysis(t_end = 1.0, dt = 0.25, num_grid = NUM_GRID, nodes_per_layer = 1, store_every = 3, T_hw_ref = 600)
+
+    assert list(results["t"]) == [0.0, 0.75, 1.0]
+    assert results["T_hw"].shape == (3, len(results["x"]))
+
+def test_initial_temperature_and_heating(engine):
+    results = engine.transient_heating_analysis(t_end = 0.5, dt = 0.1, num_grid = NUM_GRID, nodes_per_layer = 2, T_hw_ref = 600, T_initial = 350)
+
+    assert np.all(results["T_nodes"][0] == 350)
+
+    # The wall only heats up from its initial temperature
+    assert np.all(np.diff(results["T_hw"].max(axis = 1)) > 0)
+
+def test_needs_wall_heat_capacity():
+    engine = make_engine(walls = bam.Wall(material = bam.Material(E = 100e9, poisson = 0.3, alpha = 2e-5, k = 300), thickness = 2e-3))
+
+    with pytest.raises(AssertionError):
+        engine.transient_heating_analysis(t_end = 1, dt = 0.1, num_grid = NUM_GRID)
+
+def test_wall_solvers_share_radial_nodes():
+    r_faces = np.tile(np.linspace(0.02, 0.022, 4), (3, 1))
+    k = np.full((3, 3), 300.0)
+    transient = bam.transient.TransientWallSolver(r_faces = r_faces, k = k, rho_cp = np.full((3, 3), 3.4e6))
+    steady = bam.conduction.AxisymmetricWall(r_faces = r_faces, k = k, dx = 1e-3)
+
+    assert np.array_equal(transient.G, steady.G) and np.array_equal(transient.R_h, steady.R_h) and np.array_equal(transient.R_c, steady.R_c)
+    assert bam.transient.TransientWallSolver.surface_temperatures is bam.conduction.AxisymmetricWall.surface_temperatures
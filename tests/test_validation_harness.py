@@ -0,0 +1,63 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+import cusfbamboo as bam
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "validation", "harness.py")
+
+def load_harness():
+    spec = importlib.util.spec_from_file_location("harness", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_runs_without_pythonpath(tmp_path):
+    env = {key : value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    process = subprocess.run([sys.executable, SCRIPT, "--help"], cwd = str(tmp_path), env = env, capture_output = True, text = True)
+
+    assert process.returncode == 0, process.stderr
+
+def test_every_timed_run_starts_without_cached_mach_numbers(monkeypatch):
+    harness = load_harness()
+    cached = []
+    steady_heating_analysis = bam.Engine.steady_heating_analysis
+
+    def recorded(self, **kwargs):
+        cached.append(len(bam.engine._MACH_CACHES))
+        return steady_heating_analysis(self, **kwargs)
+
+    monkeypatch.setattr(bam.Engine, "steady_heating_analysis", recorded)
+    runs = harness.run(cases = ["pavli"], settings = [{"num_grid" : 50}, {"num_grid" : 50}], properties = "constant")
+
+    assert cached == [0, 0]
+    assert runs[0]["errors"] == runs[1]["errors"]
+    assert runs[0]["errors"]["dp_coolant"] is None
+
+def test_pavli_channel_width_is_quadratic():
+    harness = load_harness()
+    engine, analysis_kwargs, reference = harness.pavli(properties = "constant")
+    data = harness._load("pavli.json")
+    x, w = data["Channel width"]["x (m)"], data["Channel width"]["w (m)"]
+
+    # Passes through the data points, but is curved between them
+    assert np.isclose(engine.cooling_jacket.channel_width(x[1]), w[1])
+    x_mid = (x[1] + x[2]) / 2
+    assert not np.isclose(engine.cooling_jacket.channel_width(x_mid), (w[1] + w[2]) / 2, rtol = 1e-9)
+
+def test_check_reports_missing_and_worse_runs():
+    harness = load_harness()
+    run = {"case" : "pavli", "settings" : {"num_grid" : 50}, "errors" : {"dQ_dA_max" : 5.0, "dT_coolant" : -2.0, "dp_coolant" : None}}
+    baseline = [dict(run, errors = {"dQ_dA_max" : 3.0, "dT_coolant" : -2.5, "dp_coolant" : None})]
+    missing = dict(run, settings = {"num_grid" : 100})
+
+    failures = harness.check([run, missing], baseline, tolerance = 1.0)
+
+    assert len(failures) == 2
+    assert "dQ_dA_max" in failures[0]
+    assert "not in the baseline" in failures[1]
+    assert harness.check([run], baseline, tolerance = 3.0) == []
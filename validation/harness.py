@@ -0,0 +1,357 @@
+"""
+Headless version of the validation notebooks, for running the validation cases in batch at several solver settings, and checking that changes to the solver don't reduce accuracy.
+
+Each case is built in the same way as its notebook (Vulcain Combustion Chamber.ipynb, Vulcain Nozzle Extension.ipynb and Pavli 1966.ipynb), and the same error metrics as the
+README's validation table are calculated (peak heat flux, coolant temperature rise and coolant pressure drop errors, with positive values meaning an overprediction).
+
+Usage:
+    python validation/harness.py --output validation_results.json
+    python validation/harness.py --baseline validation_results.json     # Fails if any error has moved more than --tolerance percentage points further from zero
+
+Notes:
+ - Like the notebooks, this needs CoolProp (coolant properties) and Cantera (exhaust gas properties). '--properties constant' uses representative constant values instead, which is only
+   useful for checking that the harness itself runs - the errors are not comparable with the README.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+import scipy.interpolate
+
+# Use the copy of cusfbamboo in this repository (rather than an installed version), so the harness checks the checkout it is run from
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cusfbamboo as bam
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Solver settings to run each case at. Each is a dictionary of keyword arguments for Engine.steady_heating_analysis(), and 'None' means the notebook's own num_grid.
+DEFAULT_SETTINGS = [{"num_grid" : 250},
+                    {"num_grid" : 1000},
+                    {"num_grid" : None},
+                    {"num_grid" : 4000},
+                    {"num_grid" : 1000, "iter_each" : 4}]
+
+# Representative constant properties, for '--properties constant' only
+CONSTANT_EXHAUST = {"Pr" : 0.6, "mu" : 1.0e-4, "k" : 0.6}
+CONSTANT_HYDROGEN = {"Pr" : 0.9, "mu" : 1.2e-5, "k" : 0.12, "cp" : 13000.0, "rho" : 40.0}
+
+def _load(name):
+    with open(os.path.join(DATA_DIRECTORY, name)) as f:
+        return json.load(f)
+
+def exhaust_transport(T0, p0, OF_ratio, properties = "real"):
+    """Exhaust gas transport properties for hydrogen/oxygen combustion, using a Cantera equilibrium calculation (as in the notebooks).
+
+    Args:
+        T0 (float): Chamber temperature (K).
+        p0 (float): Chamber pressure (Pa).
+        OF_ratio (float): Oxidiser/fuel mass ratio.
+        properties (str, optional): "real" to use Cantera, or "constant" for representative constant values. Defaults to "real".
+
+    Returns:
+        TransportProperties: The exhaust gas transport properties.
+    """
+    if properties == "constant":
+        return bam.TransportProperties(**CONSTANT_EXHAUST)
+
+    try:
+        import cantera as ct
+    except ImportError:
+        raise ImportError("Cantera is needed for the validation cases (e.g. 'pip install cantera'), or use properties = 'constant' to only check that the harness runs")
+
+    gas = ct.Solution('gri30.yaml')
+    gas.TPY = T0, p0, f"H2:{1}, O2:{OF_ratio}"
+    gas.equilibrate("TP")
+
+    def mu_exhaust(T, p):
+        gas.TP = T, p
+        return gas.viscosity
+
+    def k_exhaust(T, p):
+        gas.TP = T, p
+        return gas.thermal_conductivity
+
+    def Pr_exhaust(T, p):
+        gas.TP = T, p
+        return gas.cp * gas.viscosity / gas.thermal_conductivity
+
+    return bam.TransportProperties(Pr = Pr_exhaust, mu = mu_exhaust, k = k_exhaust)
+
+def hydrogen_transport(T_min = None, properties = "real"):
+    """Hydrogen coolant transport properties from CoolProp (as in the notebooks).
+
+    Args:
+        T_min (float, optional): Temperatures below this are rounded up to it, since CoolProp can fail at very low temperatures for hydrogen. Defaults to None (no rounding).
+        properties (str, optional): "real" to use CoolProp, or "constant" for representative constant values. Defaults to "real".
+
+    Returns:
+        TransportProperties: The coolant transport properties.
+    """
+    if properties == "constant":
+        return bam.TransportProperties(**CONSTANT_HYDROGEN)
+
+    try:
+        from CoolProp.CoolProp import PropsSI
+    except ImportError:
+        raise ImportError("CoolProp is needed for the validation cases (e.g. 'pip install CoolProp'), or use properties = 'constant' to only check that the harness runs")
+
+    def make(output):
+        if T_min is None:
+            return lambda T, p: PropsSI(output, "T", T, "P", p, "HYDROGEN")
+
+        return lambda T, p: PropsSI(output, "T", max(T, T_min), "P", p, "HYDROGEN")
+
+    return bam.TransportProperties(Pr = make("PRANDTL"), mu = make("VISCOSITY"), k = make("CONDUCTIVITY"), cp = make("CPMASS"), rho = make("DMASS"))
+
+# Validation cases. Each returns the Engine, the analysis keyword arguments used in its notebook, and the reference values for the error metrics (None if there is no reference).
+def vulcain_chamber(properties = "real"):
+    """Vulcain combustion chamber, from 'Vulcain Combustion Chamber.ipynb'. References are Kirner et al (1993) for the heat flux and coolant temperatures, and LeBail (smooth wall simulation) for the pressure drop.
+    """
+    data = _load("vulcain.json")
+    xs = data["Kirner"]["Chamber Contour"]["x"]
+    rs = data["Kirner"]["Chamber Contour"]["y"]
+
+    x_key = [xs[0], xs[int(np.argmin(rs))], xs[-1]]
+    r_key = [rs[0], min(rs), rs[-1]]
+    number_of_channels = 360
+
+    def channel_height(x):
+        return np.interp(x, x_key, [9.5e-3, 11e-3, 12e-3])
+
+    blockage_key = [number_of_channels * fin / (2 * np.pi * r) for fin, r in zip([2.0e-3, 1.3e-3, 2.6e-3], r_key)]
+
+    def blockage_ratio(x):
+        return np.interp(x, x_key, blockage_key)
+
+    cooling_jacket = bam.CoolingJacket(T_coolant_in = 36.198,
+                                       p_coolant_in = 137.9e5,
+                                       coolant_transport = hydrogen_transport(T_min = 12, properties = properties),
+                                       mdot_coolant = 33.42,
+                                       configuration = "vertical",
+                                       channel_height = channel_height,
+                                       number_of_channels = number_of_channels,
+                                       blockage_ratio = blockage_ratio)
+
+    engine = bam.Engine(perfect_gas = bam.PerfectGas(gamma = 1.2006, cp = 3866.5),
+                        chamber_conditions = bam.ChamberConditions(p0 = 100e5, T0 = 3452.81),
+                        geometry = bam.Geometry(xs = xs, rs = rs),
+                        cooling_jacket = cooling_jacket,
+                        exhaust_transport = exhaust_transport(T0 = 3452.81, p0 = 100e5, OF_ratio = 5.6, properties = properties),
+                        walls = bam.Wall(material = bam.Material(k = 295), thickness = 1e-3))
+
+    reference = {"dQ_dA_max" : 5952.304e4,                  # Peak of Kirner's heat flux data (W/m2)
+                 "dT_coolant" : 98.613 - 36.198,            # Kirner's experimental inlet and outlet temperatures (K)
+                 "dp_coolant" : (137.874 - 117.173) * 1e5}  # LeBail's inlet and outlet pressures (Pa)
+
+    return engine, {"num_grid" : 1000, "counterflow" : True}, reference
+
+def vulcain_extension(properties = "real"):
+    """Vulcain nozzle extension, from 'Vulcain Nozzle Extension.ipynb'. References are Kirner et al (1993) for the coolant temperatures, and Nydén for the pressure drop.
+    """
+    data = _load("vulcain.json")
+    x_extension = data["Kirner"]["Extension Contour"]["x"]
+    x_taper_end = np.interp(0.15, [0, 4.15], [x_extension[0], x_extension[-1]])
+
+    def blockage_ratio(x):
+        return 0.2857 if x < x_taper_end else 0.2
+
+    def channel_width(x):
+        return 2.8e-3 if x < x_taper_end else 4e-3
+
+    cooling_jacket = bam.CoolingJacket(T_coolant_in = data["Kirner"]["Extension Coolant Temperature (Sim)"]["y"][0],
+                                       p_coolant_in = 40e5,
+                                       coolant_transport = hydrogen_transport(properties = properties),
+                                       mdot_coolant = 1.75,
+                                       configuration = "spiral",
+                                       channel_height = 3.2e-3,
+                                       number_of_channels = 456,
+                                       blockage_ratio = blockage_ratio,
+                                       channel_width = channel_width,
+                                       xs = [x_extension[0], x_extension[-1]])
+
+    engine = bam.Engine(perfect_gas = bam.PerfectGas(gamma = 1.2006, cp = 3866.5),
+                        chamber_conditions = bam.ChamberConditions(p0 = 100e5, T0 = 3452.81),
+                        geometry = bam.Geometry(xs = data["Kirner"]["Engine Contour"]["x"], rs = data["Kirner"]["Engine Contour"]["y"]),
+                        cooling_jacket = cooling_jacket,
+                        exhaust_transport = exhaust_transport(T0 = 3452.81, p0 = 100e5, OF_ratio = 5.6, properties = properties),
+                        walls = bam.Wall(material = bam.Material(k = 20.5), thickness = 0.4e-3),
+                        coolant_convection = "gnielinski",
+                        exhaust_convection = "bartz-sigma")
+
+    T_kirner = data["Kirner"]["Extension Coolant Temperature (Exp)"]["y"]
+
+    reference = {"dQ_dA_max" : None,
+                 "dT_coolant" : abs(T_kirner[-1] - T_kirner[0]),
+                 "dp_coolant" : 40e5 - 25e5}                # Nydén's inlet and outlet pressures, ignoring manifold losses (Pa)
+
+    return engine, {"num_grid" : 2000, "counterflow" : False}, reference
+
+def pavli(properties = "real"):
+    """Pavli 1966 (firing 9), from 'Pavli 1966.ipynb'. References are Pavli's experimental heat flux and coolant temperatures.
+    """
+    data = _load("pavli.json")
+    channel_height = 2.54e-3
+
+    channel_width = scipy.interpolate.interp1d(data["Channel width"]["x (m)"], data["Channel width"]["w (m)"], kind = "quadratic")
+
+    def blockage_ratio(x):
+        return 2.045e-6 / (channel_width(x) * channel_height)
+
+    cooling_jacket = bam.CoolingJacket(T_coolant_in = data["Coolant temperature"]["T (K)"][0],
+                                       p_coolant_in = data["Coolant static pressure"]["p (Pa)"][0],
+                                       coolant_transport = hydrogen_transport(properties = properties),
+                                       mdot_coolant = 0.0644,
+                                       configuration = "spiral",
+                                       channel_height = channel_height,
+                                       channel_width = channel_width,
+                                       number_of_channels = 8,
+                                       blockage_ratio = blockage_ratio)
+
+    engine = bam.Engine(perfect_gas = bam.PerfectGas(gamma = 1.2163, cp = 4063.1),
+                        chamber_conditions = bam.ChamberConditions(p0 = 7.91e5, T0 = 2939),
+                        geometry = bam.Geometry(xs = data["Chamber Contour"]["x (m)"], rs = data["Chamber Contour"]["y (m)"]),
+                        cooling_jacket = cooling_jacket,
+                        exhaust_transport = exhaust_transport(T0 = 2939, p0 = 7.91e5, OF_ratio = 5.01, properties = properties),
+                        walls = bam.Wall(material = bam.materials.StainlessSteel304, thickness = 2.54e-3))
+
+    T_pavli = data["Coolant temperature"]["T (K)"]
+
+    # The README doesn't give a pressure drop error for Pavli, since the coolant may have choked in the experiment
+    reference = {"dQ_dA_max" : max(data["Heat flux"]["q (W/m2)"]),
+                 "dT_coolant" : abs(T_pavli[-1] - T_pavli[0]),
+                 "dp_coolant" : None}
+
+    return engine, {"num_grid" : 1000, "counterflow" : False, "iter_each" : 3}, reference
+
+CASES = {"vulcain_chamber" : vulcain_chamber, "vulcain_extension" : vulcain_extension, "pavli" : pavli}
+
+def errors(results, reference):
+    """Calculate the README's error metrics from the results of an analysis.
+
+    Args:
+        results (dict): Results from Engine.steady_heating_analysis().
+        reference (dict): Reference values of "dQ_dA_max" (W/m2), "dT_coolant" (K) and "dp_coolant" (Pa). Any that are None are skipped.
+
+    Returns:
+        dict: Percentage error in each metric (None if there is no reference), with positive values meaning an overprediction.
+    """
+    predicted = {"dQ_dA_max" : max(results["dQ_dA"]),
+                 "dT_coolant" : abs(results["T_coolant"][-1] - results["T_coolant"][0]),
+                 "dp_coolant" : abs(results["p_coolant"][0] - results["p_coolant"][-1])}
+
+    return {name : None if reference[name] is None else float(100 * (predicted[name] - reference[name]) / reference[name]) for name in predicted}
+
+def run(cases = None, settings = None, properties = "real"):
+    """Run validation cases at several solver settings.
+
+    Args:
+        cases (list, optional): Names of the cases to run, from CASES. Defaults to None (all of them).
+        settings (list, optional): List of keyword arguments for Engine.steady_heating_analysis(), which override the notebook's own. A 'num_grid' of None uses the notebook's value.
+            Defaults to None (DEFAULT_SETTINGS).
+        properties (str, optional): "real" to use CoolProp and Cantera like the notebooks, or "constant" to only check that the harness runs. Defaults to "real".
+
+    Returns:
+        list: A dictionary for each run, with the keys "case", "settings", "runtime" (s) and "errors" (see errors()).
+    """
+    cases = list(CASES.keys()) if cases is None else cases
+    settings = DEFAULT_SETTINGS if settings is None else settings
+    runs = []
+
+    for name in cases:
+        for setting in settings:
+            # Build a new engine for every run, and forget the Mach numbers cached by the last one (they are shared between Engine objects), so the runtime includes the same work each time
+            bam.engine._MACH_CACHES.clear()
+            engine, analysis_kwargs, reference = CASES[name](properties = properties)
+            kwargs = dict(analysis_kwargs, **{key : value for key, value in setting.items() if value is not None})
+
+            start = time.perf_counter()
+            results = engine.steady_heating_analysis(**kwargs)
+            runtime = time.perf_counter() - start
+
+            runs.append({"case" : name, "settings" : kwargs, "runtime" : runtime, "errors" : errors(results, reference)})
+
+    return runs
+
+def _key(run):
+    return f"{run['case']} {json.dumps(run['settings'], sort_keys = True)}"
+
+def check(runs, baseline, tolerance = 1.0):
+    """Check that validation accuracy has not got worse, compared to a previous set of runs.
+
+    Args:
+        runs (list): Runs from run().
+        baseline (list): Runs from a previous version, e.g. loaded from the output of this script.
+        tolerance (float, optional): Allowed increase in the magnitude of each percentage error (percentage points). Defaults to 1.
+
+    Returns:
+        list: Descriptions of each metric that got worse by more than 'tolerance', and of each run that is missing from the baseline (so its accuracy can't be checked). 
+        Empty if accuracy holds.
+    """
+    previous = {_key(item) : item for item in baseline}
+    failures = []
+
+    for item in runs:
+        if _key(item) not in previous:
+            failures.append(f"{_key(item)}: not in the baseline")
+            continue
+
+        for name, value in item["errors"].items():
+            old = previous[_key(item)]["errors"].get(name)
+
+            if value is None or old is None:
+                continue
+
+            if abs(value) > abs(old) + tolerance:
+                failures.append(f"{_key(item)}: {name} error is {value:+.2f}% (was {old:+.2f}%)")
+
+    return failures
+
+def _format(value):
+    return "       -" if value is None else f"{value:+7.2f}%"
+
+def main(arguments = None):
+    parser = argparse.ArgumentParser(description = "Run the validation cases at several solver settings, and report the errors and runtimes.")
+    parser.add_argument("--cases", nargs = "+", default = list(CASES.keys()), choices = list(CASES.keys()))
+    parser.add_argument("--num-grid", nargs = "+", type = int, default = None, help = "Values of num_grid to run, instead of the default settings")
+    parser.add_argument("--properties", default = "real", choices = ["real", "constant"])
+    parser.add_argument("--output", default = None, help = "Path of the JSON file to write the results to")
+    parser.add_argument("--baseline", default = None, help = "Path of a previous JSON output to check the errors against")
+    parser.add_argument("--tolerance", type = float, default = 1.0, help = "Allowed increase in each percentage error when using --baseline (percentage points)")
+    args = parser.parse_args(arguments)
+
+    settings = None if args.num_grid is None else [{"num_grid" : num_grid} for num_grid in args.num_grid]
+    runs = run(cases = args.cases, settings = settings, properties = args.properties)
+
+    print(f"{'Case':<20}{'Settings':<55}{'Runtime (s)':>12}{'Heat flux':>11}{'dT':>11}{'dp':>11}")
+
+    for item in runs:
+        settings_text = ", ".join(f"{key} = {value}" for key, value in item["settings"].items())
+        print(f"{item['case']:<20}{settings_text:<55}{item['runtime']:>12.3f}   {_format(item['errors']['dQ_dA_max'])}   {_format(item['errors']['dT_coolant'])}   {_format(item['errors']['dp_coolant'])}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"version" : bam.__version__, "properties" : args.properties, "runs" : runs}, f, indent = 1)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline.get("properties") != args.properties:
+            print(f'Warning: the baseline used properties = "{baseline.get("properties")}", but this run used "{args.properties}"')
+
+        failures = check(runs, baseline["runs"], args.tolerance)
+
+        for failure in failures:
+            print(failure)
+
+        if failures:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())